@@ -0,0 +1,76 @@
+r"""
+Benchmark of the per-frequency dense MCCF solver against the original
+block-diagonal ``scipy.sparse`` formulation.
+
+Usage::
+
+    python benchmarks/bench_correlationfilter.py --n-images 50 --n-channels 31
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+from numpy.fft import fft2, ifft2, ifftshift
+from scipy.sparse import spdiags, eye as speye
+from scipy.sparse.linalg import spsolve
+
+from menpofit.math.correlationfilter import mccf
+from menpofit.math.fft_utils import pad, crop
+
+
+def sparse_mccf(X, y, l=0.01, boundary='constant', crop_filter=True):
+    r"""
+    Reference MCCF that builds a block-diagonal sparse system per image and
+    solves it with ``spsolve``.
+    """
+    n, k, hx, wx = X.shape
+    _, hy, wy = y.shape
+    ext_h = hx + hy - 1
+    ext_w = wx + wy - 1
+    ext_d = ext_h * ext_w
+    fft_ext_y = fft2(pad(y, (ext_h, ext_w)))
+    ext_X = pad(X, (ext_h, ext_w), boundary=boundary)
+    sXX = 0
+    sXY = 0
+    for ext_x in ext_X:
+        fft_ext_x = fft2(ext_x)
+        diag_fft_x = spdiags(fft_ext_x.reshape((k, -1)),
+                             -np.arange(0, k) * ext_d, ext_d * k, ext_d).T
+        sXX += diag_fft_x.conj().T.dot(diag_fft_x)
+        sXY += diag_fft_x.conj().T.dot(fft_ext_y.ravel())
+    fft_ext_f = spsolve(sXX + l * speye(sXX.shape[-1]), sXY)
+    f = np.real(ifftshift(ifft2(fft_ext_f.reshape((k, ext_h, ext_w))),
+                          axes=(-2, -1)))
+    if crop_filter:
+        f = crop(f, (hy, wy))
+    return f, sXY, sXX
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--n-images', type=int, default=50)
+    parser.add_argument('--n-channels', type=int, default=31)
+    parser.add_argument('--patch-size', type=int, default=34)
+    parser.add_argument('--response-size', type=int, default=17)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    X = rng.randn(args.n_images, args.n_channels, args.patch_size,
+                  args.patch_size)
+    y = rng.randn(1, args.response_size, args.response_size)
+
+    f_sparse = sparse_mccf(X, y)[0]
+    f_dense = mccf(X, y)[0]
+    print('max abs filter difference: {:.3e}'.format(
+        np.abs(f_sparse - f_dense).max()))
+
+    for name, func in [('sparse', sparse_mccf), ('dense', mccf)]:
+        t = min(timeit.repeat(lambda: func(X, y), number=1,
+                              repeat=args.repeat))
+        print('{:>6}: {:.3f}s'.format(name, t))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+r"""
+Benchmark of the float32 compute path of the Lucas-Kanade AAM/ATM fitters
+against the default float64 one. It reports the fitting time, the memory of
+the precomputed arrays and the accuracy delta between the two dtypes.
+
+Usage::
+
+    python benchmarks/bench_lk_dtype.py /path/to/lfpw/trainset --n-train 200 \
+        --n-test 50 --features igo --algorithm WibergInverseCompositional
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+
+import menpo.io as mio
+from menpo.feature import no_op, igo, fast_dsift, hog
+
+from menpofit.aam import HolisticAAM, LucasKanadeAAMFitter
+from menpofit.aam.algorithm import lk as aam_lk
+from menpofit.atm import HolisticATM, LucasKanadeATMFitter
+from menpofit.atm import algorithm as atm_lk
+from menpofit.fitter import noisy_shape_from_shape
+from menpofit.error import euclidean_bb_normalised_error
+
+
+FEATURES = {'no_op': no_op, 'igo': igo, 'dsift': fast_dsift, 'hog': hog}
+
+
+def load_images(path, n_images, diagonal):
+    images = []
+    for i in mio.import_images(path, max_images=n_images, verbose=False):
+        i = i.crop_to_landmarks_proportion(0.2)
+        i = i.rescale_landmarks_to_diagonal_range(diagonal)
+        if i.n_channels == 3:
+            i = i.as_greyscale()
+        images.append(i)
+    return images
+
+
+def precomputed_nbytes(fitter):
+    # Total size of the ndarray attributes of the algorithms
+    return sum(v.nbytes for a in fitter.algorithms
+               for v in vars(a).values() if isinstance(v, np.ndarray))
+
+
+def fit_all(fitter, images, initial_shapes, max_iters):
+    return [fitter.fit_from_shape(i, s, max_iters=max_iters,
+                                  gt_shape=i.landmarks[None].lms)
+            for i, s in zip(images, initial_shapes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('path', help='folder of landmarked images')
+    parser.add_argument('--model', choices=['aam', 'atm'], default='aam')
+    parser.add_argument('--algorithm', default=None,
+                        help='name of the Lucas-Kanade algorithm class')
+    parser.add_argument('--features', choices=sorted(FEATURES),
+                        default='igo')
+    parser.add_argument('--n-train', type=int, default=100)
+    parser.add_argument('--n-test', type=int, default=20)
+    parser.add_argument('--diagonal', type=int, default=150)
+    parser.add_argument('--max-iters', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.path, args.n_train + args.n_test, args.diagonal)
+    train, test = images[:args.n_train], images[args.n_train:]
+    features = FEATURES[args.features]
+    if args.model == 'aam':
+        model = HolisticAAM(train, holistic_features=features,
+                            diagonal=args.diagonal)
+        algorithm_cls = getattr(aam_lk, args.algorithm or
+                                'WibergInverseCompositional')
+
+        def build_fitter(dtype):
+            return LucasKanadeAAMFitter(model, lk_algorithm_cls=algorithm_cls,
+                                        dtype=dtype)
+    else:
+        model = HolisticATM(train[0], [i.landmarks[None] for i in train],
+                            holistic_features=features,
+                            diagonal=args.diagonal)
+        algorithm_cls = getattr(atm_lk, args.algorithm or
+                                'InverseCompositional')
+
+        def build_fitter(dtype):
+            return LucasKanadeATMFitter(model, lk_algorithm_cls=algorithm_cls,
+                                        dtype=dtype)
+
+    # The same noisy initialisations are used for both dtypes
+    np.random.seed(0)
+    reference_shape = model.reference_shape
+    initial_shapes = [noisy_shape_from_shape(reference_shape,
+                                             i.landmarks[None].lms)
+                      for i in test]
+
+    results = {}
+    for dtype in (np.float64, np.float32):
+        name = np.dtype(dtype).name
+        fitter = build_fitter(dtype)
+        results[dtype] = fit_all(fitter, test, initial_shapes, args.max_iters)
+        t = min(timeit.repeat(
+            lambda: fit_all(fitter, test, initial_shapes, args.max_iters),
+            number=1, repeat=args.repeat))
+        errors = np.array([r.final_error() for r in results[dtype]])
+        print('{:>8}: {:.3f}s ({:.1f}ms/image), precomputed {:.1f}MB, '
+              'mean error {:.5f}, median error {:.5f}'.format(
+                name, t, 1000 * t / len(test),
+                precomputed_nbytes(fitter) / 2.0 ** 20, errors.mean(),
+                np.median(errors)))
+
+    final_64 = np.array([r.final_shape.points for r in results[np.float64]])
+    final_32 = np.array([r.final_shape.points for r in results[np.float32]])
+    delta = euclidean_bb_normalised_error(final_32, final_64,
+                                          norm_shape=final_64)
+    print('float32 vs float64 final shapes: mean normalised distance '
+          '{:.3e}, max {:.3e}'.format(delta.mean(), delta.max()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+r"""
+Benchmark of the randomized truncated PCA against the exact (blocked) PCA,
+reporting time and the captured variance of both, on synthetic data with a
+power-law spectrum.
+
+Usage::
+
+    python benchmarks/bench_randomized_pca.py --n-samples 2000 \
+        --n-features 20000 --n-components 50
+"""
+from __future__ import print_function, division
+import argparse
+import timeit
+
+import numpy as np
+
+from menpofit.math.pca import blocked_pca, randomized_pca
+
+
+def synthetic_data(n_samples, n_features, decay, rng):
+    r"""
+    Data matrix whose singular values decay as ``(i + 1) ** -decay``.
+    """
+    rank = min(n_samples, n_features)
+    U = np.linalg.qr(rng.randn(n_samples, rank))[0]
+    V = np.linalg.qr(rng.randn(n_features, rank))[0]
+    s = (np.arange(rank) + 1.) ** -decay
+    return (U * s).dot(V.T)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--n-samples', type=int, default=2000)
+    parser.add_argument('--n-features', type=int, default=5000)
+    parser.add_argument('--n-components', type=int, default=50)
+    parser.add_argument('--n-oversamples', type=int, default=10)
+    parser.add_argument('--n-power-iterations', type=int, nargs='+',
+                        default=[0, 1, 2, 4])
+    parser.add_argument('--decay', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    X = synthetic_data(args.n_samples, args.n_features, args.decay,
+                       np.random.RandomState(0))
+    k = args.n_components
+
+    components, eigenvalues, mean = blocked_pca(X, max_n_components=k)
+    total_variance = np.sum(eigenvalues)
+    exact = np.sum(eigenvalues[:k]) / total_variance
+    t = min(timeit.repeat(lambda: blocked_pca(X, max_n_components=k),
+                          number=1, repeat=args.repeat))
+    print('{:>16}: {:.4f}s, captured variance {:.6f}'.format('exact', t,
+                                                             exact))
+
+    for q in args.n_power_iterations:
+        def func():
+            return randomized_pca(X, k, n_oversamples=args.n_oversamples,
+                                  n_power_iterations=q, random_state=0)
+        _, r_eigenvalues, _, r_total = func()
+        # The variance of the data along the randomized components
+        captured = np.sum(r_eigenvalues) / r_total
+        t = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print('{:>16}: {:.4f}s, captured variance {:.6f} '
+              '(relative loss {:.2e})'.format(
+                  'randomized q={}'.format(q), t, captured,
+                  (exact - captured) / exact))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+r"""
+Benchmark of the fused steepest descent images kernel against the original
+broadcast-and-sum implementation, reporting time and peak memory.
+
+Usage::
+
+    python benchmarks/bench_sdi.py --n-channels 36 --n-pixels 20000
+"""
+from __future__ import print_function
+import argparse
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from menpofit.math.sdi import steepest_descent_images, numba
+
+
+def broadcast_sdi(nabla, dW_dp):
+    r"""
+    Reference implementation that forms the full
+    ``(n_dims, n_blocks, n_channels, n_pixels, n_params)`` product and sums it
+    over the dims.
+    """
+    sdi = 0
+    a = nabla[..., None] * dW_dp[:, :, None, ...]
+    for d in a:
+        sdi += d
+    return sdi
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--n-channels', type=int, default=36)
+    parser.add_argument('--n-pixels', type=int, default=20000)
+    parser.add_argument('--n-params', type=int, default=20)
+    parser.add_argument('--dtype', default='float64')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    nabla = rng.randn(2, 1, args.n_channels, args.n_pixels).astype(args.dtype)
+    dW_dp = rng.randn(2, 1, args.n_pixels, args.n_params).astype(args.dtype)
+    out = np.empty((1, args.n_channels, args.n_pixels, args.n_params),
+                   dtype=args.dtype)
+
+    print('numba: {}'.format('yes' if numba is not None else 'no'))
+    print('max abs difference: {:.3e}'.format(np.abs(
+        broadcast_sdi(nabla, dW_dp) -
+        steepest_descent_images(nabla, dW_dp)).max()))
+    print('output: {:.1f}MB'.format(out.nbytes / 2.0 ** 20))
+
+    # warm up the compiled kernel, if any
+    steepest_descent_images(nabla, dW_dp, out=out)
+    for name, func in [
+            ('broadcast', lambda: broadcast_sdi(nabla, dW_dp)),
+            ('fused', lambda: steepest_descent_images(nabla, dW_dp)),
+            ('fused+out', lambda: steepest_descent_images(nabla, dW_dp,
+                                                          out=out))]:
+        t = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print('{:>10}: {:.4f}s, peak allocation {:.1f}MB'.format(
+            name, t, peak_memory(func) / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
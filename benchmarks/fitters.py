@@ -0,0 +1,167 @@
+r"""
+`asv <https://asv.readthedocs.io>`_ benchmark suite that trains every fitter
+family on synthetic landmarked images (see ``benchmarks/synthetic.py``) and
+tracks its training time, ``fit_from_bb`` time and peak memory, time per
+iteration and accuracy.
+
+Usage::
+
+    # benchmark the working tree
+    asv run --python=same
+    # fail if any tracked metric of HEAD regresses by more than 20% w.r.t.
+    # master
+    asv continuous --factor 1.2 master HEAD
+"""
+from __future__ import division
+import time
+from functools import partial
+
+import numpy as np
+
+from menpofit.aam import (HolisticAAM, PatchAAM, LucasKanadeAAMFitter,
+                          AlternatingForwardCompositional,
+                          AlternatingInverseCompositional,
+                          ModifiedAlternatingForwardCompositional,
+                          ModifiedAlternatingInverseCompositional,
+                          ProjectOutForwardCompositional,
+                          ProjectOutInverseCompositional,
+                          SimultaneousForwardCompositional,
+                          SimultaneousInverseCompositional,
+                          WibergForwardCompositional,
+                          WibergInverseCompositional)
+from menpofit.sdm import SDM, RegularizedSDM
+from menpofit.clm import CLM, GradientDescentCLMFitter
+from menpofit.aps import GenerativeAPS, GaussNewtonAPSFitter
+from menpofit.atm import HolisticATM, LucasKanadeATMFitter
+from menpofit.unified_aam_clm import UnifiedAAMCLM, UnifiedAAMCLMFitter
+from menpofit.lk import LucasKanadeFitter
+
+from .synthetic import GROUP, synthetic_images, perturbed_bounding_boxes
+
+N_TRAIN = 40
+N_TEST = 10
+DIAGONAL = 80
+SCALES = (0.5, 1.0)
+PATCH_SHAPE = (11, 11)
+MAX_ITERS = 20
+
+LK_AAM_ALGORITHMS = [
+    AlternatingForwardCompositional, AlternatingInverseCompositional,
+    ModifiedAlternatingForwardCompositional,
+    ModifiedAlternatingInverseCompositional,
+    ProjectOutForwardCompositional, ProjectOutInverseCompositional,
+    SimultaneousForwardCompositional, SimultaneousInverseCompositional,
+    WibergForwardCompositional, WibergInverseCompositional]
+
+# Functions that train a model (or a fitter) from the training images
+MODELS = {
+    'HolisticAAM': partial(HolisticAAM, group=GROUP, diagonal=DIAGONAL,
+                           scales=SCALES),
+    'PatchAAM': partial(PatchAAM, group=GROUP, diagonal=DIAGONAL,
+                        scales=SCALES, patch_shape=PATCH_SHAPE),
+    'SDM': partial(SDM, group=GROUP, diagonal=DIAGONAL, scales=SCALES,
+                   patch_shape=PATCH_SHAPE, n_perturbations=5),
+    'RegularizedSDM': partial(RegularizedSDM, group=GROUP, diagonal=DIAGONAL,
+                              scales=SCALES, patch_shape=PATCH_SHAPE,
+                              n_perturbations=5),
+    'CLM': partial(CLM, group=GROUP, diagonal=DIAGONAL, scales=SCALES,
+                   patch_shape=PATCH_SHAPE, context_shape=(22, 22)),
+    'GenerativeAPS': partial(GenerativeAPS, group=GROUP, diagonal=DIAGONAL,
+                             scales=SCALES, patch_shape=PATCH_SHAPE),
+    'HolisticATM': lambda images: HolisticATM(
+        images[0], [i.landmarks[GROUP].lms for i in images], group=GROUP,
+        diagonal=DIAGONAL, scales=SCALES),
+    'UnifiedAAMCLM': partial(UnifiedAAMCLM, group=GROUP, diagonal=DIAGONAL,
+                             scales=SCALES, patch_shape=PATCH_SHAPE,
+                             context_shape=(22, 22)),
+    'LucasKanade': lambda images: LucasKanadeFitter(
+        images[0], group=GROUP, diagonal=DIAGONAL, scales=SCALES)}
+
+# Functions that build a fitter given the trained model, per fitter name
+FITTERS = {
+    'SDM': lambda model: model,
+    'RegularizedSDM': lambda model: model,
+    'GradientDescentCLMFitter': GradientDescentCLMFitter,
+    'GaussNewtonAPSFitter': GaussNewtonAPSFitter,
+    'LucasKanadeATMFitter': LucasKanadeATMFitter,
+    'UnifiedAAMCLMFitter': UnifiedAAMCLMFitter,
+    'LucasKanadeFitter': lambda model: model}
+FITTER_MODELS = {
+    'SDM': 'SDM', 'RegularizedSDM': 'RegularizedSDM',
+    'GradientDescentCLMFitter': 'CLM',
+    'GaussNewtonAPSFitter': 'GenerativeAPS',
+    'LucasKanadeATMFitter': 'HolisticATM',
+    'UnifiedAAMCLMFitter': 'UnifiedAAMCLM',
+    'LucasKanadeFitter': 'LucasKanade'}
+for _aam in ('HolisticAAM', 'PatchAAM'):
+    for _cls in LK_AAM_ALGORITHMS:
+        _name = '{}-{}'.format(_aam, _cls.__name__)
+        FITTERS[_name] = partial(LucasKanadeAAMFitter, lk_algorithm_cls=_cls)
+        FITTER_MODELS[_name] = _aam
+
+
+def train_images():
+    return synthetic_images(N_TRAIN, seed=0)
+
+
+def test_images():
+    return synthetic_images(N_TEST, seed=1)
+
+
+class Train(object):
+    r"""
+    Training time and peak memory of every model.
+    """
+    params = sorted(MODELS)
+    param_names = ['model']
+    timeout = 600
+
+    def setup(self, model):
+        self.images = train_images()
+
+    def time_train(self, model):
+        MODELS[model](self.images)
+
+    def peakmem_train(self, model):
+        MODELS[model](self.images)
+
+
+class Fit(object):
+    r"""
+    Fitting time, peak memory, time per iteration and accuracy of every
+    fitter, fitted from perturbed bounding boxes of the test images.
+    """
+    params = sorted(FITTERS)
+    param_names = ['fitter']
+    timeout = 1200
+
+    def setup_cache(self):
+        # Train all the models once; they get pickled and passed to setup
+        images = train_images()
+        return dict((name, train(images)) for name, train in MODELS.items())
+
+    def setup(self, models, fitter):
+        self.fitter = FITTERS[fitter](models[FITTER_MODELS[fitter]])
+        self.images = test_images()
+        self.bounding_boxes = perturbed_bounding_boxes(self.images)
+
+    def _fit(self):
+        return [self.fitter.fit_from_bb(i, bb, max_iters=MAX_ITERS,
+                                        gt_shape=i.landmarks[GROUP].lms)
+                for i, bb in zip(self.images, self.bounding_boxes)]
+
+    def time_fit_from_bb(self, models, fitter):
+        self._fit()
+
+    def peakmem_fit_from_bb(self, models, fitter):
+        self._fit()
+
+    def track_time_per_iteration(self, models, fitter):
+        t = time.time()
+        results = self._fit()
+        return (time.time() - t) / sum(r.n_iters for r in results)
+    track_time_per_iteration.unit = 'seconds'
+
+    def track_error(self, models, fitter):
+        return np.mean([r.final_error() for r in self._fit()])
+    track_error.unit = 'normalised error'
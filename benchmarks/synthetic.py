@@ -0,0 +1,100 @@
+r"""
+Generator of synthetic landmarked images for the benchmarks, so that they can
+run offline and reproducibly. Each image contains a deformed and randomly
+placed face-like object: a bright elliptical blob with dark blobs on its
+(outline, eyes and mouth) landmarks.
+"""
+from __future__ import division
+import numpy as np
+
+from menpo.image import Image
+from menpo.shape import PointCloud
+
+GROUP = 'PTS'
+
+
+def mean_shape(radius=30.):
+    r"""
+    The ``(20, 2)`` mean shape, centred at the origin: 12 outline points, 4
+    eye points and 4 mouth points.
+    """
+    angles = np.linspace(0, 2 * np.pi, 12, endpoint=False)
+    outline = np.vstack((1.2 * np.cos(angles), np.sin(angles))).T
+    eyes = np.array([[-0.35, -0.55], [-0.35, -0.25],
+                     [-0.35, 0.25], [-0.35, 0.55]])
+    mouth = np.array([[0.5, -0.35], [0.4, 0.], [0.5, 0.35], [0.6, 0.]])
+    return radius * np.vstack((outline, eyes, mouth))
+
+
+def _render(points, image_shape, rng):
+    # Renders the object given its landmarks (in pixel coordinates)
+    y, x = np.mgrid[:image_shape[0], :image_shape[1]].astype(np.float64)
+    centre = points.mean(axis=0)
+    extent = points.max(axis=0) - points.min(axis=0)
+    pixels = 0.2 + 0.05 * rng.randn(*image_shape)
+    pixels += 0.5 * np.exp(-(((y - centre[0]) / (0.45 * extent[0])) ** 4 +
+                             ((x - centre[1]) / (0.45 * extent[1])) ** 4))
+    sigma = 0.04 * extent.mean()
+    for k, (py, px) in enumerate(points):
+        depth = 0.4 if k < 12 else 0.6
+        pixels -= depth * np.exp(-((y - py) ** 2 + (x - px) ** 2) /
+                                 (2 * sigma ** 2))
+    return np.clip(pixels, 0, 1)
+
+
+def synthetic_images(n_images, image_shape=(100, 100), seed=0):
+    r"""
+    Generates landmarked synthetic images. The landmarks are stored in the
+    ``'PTS'`` group.
+
+    Parameters
+    ----------
+    n_images : `int`
+        The number of images.
+    image_shape : (`int`, `int`), optional
+        The shape of the images.
+    seed : `int`, optional
+        The seed of the random generator.
+
+    Returns
+    -------
+    images : `list` of `menpo.image.Image`
+        The synthetic images.
+    """
+    rng = np.random.RandomState(seed)
+    mean = mean_shape()
+    images = []
+    for _ in range(n_images):
+        # non-rigid deformation: eyes distance, mouth opening and noise
+        points = mean.copy()
+        points[12:16, 1] *= 1 + 0.15 * rng.randn()
+        points[16:, 0] += 3 * rng.randn() * np.array([0, -1, 0, 1])
+        points += rng.randn(*points.shape)
+        # similarity transform
+        theta = np.deg2rad(10) * rng.uniform(-1, 1)
+        rotation = np.array([[np.cos(theta), -np.sin(theta)],
+                             [np.sin(theta), np.cos(theta)]])
+        scale = rng.uniform(0.9, 1.1)
+        translation = (np.array(image_shape) / 2. +
+                       rng.uniform(-5, 5, size=2))
+        points = scale * points.dot(rotation.T) + translation
+        image = Image(_render(points, image_shape, rng)[None])
+        image.landmarks[GROUP] = PointCloud(points)
+        images.append(image)
+    return images
+
+
+def perturbed_bounding_boxes(images, seed=1, noise=0.05):
+    r"""
+    Returns the bounding box of the landmarks of each image, randomly
+    translated by `noise` times its size, simulating a face detector.
+    """
+    rng = np.random.RandomState(seed)
+    bounding_boxes = []
+    for image in images:
+        bb = image.landmarks[GROUP].lms.bounding_box()
+        size = bb.range()
+        shift = noise * size * rng.uniform(-1, 1, size=2)
+        bounding_boxes.append(bb.from_vector(bb.as_vector() +
+                                             np.tile(shift, 4)))
+    return bounding_boxes
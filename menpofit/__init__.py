@@ -1,7 +1,9 @@
 from . import builder
+from . import dataset
 from . import differentiable
 from . import fitter
 from . import modelinstance
+from . import profiling
 
 from . import aam
 from . import atm
@@ -10,6 +12,7 @@ from . import dlib
 from . import lk
 from . import math
 from . import result
+from . import tracker
 from . import sdm
 from . import transform
 from . import visualize
@@ -1,12 +1,44 @@
 from __future__ import division
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.ndimage import binary_dilation
 
-from menpo.image import Image
+from menpo.image import Image, MaskedImage, BooleanImage
 from menpo.feature import gradient as fast_gradient, no_op
 
+from menpofit.cache import PrecomputeCache, fingerprint
+from menpofit.math.sdi import steepest_descent_images
+from menpofit.profiling import stage, set_iteration
+
 from ..result import AAMAlgorithmResult
 
 
+def _solve_double(H, b):
+    # The parameter-space systems are small, hence they are always solved in
+    # double precision regardless of the compute dtype of the algorithm
+    with stage('solve'):
+        return np.linalg.solve(np.asarray(H, dtype=np.float64),
+                               np.asarray(b, dtype=np.float64))
+
+
+def _cast_image(image, dtype):
+    # Casts the pixels of a newly created image to the compute dtype in-place
+    if image.pixels.dtype != dtype:
+        image.pixels = image.pixels.astype(dtype)
+    return image
+
+
+def _schur_solve(H_ab, H_bb, g_b, iH_ab, iH_g_a):
+    # Solves the block system [[H_aa, H_ab], [H_ab^T, H_bb]] [x_a; x_b] =
+    # - [g_a; g_b] given iH_ab = H_aa^-1 H_ab and iH_g_a = H_aa^-1 g_a, by
+    # means of the Schur complement of H_aa. Hence, neither the full system
+    # nor H_aa are ever formed.
+    S = H_bb - H_ab.T.dot(iH_ab)
+    x_b = - _solve_double(S, g_b - H_ab.T.dot(iH_g_a))
+    x_a = - (iH_g_a + iH_ab.dot(x_b))
+    return x_a, x_b
+
+
 def _solve_all_map(H, J, e, Ja_prior, c, Js_prior, p, m, n):
     if n is not H.shape[0] - m:
         # Bidirectional Compositional case
@@ -14,15 +46,15 @@ def _solve_all_map(H, J, e, Ja_prior, c, Js_prior, p, m, n):
         p = np.hstack((p, p))
         # compute and return MAP solution
     J_prior = np.hstack((Ja_prior, Js_prior))
-    H += np.diag(J_prior)
+    H = H + np.diag(J_prior)
     Je = J_prior * np.hstack((c, p)) + J.T.dot(e)
-    dq = - np.linalg.solve(H, Je)
+    dq = - _solve_double(H, Je)
     return dq[:m], dq[m:]
 
 
 def _solve_all_ml(H, J, e, m):
     # compute ML solution
-    dq = - np.linalg.solve(H, J.T.dot(e))
+    dq = - _solve_double(H, J.T.dot(e))
     return dq[:m], dq[m:]
 
 
@@ -52,7 +84,6 @@ class LucasKanadeBaseInterface(object):
     def _build_sampling_mask(self, sampling):
         n_true_pixels = self.template.n_true_pixels()
         n_channels = self.template.n_channels
-        n_parameters = self.transform.n_parameters
 
         sampling_mask = np.zeros(n_true_pixels, dtype=np.bool)
 
@@ -62,16 +93,27 @@ class LucasKanadeBaseInterface(object):
             sampling = range(0, n_true_pixels, sampling)
 
         sampling_mask[sampling] = 1
+        self.sampling_mask = sampling_mask
 
         self.i_mask = np.nonzero(np.tile(
             sampling_mask[None, ...], (n_channels, 1)).flatten())[0]
-        self.dW_dp_mask = np.nonzero(np.tile(
-            sampling_mask[None, ..., None], (2, 1, n_parameters)))
         self.nabla_mask = np.nonzero(np.tile(
             sampling_mask[None, None, ...], (2, n_channels, 1)))
         self.nabla2_mask = np.nonzero(np.tile(
             sampling_mask[None, None, None, ...], (2, 2, n_channels, 1)))
 
+        if np.all(sampling_mask):
+            self.warp_mask = self.template.mask
+        else:
+            # Only the sampled pixels and their direct neighbours (which are
+            # needed by the finite differences of the gradient) get warped
+            sampled_pixels = np.zeros(self.template.shape, dtype=np.bool)
+            sampled_pixels[tuple(self.true_indices[sampling_mask].T)] = True
+            sampled_pixels = binary_dilation(sampled_pixels,
+                                             structure=np.ones((3, 3)))
+            self.warp_mask = BooleanImage(
+                sampled_pixels & self.template.mask.mask, copy=False)
+
     @property
     def shape_model(self):
         r"""
@@ -105,13 +147,15 @@ class LucasKanadeBaseInterface(object):
 
         :type: ``(n_dims, n_pixels, n_params)`` `ndarray`
         """
-        dW_dp = np.rollaxis(self.transform.d_dp(self.true_indices), -1)
-        return dW_dp[self.dW_dp_mask].reshape((dW_dp.shape[0], -1,
-                                               dW_dp.shape[2]))
+        # evaluate the jacobian only at the sampled pixels
+        sampled_indices = self.true_indices[self.sampling_mask]
+        return np.rollaxis(self.transform.d_dp(sampled_indices), -1)
 
     def warp(self, image):
         r"""
-        Warps an image into the template's mask.
+        Warps an image into the template's mask. If a sub-sampling mask is
+        used, then only the sampled pixels and their direct neighbours are
+        interpolated, while the rest of the template's pixels are set to zero.
 
         Parameters
         ----------
@@ -123,8 +167,14 @@ class LucasKanadeBaseInterface(object):
         warped_image : `menpo.image.Image` or subclass
             The warped image.
         """
-        return image.warp_to_mask(self.template.mask, self.transform,
-                                  warp_landmarks=False)
+        warped_image = image.warp_to_mask(self.warp_mask, self.transform,
+                                          warp_landmarks=False)
+        if self.warp_mask is not self.template.mask:
+            # Express the warped image on the template's mask, so that its
+            # vectorized form is indexed by the sampling mask as usual
+            warped_image = MaskedImage(warped_image.pixels,
+                                       mask=self.template.mask, copy=False)
+        return warped_image
 
     def warped_images(self, image, shapes):
         r"""
@@ -148,7 +198,9 @@ class LucasKanadeBaseInterface(object):
         warped_images = []
         for s in shapes:
             self.transform.set_target(s)
-            warped_images.append(self.warp(image))
+            # warp into the whole template's mask, regardless of sampling
+            warped_images.append(image.warp_to_mask(
+                self.template.mask, self.transform, warp_landmarks=False))
         return warped_images
 
     def gradient(self, image):
@@ -193,13 +245,10 @@ class LucasKanadeBaseInterface(object):
         # nabla: n_dims x n_channels x n_pixels
         # warp_jacobian: n_dims x            x n_pixels x n_params
         # sdi:            n_channels x n_pixels x n_params
-        sdi = 0
-        a = nabla[..., None] * dW_dp[:, None, ...]
-        for d in a:
-            sdi += d
+        sdi = steepest_descent_images(nabla[:, None], dW_dp[:, None])
         # reshape steepest descent images
         # sdi: (n_channels x n_pixels) x n_params
-        return sdi.reshape((-1, sdi.shape[2]))
+        return sdi.reshape((-1, sdi.shape[-1]))
 
     @classmethod
     def solve_shape_map(cls, H, J, e, J_prior, p):
@@ -228,10 +277,11 @@ class LucasKanadeBaseInterface(object):
             # Bidirectional Compositional case
             J_prior = np.hstack((J_prior, J_prior))
             p = np.hstack((p, p))
-        # compute and return MAP solution
-        H += np.diag(J_prior)
+        # compute and return MAP solution. Note that H is not updated
+        # inplace, as it may be a precomputed (and read-only) Hessian.
+        H = H + np.diag(J_prior)
         Je = J_prior * p + J.T.dot(e)
-        return - np.linalg.solve(H, Je)
+        return - _solve_double(H, Je)
 
     @classmethod
     def solve_shape_ml(cls, H, J, e):
@@ -253,7 +303,7 @@ class LucasKanadeBaseInterface(object):
             The ML solution.
         """
         # compute and return ML solution
-        return -np.linalg.solve(H, J.T.dot(e))
+        return -_solve_double(H, J.T.dot(e))
 
     def algorithm_result(self, image, shapes, shape_parameters,
                          appearance_parameters=None, initial_shape=None,
@@ -591,10 +641,8 @@ class LucasKanadePatchBaseInterface(LucasKanadeBaseInterface):
         # nabla: dims x parts x off x ch x (h x w)
         # ds_dp:    dims x parts x                             x params
         # sdi:             parts x off x ch x (h x w) x params
-        sdi = 0
-        a = nabla[..., None] * dw_dp[..., None, None, None, :]
-        for d in a:
-            sdi += d
+        sdi = steepest_descent_images(
+            nabla.reshape(nabla.shape[:2] + (-1, 1)), dw_dp[:, :, None])
 
         # reshape steepest descent images
         # sdi: (parts x offsets x ch x w x h) x params
@@ -712,11 +760,35 @@ class LucasKanade(object):
 
     eps : `float`, optional
         Value for checking the convergence of the optimization.
+    cache_dir : `str` or ``None``, optional
+        If provided, then the expensive precomputed arrays (e.g. the
+        pseudo-inverse of the appearance model and the warp Jacobian) are
+        stored in a :map:`PrecomputeCache` within this directory, keyed by a
+        fingerprint of the algorithm class, the appearance components and
+        mean, the template mask, the sampling and the source and basis of the
+        transform. Subsequent constructions
+        with the same fingerprint load them memory-mapped instead of
+        recomputing them.
+    dtype : `numpy.dtype`, optional
+        The dtype in which the precomputed arrays and the per-iteration
+        quantities (warped images, gradients, Jacobians and projections) are
+        computed. Using ``np.float32`` halves the memory and the memory
+        bandwidth of the algorithm, which matters for features with many
+        channels. Note that the systems in the parameter space are always
+        solved in double precision.
     """
-    def __init__(self, aam_interface, eps=10**-5):
+    def __init__(self, aam_interface, eps=10**-5, cache_dir=None,
+                 dtype=np.float64):
         self.eps = eps
         self.interface = aam_interface
+        self.dtype = np.dtype(dtype)
+        self._cache = None
+        if cache_dir is not None:
+            self._cache = PrecomputeCache(cache_dir, self._cache_key())
         self._precompute()
+        if self._cache is not None:
+            self._cache.flush()
+            self._cache = None
 
     @property
     def appearance_model(self):
@@ -748,6 +820,50 @@ class LucasKanade(object):
         """
         return self.interface.template
 
+    def _cache_key(self):
+        # Fingerprint of the classes and the arrays that the precomputations
+        # actually read, i.e. the appearance components and mean, the
+        # template mask, the sampling and the type, source and basis of the
+        # transform
+        types = [type(self), type(self.interface), type(self.transform)]
+        arrays = [self.appearance_model.components,
+                  self.appearance_model.mean().pixels,
+                  self.interface.i_mask,
+                  self.interface.shape_model.components,
+                  self.interface.shape_model.mean().as_vector()]
+        mask = getattr(self.template, 'mask', None)
+        if mask is not None:
+            arrays.append(mask.mask)
+        # the alignment (e.g. piecewise affine or thin plate splines) of a
+        # model driven transform
+        alignment = getattr(self.transform, 'transform', None)
+        if alignment is not None:
+            types.append(type(alignment))
+            arrays.append(alignment.source.points)
+        return fingerprint(self.dtype.str, *(types + arrays))
+
+    def _precomputed(self, names, compute):
+        # Returns the arrays computed by compute, loading them from the
+        # precompute cache if one is used
+        if getattr(self, '_cache', None) is None:
+            return compute()
+        return self._cache.load(names, compute)
+
+    def _warp(self, image):
+        # warp image in the compute dtype
+        with stage('warp'):
+            return _cast_image(self.interface.warp(image), self.dtype)
+
+    def _gradient(self, image):
+        # compute vectorized image gradient in the compute dtype
+        with stage('gradient'):
+            return self.interface.gradient(image).astype(self.dtype,
+                                                         copy=False)
+
+    def _instance(self, c):
+        # generate appearance instance in the compute dtype
+        return _cast_image(self.appearance_model.instance(c), self.dtype)
+
     def _precompute(self):
         # grab number of shape and appearance parameters
         self.n = self.transform.n_parameters
@@ -756,17 +872,22 @@ class LucasKanade(object):
         # grab appearance model components
         self.A = self.appearance_model.components
         # mask them
-        self.A_m = self.A.T[self.interface.i_mask, :]
-        # compute their pseudoinverse
-        self.pinv_A_m = np.linalg.pinv(self.A_m)
+        A_m = self.A.T[self.interface.i_mask, :]
+        self.A_m = A_m.astype(self.dtype, copy=False)
+        # compute their pseudoinverse (in double precision)
+        self.pinv_A_m, = self._precomputed(
+            ('pinv_A_m',),
+            lambda: (np.linalg.pinv(A_m).astype(self.dtype, copy=False),))
 
         # grab appearance model mean
-        self.a_bar = self.appearance_model.mean()
+        self.a_bar = _cast_image(self.appearance_model.mean(), self.dtype)
         # vectorize it and mask it
         self.a_bar_m = self.a_bar.as_vector()[self.interface.i_mask]
 
         # compute warp jacobian
-        self.dW_dp = self.interface.warp_jacobian()
+        self.dW_dp, = self._precomputed(
+            ('dW_dp',), lambda: (self.interface.warp_jacobian().astype(
+                self.dtype, copy=False),))
 
         # compute shape model prior
         # TODO: Is this correct? It's like modelling no noise at all
@@ -778,6 +899,43 @@ class LucasKanade(object):
         S = self.appearance_model.eigenvalues
         self.s2_inv_S = s2 / S
 
+        # compute the (constant) appearance Hessian (in double precision)
+        self.AA_m, = self._precomputed(('AA_m',), lambda: (A_m.T.dot(A_m),))
+
+    def _precompute_appearance_map(self):
+        # Cholesky factor of the (symmetric positive definite) MAP appearance
+        # Hessian, only needed by the algorithms that solve for the
+        # appearance parameters
+        self.AA_m_map_factor = cho_factor(self.AA_m + np.diag(self.s2_inv_S))
+
+    def _appearance_projections(self, J_m, e_m):
+        # Projects the masked Jacobian and error onto the appearance model,
+        # i.e. returns pinv(A) J and pinv(A) e. Note that A^T J and A^T e are
+        # then obtained as A^T A pinv(A) J and A^T A pinv(A) e.
+        PJ_m = self.pinv_A_m.dot(J_m).astype(np.float64, copy=False)
+        Pe_m = self.pinv_A_m.dot(e_m).astype(np.float64, copy=False)
+        return PJ_m, Pe_m
+
+    def _project_out_system(self, J_m, e_m):
+        # Computes the masked Hessian J^T Q J and gradient J^T Q e of the
+        # shape parameters with the appearance model projected out, where
+        # Q = I - A pinv(A). This is the Schur complement of the constant
+        # appearance block, thus Q J is never formed.
+        PJ_m, Pe_m = self._appearance_projections(J_m, e_m)
+        APJ_m = self.AA_m.dot(PJ_m)
+        JQJ_m = J_m.T.dot(J_m).astype(np.float64) - APJ_m.T.dot(PJ_m)
+        JQe_m = J_m.T.dot(e_m).astype(np.float64) - APJ_m.T.dot(Pe_m)
+        return JQJ_m, JQe_m
+
+    def _solve_project_out(self, J_m, e_m, map_inference):
+        # Solves for the shape parameters increments with the appearance
+        # model projected out
+        JQJ_m, JQe_m = self._project_out_system(J_m, e_m)
+        if map_inference:
+            JQJ_m += np.diag(self.s2_inv_L)
+            JQe_m += self.s2_inv_L * self.transform.as_vector()
+        return - _solve_double(JQJ_m, JQe_m)
+
 
 class ProjectOut(LucasKanade):
     r"""
@@ -842,7 +1000,7 @@ class ProjectOut(LucasKanade):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # vectorize it and mask it
         i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -855,6 +1013,7 @@ class ProjectOut(LucasKanade):
             costs = [cost_closure(self.e_m, self.project_out)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # solve for increments on the shape parameters
             self.dp = self._solve(map_inference)
 
@@ -865,7 +1024,7 @@ class ProjectOut(LucasKanade):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # vectorize it and mask it
             i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -894,20 +1053,12 @@ class ProjectOutForwardCompositional(ProjectOut):
     """
     def _solve(self, map_inference):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # compute masked forward Jacobian
         J_m = self.interface.steepest_descent_images(nabla_i, self.dW_dp)
-        # project out appearance model from it
-        QJ_m = self.project_out(J_m)
-        # compute masked forward Hessian
-        JQJ_m = QJ_m.T.dot(J_m)
-        # solve for increments on the shape parameters
-        if map_inference:
-            return self.interface.solve_shape_map(
-                JQJ_m, QJ_m, self.e_m,  self.s2_inv_L,
-                self.transform.as_vector())
-        else:
-            return self.interface.solve_shape_ml(JQJ_m, QJ_m, self.e_m)
+        # solve for increments on the shape parameters with the appearance
+        # model projected out
+        return self._solve_project_out(J_m, self.e_m, map_inference)
 
     def _update_warp(self):
         # update warp based on forward composition
@@ -925,16 +1076,21 @@ class ProjectOutInverseCompositional(ProjectOut):
     def _precompute(self):
         # call super method
         super(ProjectOutInverseCompositional, self)._precompute()
+        self.QJ_m, self.JQJ_m, self.pinv_QJ_m = self._precomputed(
+            ('QJ_m', 'JQJ_m', 'pinv_QJ_m'), self._precompute_project_out)
+
+    def _precompute_project_out(self):
         # compute appearance model mean gradient
-        nabla_a = self.interface.gradient(self.a_bar)
+        nabla_a = self._gradient(self.a_bar)
         # compute masked inverse Jacobian
         J_m = self.interface.steepest_descent_images(-nabla_a, self.dW_dp)
         # project out appearance model from it
-        self.QJ_m = self.project_out(J_m)
+        QJ_m = self.project_out(J_m)
         # compute masked inverse Hessian
-        self.JQJ_m = self.QJ_m.T.dot(J_m)
+        JQJ_m = QJ_m.T.dot(J_m)
         # compute masked Jacobian pseudo-inverse
-        self.pinv_QJ_m = np.linalg.solve(self.JQJ_m, self.QJ_m.T)
+        pinv_QJ_m = _solve_double(JQJ_m, QJ_m.T).astype(self.dtype)
+        return QJ_m, JQJ_m, pinv_QJ_m
 
     def _solve(self, map_inference):
         # solve for increments on the shape parameters
@@ -950,6 +1106,118 @@ class ProjectOutInverseCompositional(ProjectOut):
         self.transform._from_vector_inplace(
             self.transform.as_vector() - self.dp)
 
+    def run_batch(self, images, initial_shapes, gt_shapes=None, max_iters=20,
+                  return_costs=False, map_inference=False):
+        r"""
+        Execute the optimization algorithm on a batch of images. Since the
+        projected-out Jacobian is constant, the increments of all the active
+        samples are computed with a single matrix product on the stacked
+        error images. Samples that converge are removed from the active batch.
+
+        Parameters
+        ----------
+        images : `list` of `menpo.image.Image`
+            The input test images.
+        initial_shapes : `list` of `menpo.shape.PointCloud`
+            The initial shape of each image from which the optimization will
+            start.
+        gt_shapes : `list` of (`menpo.shape.PointCloud` or ``None``), optional
+            The ground truth shape of each image. They are only needed in order
+            to get passed in the optimization result objects, which have the
+            ability to compute the fitting error.
+        max_iters : `int`, optional
+            The maximum number of iterations. Note that the algorithm may
+            converge, and thus stop, earlier.
+        return_costs : `bool`, optional
+            If ``True``, then the cost function values will be computed
+            during the fitting procedure. Then these cost values will be
+            assigned to the returned fitting results. *Note that the costs
+            computation increases the computational cost of the fitting. The
+            additional computation cost depends on the fitting method. Only
+            use this option for research purposes.*
+        map_inference : `bool`, optional
+            If ``True``, then the solution will be given after performing MAP
+            inference.
+
+        Returns
+        -------
+        fitting_results : `list` of :map:`AAMAlgorithmResult`
+            The parametric iterative fitting result of each image.
+        """
+        n_samples = len(images)
+        if gt_shapes is None:
+            gt_shapes = [None] * n_samples
+
+        def warp_error(image):
+            # warp image, vectorize it, mask it and compute masked error
+            i_m = self._warp(image).as_vector()[self.interface.i_mask]
+            return i_m - self.a_bar_m
+
+        # initialize the transform of each sample and stack the masked errors
+        # as the columns of a single matrix
+        p_lists, shapes, costs = [], [], []
+        E_m = np.empty((self.a_bar_m.shape[0], n_samples), dtype=self.dtype)
+        for j in range(n_samples):
+            self.transform.set_target(initial_shapes[j])
+            p_lists.append([self.transform.as_vector()])
+            shapes.append([self.transform.target])
+            E_m[:, j] = warp_error(images[j])
+            costs.append([E_m[:, j].T.dot(self.project_out(E_m[:, j]))]
+                         if return_costs else None)
+
+        if map_inference:
+            # the MAP Hessian is constant too
+            H_map = self.JQJ_m + np.diag(self.s2_inv_L)
+
+        # Compositional Gauss-Newton loop -------------------------------------
+        active = np.arange(n_samples)
+        k = 0
+        while k < max_iters and active.size > 0:
+            set_iteration(k)
+            # solve for increments on the shape parameters of all the active
+            # samples at once
+            if map_inference:
+                P = np.array([p_lists[j][-1] for j in active]).T
+                dP = - _solve_double(
+                    H_map, self.s2_inv_L[..., None] * P +
+                    self.QJ_m.T.dot(E_m[:, active]))
+            else:
+                dP = - self.pinv_QJ_m.dot(E_m[:, active])
+
+            still_active = []
+            for dp, j in zip(dP.T, active):
+                # update warp based on inverse composition
+                s_k = shapes[j][-1].points
+                self.transform._from_vector_inplace(p_lists[j][-1] - dp)
+                p_lists[j].append(self.transform.as_vector())
+                shapes[j].append(self.transform.target)
+
+                # warp image and compute masked error
+                E_m[:, j] = warp_error(images[j])
+
+                # update costs
+                if return_costs:
+                    costs[j].append(
+                        E_m[:, j].T.dot(self.project_out(E_m[:, j])))
+
+                # test convergence
+                eps = np.abs(np.linalg.norm(
+                    s_k - self.transform.target.points))
+                if eps > self.eps:
+                    still_active.append(j)
+            active = np.array(still_active, dtype=np.int)
+
+            # increase iteration counter
+            k += 1
+
+        # return algorithm results
+        return [self.interface.algorithm_result(
+                    image=images[j], shapes=shapes[j],
+                    shape_parameters=p_lists[j],
+                    initial_shape=initial_shapes[j], costs=costs[j],
+                    gt_shape=gt_shapes[j])
+                for j in range(n_samples)]
+
     def __str__(self):
         return "Project-Out Inverse Compositional Algorithm"
 
@@ -958,6 +1226,11 @@ class Simultaneous(LucasKanade):
     r"""
     Abstract class for defining Simultaneous AAM optimization algorithms.
     """
+    def _precompute(self):
+        # call super method
+        super(Simultaneous, self)._precompute()
+        self._precompute_appearance_map()
+
     def run(self, image, initial_shape, gt_shape=None, max_iters=20,
             return_costs=False, map_inference=False):
         r"""
@@ -1008,14 +1281,14 @@ class Simultaneous(LucasKanade):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # mask warped image
         i_m = self.i.as_vector()[self.interface.i_mask]
 
         # initialize appearance parameters by projecting masked image
         # onto masked appearance model
         self.c = self.pinv_A_m.dot(i_m - self.a_bar_m)
-        self.a = self.appearance_model.instance(self.c)
+        self.a = self._instance(self.c)
         a_m = self.a.as_vector()[self.interface.i_mask]
         c_list = [self.c]
 
@@ -1028,13 +1301,14 @@ class Simultaneous(LucasKanade):
             costs = [cost_closure(self.e_m)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # solve for increments on the appearance and shape parameters
             # simultaneously
             dc, self.dp = self._solve(map_inference)
 
             # update appearance parameters
             self.c = self.c + dc
-            self.a = self.appearance_model.instance(self.c)
+            self.a = self._instance(self.c)
             a_m = self.a.as_vector()[self.interface.i_mask]
             c_list.append(self.c)
 
@@ -1045,7 +1319,7 @@ class Simultaneous(LucasKanade):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # mask warped image
             i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -1071,18 +1345,28 @@ class Simultaneous(LucasKanade):
     def _solve(self, map_inference):
         # compute masked Jacobian
         J_m = self._compute_jacobian()
-        # assemble masked simultaneous Jacobian
-        J_sim_m = np.hstack((-self.A_m, J_m))
-        # compute masked Hessian
-        H_sim_m = J_sim_m.T.dot(J_sim_m)
-        # solve for increments on the appearance and shape parameters
-        # simultaneously
+        # The simultaneous Jacobian is [-A, J], hence the Hessian has the
+        # constant appearance block A^T A. Its cross block -A^T J and the
+        # appearance gradient -A^T e are obtained from the projections onto
+        # the appearance model, so that neither the simultaneous Jacobian
+        # nor the full Hessian are formed.
+        PJ_m, Pe_m = self._appearance_projections(J_m, self.e_m)
+        H_cp = - self.AA_m.dot(PJ_m)
+        H_pp = J_m.T.dot(J_m).astype(np.float64)
+        g_p = J_m.T.dot(self.e_m).astype(np.float64)
         if map_inference:
-            return self.interface.solve_all_map(
-                H_sim_m, J_sim_m, self.e_m, self.s2_inv_S, self.c,
-                self.s2_inv_L, self.transform.as_vector())
+            H_pp += np.diag(self.s2_inv_L)
+            g_p += self.s2_inv_L * self.transform.as_vector()
+            g_c = self.s2_inv_S * self.c - self.AA_m.dot(Pe_m)
+            iH_cp = cho_solve(self.AA_m_map_factor, H_cp)
+            iH_g_c = cho_solve(self.AA_m_map_factor, g_c)
         else:
-            return self.interface.solve_all_ml(H_sim_m, J_sim_m, self.e_m)
+            # (A^T A)^-1 A^T = pinv(A)
+            iH_cp = - PJ_m
+            iH_g_c = - Pe_m
+        # solve for increments on the appearance and shape parameters
+        # simultaneously
+        return _schur_solve(H_cp, H_pp, g_p, iH_cp, iH_g_c)
 
 
 class SimultaneousForwardCompositional(Simultaneous):
@@ -1091,7 +1375,7 @@ class SimultaneousForwardCompositional(Simultaneous):
     """
     def _compute_jacobian(self):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # return forward Jacobian
         return self.interface.steepest_descent_images(nabla_i, self.dW_dp)
 
@@ -1110,7 +1394,7 @@ class SimultaneousInverseCompositional(Simultaneous):
     """
     def _compute_jacobian(self):
         # compute warped appearance model gradient
-        nabla_a = self.interface.gradient(self.a)
+        nabla_a = self._gradient(self.a)
         # return inverse Jacobian
         return self.interface.steepest_descent_images(-nabla_a, self.dW_dp)
 
@@ -1127,11 +1411,19 @@ class Alternating(LucasKanade):
     r"""
     Abstract class for defining Alternating AAM optimization algorithms.
     """
-    def _precompute(self, **kwargs):
+    def _precompute(self):
         # call super method
         super(Alternating, self)._precompute()
-        # compute MAP appearance Hessian
-        self.AA_m_map = self.A_m.T.dot(self.A_m) + np.diag(self.s2_inv_S)
+        self._precompute_appearance_map()
+
+    def _solve_appearance(self, e_m, c, map_inference):
+        # Solves for the increments on the appearance parameters given the
+        # masked error (the Cholesky factor of the MAP appearance Hessian is
+        # precomputed)
+        if map_inference:
+            Ae_m_map = - self.s2_inv_S * c + self.A_m.T.dot(e_m)
+            return cho_solve(self.AA_m_map_factor, Ae_m_map)
+        return self.pinv_A_m.dot(e_m)
 
     def run(self, image, initial_shape, gt_shape=None, max_iters=20,
             return_costs=False, map_inference=False):
@@ -1183,14 +1475,14 @@ class Alternating(LucasKanade):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # mask warped image
         i_m = self.i.as_vector()[self.interface.i_mask]
 
         # initialize appearance parameters by projecting masked image
         # onto masked appearance model
         c = self.pinv_A_m.dot(i_m - self.a_bar_m)
-        self.a = self.appearance_model.instance(c)
+        self.a = self._instance(c)
         a_m = self.a.as_vector()[self.interface.i_mask]
         c_list = [c]
         Jdp = 0
@@ -1204,29 +1496,27 @@ class Alternating(LucasKanade):
             costs = [cost_closure(e_m)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # solve for increment on the appearance parameters
-            if map_inference:
-                Ae_m_map = - self.s2_inv_S * c + self.A_m.dot(e_m + Jdp)
-                dc = np.linalg.solve(self.AA_m_map, Ae_m_map)
-            else:
-                dc = self.pinv_A_m.dot(e_m + Jdp)
+            dc = self._solve_appearance(e_m + Jdp, c, map_inference)
 
             # compute masked Jacobian
             J_m = self._compute_jacobian()
             # compute masked Hessian
             H_m = J_m.T.dot(J_m)
+            # compute masked error after the appearance update
+            e_dc_m = e_m - self.A_m.dot(dc.astype(self.dtype))
             # solve for increments on the shape parameters
             if map_inference:
                 self.dp = self.interface.solve_shape_map(
-                    H_m, J_m, e_m - self.A_m.T.dot(dc), self.s2_inv_L,
+                    H_m, J_m, e_dc_m, self.s2_inv_L,
                     self.transform.as_vector())
             else:
-                self.dp = self.interface.solve_shape_ml(H_m, J_m,
-                                                        e_m - self.A_m.dot(dc))
+                self.dp = self.interface.solve_shape_ml(H_m, J_m, e_dc_m)
 
             # update appearance parameters
             c = c + dc
-            self.a = self.appearance_model.instance(c)
+            self.a = self._instance(c)
             a_m = self.a.as_vector()[self.interface.i_mask]
             c_list.append(c)
 
@@ -1237,12 +1527,12 @@ class Alternating(LucasKanade):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # mask warped image
             i_m = self.i.as_vector()[self.interface.i_mask]
 
             # compute Jdp
-            Jdp = J_m.dot(self.dp)
+            Jdp = J_m.dot(self.dp.astype(self.dtype))
 
             # compute masked error
             e_m = i_m - a_m
@@ -1270,7 +1560,7 @@ class AlternatingForwardCompositional(Alternating):
     """
     def _compute_jacobian(self):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # return forward Jacobian
         return self.interface.steepest_descent_images(nabla_i, self.dW_dp)
 
@@ -1289,7 +1579,7 @@ class AlternatingInverseCompositional(Alternating):
     """
     def _compute_jacobian(self):
         # compute warped appearance model gradient
-        nabla_a = self.interface.gradient(self.a)
+        nabla_a = self._gradient(self.a)
         # return inverse Jacobian
         return self.interface.steepest_descent_images(-nabla_a, self.dW_dp)
 
@@ -1359,14 +1649,14 @@ class ModifiedAlternating(Alternating):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # mask warped image
         i_m = self.i.as_vector()[self.interface.i_mask]
 
         # initialize appearance parameters by projecting masked image
         # onto masked appearance model
         c = self.pinv_A_m.dot(i_m - a_m)
-        self.a = self.appearance_model.instance(c)
+        self.a = self._instance(c)
         a_m = self.a.as_vector()[self.interface.i_mask]
         c_list.append(c)
 
@@ -1379,6 +1669,7 @@ class ModifiedAlternating(Alternating):
             costs = [cost_closure(e_m)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute masked Jacobian
             J_m = self._compute_jacobian()
             # compute masked Hessian
@@ -1397,13 +1688,13 @@ class ModifiedAlternating(Alternating):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # mask warped image
             i_m = self.i.as_vector()[self.interface.i_mask]
 
             # update appearance parameters
             c = self.pinv_A_m.dot(i_m - self.a_bar_m)
-            self.a = self.appearance_model.instance(c)
+            self.a = self._instance(c)
             a_m = self.a.as_vector()[self.interface.i_mask]
             c_list.append(c)
 
@@ -1433,7 +1724,7 @@ class ModifiedAlternatingForwardCompositional(ModifiedAlternating):
     """
     def _compute_jacobian(self):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # return forward Jacobian
         return self.interface.steepest_descent_images(nabla_i, self.dW_dp)
 
@@ -1452,7 +1743,7 @@ class ModifiedAlternatingInverseCompositional(ModifiedAlternating):
     """
     def _compute_jacobian(self):
         # compute warped appearance model gradient
-        nabla_a = self.interface.gradient(self.a)
+        nabla_a = self._gradient(self.a)
         # return inverse Jacobian
         return self.interface.steepest_descent_images(-nabla_a, self.dW_dp)
 
@@ -1523,14 +1814,14 @@ class Wiberg(LucasKanade):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # mask warped image
         i_m = self.i.as_vector()[self.interface.i_mask]
 
         # initialize appearance parameters by projecting masked image
         # onto masked appearance model
         c = self.pinv_A_m.dot(i_m - self.a_bar_m)
-        self.a = self.appearance_model.instance(c)
+        self.a = self._instance(c)
         a_m = self.a.as_vector()[self.interface.i_mask]
         c_list = [c]
 
@@ -1543,19 +1834,12 @@ class Wiberg(LucasKanade):
             costs = [cost_closure(e_m, self.project_out)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute masked Jacobian
             J_m = self._compute_jacobian()
-            # project out appearance models
-            QJ_m = self.project_out(J_m)
-            # compute masked Hessian
-            JQJ_m = QJ_m.T.dot(J_m)
-            # solve for increments on the shape parameters
-            if map_inference:
-                self.dp = self.interface.solve_shape_map(
-                    JQJ_m, QJ_m, e_m, self.s2_inv_L,
-                    self.transform.as_vector())
-            else:
-                self.dp = self.interface.solve_shape_ml(JQJ_m, QJ_m, e_m)
+            # solve for increments on the shape parameters with the
+            # appearance models projected out
+            self.dp = self._solve_project_out(J_m, e_m, map_inference)
 
             # update warp
             s_k = self.transform.target.points
@@ -1564,14 +1848,15 @@ class Wiberg(LucasKanade):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # mask warped image
             i_m = self.i.as_vector()[self.interface.i_mask]
 
             # update appearance parameters
-            dc = self.pinv_A_m.dot(i_m - a_m + J_m.dot(self.dp))
+            dc = self.pinv_A_m.dot(
+                i_m - a_m + J_m.dot(self.dp.astype(self.dtype)))
             c = c + dc
-            self.a = self.appearance_model.instance(c)
+            self.a = self._instance(c)
             a_m = self.a.as_vector()[self.interface.i_mask]
             c_list.append(c)
 
@@ -1601,7 +1886,7 @@ class WibergForwardCompositional(Wiberg):
     """
     def _compute_jacobian(self):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # return forward Jacobian
         return self.interface.steepest_descent_images(nabla_i, self.dW_dp)
 
@@ -1620,7 +1905,7 @@ class WibergInverseCompositional(Wiberg):
     """
     def _compute_jacobian(self):
         # compute warped appearance model gradient
-        nabla_a = self.interface.gradient(self.a)
+        nabla_a = self._gradient(self.a)
         # return inverse Jacobian
         return self.interface.steepest_descent_images(-nabla_a, self.dW_dp)
 
@@ -1,10 +1,10 @@
 from __future__ import division
+from functools import partial
 import warnings
 import numpy as np
 
 from menpo.feature import no_op
 from menpo.visualize import print_dynamic
-from menpo.model import PCAModel
 from menpo.transform import Scale
 from menpo.shape import mean_pointcloud
 from menpo.base import name_of_callable
@@ -17,12 +17,15 @@ from menpofit.modelinstance import OrthoPDM
 from menpofit.transform import (DifferentiableThinPlateSplines,
                                 DifferentiablePiecewiseAffine, OrthoMDTransform,
                                 LinearOrthoMDTransform)
-from menpofit.base import batch
+from menpofit.base import batch, as_sequence
 from menpofit.builder import (
     build_reference_frame, build_patch_reference_frame,
     compute_features, scale_images, warp_images,
     align_shapes, rescale_images_to_reference_shape, densify_shapes,
-    extract_patches, MenpoFitBuilderWarning, compute_reference_shape)
+    extract_patches, MenpoFitBuilderWarning, compute_reference_shape,
+    extract_shapes, build_appearance_model_out_of_core, build_pca_model,
+    shared_holistic_features, train_scales_in_parallel)
+from menpofit.visualize import print_progress
 
 
 class AAM(object):
@@ -89,6 +92,39 @@ class AAM(object):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). Hence, the warped images
+        are never held in memory all at once. If ``None``, then the appearance
+        models are built in memory. It has no effect when incrementing the
+        model.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
 
     References
     ----------
@@ -107,12 +143,23 @@ class AAM(object):
         Zafeiriou. "Feature-Based Lucas-Kanade and Active Appearance Models",
         IEEE Transactions on Image Processing, 24(9): 2617-2632, 2015.
     """
+    # Models that were pickled before n_workers and n_scale_workers existed
+    # build sequentially
+    n_workers = 1
+    n_scale_workers = 1
+    # The attributes that are set while training a scale, other than its
+    # models
+    _scale_attributes = ()
+
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  transform=DifferentiablePiecewiseAffine,
                  shape_model_cls=OrthoPDM, max_shape_components=None,
                  max_appearance_components=None, verbose=False,
-                 batch_size=None):
+                 batch_size=None, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1,
+                 n_scale_workers=1):
         # Check parameters
         checks.check_diagonal(diagonal)
         scales = checks.check_scales(scales)
@@ -132,6 +179,12 @@ class AAM(object):
         self.max_appearance_components = max_appearance_components
         self.reference_shape = reference_shape
         self._shape_model_cls = shape_model_cls
+        self.appearance_block_size = appearance_block_size
+        self.pca_solver = pca_solver
+        self.pca_oversamples = pca_oversamples
+        self.pca_power_iterations = pca_power_iterations
+        self.n_workers = n_workers
+        self.n_scale_workers = n_scale_workers
         self.shape_models = []
         self.appearance_models = []
         # Train AAM
@@ -148,7 +201,7 @@ class AAM(object):
             # on an infinite list.
             image_batches = batch(images, batch_size)
         else:
-            image_batches = [list(images)]
+            image_batches = [as_sequence(images)]
 
         for k, image_batch in enumerate(image_batches):
             if k == 0:
@@ -165,7 +218,7 @@ class AAM(object):
                     checks.check_landmark_trilist(image_batch[0],
                                                   self.transform, group=group)
                     self.reference_shape = compute_reference_shape(
-                        [i.landmarks[group].lms for i in image_batch],
+                        extract_shapes(image_batch, group),
                         self.diagonal, verbose=verbose)
 
             # After the first batch, we are incrementing the model
@@ -187,12 +240,32 @@ class AAM(object):
                      appearance_forgetting_factor=1.0):
         # Rescale to existing reference shape
         image_batch = rescale_images_to_reference_shape(
-            image_batch, group, self.reference_shape, verbose=verbose)
+            image_batch, group, self.reference_shape, verbose=verbose,
+            n_workers=self.n_workers)
 
         # Build models at each scale
         if verbose:
             print_dynamic('- Building models\n')
 
+        train_scale = partial(
+            self._train_scale, image_batch=image_batch, increment=increment,
+            group=group, shape_forgetting_factor=shape_forgetting_factor,
+            appearance_forgetting_factor=appearance_forgetting_factor)
+        if self.n_scale_workers != 1 and self.n_scales > 1:
+            # The scales are independent, so build them in worker processes
+            scale_features = shared_holistic_features(
+                image_batch, self.holistic_features, prefix='  - ',
+                verbose=verbose, n_workers=self.n_workers)
+            wrap = partial(print_progress, prefix='  - Building scales',
+                           verbose=verbose)
+            results = train_scales_in_parallel(
+                partial(train_scale, prefix=None, verbose=False),
+                scale_features, n_workers=self.n_scale_workers, wrap=wrap)
+            del scale_features
+            for j, result in enumerate(results):
+                self._set_scale_models(j, result, increment)
+            return
+
         feature_images = []
         # for each scale (low --> high)
         for j in range(self.n_scales):
@@ -215,65 +288,94 @@ class AAM(object):
                 feature_images = compute_features(image_batch,
                                                   self.holistic_features[j],
                                                   prefix=scale_prefix,
-                                                  verbose=verbose)
-            # handle scales
-            if self.scales[j] != 1:
-                # Scale feature images only if scale is different than 1
-                scaled_images = scale_images(feature_images, self.scales[j],
-                                             prefix=scale_prefix,
-                                             verbose=verbose)
-            else:
-                scaled_images = feature_images
+                                                  verbose=verbose,
+                                                  n_workers=self.n_workers)
+            self._set_scale_models(
+                j, train_scale(j, feature_images, prefix=scale_prefix,
+                               verbose=verbose), increment)
 
-            # Extract potentially rescaled shapes
-            scale_shapes = [i.landmarks[group].lms for i in scaled_images]
-
-            # Build the shape model
             if verbose:
-                print_dynamic('{}Building shape model'.format(scale_prefix))
+                print_dynamic('{}Done\n'.format(scale_prefix))
 
-            if not increment:
-                shape_model = self._build_shape_model(scale_shapes, j)
-                self.shape_models.append(shape_model)
-            else:
-                self._increment_shape_model(
-                    scale_shapes, j, forgetting_factor=shape_forgetting_factor)
-
-            # Obtain warped images - we use a scaled version of the
-            # reference shape, computed here. This is because the mean
-            # moves when we are incrementing, and we need a consistent
-            # reference frame.
-            scaled_reference_shape = Scale(self.scales[j], n_dims=2).apply(
-                self.reference_shape)
-            warped_images = self._warp_images(scaled_images, scale_shapes,
-                                              scaled_reference_shape,
-                                              j, scale_prefix, verbose)
+    def _train_scale(self, scale_index, feature_images, image_batch,
+                     increment, group, shape_forgetting_factor,
+                     appearance_forgetting_factor, prefix, verbose):
+        # Trains the models of a single scale, given the feature images of the
+        # scale or None, and returns them without adding them to the AAM, so
+        # that it can run in a worker process
+        j = scale_index
+        if feature_images is None:
+            feature_images = compute_features(image_batch,
+                                              self.holistic_features[j],
+                                              prefix=prefix, verbose=verbose,
+                                              n_workers=self.n_workers)
+        # handle scales
+        if self.scales[j] != 1:
+            # Scale feature images only if scale is different than 1
+            scaled_images = scale_images(feature_images, self.scales[j],
+                                         prefix=prefix, verbose=verbose,
+                                         n_workers=self.n_workers)
+        else:
+            scaled_images = feature_images
+        del feature_images
+
+        # Extract potentially rescaled shapes
+        scale_shapes = [i.landmarks[group].lms for i in scaled_images]
+
+        # Build the shape model
+        if verbose:
+            print_dynamic('{}Building shape model'.format(prefix))
 
+        if not increment:
+            shape_model = self._build_shape_model(scale_shapes, j)
+        else:
+            self._increment_shape_model(
+                scale_shapes, j, forgetting_factor=shape_forgetting_factor)
+            shape_model = self.shape_models[j]
+
+        # Obtain warped images - we use a scaled version of the
+        # reference shape, computed here. This is because the mean
+        # moves when we are incrementing, and we need a consistent
+        # reference frame.
+        scaled_reference_shape = Scale(self.scales[j], n_dims=2).apply(
+            self.reference_shape)
+        if not increment:
             # obtain appearance model
-            if verbose:
-                print_dynamic('{}Building appearance model'.format(
-                    scale_prefix))
-
-            if not increment:
-                appearance_model = PCAModel(warped_images)
-                # trim appearance model if required
-                if self.max_appearance_components[j] is not None:
-                    appearance_model.trim_components(
-                        self.max_appearance_components[j])
-                # add appearance model to the list
-                self.appearance_models.append(appearance_model)
-            else:
-                # increment appearance model
-                self.appearance_models[j].increment(
-                    warped_images,
-                    forgetting_factor=appearance_forgetting_factor)
-                # trim appearance model if required
-                if self.max_appearance_components[j] is not None:
-                    self.appearance_models[j].trim_components(
-                        self.max_appearance_components[j])
+            appearance_model = self._build_appearance_model(
+                scaled_images, scale_shapes, scaled_reference_shape, j,
+                prefix, verbose)
+        else:
+            warped_images = self._warp_images(scaled_images, scale_shapes,
+                                              scaled_reference_shape,
+                                              j, prefix, verbose)
 
             if verbose:
-                print_dynamic('{}Done\n'.format(scale_prefix))
+                print_dynamic('{}Building appearance model'.format(prefix))
+
+            # increment appearance model
+            appearance_model = self.appearance_models[j]
+            appearance_model.increment(
+                warped_images, forgetting_factor=appearance_forgetting_factor)
+            # trim appearance model if required
+            if self.max_appearance_components[j] is not None:
+                appearance_model.trim_components(
+                    self.max_appearance_components[j])
+
+        attributes = dict((a, getattr(self, a))
+                          for a in self._scale_attributes)
+        return shape_model, appearance_model, attributes
+
+    def _set_scale_models(self, scale_index, result, increment):
+        # Adds the models returned by _train_scale to the AAM
+        shape_model, appearance_model, attributes = result
+        if not increment:
+            self.shape_models.append(shape_model)
+            self.appearance_models.append(appearance_model)
+        else:
+            self.shape_models[scale_index] = shape_model
+            self.appearance_models[scale_index] = appearance_model
+        for name, value in attributes.items():
+            setattr(self, name, value)
 
     def increment(self, images, group=None, shape_forgetting_factor=1.0,
                   appearance_forgetting_factor=1.0, verbose=False,
@@ -331,7 +433,34 @@ class AAM(object):
                      prefix, verbose):
         reference_frame = build_reference_frame(reference_shape)
         return warp_images(images, shapes, reference_frame, self.transform,
-                           prefix=prefix, verbose=verbose)
+                           prefix=prefix, verbose=verbose,
+                           n_workers=self.n_workers)
+
+    def _build_appearance_model(self, images, shapes, reference_shape,
+                                scale_index, prefix, verbose):
+        block_size = getattr(self, 'appearance_block_size', None)
+        max_n_components = self.max_appearance_components[scale_index]
+        pca_kwargs = {
+            'solver': getattr(self, 'pca_solver', 'auto'),
+            'n_oversamples': getattr(self, 'pca_oversamples', 10),
+            'n_power_iterations': getattr(self, 'pca_power_iterations', 2)}
+        if block_size is not None:
+            # Stream the warped images to disk, block by block
+            warp = partial(self._warp_images, reference_shape=reference_shape,
+                           scale_index=scale_index, prefix=prefix,
+                           verbose=False)
+            return build_appearance_model_out_of_core(
+                images, shapes, warp, block_size,
+                max_n_components=max_n_components, prefix=prefix,
+                verbose=verbose, **pca_kwargs)
+
+        warped_images = self._warp_images(images, shapes, reference_shape,
+                                          scale_index, prefix, verbose)
+        if verbose:
+            print_dynamic('{}Building appearance model'.format(prefix))
+        return build_pca_model(warped_images,
+                               max_n_components=max_n_components,
+                               prefix=prefix, verbose=verbose, **pca_kwargs)
 
     @property
     def n_scales(self):
@@ -666,12 +795,48 @@ class MaskedAAM(AAM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). Hence, the warped images
+        are never held in memory all at once. If ``None``, then the appearance
+        models are built in memory. It has no effect when incrementing the
+        model.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
     """
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), shape_model_cls=OrthoPDM,
                  max_shape_components=None, max_appearance_components=None,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1,
+                 n_scale_workers=1):
         # Check arguments
         n_scales = len(checks.check_scales(scales))
         self.patch_shape = checks.check_patch_shape(patch_shape, n_scales)
@@ -683,14 +848,19 @@ class MaskedAAM(AAM):
             transform=DifferentiableThinPlateSplines, diagonal=diagonal,
             scales=scales,  max_shape_components=max_shape_components,
             max_appearance_components=max_appearance_components,
-            shape_model_cls=shape_model_cls, batch_size=batch_size)
+            shape_model_cls=shape_model_cls, batch_size=batch_size,
+            appearance_block_size=appearance_block_size,
+            pca_solver=pca_solver, pca_oversamples=pca_oversamples,
+            pca_power_iterations=pca_power_iterations,
+            n_workers=n_workers, n_scale_workers=n_scale_workers)
 
     def _warp_images(self, images, shapes, reference_shape, scale_index,
                      prefix, verbose):
         reference_frame = build_patch_reference_frame(
             reference_shape, patch_shape=self.patch_shape[scale_index])
         return warp_images(images, shapes, reference_frame, self.transform,
-                           prefix=prefix, verbose=verbose)
+                           prefix=prefix, verbose=verbose,
+                           n_workers=self.n_workers)
 
     @property
     def _str_title(self):
@@ -776,13 +946,52 @@ class LinearAAM(AAM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). Hence, the warped images
+        are never held in memory all at once. If ``None``, then the appearance
+        models are built in memory. It has no effect when incrementing the
+        model.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
     """
+    # The reference frame is built by the shape model of each scale
+    _scale_attributes = ('n_landmarks', 'reference_frame')
+
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  transform=DifferentiableThinPlateSplines,
                  shape_model_cls=OrthoPDM,  max_shape_components=None,
                  max_appearance_components=None, verbose=False,
-                 batch_size=None):
+                 batch_size=None, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1,
+                 n_scale_workers=1):
         super(LinearAAM, self).__init__(
             images, group=group, verbose=verbose,
             reference_shape=reference_shape,
@@ -790,7 +999,11 @@ class LinearAAM(AAM):
             diagonal=diagonal, scales=scales,
             max_shape_components=max_shape_components,
             max_appearance_components=max_appearance_components,
-            shape_model_cls=shape_model_cls, batch_size=batch_size)
+            shape_model_cls=shape_model_cls, batch_size=batch_size,
+            appearance_block_size=appearance_block_size,
+            pca_solver=pca_solver, pca_oversamples=pca_oversamples,
+            pca_power_iterations=pca_power_iterations,
+            n_workers=n_workers, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
@@ -826,7 +1039,7 @@ class LinearAAM(AAM):
                      prefix, verbose):
         return warp_images(images, shapes, self.reference_frame,
                            self.transform, prefix=prefix,
-                           verbose=verbose)
+                           verbose=verbose, n_workers=self.n_workers)
 
     # TODO: implement me!
     def _instance(self, scale_index, shape_instance, appearance_instance):
@@ -941,12 +1154,51 @@ class LinearMaskedAAM(AAM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). Hence, the warped images
+        are never held in memory all at once. If ``None``, then the appearance
+        models are built in memory. It has no effect when incrementing the
+        model.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
     """
+    # The reference frame is built by the shape model of each scale
+    _scale_attributes = ('n_landmarks', 'reference_frame')
+
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), shape_model_cls=OrthoPDM,
                  max_shape_components=None, max_appearance_components=None,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1,
+                 n_scale_workers=1):
         # Check arguments
         n_scales = len(checks.check_scales(scales))
         self.patch_shape = checks.check_patch_shape(patch_shape, n_scales)
@@ -958,7 +1210,11 @@ class LinearMaskedAAM(AAM):
             transform=DifferentiableThinPlateSplines, diagonal=diagonal,
             scales=scales,  max_shape_components=max_shape_components,
             max_appearance_components=max_appearance_components,
-            shape_model_cls=shape_model_cls, batch_size=batch_size)
+            shape_model_cls=shape_model_cls, batch_size=batch_size,
+            appearance_block_size=appearance_block_size,
+            pca_solver=pca_solver, pca_oversamples=pca_oversamples,
+            pca_power_iterations=pca_power_iterations,
+            n_workers=n_workers, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
@@ -994,7 +1250,7 @@ class LinearMaskedAAM(AAM):
                      prefix, verbose):
         return warp_images(images, shapes, self.reference_frame,
                            self.transform, prefix=prefix,
-                           verbose=verbose)
+                           verbose=verbose, n_workers=self.n_workers)
 
     # TODO: implement me!
     def _instance(self, scale_index, shape_instance, appearance_instance):
@@ -1117,13 +1373,49 @@ class PatchAAM(AAM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). Hence, the warped images
+        are never held in memory all at once. If ``None``, then the appearance
+        models are built in memory. It has no effect when incrementing the
+        model.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
     """
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), patch_normalisation=no_op,
                  shape_model_cls=OrthoPDM, max_shape_components=None,
                  max_appearance_components=None, verbose=False,
-                 batch_size=None):
+                 batch_size=None, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1,
+                 n_scale_workers=1):
         n_scales = len(checks.check_scales(scales))
         self.patch_shape = checks.check_patch_shape(patch_shape, n_scales)
         self.patch_normalisation = checks.check_callable(patch_normalisation,
@@ -1136,7 +1428,11 @@ class PatchAAM(AAM):
             diagonal=diagonal, scales=scales,
             max_shape_components=max_shape_components,
             max_appearance_components=max_appearance_components,
-            shape_model_cls=shape_model_cls, batch_size=batch_size)
+            shape_model_cls=shape_model_cls, batch_size=batch_size,
+            appearance_block_size=appearance_block_size,
+            pca_solver=pca_solver, pca_oversamples=pca_oversamples,
+            pca_power_iterations=pca_power_iterations,
+            n_workers=n_workers, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
@@ -1151,7 +1447,7 @@ class PatchAAM(AAM):
         return extract_patches(
             images, shapes, self.patch_shape[scale_index],
             normalise_function=self.patch_normalisation[scale_index],
-            prefix=prefix, verbose=verbose)
+            prefix=prefix, verbose=verbose, n_workers=self.n_workers)
 
     def _instance(self, scale_index, shape_instance, appearance_instance):
         return shape_instance, appearance_instance
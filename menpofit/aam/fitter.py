@@ -76,7 +76,8 @@ class AAMFitter(MultiScaleParametricFitter):
             The multi-scale fitting result containing the result of the fitting
             procedure.
         """
-        return AAMResult(results=algorithm_results, scales=self.scales,
+        return AAMResult(results=algorithm_results,
+                         scales=self._result_scales(algorithm_results),
                          affine_transforms=affine_transforms,
                          scale_transforms=scale_transforms, image=image,
                          gt_shape=gt_shape)
@@ -141,9 +142,23 @@ class LucasKanadeAAMFitter(AAMFitter):
         sub-sampling step of the sampling mask. If `ndarray`, then it
         explicitly defines the sampling mask. If ``None``, then no
         sub-sampling is applied.
+    cache_dir : `str` or ``None``, optional
+        If provided, then the expensive per-scale precomputations of the
+        algorithms are stored in (and loaded memory-mapped from) an on-disk
+        :map:`PrecomputeCache` within this directory. This speeds up the
+        construction of fitters with the same model, components and sampling.
+        If ``None``, then everything is computed on construction.
+    dtype : `numpy.dtype`, optional
+        The dtype of the precomputed arrays and of the per-iteration
+        computations of the algorithms (warped images, gradients, Jacobians
+        and projections). ``np.float32`` roughly halves the memory and the
+        memory bandwidth of the fitting, which is significant for features
+        with many channels (e.g. HOG or IGO). The small linear systems in the
+        parameter space are always solved in double precision.
     """
     def __init__(self, aam, lk_algorithm_cls=WibergInverseCompositional,
-                 n_shape=None, n_appearance=None, sampling=None):
+                 n_shape=None, n_appearance=None, sampling=None,
+                 cache_dir=None, dtype=np.float64):
         # Check parameters
         checks.set_models_components(aam.shape_models, n_shape)
         checks.set_models_components(aam.appearance_models, n_appearance)
@@ -151,7 +166,11 @@ class LucasKanadeAAMFitter(AAMFitter):
 
         # Get list of algorithm objects per scale
         interfaces = aam.build_fitter_interfaces(self._sampling)
-        algorithms = [lk_algorithm_cls(interface) for interface in interfaces]
+        kwargs = {'dtype': dtype}
+        if cache_dir is not None:
+            kwargs['cache_dir'] = cache_dir
+        algorithms = [lk_algorithm_cls(interface, **kwargs)
+                      for interface in interfaces]
 
         # Call superclass
         super(LucasKanadeAAMFitter, self).__init__(aam=aam,
@@ -365,7 +384,8 @@ class SupervisedDescentAAMFitter(SupervisedDescentFitter):
             procedure.
         """
         return MultiScaleParametricIterativeResult(
-            results=algorithm_results, scales=self.scales,
+            results=algorithm_results,
+            scales=self._result_scales(algorithm_results),
             affine_transforms=affine_transforms,
             scale_transforms=scale_transforms, image=image, gt_shape=gt_shape)
 
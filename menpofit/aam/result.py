@@ -1,5 +1,5 @@
 from menpofit.result import (ParametricIterativeResult,
-                             MultiScaleParametricIterativeResult)
+                             MultiScaleParametricIterativeResult, _as_list)
 
 
 class AAMAlgorithmResult(ParametricIterativeResult):
@@ -54,7 +54,7 @@ class AAMAlgorithmResult(ParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._appearance_parameters
+        return _as_list(self._appearance_parameters)
 
 
 class AAMResult(MultiScaleParametricIterativeResult):
@@ -109,4 +109,4 @@ class AAMResult(MultiScaleParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._appearance_parameters
+        return _as_list(self._appearance_parameters)
@@ -0,0 +1,42 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.image import Image
+from menpo.shape import PointCloud
+
+from menpofit.aam import HolisticAAM
+
+
+def _training_images(n_images=8):
+    rng = np.random.RandomState(0)
+    y, x = np.mgrid[:80, :80].astype(np.float64)
+    images = []
+    for _ in range(n_images):
+        cy, cx = 40 + rng.randn(2) * 2
+        pixels = (np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / 200.) +
+                  0.1 * rng.rand(80, 80))
+        image = Image(pixels[None])
+        image.landmarks['PTS'] = PointCloud(
+            np.array([[cy - 20., cx - 20.], [cy - 20., cx + 20.],
+                      [cy + 20., cx + 20.], [cy + 20., cx - 20.],
+                      [cy, cx]]) + rng.randn(5, 2))
+        images.append(image)
+    return images
+
+
+def test_aam_scales_built_in_parallel_match_sequential_build():
+    images = _training_images()
+    sequential = HolisticAAM(images, group='PTS', scales=(0.5, 1.0),
+                             n_workers=1, n_scale_workers=1)
+    parallel = HolisticAAM(images, group='PTS', scales=(0.5, 1.0),
+                           n_workers=1, n_scale_workers=2)
+    for s, p in zip(sequential.shape_models, parallel.shape_models):
+        assert_allclose(s.model.mean().points, p.model.mean().points)
+        assert_allclose(np.abs(s.model.components),
+                        np.abs(p.model.components), atol=1e-10)
+    for s, p in zip(sequential.appearance_models,
+                    parallel.appearance_models):
+        assert_allclose(s.mean().as_vector(), p.mean().as_vector())
+        assert_allclose(s.eigenvalues, p.eigenvalues)
+        assert_allclose(np.abs(s.components), np.abs(p.components),
+                        atol=1e-10)
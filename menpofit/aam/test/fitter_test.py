@@ -0,0 +1,94 @@
+import copy
+import pickle
+import shutil
+import tempfile
+
+import mock
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpofit.aam import (HolisticAAM, LucasKanadeAAMFitter,
+                          ProjectOutInverseCompositional,
+                          WibergInverseCompositional)
+from menpofit.aam.test.base_test import _training_images
+from menpofit.transform import DifferentiableThinPlateSplines
+
+
+aam = HolisticAAM(_training_images(), group='PTS', scales=(1.0,),
+                  n_workers=1)
+
+
+def _fitter(cache_dir, sampling=None, aam=aam):
+    return LucasKanadeAAMFitter(aam, sampling=sampling, cache_dir=cache_dir)
+
+
+def test_precomputations_are_loaded_from_cache():
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cached = _fitter(cache_dir).algorithms[0]
+        loaded = _fitter(cache_dir).algorithms[0]
+    finally:
+        shutil.rmtree(cache_dir)
+    assert isinstance(loaded.pinv_A_m, np.memmap)
+    assert isinstance(loaded.dW_dp, np.memmap)
+    for name in ('pinv_A_m', 'dW_dp', 'AA_m'):
+        assert_allclose(getattr(loaded, name), getattr(cached, name))
+
+
+def test_cache_key_depends_on_sampling():
+    algorithm = _fitter(None).algorithms[0]
+    sampled = _fitter(None, sampling=2).algorithms[0]
+    assert algorithm._cache_key() != sampled._cache_key()
+    assert algorithm._cache_key() == _fitter(None).algorithms[0]._cache_key()
+
+
+def test_cache_key_depends_on_transform():
+    # same shape and appearance models, but a different warp
+    tps_aam = copy.deepcopy(aam)
+    tps_aam.transform = DifferentiableThinPlateSplines
+    algorithm = _fitter(None).algorithms[0]
+    tps_algorithm = _fitter(None, aam=tps_aam).algorithms[0]
+    assert algorithm._cache_key() != tps_algorithm._cache_key()
+
+
+def test_cache_key_does_not_pickle_the_model():
+    algorithm = _fitter(None).algorithms[0]
+    with mock.patch('menpofit.cache.pickle.dumps',
+                    side_effect=pickle.dumps) as dumps:
+        algorithm._cache_key()
+    assert all(isinstance(c[0][0], str) for c in dumps.call_args_list)
+
+
+def _check_batch_matches_per_image_fitting(fitter, images, initial_shapes,
+                                           **kwargs):
+    batch = fitter.fit_from_shapes(images, initial_shapes, **kwargs)
+    for image, initial_shape, result in zip(images, initial_shapes, batch):
+        expected = fitter.fit_from_shape(image, initial_shape, **kwargs)
+        assert result.n_iters_per_scale == expected.n_iters_per_scale
+        assert_allclose(result.final_shape.points,
+                        expected.final_shape.points, atol=1e-8)
+        for p, e in zip(result.shape_parameters, expected.shape_parameters):
+            assert_allclose(p, e, atol=1e-8)
+    return batch
+
+
+def test_fit_from_shapes_matches_fit_from_shape():
+    images = _training_images(n_images=6)
+    multiscale_aam = HolisticAAM(images, group='PTS', scales=(0.5, 1.0),
+                                 n_workers=1)
+    # the initial shapes are perturbed by increasing amounts, so that the
+    # samples converge at different iterations
+    rng = np.random.RandomState(1)
+    initial_shapes = [
+        i.landmarks['PTS'].lms.from_vector(
+            i.landmarks['PTS'].lms.as_vector() + rng.randn(10) * k)
+        for k, i in enumerate(images)]
+    for algorithm_cls in [ProjectOutInverseCompositional,
+                          WibergInverseCompositional]:
+        fitter = LucasKanadeAAMFitter(multiscale_aam,
+                                      lk_algorithm_cls=algorithm_cls)
+        batch = _check_batch_matches_per_image_fitting(
+            fitter, images, initial_shapes, max_iters=50)
+        assert len(set(r.n_iters_per_scale[-1] for r in batch)) > 1
+        _check_batch_matches_per_image_fitting(
+            fitter, images, initial_shapes, max_iters=10, map_inference=True)
@@ -0,0 +1,102 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpofit.aam.algorithm.lk import (LucasKanadeStandardInterface,
+                                       SimultaneousInverseCompositional,
+                                       AlternatingInverseCompositional,
+                                       WibergInverseCompositional)
+
+
+n_pixels, m, n = 60, 5, 8
+
+
+class _Transform(object):
+    def __init__(self, p):
+        self.p = p
+        self.n_parameters = p.shape[0]
+
+    def as_vector(self):
+        return self.p
+
+
+class _AppearanceModel(object):
+    n_active_components = m
+
+
+class _Interface(LucasKanadeStandardInterface):
+    # Interface with a synthetic shape and appearance model, which only
+    # provides the solvers of the parameter increments
+    def __init__(self, p):
+        self.transform = _Transform(p)
+        self.appearance_model = _AppearanceModel()
+
+
+def _synthetic_algorithm(algorithm_cls):
+    # The precomputed quantities and the current state of the algorithm
+    rng = np.random.RandomState(0)
+    algorithm = algorithm_cls.__new__(algorithm_cls)
+    algorithm.interface = _Interface(rng.randn(n))
+    algorithm.dtype = np.dtype(np.float64)
+    algorithm.A_m = rng.randn(n_pixels, m)
+    algorithm.pinv_A_m = np.linalg.pinv(algorithm.A_m)
+    algorithm.AA_m = algorithm.A_m.T.dot(algorithm.A_m)
+    algorithm.s2_inv_S = rng.rand(m) + 0.5
+    algorithm.s2_inv_L = rng.rand(n) + 0.5
+    algorithm._precompute_appearance_map()
+    algorithm.c = rng.randn(m)
+    algorithm.e_m = rng.randn(n_pixels)
+    J_m = rng.randn(n_pixels, n)
+    algorithm._compute_jacobian = lambda: J_m
+    return algorithm, J_m
+
+
+def test_simultaneous_increments_match_stacked_solve():
+    for map_inference in [True, False]:
+        algorithm, J_m = _synthetic_algorithm(SimultaneousInverseCompositional)
+        dc, dp = algorithm._solve(map_inference)
+        # Solve the system of the stacked simultaneous Jacobian [-A, J]
+        J_sim_m = np.hstack((-algorithm.A_m, J_m))
+        H_sim_m = J_sim_m.T.dot(J_sim_m)
+        if map_inference:
+            expected_dc, expected_dp = algorithm.interface.solve_all_map(
+                H_sim_m, J_sim_m, algorithm.e_m, algorithm.s2_inv_S,
+                algorithm.c, algorithm.s2_inv_L,
+                algorithm.transform.as_vector())
+        else:
+            expected_dc, expected_dp = algorithm.interface.solve_all_ml(
+                H_sim_m, J_sim_m, algorithm.e_m)
+        assert_allclose(dc, expected_dc, atol=1e-10)
+        assert_allclose(dp, expected_dp, atol=1e-10)
+
+
+def test_wiberg_increments_match_projected_out_solve():
+    for map_inference in [True, False]:
+        algorithm, J_m = _synthetic_algorithm(WibergInverseCompositional)
+        dp = algorithm._solve_project_out(J_m, algorithm.e_m, map_inference)
+        # Solve the system of the projected out Jacobian QJ
+        QJ_m = algorithm.project_out(J_m)
+        JQJ_m = QJ_m.T.dot(J_m)
+        if map_inference:
+            expected_dp = algorithm.interface.solve_shape_map(
+                JQJ_m, QJ_m, algorithm.e_m, algorithm.s2_inv_L,
+                algorithm.transform.as_vector())
+        else:
+            expected_dp = algorithm.interface.solve_shape_ml(JQJ_m, QJ_m,
+                                                             algorithm.e_m)
+        assert_allclose(dp, expected_dp, atol=1e-10)
+
+
+def test_alternating_appearance_increments_match_least_squares():
+    for map_inference in [True, False]:
+        algorithm, _ = _synthetic_algorithm(AlternatingInverseCompositional)
+        dc = algorithm._solve_appearance(algorithm.e_m, algorithm.c,
+                                         map_inference)
+        # The increment minimises ||e - A dc||^2 and, for MAP inference, the
+        # prior term ||c + dc||^2 weighted by s2_inv_S
+        A, b = algorithm.A_m, algorithm.e_m
+        if map_inference:
+            sqrt_prior = np.sqrt(algorithm.s2_inv_S)
+            A = np.vstack((A, np.diag(sqrt_prior)))
+            b = np.hstack((b, - sqrt_prior * algorithm.c))
+        expected_dc = np.linalg.lstsq(A, b, rcond=None)[0]
+        assert_allclose(dc, expected_dc, atol=1e-10)
@@ -4,6 +4,9 @@ import numpy as np
 from menpo.feature import gradient as fast_gradient
 from menpo.image import Image
 
+from menpofit.math.sdi import steepest_descent_images
+from menpofit.profiling import stage, set_iteration
+
 from ..result import APSAlgorithmResult
 
 
@@ -188,10 +191,8 @@ class GaussNewtonBaseInterface(object):
         # nabla: dims x parts x off x ch x (h x w)
         # dS_dp: dims x parts x                             x params
         # sdi:          parts x off x ch x (h x w) x params
-        sdi = 0
-        a = nabla[..., None] * ds_dp[..., None, None, None, :]
-        for d in a:
-            sdi += d
+        sdi = steepest_descent_images(
+            nabla.reshape(nabla.shape[:2] + (-1, 1)), ds_dp[:, :, None])
 
         # reshape steepest descent images
         # sdi: (parts x offsets x ch x w x h) x params
@@ -445,7 +446,8 @@ class Inverse(GaussNewton):
         # Inverse Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        with stage('warp'):
+            self.i = self.interface.warp(image)
         # vectorize it and mask it
         i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -462,6 +464,7 @@ class Inverse(GaussNewton):
             costs = [appearance_costs[-1] + deformation_costs[-1]]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute gauss-newton parameter updates
             b = self._J_a_T_Q_a.dot(self.e_m)
             p = p_list[-1].copy()
@@ -478,7 +481,8 @@ class Inverse(GaussNewton):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            with stage('warp'):
+                self.i = self.interface.warp(image)
             # vectorize it and mask it
             i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -583,7 +587,8 @@ class Forward(GaussNewton):
         # Forward Gauss-Newton loop -------------------------------------
 
         # warp image
-        i = self.interface.warp(image)
+        with stage('warp'):
+            i = self.interface.warp(image)
         # vectorize it and mask it
         i_m = i.as_vector()[self.interface.i_mask]
 
@@ -600,8 +605,10 @@ class Forward(GaussNewton):
             costs = [appearance_costs[-1] + deformation_costs[-1]]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute image gradient
-            nabla_i = self.interface.gradient(i)
+            with stage('gradient'):
+                nabla_i = self.interface.gradient(i)
 
             # compute appearance jacobian
             Ja = self.interface.steepest_descent_images(nabla_i, self._ds_dp)
@@ -618,7 +625,8 @@ class Forward(GaussNewton):
             if self.interface.use_procrustes:
                 p[0:4] = 0
             b += self._H_s.dot(p)
-            dp = -np.linalg.solve(H, b)
+            with stage('solve'):
+                dp = -np.linalg.solve(H, b)
 
             # update warp
             s_k = self.transform.target.points
@@ -628,7 +636,8 @@ class Forward(GaussNewton):
             shapes.append(self.transform.target)
 
             # warp image
-            i = self.interface.warp(image)
+            with stage('warp'):
+                i = self.interface.warp(image)
             # vectorize it and mask it
             i_m = i.as_vector()[self.interface.i_mask]
 
@@ -1,22 +1,26 @@
 from __future__ import division
+from functools import partial
 import warnings
 import numpy as np
-from scipy.stats import multivariate_normal
+from numpy.linalg import LinAlgError
 
 from menpo.base import name_of_callable
 from menpo.feature import no_op
-from menpo.visualize import print_dynamic, print_progress
+from menpo.visualize import print_dynamic
 from menpo.model import GMRFModel
 from menpo.shape import (DirectedGraph, UndirectedGraph, Tree, PointTree,
                          PointDirectedGraph, PointUndirectedGraph)
 
 from menpofit import checks
-from menpofit.base import batch
+from menpofit.base import batch, as_sequence
 from menpofit.modelinstance import OrthoPDM
 from menpofit.builder import (compute_features, scale_images, align_shapes,
                               rescale_images_to_reference_shape,
                               extract_patches, MenpoFitBuilderWarning,
-                              compute_reference_shape)
+                              compute_reference_shape, extract_shapes,
+                              shared_holistic_features,
+                              train_scales_in_parallel)
+from menpofit.visualize import print_progress
 
 
 class GenerativeAPS(object):
@@ -111,6 +115,21 @@ class GenerativeAPS(object):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and patch
+        extraction of the training images (see :map:`parallel_map`). If
+        `int`, then it is the number of threads. If ``None``, then the number
+        of CPUs is used. It can also be an existing pool of workers, e.g. a
+        process pool, in which case the images and the features must be
+        picklable.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The scales only share the
+        training images and the holistic features that are common to several
+        scales, which are computed once beforehand. Every other intermediate
+        of a scale lives in its own worker process and is released as soon as
+        the models of the scale are built. If ``None``, then up to one process
+        per CPU is used. If ``1``, then the scales are built sequentially.
 
     References
     ----------
@@ -119,6 +138,11 @@ class GenerativeAPS(object):
         Vision and Pattern Recognition (CVPR), Boston, MA, USA, pp. 1872-1882,
         June 2015.
     """
+    # Models that were pickled before n_workers and n_scale_workers existed
+    # build sequentially
+    n_workers = 1
+    n_scale_workers = 1
+
     def __init__(self, images, group=None, appearance_graph=None,
                  shape_graph=None, deformation_graph=None,
                  holistic_features=no_op, reference_shape=None, diagonal=None,
@@ -126,7 +150,8 @@ class GenerativeAPS(object):
                  patch_normalisation=no_op, use_procrustes=True,
                  precision_dtype=np.float32, max_shape_components=None,
                  n_appearance_components=None, can_be_incremented=False,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, n_workers=1,
+                 n_scale_workers=1):
         # Check parameters
         checks.check_diagonal(diagonal)
         scales = checks.check_scales(scales)
@@ -152,6 +177,8 @@ class GenerativeAPS(object):
         self.precision_dtype = precision_dtype
         self.max_shape_components = max_shape_components
         self.n_appearance_components = n_appearance_components
+        self.n_workers = n_workers
+        self.n_scale_workers = n_scale_workers
 
         # Check provided graphs
         self.appearance_graph = checks.check_graph(
@@ -180,7 +207,7 @@ class GenerativeAPS(object):
             # on an infinite list.
             image_batches = batch(images, batch_size)
         else:
-            image_batches = [list(images)]
+            image_batches = [as_sequence(images)]
 
         for k, image_batch in enumerate(image_batches):
             if k == 0:
@@ -195,7 +222,7 @@ class GenerativeAPS(object):
                                       'this may cause issues.',
                                       MenpoFitBuilderWarning)
                     self.reference_shape = compute_reference_shape(
-                        [i.landmarks[group].lms for i in image_batch],
+                        extract_shapes(image_batch, group),
                         self.diagonal, verbose=verbose)
 
             # After the first batch, we are incrementing the model
@@ -213,7 +240,8 @@ class GenerativeAPS(object):
                      verbose=False):
         # Rescale to existing reference shape
         image_batch = rescale_images_to_reference_shape(
-            image_batch, group, self.reference_shape, verbose=verbose)
+            image_batch, group, self.reference_shape, verbose=verbose,
+            n_workers=self.n_workers)
 
         # If the deformation graph was not provided (None given), then compute
         # the MST
@@ -228,6 +256,23 @@ class GenerativeAPS(object):
         if verbose:
             print_dynamic('- Building models\n')
 
+        train_scale = partial(self._train_scale, image_batch=image_batch,
+                              increment=increment, group=group)
+        if self.n_scale_workers != 1 and self.n_scales > 1:
+            # The scales are independent, so build them in worker processes
+            scale_features = shared_holistic_features(
+                image_batch, self.holistic_features, prefix='  - ',
+                verbose=verbose, n_workers=self.n_workers)
+            wrap = partial(print_progress, prefix='  - Building scales',
+                           verbose=verbose)
+            results = train_scales_in_parallel(
+                partial(train_scale, prefix=None, verbose=False),
+                scale_features, n_workers=self.n_scale_workers, wrap=wrap)
+            del scale_features
+            for j, result in enumerate(results):
+                self._set_scale_models(j, result, increment)
+            return
+
         feature_images = []
         # for each scale (low --> high)
         for j in range(self.n_scales):
@@ -251,71 +296,102 @@ class GenerativeAPS(object):
                 feature_images = compute_features(image_batch,
                                                   self.holistic_features[j],
                                                   prefix=scale_prefix,
-                                                  verbose=verbose)
-            # handle scales
-            if self.scales[j] != 1:
-                # Scale feature images only if scale is different than 1
-                scaled_images = scale_images(feature_images, self.scales[j],
-                                             prefix=scale_prefix,
-                                             verbose=verbose)
-            else:
-                scaled_images = feature_images
+                                                  verbose=verbose,
+                                                  n_workers=self.n_workers)
+            self._set_scale_models(
+                j, train_scale(j, feature_images, prefix=scale_prefix,
+                               verbose=verbose), increment)
 
-            # Extract potentially rescaled shapes
-            scale_shapes = [i.landmarks[group].lms for i in scaled_images]
+            if verbose:
+                print_dynamic('{}Done\n'.format(scale_prefix))
 
-            # Apply procrustes to align the shapes
-            aligned_shapes = align_shapes(scale_shapes)
+    def _train_scale(self, scale_index, feature_images, image_batch,
+                     increment, group, prefix, verbose):
+        # Trains the models of a single scale, given the feature images of the
+        # scale or None, and returns them without adding them to the APS, so
+        # that it can run in a worker process
+        j = scale_index
+        if feature_images is None:
+            feature_images = compute_features(image_batch,
+                                              self.holistic_features[j],
+                                              prefix=prefix, verbose=verbose,
+                                              n_workers=self.n_workers)
+        # handle scales
+        if self.scales[j] != 1:
+            # Scale feature images only if scale is different than 1
+            scaled_images = scale_images(feature_images, self.scales[j],
+                                         prefix=prefix, verbose=verbose,
+                                         n_workers=self.n_workers)
+        else:
+            scaled_images = feature_images
+        del feature_images
 
-            # Build the shape model using the aligned shapes
-            if verbose:
-                print_dynamic('{}Building shape model'.format(scale_prefix))
+        # Extract potentially rescaled shapes
+        scale_shapes = [i.landmarks[group].lms for i in scaled_images]
 
-            if not increment:
-                self.shape_models.append(self._build_shape_model(
-                    aligned_shapes, self.shape_graph[j],
-                    self.max_shape_components[j], verbose=verbose))
-            else:
-                self.shape_models[j].increment(aligned_shapes, verbose=verbose)
+        # Apply procrustes to align the shapes
+        aligned_shapes = align_shapes(scale_shapes)
 
-            # Build the deformation model
-            if verbose:
-                print_dynamic('{}Building deformation model'.format(
-                    scale_prefix))
+        # Build the shape model using the aligned shapes
+        if verbose:
+            print_dynamic('{}Building shape model'.format(prefix))
 
-            if self.use_procrustes:
-                deformation_shapes = aligned_shapes
-            else:
-                deformation_shapes = scale_shapes
+        if not increment:
+            shape_model = self._build_shape_model(
+                aligned_shapes, self.shape_graph[j],
+                self.max_shape_components[j], verbose=verbose)
+        else:
+            shape_model = self.shape_models[j]
+            shape_model.increment(aligned_shapes, verbose=verbose)
 
-            if not increment:
-                self.deformation_models.append(self._build_deformation_model(
-                    deformation_shapes, self.deformation_graph[j],
-                    verbose=verbose))
-            else:
-                self.deformation_models[j].increment(deformation_shapes,
-                                                     verbose=verbose)
+        # Build the deformation model
+        if verbose:
+            print_dynamic('{}Building deformation model'.format(prefix))
 
-            # Obtain warped images
-            warped_images = self._warp_images(scaled_images, scale_shapes,
-                                              j, scale_prefix, verbose)
+        if self.use_procrustes:
+            deformation_shapes = aligned_shapes
+        else:
+            deformation_shapes = scale_shapes
 
-            # Build the appearance model
-            if verbose:
-                print_dynamic('{}Building appearance model'.format(
-                    scale_prefix))
+        if not increment:
+            deformation_model = self._build_deformation_model(
+                deformation_shapes, self.deformation_graph[j],
+                verbose=verbose)
+        else:
+            deformation_model = self.deformation_models[j]
+            deformation_model.increment(deformation_shapes, verbose=verbose)
 
-            if not increment:
-                self.appearance_models.append(self._build_appearance_model(
-                    warped_images, self.appearance_graph[j],
-                    self.n_appearance_components[j], verbose=verbose))
-            else:
-                self._increment_appearance_model(
-                    warped_images, self.appearance_graph[j],
-                    self.appearance_models[j], verbose=verbose)
+        # Obtain warped images
+        warped_images = self._warp_images(scaled_images, scale_shapes,
+                                          j, prefix, verbose)
+        del scaled_images
 
-            if verbose:
-                print_dynamic('{}Done\n'.format(scale_prefix))
+        # Build the appearance model
+        if verbose:
+            print_dynamic('{}Building appearance model'.format(prefix))
+
+        if not increment:
+            appearance_model = self._build_appearance_model(
+                warped_images, self.appearance_graph[j],
+                self.n_appearance_components[j], verbose=verbose)
+        else:
+            appearance_model = self.appearance_models[j]
+            self._increment_appearance_model(
+                warped_images, self.appearance_graph[j],
+                appearance_model, verbose=verbose)
+        return shape_model, deformation_model, appearance_model
+
+    def _set_scale_models(self, scale_index, result, increment):
+        # Adds the models returned by _train_scale to the APS
+        shape_model, deformation_model, appearance_model = result
+        if not increment:
+            self.shape_models.append(shape_model)
+            self.deformation_models.append(deformation_model)
+            self.appearance_models.append(appearance_model)
+        else:
+            self.shape_models[scale_index] = shape_model
+            self.deformation_models[scale_index] = deformation_model
+            self.appearance_models[scale_index] = appearance_model
 
     def increment(self, images, group=None, batch_size=None, verbose=False):
         r"""
@@ -383,7 +459,7 @@ class GenerativeAPS(object):
         return extract_patches(
             images, shapes, self.patch_shape[scale_index],
             normalise_function=self.patch_normalisation[scale_index],
-            prefix=prefix, verbose=verbose)
+            prefix=prefix, verbose=verbose, n_workers=self.n_workers)
 
     @property
     def n_scales(self):
@@ -763,35 +839,46 @@ class GenerativeAPS(object):
 
 def _compute_minimum_spanning_tree(shapes, root_vertex=0, prefix='',
                                    verbose=False):
-    # initialize weights matrix
-    n_vertices = shapes[0].n_points
-    weights = np.zeros((n_vertices, n_vertices))
+    # stack all shapes
+    # points: n_shapes x n_vertices x 2
+    points = np.array([s.points for s in shapes])
+    n_shapes, n_vertices = points.shape[:2]
 
-    # print progress if requested
-    range1 = range(n_vertices-1)
     if verbose:
-        range1 = print_progress(
-            range1, end_with_newline=False,
-            prefix='{}Deformation graph - Computing complete graph`s '
-                   'weights'.format(prefix))
-
-    # compute weights
-    for i in range1:
-        for j in range(i+1, n_vertices, 1):
-            # create data matrix of edge
-            diffs_x = [s.points[i, 0] - s.points[j, 0] for s in shapes]
-            diffs_y = [s.points[i, 1] - s.points[j, 1] for s in shapes]
-            coords = np.array([diffs_x, diffs_y])
-
-            # compute mean and covariance
-            m = np.mean(coords, axis=1)
-            c = np.cov(coords)
-
-            # get weight
-            for im in range(len(shapes)):
-                weights[i, j] += -np.log(multivariate_normal.pdf(coords[:, im],
-                                                                 mean=m, cov=c))
-            weights[j, i] = weights[i, j]
+        print_dynamic('{}Deformation graph - Computing complete graph`s '
+                      'weights'.format(prefix))
+
+    # The weight of the edge (i, j) is the negative log-likelihood of the
+    # differences points[:, i] - points[:, j] under the Gaussian with their
+    # sample mean and covariance. The covariances of all edges are computed at
+    # once from the centred points through
+    #     C_ij = (G_ii + G_jj - G_ij - G_ji) / (n_shapes - 1),
+    # where G_ij = sum_s q_si q_sj^T and q are the centred points.
+    centred = points - points.mean(axis=0)
+    gram = np.einsum('sia, sjb -> ijab', centred, centred)
+    gram_diag = gram[np.arange(n_vertices), np.arange(n_vertices)]
+    covs = (gram_diag[:, None] + gram_diag[None, :] - gram -
+            gram.transpose(1, 0, 2, 3)) / (n_shapes - 1)
+    # closed form determinant of the 2 x 2 covariances
+    dets = (covs[..., 0, 0] * covs[..., 1, 1] -
+            covs[..., 0, 1] * covs[..., 1, 0])
+    # the Gaussian of an edge is degenerate if its covariance is singular
+    # (e.g. the two points always move together), as in scipy's
+    # multivariate_normal
+    edges = ~np.eye(n_vertices, dtype=bool)
+    singular = edges & ~(dets > 0)
+    if np.any(singular):
+        i, j = np.argwhere(singular)[0]
+        raise LinAlgError('The covariance of the differences between the '
+                          'points {} and {} is singular, hence the '
+                          'deformation graph cannot be computed.'.format(i, j))
+    log_dets = np.log(np.where(edges, dets, 1.))
+    # The sum of the Mahalanobis distances of the samples from their sample
+    # mean under their sample covariance is trace(C^-1 (n_shapes - 1) C),
+    # i.e. 2 * (n_shapes - 1), hence the negative log-likelihood is
+    weights = (n_shapes * (np.log(2 * np.pi) + 0.5 * log_dets) +
+               (n_shapes - 1))
+    np.fill_diagonal(weights, 0)
 
     # create undirected graph
     complete_graph = UndirectedGraph(weights)
@@ -0,0 +1,48 @@
+import numpy as np
+from numpy.linalg import LinAlgError
+from numpy.testing import assert_allclose
+from nose.tools import raises
+from scipy.stats import multivariate_normal
+
+from menpo.shape import PointCloud, UndirectedGraph
+
+from menpofit.aps.base import _compute_minimum_spanning_tree
+
+
+def _edge_weight(shapes, i, j):
+    # The negative log-likelihood of the differences of the points of an
+    # edge, computed one sample at a time
+    coords = np.array([s.points[i] - s.points[j] for s in shapes]).T
+    m = np.mean(coords, axis=1)
+    c = np.cov(coords)
+    return sum(-np.log(multivariate_normal.pdf(coords[:, k], mean=m, cov=c))
+               for k in range(len(shapes)))
+
+
+def test_minimum_spanning_tree_weights():
+    rng = np.random.RandomState(0)
+    shapes = [PointCloud(rng.randn(5, 2) * (1 + np.arange(5)[:, None]))
+              for _ in range(10)]
+    tree = _compute_minimum_spanning_tree(shapes)
+    assert tree.n_edges == 4
+    # The tree is the minimum spanning tree of the complete graph with the
+    # weights of the edges
+    weights = np.zeros((5, 5))
+    for i in range(5):
+        for j in range(i + 1, 5):
+            weights[i, j] = weights[j, i] = _edge_weight(shapes, i, j)
+    expected = UndirectedGraph(weights).minimum_spanning_tree(0)
+    assert_allclose(tree.adjacency_matrix.toarray(),
+                    expected.adjacency_matrix.toarray())
+
+
+@raises(LinAlgError)
+def test_minimum_spanning_tree_singular_edge_covariance():
+    rng = np.random.RandomState(0)
+    shapes = []
+    for _ in range(10):
+        points = rng.randn(4, 2)
+        # The points 1 and 3 always move together
+        points[3] = points[1] + 1.
+        shapes.append(PointCloud(points))
+    _compute_minimum_spanning_tree(shapes)
@@ -1,9 +1,11 @@
 from __future__ import division
 import numpy as np
 
+from menpofit.profiling import stage, set_iteration
 from menpofit.result import ParametricIterativeResult
 from menpofit.aam.algorithm.lk import (LucasKanadeBaseInterface,
-                                       LucasKanadePatchBaseInterface)
+                                       LucasKanadePatchBaseInterface,
+                                       _cast_image, _solve_double)
 
 
 # ----------- INTERFACES -----------
@@ -172,10 +174,17 @@ class LucasKanade(object):
 
     eps : `float`, optional
         Value for checking the convergence of the optimization.
+    dtype : `numpy.dtype`, optional
+        The dtype in which the precomputed arrays and the per-iteration
+        quantities (warped images, gradients and Jacobians) are computed.
+        Using ``np.float32`` halves the memory and the memory bandwidth of the
+        algorithm. Note that the systems in the parameter space are always
+        solved in double precision.
     """
-    def __init__(self, atm_interface, eps=10**-5):
+    def __init__(self, atm_interface, eps=10**-5, dtype=np.float64):
         self.eps = eps
         self.interface = atm_interface
+        self.dtype = np.dtype(dtype)
         self._precompute()
 
     @property
@@ -198,15 +207,28 @@ class LucasKanade(object):
         """
         return self.interface.template
 
+    def _warp(self, image):
+        # warp image in the compute dtype
+        with stage('warp'):
+            return _cast_image(self.interface.warp(image), self.dtype)
+
+    def _gradient(self, image):
+        # compute vectorized image gradient in the compute dtype
+        with stage('gradient'):
+            return self.interface.gradient(image).astype(self.dtype,
+                                                         copy=False)
+
     def _precompute(self):
         # grab number of shape and appearance parameters
         self.n = self.transform.n_parameters
 
         # vectorize template and mask it
-        self.t_m = self.template.as_vector()[self.interface.i_mask]
+        self.t_m = self.template.as_vector()[self.interface.i_mask].astype(
+            self.dtype, copy=False)
 
         # compute warp jacobian
-        self.dW_dp = self.interface.warp_jacobian()
+        self.dW_dp = self.interface.warp_jacobian().astype(self.dtype,
+                                                           copy=False)
 
         # compute shape model prior
         # TODO: Is this correct? It's like modelling no noise at all
@@ -270,7 +292,7 @@ class Compositional(LucasKanade):
         # Compositional Gauss-Newton loop -------------------------------------
 
         # warp image
-        self.i = self.interface.warp(image)
+        self.i = self._warp(image)
         # vectorize it and mask it
         i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -283,6 +305,7 @@ class Compositional(LucasKanade):
             costs = [cost_closure(self.e_m)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # solve for increments on the shape parameters
             self.dp = self._solve(map_inference)
 
@@ -293,7 +316,7 @@ class Compositional(LucasKanade):
             shapes.append(self.transform.target)
 
             # warp image
-            self.i = self.interface.warp(image)
+            self.i = self._warp(image)
             # vectorize it and mask it
             i_m = self.i.as_vector()[self.interface.i_mask]
 
@@ -322,7 +345,7 @@ class ForwardCompositional(Compositional):
     """
     def _solve(self, map_inference):
         # compute warped image gradient
-        nabla_i = self.interface.gradient(self.i)
+        nabla_i = self._gradient(self.i)
         # compute masked forward Jacobian
         J_m = self.interface.steepest_descent_images(nabla_i, self.dW_dp)
         # compute masked forward Hessian
@@ -352,13 +375,14 @@ class InverseCompositional(Compositional):
         # call super method
         super(InverseCompositional, self)._precompute()
         # compute appearance model mean gradient
-        nabla_t = self.interface.gradient(self.template)
+        nabla_t = self._gradient(self.template)
         # compute masked inverse Jacobian
         self.J_m = self.interface.steepest_descent_images(-nabla_t, self.dW_dp)
         # compute masked inverse Hessian
         self.JJ_m = self.J_m.T.dot(self.J_m)
         # compute masked Jacobian pseudo-inverse
-        self.pinv_J_m = np.linalg.solve(self.JJ_m, self.J_m.T)
+        self.pinv_J_m = _solve_double(self.JJ_m, self.J_m.T).astype(
+            self.dtype)
 
     def _solve(self, map_inference):
         # solve for increments on the shape parameters
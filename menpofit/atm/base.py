@@ -1,4 +1,5 @@
 from __future__ import division
+from functools import partial
 import warnings
 import numpy as np
 
@@ -18,7 +19,9 @@ from menpofit.builder import (
     build_reference_frame, build_patch_reference_frame,
     compute_features, scale_images, warp_images,
     align_shapes, densify_shapes,
-    extract_patches, MenpoFitBuilderWarning, compute_reference_shape)
+    extract_patches, MenpoFitBuilderWarning, compute_reference_shape,
+    shared_holistic_features, train_scales_in_parallel)
+from menpofit.visualize import print_progress
 
 from .algorithm import (ATMLucasKanadeStandardInterface, ATMLucasKanadeLinearInterface,
                         ATMLucasKanadePatchInterface)
@@ -81,6 +84,13 @@ class ATM(object):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The holistic features that are
+        common to several scales are computed once beforehand and every other
+        intermediate of a scale is released as soon as its models are built.
+        If ``None``, then up to one process per CPU is used. If ``1``, then
+        the scales are built sequentially.
 
     References
     ----------
@@ -88,11 +98,18 @@ class ATM(object):
         framework", International Journal of Computer Vision, 56(3): 221-255,
         2004.
     """
+    # Models that were pickled before n_scale_workers existed build
+    # sequentially
+    n_scale_workers = 1
+    # The attributes that are set while training a scale, other than its
+    # models
+    _scale_attributes = ()
+
     def __init__(self, template, shapes, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  transform=DifferentiablePiecewiseAffine,
                  shape_model_cls=OrthoPDM, max_shape_components=None,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, n_scale_workers=1):
         # Check arguments
         checks.check_diagonal(diagonal)
         n_scales = len(scales)
@@ -108,6 +125,7 @@ class ATM(object):
         self.scales = scales
         self.max_shape_components = max_shape_components
         self.reference_shape = reference_shape
+        self.n_scale_workers = n_scale_workers
         self.shape_models = []
         self.warped_templates = []
         self._shape_model_cls = shape_model_cls
@@ -166,6 +184,25 @@ class ATM(object):
         if verbose:
             print_dynamic('- Building models\n')
 
+        train_scale = partial(
+            self._train_scale, template=template, shape_batch=shape_batch,
+            increment=increment, group=group,
+            shape_forgetting_factor=shape_forgetting_factor)
+        if self.n_scale_workers != 1 and self.n_scales > 1:
+            # The scales are independent, so build them in worker processes
+            scale_features = shared_holistic_features(
+                [template], self.holistic_features, prefix='  - ',
+                verbose=verbose)
+            wrap = partial(print_progress, prefix='  - Building scales',
+                           verbose=verbose)
+            results = train_scales_in_parallel(
+                partial(train_scale, prefix=None, verbose=False),
+                scale_features, n_workers=self.n_scale_workers, wrap=wrap)
+            del scale_features
+            for j, result in enumerate(results):
+                self._set_scale_models(j, result, increment)
+            return
+
         feature_images = []
         # for each scale (low --> high)
         for j in range(self.n_scales):
@@ -186,45 +223,71 @@ class ATM(object):
                                                   self.holistic_features[j],
                                                   prefix=scale_prefix,
                                                   verbose=verbose)
-            # handle scales
-            if self.scales[j] != 1:
-                # Scale feature images only if scale is different than 1
-                scaled_images = scale_images(feature_images, self.scales[j],
-                                             prefix=scale_prefix,
-                                             verbose=verbose)
-                # Extract potentially rescaled shapes
-                scale_transform = Scale(scale_factor=self.scales[j],
-                                        n_dims=2)
-                scale_shapes = [scale_transform.apply(s)
-                                for s in shape_batch]
-            else:
-                scaled_images = feature_images
-                scale_shapes = shape_batch
+            self._set_scale_models(
+                j, train_scale(j, feature_images, prefix=scale_prefix,
+                               verbose=verbose), increment)
 
-            # Build the shape model
             if verbose:
-                print_dynamic('{}Building shape model'.format(scale_prefix))
+                print_dynamic('{}Done\n'.format(scale_prefix))
 
-            if not increment:
-                shape_model = self._build_shape_model(scale_shapes, j)
-                self.shape_models.append(shape_model)
-            else:
-                self._increment_shape_model(
-                    scale_shapes, j, forgetting_factor=shape_forgetting_factor)
-
-            # Obtain warped images - we use a scaled version of the
-            # reference shape, computed here. This is because the mean
-            # moves when we are incrementing, and we need a consistent
-            # reference frame.
-            scaled_reference_shape = Scale(self.scales[j], n_dims=2).apply(
-                self.reference_shape)
-            warped_template = self._warp_template(scaled_images[0], group,
-                                                  scaled_reference_shape,
-                                                  j, scale_prefix, verbose)
-            self.warped_templates.append(warped_template[0])
+    def _train_scale(self, scale_index, feature_images, template, shape_batch,
+                     increment, group, shape_forgetting_factor, prefix,
+                     verbose):
+        # Trains the models of a single scale, given the feature images of the
+        # scale or None, and returns them without adding them to the ATM, so
+        # that it can run in a worker process
+        j = scale_index
+        if feature_images is None:
+            feature_images = compute_features([template],
+                                              self.holistic_features[j],
+                                              prefix=prefix, verbose=verbose)
+        # handle scales
+        if self.scales[j] != 1:
+            # Scale feature images only if scale is different than 1
+            scaled_images = scale_images(feature_images, self.scales[j],
+                                         prefix=prefix, verbose=verbose)
+            # Extract potentially rescaled shapes
+            scale_transform = Scale(scale_factor=self.scales[j], n_dims=2)
+            scale_shapes = [scale_transform.apply(s) for s in shape_batch]
+        else:
+            scaled_images = feature_images
+            scale_shapes = shape_batch
 
-            if verbose:
-                print_dynamic('{}Done\n'.format(scale_prefix))
+        # Build the shape model
+        if verbose:
+            print_dynamic('{}Building shape model'.format(prefix))
+
+        if not increment:
+            shape_model = self._build_shape_model(scale_shapes, j)
+        else:
+            self._increment_shape_model(
+                scale_shapes, j, forgetting_factor=shape_forgetting_factor)
+            shape_model = self.shape_models[j]
+
+        # Obtain warped images - we use a scaled version of the
+        # reference shape, computed here. This is because the mean
+        # moves when we are incrementing, and we need a consistent
+        # reference frame.
+        scaled_reference_shape = Scale(self.scales[j], n_dims=2).apply(
+            self.reference_shape)
+        warped_template = self._warp_template(scaled_images[0], group,
+                                              scaled_reference_shape,
+                                              j, prefix, verbose)
+
+        attributes = dict((a, getattr(self, a))
+                          for a in self._scale_attributes)
+        return shape_model, warped_template[0], attributes
+
+    def _set_scale_models(self, scale_index, result, increment):
+        # Adds the models returned by _train_scale to the ATM
+        shape_model, warped_template, attributes = result
+        if not increment:
+            self.shape_models.append(shape_model)
+        else:
+            self.shape_models[scale_index] = shape_model
+        self.warped_templates.append(warped_template)
+        for name, value in attributes.items():
+            setattr(self, name, value)
 
     def increment(self, template, shapes, group=None,
                   shape_forgetting_factor=1.0, verbose=False, batch_size=None):
@@ -508,11 +571,18 @@ class MaskedATM(ATM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The holistic features that are
+        common to several scales are computed once beforehand and every other
+        intermediate of a scale is released as soon as its models are built.
+        If ``None``, then up to one process per CPU is used. If ``1``, then
+        the scales are built sequentially.
     """
     def __init__(self, template, shapes, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), max_shape_components=None,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, n_scale_workers=1):
         # Check arguments
         self.patch_shape = checks.check_patch_shape(patch_shape, len(scales))
         # Call superclass
@@ -522,7 +592,7 @@ class MaskedATM(ATM):
                 reference_shape=reference_shape, diagonal=diagonal,
                 scales=scales, transform=DifferentiableThinPlateSplines,
                 max_shape_components=max_shape_components, verbose=verbose,
-                batch_size=batch_size)
+                batch_size=batch_size, n_scale_workers=n_scale_workers)
 
     def _warp_template(self, template, group, reference_shape, scale_index,
                        prefix, verbose):
@@ -606,18 +676,29 @@ class LinearATM(ATM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The holistic features that are
+        common to several scales are computed once beforehand and every other
+        intermediate of a scale is released as soon as its models are built.
+        If ``None``, then up to one process per CPU is used. If ``1``, then
+        the scales are built sequentially.
     """
+    # The reference frame is built by the shape model of each scale
+    _scale_attributes = ('n_landmarks', 'reference_frame')
+
     def __init__(self, template, shapes, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  transform=DifferentiableThinPlateSplines,
-                 max_shape_components=None, verbose=False, batch_size=None):
+                 max_shape_components=None, verbose=False, batch_size=None,
+                 n_scale_workers=1):
         super(LinearATM, self).__init__(
                 template, shapes, group=group,
                 holistic_features=holistic_features,
                 reference_shape=reference_shape, diagonal=diagonal,
                 scales=scales, transform=transform,
                 max_shape_components=max_shape_components, verbose=verbose,
-                batch_size=batch_size)
+                batch_size=batch_size, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
@@ -752,11 +833,21 @@ class LinearMaskedATM(ATM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The holistic features that are
+        common to several scales are computed once beforehand and every other
+        intermediate of a scale is released as soon as its models are built.
+        If ``None``, then up to one process per CPU is used. If ``1``, then
+        the scales are built sequentially.
     """
+    # The reference frame is built by the shape model of each scale
+    _scale_attributes = ('n_landmarks', 'reference_frame')
+
     def __init__(self, template, shapes, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), max_shape_components=None,
-                 verbose=False, batch_size=None):
+                 verbose=False, batch_size=None, n_scale_workers=1):
         # Check arguments
         self.patch_shape = checks.check_patch_shape(patch_shape, len(scales))
         # Call superclass
@@ -766,7 +857,7 @@ class LinearMaskedATM(ATM):
                 reference_shape=reference_shape, diagonal=diagonal,
                 scales=scales, transform=DifferentiableThinPlateSplines,
                 max_shape_components=max_shape_components, verbose=verbose,
-                batch_size=batch_size)
+                batch_size=batch_size, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
@@ -901,11 +992,19 @@ class PatchATM(ATM):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_scale_workers : `int` or ``None``, optional
+        The number of worker processes that build the scales concurrently
+        (see :map:`train_scales_in_parallel`). The holistic features that are
+        common to several scales are computed once beforehand and every other
+        intermediate of a scale is released as soon as its models are built.
+        If ``None``, then up to one process per CPU is used. If ``1``, then
+        the scales are built sequentially.
     """
     def __init__(self, template, shapes, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  patch_shape=(17, 17), patch_normalisation=no_op,
-                 max_shape_components=None, verbose=False, batch_size=None):
+                 max_shape_components=None, verbose=False, batch_size=None,
+                 n_scale_workers=1):
         # Check arguments
         self.patch_shape = checks.check_patch_shape(patch_shape, len(scales))
         self.patch_normalisation = patch_normalisation
@@ -916,7 +1015,7 @@ class PatchATM(ATM):
                 reference_shape=reference_shape, diagonal=diagonal,
                 scales=scales, transform=DifferentiableThinPlateSplines,
                 max_shape_components=max_shape_components, verbose=verbose,
-                batch_size=batch_size)
+                batch_size=batch_size, n_scale_workers=n_scale_workers)
 
     @property
     def _str_title(self):
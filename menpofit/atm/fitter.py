@@ -1,3 +1,5 @@
+import numpy as np
+
 from menpofit import checks
 from menpofit.fitter import MultiScaleParametricFitter
 
@@ -38,9 +40,15 @@ class LucasKanadeATMFitter(MultiScaleParametricFitter):
         sub-sampling step of the sampling mask. If `ndarray`, then it
         explicitly defines the sampling mask. If ``None``, then no
         sub-sampling is applied.
+    dtype : `numpy.dtype`, optional
+        The dtype of the precomputed arrays and of the per-iteration
+        computations of the algorithms (warped images, gradients and
+        Jacobians). ``np.float32`` roughly halves the memory and the memory
+        bandwidth of the fitting. The small linear systems in the parameter
+        space are always solved in double precision.
     """
     def __init__(self, atm, lk_algorithm_cls=InverseCompositional,
-                 n_shape=None, sampling=None):
+                 n_shape=None, sampling=None, dtype=np.float64):
         # Store model
         self._model = atm
 
@@ -50,7 +58,8 @@ class LucasKanadeATMFitter(MultiScaleParametricFitter):
 
         # Get list of algorithm objects per scale
         interfaces = atm.build_fitter_interfaces(self._sampling)
-        algorithms = [lk_algorithm_cls(interface) for interface in interfaces]
+        algorithms = [lk_algorithm_cls(interface, dtype=dtype)
+                      for interface in interfaces]
 
         # Call superclass
         super(LucasKanadeATMFitter, self).__init__(
@@ -1,10 +1,18 @@
 from __future__ import division
 import itertools
+import multiprocessing
 import os
 import numpy as np
 
+from menpofit.dataset import ImageDataset
+
 
 def batch(iterable, n):
+    if isinstance(iterable, ImageDataset):
+        # Lazy datasets of n images, that are imported when the batch is used
+        for start in range(0, len(iterable), n):
+            yield iterable[start:start + n]
+        return
     it = iter(iterable)
     while True:
         chunk = tuple(itertools.islice(it, n))
@@ -13,6 +21,27 @@ def batch(iterable, n):
         yield chunk
 
 
+def as_sequence(images):
+    r"""
+    Returns the images as a sequence that can be traversed multiple times. An
+    :map:`ImageDataset` is returned as is, so that its images are only imported
+    when they are used, while any other iterable is converted to a `list`.
+
+    Parameters
+    ----------
+    images : `iterable` of `menpo.image.Image` or :map:`ImageDataset`
+        The images.
+
+    Returns
+    -------
+    images : `list` of `menpo.image.Image` or :map:`ImageDataset`
+        The images as a sequence.
+    """
+    if isinstance(images, ImageDataset):
+        return images
+    return list(images)
+
+
 def build_grid(shape):
     r"""
     """
@@ -25,6 +54,53 @@ def build_grid(shape):
     return np.rollaxis(sampling_grid, 0, 3)
 
 
+def can_fork():
+    r"""
+    Returns whether worker processes can be started with ``fork``, in which
+    case they inherit the state of the current process instead of receiving a
+    pickled copy of it.
+
+    Returns
+    -------
+    can_fork : `bool`
+        If ``True``, then :map:`process_pool` can fork the workers.
+    """
+    if not hasattr(multiprocessing, 'get_all_start_methods'):
+        # Python 2 forks on every platform but Windows
+        return os.name != 'nt'
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def process_pool(n_workers, fork=True, **kwargs):
+    r"""
+    Creates a pool of worker processes, which are started with ``fork`` if
+    `fork` is ``True`` and with ``spawn`` otherwise. On Python 2 the start
+    method cannot be chosen, hence the platform default is used, which is
+    ``fork`` wherever :map:`can_fork` is ``True``.
+
+    Parameters
+    ----------
+    n_workers : `int`
+        The number of worker processes.
+    fork : `bool`, optional
+        If ``True``, then the workers are forked. It must only be ``True`` if
+        :map:`can_fork`.
+    kwargs : `dict`, optional
+        The other arguments of `multiprocessing.Pool`, e.g. `initializer`,
+        `initargs` and `maxtasksperchild`.
+
+    Returns
+    -------
+    pool : `multiprocessing.pool.Pool`
+        The pool of worker processes.
+    """
+    if not hasattr(multiprocessing, 'get_context'):
+        # Python 2
+        return multiprocessing.Pool(n_workers, **kwargs)
+    context = multiprocessing.get_context('fork' if fork else 'spawn')
+    return context.Pool(n_workers, **kwargs)
+
+
 class MenpoFitCostsWarning(Warning):
     r"""
     A warning that the costs cannot be computed for the selected fitting
@@ -1,5 +1,9 @@
 from __future__ import division
 from functools import partial
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import os
+import tempfile
 import warnings
 import numpy as np
 
@@ -7,11 +11,196 @@ from menpo.shape import mean_pointcloud, PointCloud, TriMesh
 from menpo.image import Image, MaskedImage
 from menpo.feature import no_op
 from menpo.transform import Scale, Translation, GeneralizedProcrustesAnalysis
+from menpo.model import PCAModel
 from menpo.visualize import print_dynamic
 
+from menpofit.math.pca import (blocked_pca, randomized_pca,
+                               residual_eigenvalues, use_randomized_pca)
+from menpofit.base import can_fork, process_pool
+from menpofit.dataset import ImageDataset
 from menpofit.visualize import print_progress
 
 
+def parallel_map(function, items, n_workers=1, wrap=None):
+    r"""
+    Applies a function to each item of a list, either sequentially or in
+    parallel. The results are returned in the order of the items and the
+    progress is reported in the same order, regardless of the order in which
+    the workers finish.
+
+    Parameters
+    ----------
+    function : `callable`
+        The function, called as ``function(item)``. If a process pool is used,
+        then it must be picklable, e.g. a module-level function or a
+        `functools.partial` of one.
+    items : `list`
+        The items.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        If `int`, then it is the number of threads that process the items; the
+        interpolation, filtering and feature extraction of menpo spend most of
+        their time in NumPy/SciPy code that releases the GIL. If ``None``, then
+        the number of CPUs is used. Otherwise, it is an existing pool of
+        workers (e.g. a process pool, or a `concurrent.futures.Executor`),
+        whose ``imap`` (or ``map``) method is used and which is not closed.
+    wrap : `callable` or ``None``, optional
+        The progress reporting function that wraps the iterable of the
+        results, e.g. a `functools.partial` of
+        `menpofit.visualize.print_progress`.
+
+    Returns
+    -------
+    results : `list`
+        The result for each item.
+    """
+    n_items = len(items)
+    if wrap is None:
+        wrap = partial(print_progress, verbose=False)
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    if hasattr(n_workers, 'imap') or hasattr(n_workers, 'map'):
+        pool_map = getattr(n_workers, 'imap', None) or n_workers.map
+        return list(wrap(pool_map(function, items), n_items=n_items))
+    if n_workers <= 1 or n_items <= 1:
+        return [function(i) for i in wrap(items)]
+    pool = ThreadPool(min(n_workers, n_items))
+    try:
+        return list(wrap(pool.imap(function, items), n_items=n_items))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def shared_holistic_features(images, holistic_features, prefix='',
+                             verbose=False, n_workers=1):
+    r"""
+    Computes once the holistic features that are shared by more than one
+    scale of a multi-scale model, so that the scales can then be built
+    independently (see :map:`train_scales_in_parallel`).
+
+    Parameters
+    ----------
+    images : `list` of `menpo.image.Image`
+        The set of images.
+    holistic_features : `list` of `callable`
+        The features extraction function of each scale.
+    prefix : `str`, optional
+        The prefix of the printed information.
+    verbose : `bool`, optional
+        Flag that controls information and progress printing.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the feature extraction (see :map:`parallel_map`).
+
+    Returns
+    -------
+    scale_features : `list` of (`list` of `menpo.image.Image` or ``None``)
+        The feature images of each scale. It is ``None`` for the scales whose
+        features are not shared, which have to compute them.
+    """
+    scale_features = []
+    computed = []
+    for features in holistic_features:
+        if features == no_op:
+            scale_features.append(images)
+        elif sum(f is features for f in holistic_features) > 1:
+            for f, feature_images in computed:
+                if f is features:
+                    break
+            else:
+                feature_images = compute_features(
+                    images, features, prefix=prefix, verbose=verbose,
+                    n_workers=n_workers)
+                computed.append((features, feature_images))
+            scale_features.append(feature_images)
+        else:
+            scale_features.append(None)
+    return scale_features
+
+
+# The function and the feature images of the scales that are built by a
+# worker process spawned by train_scales_in_parallel
+_worker_task = None
+
+
+def _initialise_scale_worker(task):
+    global _worker_task
+    if task is not None:
+        _worker_task = task
+
+
+def _train_scale_in_worker(scale_index):
+    train_scale, scale_features = _worker_task
+    return train_scale(scale_index, scale_features[scale_index])
+
+
+def train_scales_in_parallel(train_scale, scale_features, n_workers=None,
+                             wrap=None):
+    r"""
+    Builds the independent scales of a multi-scale model concurrently, in a
+    pool of worker processes. Each worker builds a single scale and then
+    exits, hence the intermediates of a scale (features, rescaled and warped
+    images) are released as soon as its models are built. The results are
+    returned in the order of the scales.
+
+    Where available, the workers are forked so that they inherit the training
+    images and the shared feature images instead of receiving a pickled copy.
+    Otherwise, `train_scale` and `scale_features` must be picklable.
+
+    Parameters
+    ----------
+    train_scale : `callable`
+        The function that builds a scale, called as
+        ``train_scale(scale_index, feature_images)``, where `feature_images`
+        is the entry of `scale_features` for the scale. It returns the models
+        of the scale, which must be picklable.
+    scale_features : `list`
+        The feature images of each scale, or ``None`` for the scales that
+        compute their own features (see :map:`shared_holistic_features`).
+    n_workers : `int` or ``None``, optional
+        The maximum number of worker processes. If ``None``, then the number
+        of CPUs is used. If ``1``, then the scales are built sequentially in
+        the current process.
+    wrap : `callable` or ``None``, optional
+        The progress reporting function that wraps the iterable of the
+        results, e.g. a `functools.partial` of
+        `menpofit.visualize.print_progress`.
+
+    Returns
+    -------
+    results : `list`
+        The result of `train_scale` for each scale.
+    """
+    global _worker_task
+    n_scales = len(scale_features)
+    if wrap is None:
+        wrap = partial(print_progress, verbose=False)
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    n_workers = min(n_workers, n_scales)
+    if n_workers <= 1:
+        return [train_scale(j, scale_features[j])
+                for j in wrap(range(n_scales))]
+
+    fork = can_fork()
+    if fork:
+        # The workers inherit the task
+        _worker_task = (train_scale, scale_features)
+        task = None
+    else:
+        # The workers receive a pickled copy of the task at start up
+        task = (train_scale, scale_features)
+    pool = process_pool(n_workers, fork=fork,
+                        initializer=_initialise_scale_worker,
+                        initargs=(task,), maxtasksperchild=1)
+    try:
+        return list(wrap(pool.imap(_train_scale_in_worker, range(n_scales)),
+                         n_items=n_scales))
+    finally:
+        pool.terminate()
+        pool.join()
+        _worker_task = None
+
+
 class MenpoFitModelBuilderWarning(Warning):
     r"""
     A warning that the parameters chosen to build a given model may cause
@@ -20,6 +209,30 @@ class MenpoFitModelBuilderWarning(Warning):
     pass
 
 
+def extract_shapes(images, group=None):
+    r"""
+    Function that returns the shapes of a set of images. If the images are an
+    :map:`ImageDataset`, then the shapes are read from the landmark files
+    without importing the images.
+
+    Parameters
+    ----------
+    images : `list` of `menpo.image.Image` or :map:`ImageDataset`
+        The images.
+    group : `str` or ``None``, optional
+        If `str`, then it specifies the group of the images's shapes. If
+        ``None``, then the images must have only one landmark group.
+
+    Returns
+    -------
+    shapes : `list` of `menpo.shape.PointCloud`
+        The shapes of the images.
+    """
+    if isinstance(images, ImageDataset):
+        return images.shapes(group=group)
+    return [i.landmarks[group].lms for i in images]
+
+
 def compute_reference_shape(shapes, diagonal, verbose=False):
     r"""
     Function that computes the reference shape as the mean shape of the provided
@@ -56,8 +269,12 @@ def compute_reference_shape(shapes, diagonal, verbose=False):
     return reference_shape
 
 
+def _rescale_image_to_reference_shape(image, group, reference_shape):
+    return image.rescale_to_pointcloud(reference_shape, group=group)
+
+
 def rescale_images_to_reference_shape(images, group, reference_shape,
-                                      verbose=False):
+                                      verbose=False, n_workers=1):
     r"""
     Function that normalizes the images' sizes with respect to the size of the
     provided reference shape. In other words, the function rescales the provided
@@ -66,8 +283,10 @@ def rescale_images_to_reference_shape(images, group, reference_shape,
 
     Parameters
     ----------
-    images : `list` of `menpo.image.Image`
-        The set of images that will be rescaled.
+    images : `list` of `menpo.image.Image` or :map:`ImageDataset`
+        The set of images that will be rescaled. The images of an
+        :map:`ImageDataset` are imported (or loaded from its cache) already
+        rescaled, so the original images are never held in memory.
     group : `str` or ``None``
         If `str`, then it specifies the group of the images's shapes. If
         ``None``, then the images must have only one landmark group.
@@ -75,6 +294,9 @@ def rescale_images_to_reference_shape(images, group, reference_shape,
         The reference shape.
     verbose : `bool`, optional
         If ``True``, then progress information is printed.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism (see :map:`parallel_map`). If ``1``, then the images
+        are processed sequentially.
 
     Returns
     -------
@@ -84,10 +306,20 @@ def rescale_images_to_reference_shape(images, group, reference_shape,
     wrap = partial(print_progress, prefix='- Normalizing images size',
                    end_with_newline=False, verbose=verbose)
 
+    if isinstance(images, ImageDataset):
+        dataset = images.rescaled_to_reference_shape(reference_shape,
+                                                     group=group)
+        if n_workers == 1:
+            # Iterate the dataset so that it prefetches the images
+            return list(wrap(dataset))
+        return parallel_map(dataset.__getitem__, range(len(dataset)),
+                            n_workers=n_workers, wrap=wrap)
+
     # Normalize the scaling of all images wrt the reference_shape size
-    normalized_images = [i.rescale_to_pointcloud(reference_shape, group=group)
-                         for i in wrap(images)]
-    return normalized_images
+    rescale = partial(_rescale_image_to_reference_shape, group=group,
+                      reference_shape=reference_shape)
+    return parallel_map(rescale, list(images), n_workers=n_workers,
+                        wrap=wrap)
 
 
 def normalization_wrt_reference_shape(images, group, diagonal, verbose=False):
@@ -125,7 +357,7 @@ def normalization_wrt_reference_shape(images, group, diagonal, verbose=False):
         The images with normalized size.
     """
     # get shapes
-    shapes = [i.landmarks[group].lms for i in images]
+    shapes = extract_shapes(images, group)
 
     # compute the reference shape and fix its diagonal length
     reference_shape = compute_reference_shape(shapes, diagonal, verbose=verbose)
@@ -136,7 +368,8 @@ def normalization_wrt_reference_shape(images, group, diagonal, verbose=False):
     return reference_shape, normalized_images
 
 
-def compute_features(images, features, prefix='', verbose=False):
+def compute_features(images, features, prefix='', verbose=False,
+                     n_workers=1):
     r"""
     Function that extracts features from a list of images.
 
@@ -151,6 +384,9 @@ def compute_features(images, features, prefix='', verbose=False):
         The prefix of the printed information.
     verbose : `bool`, Optional
         Flag that controls information and progress printing.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism (see :map:`parallel_map`). If ``1``, then the images
+        are processed sequentially.
 
     Returns
     -------
@@ -161,11 +397,15 @@ def compute_features(images, features, prefix='', verbose=False):
                    prefix='{}Computing feature space'.format(prefix),
                    end_with_newline=not prefix, verbose=verbose)
 
-    return [features(i) for i in wrap(images)]
+    return parallel_map(features, images, n_workers=n_workers, wrap=wrap)
+
+
+def _rescale_image(image, scale, return_transform):
+    return image.rescale(scale, return_transform=return_transform)
 
 
 def scale_images(images, scale, prefix='', return_transforms=False,
-                 verbose=False):
+                 verbose=False, n_workers=1):
     r"""
     Function that rescales a list of images and optionally returns the scale
     transforms.
@@ -185,6 +425,9 @@ def scale_images(images, scale, prefix='', return_transforms=False,
         were used to perform the rescale for each image  is also returned.
     verbose : `bool`, optional
         Flag that controls information and progress printing.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism (see :map:`parallel_map`). If ``1``, then the images
+        are processed sequentially.
 
     Returns
     -------
@@ -198,23 +441,15 @@ def scale_images(images, scale, prefix='', return_transforms=False,
                    prefix='{}Scaling images'.format(prefix),
                    end_with_newline=not prefix, verbose=verbose)
     if not np.allclose(scale, 1):
-        # initialise scaled images and transforms lists
-        scaled_images = []
-        scale_transforms = []
-        # for each image
-        for i in wrap(images):
-            if return_transforms:
-                # store scaled image and transform, if asked
-                sc_image, tr = i.rescale(scale, return_transform=True)
-                scaled_images.append(sc_image)
-                scale_transforms.append(tr)
-            else:
-                # store only scaled image
-                scaled_images.append(i.rescale(scale))
+        rescale = partial(_rescale_image, scale=scale,
+                          return_transform=return_transforms)
+        scaled = parallel_map(rescale, images, n_workers=n_workers,
+                              wrap=wrap)
         if return_transforms:
-            return scaled_images, scale_transforms
+            # split the scaled images from the transforms
+            return [i for i, _ in scaled], [t for _, t in scaled]
         else:
-            return scaled_images
+            return scaled
     else:
         if return_transforms:
             scale_transforms = [Scale(1., images[0].n_dims)] * len(images)
@@ -223,8 +458,23 @@ def scale_images(images, scale, prefix='', return_transforms=False,
             return images
 
 
+def _warp_image(image_shape, reference_frame, warp_transform, copy_transform):
+    image, shape = image_shape
+    if copy_transform:
+        # The transform is shared by the workers
+        warp_transform = warp_transform.copy()
+    # Update Transform Target
+    warp_transform.set_target(shape)
+    # warp images
+    warped_image = image.warp_to_mask(reference_frame.mask, warp_transform,
+                                      warp_landmarks=False)
+    # attach reference frame landmarks to images
+    warped_image.landmarks['source'] = reference_frame.landmarks['source']
+    return warped_image
+
+
 def warp_images(images, shapes, reference_frame, transform, prefix='',
-                verbose=None):
+                verbose=None, n_workers=1):
     r"""
     Function that warps a list of images into the provided reference frame.
 
@@ -244,6 +494,9 @@ def warp_images(images, shapes, reference_frame, transform, prefix='',
         The prefix of the printed information.
     verbose : `bool`, Optional
         Flag that controls information and progress printing.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism (see :map:`parallel_map`). If ``1``, then the images
+        are processed sequentially.
 
     Returns
     -------
@@ -254,24 +507,26 @@ def warp_images(images, shapes, reference_frame, transform, prefix='',
                    prefix='{}Warping images'.format(prefix),
                    end_with_newline=not prefix, verbose=verbose)
 
-    warped_images = []
     # Build a dummy transform, use set_target for efficiency
     warp_transform = transform(reference_frame.landmarks['source'].lms,
                                reference_frame.landmarks['source'].lms)
-    for i, s in wrap(list(zip(images, shapes))):
-        # Update Transform Target
-        warp_transform.set_target(s)
-        # warp images
-        warped_i = i.warp_to_mask(reference_frame.mask, warp_transform,
-                                  warp_landmarks=False)
-        # attach reference frame landmarks to images
-        warped_i.landmarks['source'] = reference_frame.landmarks['source']
-        warped_images.append(warped_i)
-    return warped_images
+    warp = partial(_warp_image, reference_frame=reference_frame,
+                   warp_transform=warp_transform,
+                   copy_transform=n_workers != 1)
+    return parallel_map(warp, list(zip(images, shapes)), n_workers=n_workers,
+                        wrap=wrap)
+
+
+def _extract_image_patches(image_shape, patch_shape, normalise_function):
+    image, shape = image_shape
+    parts = image.extract_patches(shape, patch_shape=patch_shape,
+                                  as_single_array=True)
+    parts = normalise_function(parts)
+    return Image(parts, copy=False)
 
 
 def extract_patches(images, shapes, patch_shape, normalise_function=no_op,
-                    prefix='', verbose=False):
+                    prefix='', verbose=False, n_workers=1):
     r"""
     Function that extracts patches around the landmarks of the provided images.
 
@@ -289,6 +544,9 @@ def extract_patches(images, shapes, patch_shape, normalise_function=no_op,
         The prefix of the printed information.
     verbose : `bool`, Optional
         Flag that controls information and progress printing.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism (see :map:`parallel_map`). If ``1``, then the images
+        are processed sequentially.
 
     Returns
     -------
@@ -300,13 +558,218 @@ def extract_patches(images, shapes, patch_shape, normalise_function=no_op,
                    prefix='{}Extracting patches'.format(prefix),
                    end_with_newline=not prefix, verbose=verbose)
 
-    parts_images = []
-    for i, s in wrap(list(zip(images, shapes))):
-        parts = i.extract_patches(s, patch_shape=patch_shape,
-                                  as_single_array=True)
-        parts = normalise_function(parts)
-        parts_images.append(Image(parts, copy=False))
-    return parts_images
+    extract = partial(_extract_image_patches, patch_shape=patch_shape,
+                      normalise_function=normalise_function)
+    return parallel_map(extract, list(zip(images, shapes)),
+                        n_workers=n_workers, wrap=wrap)
+
+
+def _pca_model(components, eigenvalues, trimmed_eigenvalues, mean, n_samples):
+    # Creates a PCA model given its components, with the template of mean
+    pca_model = PCAModel.init_from_components(components, eigenvalues, mean,
+                                              n_samples, True)
+    # Keep the variance of the discarded components, as trim_components
+    # does, so that the noise variance of the model is correct
+    pca_model._trimmed_eigenvalues = trimmed_eigenvalues
+    return pca_model
+
+
+def _print_captured_variance(eigenvalues, total_variance, prefix, verbose):
+    if verbose:
+        print_dynamic('{}Randomized PCA: {} components capture {:.2%} of the '
+                      'variance\n'.format(prefix, eigenvalues.shape[0],
+                                          np.sum(eigenvalues) /
+                                          total_variance))
+
+
+def _randomized(solver, max_n_components, n_samples, n_features,
+                n_oversamples):
+    # Whether the randomized decomposition is used given the solver option
+    if solver == 'exact':
+        return False
+    elif solver == 'randomized':
+        if (max_n_components is None or
+                isinstance(max_n_components, float)):
+            raise ValueError('The randomized decomposition requires an exact '
+                             'number of components')
+        return True
+    elif solver == 'auto':
+        return use_randomized_pca(max_n_components, n_samples, n_features,
+                                  n_oversamples=n_oversamples)
+    raise ValueError("solver must be 'auto', 'exact' or 'randomized'")
+
+
+def build_pca_model(samples, max_n_components=None, solver='auto',
+                    n_oversamples=10, n_power_iterations=2, prefix='',
+                    verbose=False):
+    r"""
+    Function that builds a PCA model, e.g. the appearance model of an AAM.
+    If the requested number of components is much smaller than the data,
+    then a randomized truncated decomposition (see :map:`randomized_pca`) is
+    performed instead of the full eigendecomposition, which is then trimmed.
+
+    Parameters
+    ----------
+    samples : `list` of `menpo.base.Vectorizable`
+        The samples, e.g. warped images.
+    max_n_components : `int` or `float` or ``None``, optional
+        The number of components to keep. If `int`, then it sets the exact
+        number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
+    solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition. If ``'auto'``, then the randomized decomposition is
+        used if `max_n_components` is an `int` much smaller than the rank of
+        the data (see :map:`use_randomized_pca`). ``'randomized'`` requires
+        `max_n_components` to be an `int`.
+    n_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    n_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    prefix : `str`
+        The prefix of the printed information.
+    verbose : `bool`, Optional
+        Flag that controls information printing. If ``True``, then the
+        percentage of variance captured by the randomized decomposition is
+        reported.
+
+    Returns
+    -------
+    pca_model : `menpo.model.PCAModel`
+        The PCA model.
+    """
+    samples = list(samples)
+    n_samples, n_features = len(samples), samples[0].as_vector().shape[0]
+    if _randomized(solver, max_n_components, n_samples, n_features,
+                   n_oversamples):
+        X = np.array([s.as_vector() for s in samples])
+        components, eigenvalues, mean, total_variance = randomized_pca(
+            X, max_n_components, n_oversamples=n_oversamples,
+            n_power_iterations=n_power_iterations)
+        del X
+        _print_captured_variance(eigenvalues, total_variance, prefix, verbose)
+        return _pca_model(
+            components, eigenvalues,
+            residual_eigenvalues(eigenvalues, total_variance, n_samples,
+                                 n_features),
+            samples[0].from_vector(mean), n_samples)
+
+    pca_model = PCAModel(samples)
+    # trim model if required
+    if max_n_components is not None:
+        pca_model.trim_components(max_n_components)
+    return pca_model
+
+
+def build_appearance_model_out_of_core(images, shapes, warp_function,
+                                       block_size, max_n_components=None,
+                                       dtype=np.float64, solver='auto',
+                                       n_oversamples=10, n_power_iterations=2,
+                                       prefix='', verbose=False):
+    r"""
+    Function that builds a PCA appearance model without holding all the warped
+    images in memory. The images are warped in blocks of `block_size` and the
+    vectorized warped images are written to a memory-mapped temporary file,
+    from which the principal components are computed in blocks (see
+    :map:`blocked_pca`). Hence, the peak memory is bounded by a block of
+    warped images plus the ``(n, n)`` Gram (or ``(d, d)`` covariance) matrix
+    and the kept components, instead of the ``(n, d)`` data matrix. The
+    temporary file is created in the default temporary directory (see
+    `tempfile.gettempdir`) and deleted afterwards.
+
+    Parameters
+    ----------
+    images : `list` of `menpo.image.Image`
+        The set of images to warp.
+    shapes : `list` of `menpo.shape.PointCloud`
+        The set of shapes that correspond to the images.
+    warp_function : `callable`
+        Function that warps a `list` of images given their shapes, i.e.
+        ``warp_function(images, shapes)``, and returns the `list` of warped
+        images.
+    block_size : `int`
+        The number of images that are warped and held in memory at once.
+    max_n_components : `int` or `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
+    dtype : `numpy.dtype`, optional
+        The dtype of the memory-mapped warped images. ``np.float32`` halves
+        the required disk space and I/O.
+    solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition (see :map:`build_pca_model`). The randomized one
+        also avoids the ``(n, n)`` Gram matrix.
+    n_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    n_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    prefix : `str`
+        The prefix of the printed information.
+    verbose : `bool`, Optional
+        Flag that controls information and progress printing.
+
+    Returns
+    -------
+    appearance_model : `menpo.model.PCAModel`
+        The appearance model.
+    """
+    n_samples = len(images)
+    wrap = partial(print_progress,
+                   prefix='{}Warping images to disk'.format(prefix),
+                   end_with_newline=not prefix, verbose=verbose)
+
+    fd, path = tempfile.mkstemp(prefix='menpofit-appearance-', suffix='.dat')
+    os.close(fd)
+    store = None
+    try:
+        template = None
+        mean = None
+        for start in wrap(range(0, n_samples, block_size)):
+            stop = min(start + block_size, n_samples)
+            warped_images = warp_function(images[start:stop],
+                                          shapes[start:stop])
+            block = np.array([i.as_vector() for i in warped_images],
+                             dtype=dtype)
+            if store is None:
+                # The first warped image is the template of the model
+                template = warped_images[0]
+                store = np.memmap(path, dtype=dtype, mode='w+',
+                                  shape=(n_samples, block.shape[1]))
+                mean = np.zeros(block.shape[1])
+            store[start:stop] = block
+            # accumulate the mean while writing, to save a pass over the data
+            mean += np.sum(block, axis=0, dtype=np.float64)
+            del warped_images, block
+        store.flush()
+        mean /= n_samples
+
+        if verbose:
+            print_dynamic('{}Computing principal components'.format(prefix))
+        n_features = store.shape[1]
+        if _randomized(solver, max_n_components, n_samples, n_features,
+                       n_oversamples):
+            components, eigenvalues, mean, total_variance = randomized_pca(
+                store, max_n_components, mean=mean,
+                n_oversamples=n_oversamples,
+                n_power_iterations=n_power_iterations, block_size=block_size)
+            _print_captured_variance(eigenvalues, total_variance, prefix,
+                                     verbose)
+            trimmed_eigenvalues = residual_eigenvalues(
+                eigenvalues, total_variance, n_samples, n_features)
+        else:
+            components, eigenvalues, mean = blocked_pca(
+                store, mean=mean, max_n_components=max_n_components,
+                block_size=block_size)
+            n_components = components.shape[0]
+            eigenvalues, trimmed_eigenvalues = (eigenvalues[:n_components],
+                                                eigenvalues[n_components:])
+    finally:
+        del store
+        os.remove(path)
+
+    return _pca_model(components, eigenvalues, trimmed_eigenvalues,
+                      template.from_vector(mean), n_samples)
 
 
 def build_reference_frame(landmarks, boundary=3, group='source'):
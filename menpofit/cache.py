@@ -0,0 +1,112 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+# Bump every time the layout or the semantics of the cached arrays change, so
+# that stale caches are ignored rather than loaded.
+PRECOMPUTE_CACHE_VERSION = 1
+
+
+def fingerprint(*objects):
+    r"""
+    Computes a hash of the provided objects that can be used as the key of a
+    :map:`PrecomputeCache`. `ndarray` objects are hashed by their dtype,
+    shape and data, classes by their qualified name and any other object by
+    its pickled representation.
+
+    Parameters
+    ----------
+    objects : `object`
+        The objects to be hashed.
+
+    Returns
+    -------
+    key : `str`
+        The hexadecimal hash of the objects.
+    """
+    h = hashlib.sha1()
+    for o in objects:
+        if isinstance(o, np.ndarray):
+            h.update('{}{}'.format(o.dtype.str, o.shape).encode('utf-8'))
+            h.update(np.ascontiguousarray(o).tobytes())
+        elif isinstance(o, type):
+            h.update('{}.{}'.format(o.__module__, o.__name__).encode('utf-8'))
+        else:
+            h.update(pickle.dumps(o, protocol=2))
+    return h.hexdigest()
+
+
+class PrecomputeCache(object):
+    r"""
+    On-disk cache of precomputed arrays. The arrays of an entry are stored as
+    separate ``.npy`` files within ``cache_dir/v<version>/<key>`` and they are
+    loaded memory-mapped (read-only), so that processes that load the same
+    entry share their pages.
+
+    Parameters
+    ----------
+    cache_dir : `str`
+        The root directory of the cache.
+    key : `str`
+        The key of the cache entry, e.g. the :map:`fingerprint` of everything
+        the arrays depend on.
+    """
+    def __init__(self, cache_dir, key):
+        self.path = os.path.join(cache_dir,
+                                 'v{}'.format(PRECOMPUTE_CACHE_VERSION), key)
+        self._computed = {}
+
+    def _filepath(self, name):
+        return os.path.join(self.path, '{}.npy'.format(name))
+
+    def load(self, names, compute):
+        r"""
+        Loads the arrays with the provided names from the cache. If any of them
+        is missing, then they are all computed and get written to the cache on
+        :meth:`flush`.
+
+        Parameters
+        ----------
+        names : `tuple` of `str`
+            The names of the arrays.
+        compute : `callable`
+            Function that computes the arrays. It must return a `tuple` with
+            an `ndarray` per name.
+
+        Returns
+        -------
+        arrays : `tuple` of `ndarray`
+            The loaded or computed arrays.
+        """
+        try:
+            return tuple(np.load(self._filepath(n), mmap_mode='r')
+                         for n in names)
+        except (IOError, OSError, ValueError):
+            arrays = compute()
+            self._computed.update(zip(names, arrays))
+            return arrays
+
+    def flush(self):
+        r"""
+        Writes the computed arrays to the cache. Every array is first written
+        to a temporary file which is then atomically renamed, hence
+        concurrent processes never load partially written arrays.
+        """
+        if not self._computed:
+            return
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                # created concurrently by another process
+                if not os.path.isdir(self.path):
+                    raise
+        for name, array in self._computed.items():
+            filepath = self._filepath(name)
+            tmp_filepath = '{}.{}.tmp'.format(filepath, os.getpid())
+            with open(tmp_filepath, 'wb') as f:
+                np.save(f, np.asarray(array))
+            os.rename(tmp_filepath, filepath)
+        self._computed = {}
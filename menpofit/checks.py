@@ -318,6 +318,32 @@ def check_max_iters(max_iters, n_scales):
     return np.require(max_iters, dtype=np.int)
 
 
+def check_result_mode(result_mode):
+    r"""
+    Function that checks the value of a `result_mode` parameter of the fitting
+    methods.
+
+    Parameters
+    ----------
+    result_mode : ``{'full', 'trajectory', 'final'}``
+        The value to check.
+
+    Returns
+    -------
+    result_mode : `str`
+        The checked value.
+
+    Raises
+    ------
+    ValueError
+        result_mode must be 'full', 'trajectory' or 'final'
+    """
+    if result_mode not in ('full', 'trajectory', 'final'):
+        raise ValueError("result_mode must be 'full', 'trajectory' or "
+                         "'final'")
+    return result_mode
+
+
 def check_sampling(sampling, n_scales):
     r"""
     Function that checks the value of a `sampling` parameter defined for
@@ -3,6 +3,7 @@ import numpy as np
 
 from menpofit.base import build_grid
 from menpofit.fitter import raise_costs_warning
+from menpofit.profiling import stage, set_iteration
 from menpofit.result import ParametricIterativeResult
 
 multivariate_normal = None  # expensive, from scipy.stats
@@ -152,6 +153,7 @@ class ActiveShapeModel(GradientDescentCLMAlgorithm):
 
         # Expectation-Maximisation loop
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
 
             target = self.transform.target
             # Obtain all landmark positions l_i = (x_i, y_i) being considered
@@ -160,7 +162,9 @@ class ActiveShapeModel(GradientDescentCLMAlgorithm):
                                    self.search_grid)
 
             # Compute responses
-            responses = self.expert_ensemble.predict_probability(image, target)
+            with stage('responses'):
+                responses = self.expert_ensemble.predict_probability(image,
+                                                                     target)
             # Approximate responses using isotropic Gaussian
             max_indices = np.argmax(
                 responses.reshape(responses.shape[:2] + (-1,)), axis=-1)
@@ -295,6 +299,7 @@ class RegularisedLandmarkMeanShift(GradientDescentCLMAlgorithm):
 
         # Expectation-Maximisation loop
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
 
             target = self.transform.target
             # Obtain all landmark positions l_i = (x_i, y_i) being considered
@@ -303,8 +308,9 @@ class RegularisedLandmarkMeanShift(GradientDescentCLMAlgorithm):
                                    self.search_grid)
 
             # Compute patch responses
-            patch_responses = self.expert_ensemble.predict_probability(image,
-                                                                       target)
+            with stage('responses'):
+                patch_responses = self.expert_ensemble.predict_probability(
+                    image, target)
 
             # Smooth responses using the Gaussian-KDE grid
             patch_kernels = patch_responses * self.kernel_grid
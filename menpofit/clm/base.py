@@ -7,10 +7,11 @@ from menpo.feature import no_op
 from menpo.visualize import print_dynamic
 
 from menpofit import checks
-from menpofit.base import batch
+from menpofit.base import batch, as_sequence
 from menpofit.builder import (compute_features, scale_images,
                               MenpoFitBuilderWarning, compute_reference_shape,
-                              rescale_images_to_reference_shape)
+                              rescale_images_to_reference_shape,
+                              extract_shapes)
 from menpofit.modelinstance import OrthoPDM
 
 from .expert import CorrelationFilterExpertEnsemble
@@ -73,7 +74,10 @@ class CLM(object):
         choice is :map:`OrthoPDM`.
     expert_ensemble_cls : `subclass` of :map:`ExpertEnsemble`, optional
         The class to be used for training the ensemble of experts. The most
-        common choice is :map:`CorrelationFilterExpertEnsemble`.
+        common choice is :map:`CorrelationFilterExpertEnsemble`. Any
+        additional arguments of the ensemble, e.g. the ``n_workers`` and
+        ``memmap_dir`` of :map:`CorrelationFilterExpertEnsemble`, can be set
+        by passing a `functools.partial` of the class.
     max_shape_components : `int`, `float`, `list` of those or ``None``, optional
         The number of shape components to keep. If `int`, then it sets the exact
         number of components. If `float`, then it defines the variance
@@ -88,6 +92,14 @@ class CLM(object):
         incremental fashion on image batches of size equal to the provided
         value. If ``None``, then the training is performed directly on the
         all the images.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling and feature extraction of the
+        training images (see :map:`parallel_map`). If `int`, then it is the
+        number of threads. If ``None``, then the number of CPUs is used. It
+        can also be an existing pool of workers, e.g. a process pool, in which
+        case the images and the features must be picklable. It is not
+        forwarded to the expert ensemble, whose own parallelism is set
+        through `expert_ensemble_cls`.
 
     References
     ----------
@@ -101,13 +113,17 @@ class CLM(object):
         Shape Models - their training and application", Computer Vision and Image
         Understanding (CVIU), 61(1): 38-59, 1995.
     """
+    # Models that were pickled before n_workers existed build sequentially
+    n_workers = 1
+
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1),
                  patch_shape=(17, 17), patch_normalisation=no_op,
                  context_shape=(34, 34), cosine_mask=True, sample_offsets=None,
                  shape_model_cls=OrthoPDM,
                  expert_ensemble_cls=CorrelationFilterExpertEnsemble,
-                 max_shape_components=None, verbose=False, batch_size=None):
+                 max_shape_components=None, verbose=False, batch_size=None,
+                 n_workers=1):
         self.scales = checks.check_scales(scales)
         n_scales = len(scales)
         self.diagonal = checks.check_diagonal(diagonal)
@@ -125,6 +141,7 @@ class CLM(object):
         self.context_shape = checks.check_patch_shape(context_shape, n_scales)
         self.cosine_mask = cosine_mask
         self.sample_offsets = sample_offsets
+        self.n_workers = n_workers
         self.shape_models = []
         self.expert_ensembles = []
 
@@ -154,7 +171,7 @@ class CLM(object):
             # on an infinite list.
             image_batches = batch(images, batch_size)
         else:
-            image_batches = [list(images)]
+            image_batches = [as_sequence(images)]
 
         for k, image_batch in enumerate(image_batches):
             if k == 0:
@@ -169,7 +186,7 @@ class CLM(object):
                                       'this may cause issues.',
                                       MenpoFitBuilderWarning)
                     self.reference_shape = compute_reference_shape(
-                        [i.landmarks[group].lms for i in image_batch],
+                        extract_shapes(image_batch, group),
                         self.diagonal, verbose=verbose)
 
             # After the first batch, we are incrementing the model
@@ -188,7 +205,8 @@ class CLM(object):
                      shape_forgetting_factor=1.0, verbose=False):
         # normalize images
         image_batch = rescale_images_to_reference_shape(
-            image_batch, group, self.reference_shape, verbose=verbose)
+            image_batch, group, self.reference_shape, verbose=verbose,
+            n_workers=self.n_workers)
 
         # build models at each scale
         if verbose:
@@ -215,14 +233,16 @@ class CLM(object):
                 feature_images = compute_features(image_batch,
                                                   self.holistic_features[i],
                                                   prefix=prefix,
-                                                  verbose=verbose)
+                                                  verbose=verbose,
+                                                  n_workers=self.n_workers)
             # handle scales
             if self.scales[i] != 1:
                 # scale feature images only if scale is different than 1
                 scaled_images = scale_images(feature_images,
                                              self.scales[i],
                                              prefix=prefix,
-                                             verbose=verbose)
+                                             verbose=verbose,
+                                             n_workers=self.n_workers)
             else:
                 scaled_images = feature_images
 
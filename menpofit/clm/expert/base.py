@@ -69,12 +69,12 @@ class IncrementalCorrelationFilterThinWrapper(object):
 
         Parameters
         ----------
-        A : ``(N,)`` `ndarray`
+        A : ``(D, n_channels)`` `ndarray`
             The current auto-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
-        B : ``(N, N)`` `ndarray`
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
+        B : ``(D, n_channels, n_channels)`` `ndarray`
             The current cross-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
         n_x : `int`
             The current number of images.
         Z : `list` or ``(n_images, n_channels, patch_h, patch_w)`` `ndarray`
@@ -87,12 +87,12 @@ class IncrementalCorrelationFilterThinWrapper(object):
         -------
         correlation_filter : ``(n_channels, response_h, response_w)`` `ndarray`
             The learned correlation filter.
-        auto_correlation : ``(N,)`` `ndarray`
+        auto_correlation : ``(D, n_channels)`` `ndarray`
             The auto-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
-        cross_correlation : ``(N, N)`` `ndarray`
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
+        cross_correlation : ``(D, n_channels, n_channels)`` `ndarray`
             The cross-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
         """
         # Turn list of X into ndarray
         if isinstance(Z, list):
@@ -115,12 +115,12 @@ class IncrementalCorrelationFilterThinWrapper(object):
         -------
         correlation_filter : ``(n_channels, response_h, response_w)`` `ndarray`
             The learned correlation filter.
-        auto_correlation : ``(N,)`` `ndarray`
+        auto_correlation : ``(D, n_channels)`` `ndarray`
             The auto-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
-        cross_correlation : ``(N, N)`` `ndarray`
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
+        cross_correlation : ``(D, n_channels, n_channels)`` `ndarray`
             The cross-correlation array, where
-            ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``
+            ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``
         """
         # Turn list of X into ndarray
         if isinstance(X, list):
@@ -1,5 +1,8 @@
 from __future__ import division
 from functools import partial
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import tempfile
 import numpy as np
 from scipy.stats import multivariate_normal
 
@@ -315,6 +318,13 @@ class CorrelationFilterExpertEnsemble(ConvolutionBasedExpertEnsemble):
         of the patch (no offset) and ``(1, 0)`` would be sampling the patch
         from 1 pixel up the first axis away from the centre. If ``None``,
         then no offsets are applied.
+    n_workers : `int` or ``None``, optional
+        The number of threads used to train the experts in parallel. If
+        ``None``, then the number of CPUs is used.
+    memmap_dir : `str` or ``None``, optional
+        If provided, then the ``(n_experts, n_images, n_channels, height,
+        width)`` array of training patches is stored in a temporary
+        memory-mapped file within this directory rather than in memory.
     prefix : `str`, optional
         The prefix of the printed progress information.
     verbose : `bool`, optional
@@ -326,11 +336,13 @@ class CorrelationFilterExpertEnsemble(ConvolutionBasedExpertEnsemble):
                  patch_shape=(17, 17), context_shape=(34, 34),
                  response_covariance=3,
                  patch_normalisation=channel_normalize_norm,
-                 cosine_mask=True, sample_offsets=None, prefix='',
-                 verbose=False):
+                 cosine_mask=True, sample_offsets=None, n_workers=1,
+                 memmap_dir=None, prefix='', verbose=False):
         # TODO: check parameters?
         # Set parameters
         self._icf = icf_cls()
+        self.n_workers = n_workers
+        self.memmap_dir = memmap_dir
         self.patch_shape = patch_shape
         self.context_shape = context_shape
         self.response_covariance = response_covariance
@@ -364,9 +376,38 @@ class CorrelationFilterExpertEnsemble(ConvolutionBasedExpertEnsemble):
             patch = self._cosine_mask * patch
         return patch
 
+    def _extract_context_patches(self, image, shape):
+        # Extract the patches of all landmarks at once
+        patches = image.extract_patches(shape, patch_shape=self.context_shape,
+                                        sample_offsets=self.sample_offsets,
+                                        as_single_array=True)
+        # Reshape patches
+        # patches: n_patches x (n_offsets x n_channels) x height x width
+        patches = patches.reshape((patches.shape[0], -1) + patches.shape[-2:])
+        # Normalise each patch on its own
+        for j, patch in enumerate(patches):
+            patches[j] = self.patch_normalisation(patch)
+        if self.cosine_mask:
+            # Apply cosine mask if required
+            patches *= self._cosine_mask
+        return patches
+
+    def _allocate_patches(self, shape, dtype):
+        # Ensembles pickled by older versions do not have a memmap_dir
+        memmap_dir = getattr(self, 'memmap_dir', None)
+        if memmap_dir is None:
+            return np.empty(shape, dtype=dtype)
+        # The temporary file is removed as soon as the array is released
+        return np.memmap(tempfile.TemporaryFile(dir=memmap_dir),
+                         dtype=dtype, mode='w+', shape=shape)
+
     def _train(self, images, shapes, prefix='', verbose=False,
                increment=False):
-        # Define print_progress partial
+        # Define print_progress partials
+        wrap_extract = partial(print_progress,
+                               prefix='{}Extracting patches'.format(prefix),
+                               end_with_newline=not prefix,
+                               verbose=verbose)
         wrap = partial(print_progress,
                        prefix='{}Training experts'
                               .format(prefix),
@@ -388,43 +429,60 @@ class CorrelationFilterExpertEnsemble(ConvolutionBasedExpertEnsemble):
         # Obtain total number of experts
         n_experts = shapes[0].n_points
 
-        # Train ensemble of correlation filter experts
-        fft_padded_filters = []
-        auto_correlations = []
-        cross_correlations = []
-        for i in wrap(range(n_experts)):
-            patches = []
-            for image, shape in zip(images, shapes):
-                # Select the appropriate landmark
-                landmark = PointCloud([shape.points[i]])
-                # Extract patch
-                patch = self._extract_patch(image, landmark)
-                # Add patch to the list
-                patches.append(patch)
-
+        # Extract the patches of all experts with a single pass over the
+        # images
+        # patches: n_experts x n_images x n_channels x height x width
+        patches = None
+        for k, (image, shape) in enumerate(wrap_extract(list(zip(images,
+                                                                  shapes)))):
+            image_patches = self._extract_context_patches(image, shape)
+            if patches is None:
+                patches = self._allocate_patches(
+                    (n_experts, len(images)) + image_patches.shape[1:],
+                    image_patches.dtype)
+            patches[:, k] = image_patches
+
+        def train_expert(i):
             if increment:
                 # Increment correlation filter
                 correlation_filter, auto_correlation, cross_correlation = (
                     self._icf.increment(self.auto_correlations[i],
                                         self.cross_correlations[i],
                                         self.n_images,
-                                        patches,
+                                        patches[i],
                                         self.response))
             else:
                 # Train correlation filter
                 correlation_filter, auto_correlation, cross_correlation = (
-                    self._icf.train(patches, self.response))
+                    self._icf.train(patches[i], self.response))
 
             # Pad filter with zeros
             padded_filter = pad(correlation_filter, self.padded_size)
             # Compute fft of padded filter
             fft_padded_filter = fft2(padded_filter)
-            # Add fft padded filter to list
-            fft_padded_filters.append(fft_padded_filter)
-            auto_correlations.append(auto_correlation)
-            cross_correlations.append(cross_correlation)
+            return fft_padded_filter, auto_correlation, cross_correlation
+
+        # Train ensemble of correlation filter experts, in parallel if more
+        # than one worker is requested. The heavy lifting (fft and linear
+        # solves) releases the GIL, so threads are enough.
+        n_workers = getattr(self, 'n_workers', 1)
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        if n_workers <= 1:
+            results = [train_expert(i) for i in wrap(range(n_experts))]
+        else:
+            pool = ThreadPool(min(n_workers, n_experts))
+            try:
+                results = list(wrap(pool.imap(train_expert, range(n_experts)),
+                                    n_items=n_experts))
+            finally:
+                pool.close()
+                pool.join()
+        del patches
 
         # Turn list into ndarray
+        fft_padded_filters, auto_correlations, cross_correlations = zip(
+            *results)
         self.fft_padded_filters = np.asarray(fft_padded_filters)
         self.auto_correlations = np.asarray(auto_correlations)
         self.cross_correlations = np.asarray(cross_correlations)
@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.shape import PointCloud
+
+from menpofit.aam.test.base_test import _training_images
+from menpofit.clm import CorrelationFilterExpertEnsemble
+from menpofit.math.fft_utils import fft2, pad
+
+
+images = _training_images(n_images=6)
+shapes = [i.landmarks['PTS'].lms for i in images]
+sample_offsets = np.array([[0, 0], [2, -1]])
+
+
+def _ensemble(images, shapes, **kwargs):
+    return CorrelationFilterExpertEnsemble(
+        images, shapes, patch_shape=(8, 8), context_shape=(16, 16), **kwargs)
+
+
+def _per_landmark_train(ensemble, images, shapes, increment=False):
+    # the experts as originally trained, extracting the patch of each
+    # (landmark, image) pair separately
+    filters, auto_correlations, cross_correlations = [], [], []
+    # the number of images is updated before the experts are incremented
+    n_images = ensemble.n_images + len(images)
+    for i in range(shapes[0].n_points):
+        patches = [ensemble._extract_patch(image,
+                                           PointCloud([shape.points[i]]))
+                   for image, shape in zip(images, shapes)]
+        if increment:
+            f, a, c = ensemble._icf.increment(
+                ensemble.auto_correlations[i], ensemble.cross_correlations[i],
+                n_images, patches, ensemble.response)
+        else:
+            f, a, c = ensemble._icf.train(patches, ensemble.response)
+        filters.append(fft2(pad(f, ensemble.padded_size)))
+        auto_correlations.append(a)
+        cross_correlations.append(c)
+    return filters, auto_correlations, cross_correlations
+
+
+def _check_matches_per_landmark_train(ensemble, expected):
+    filters, auto_correlations, cross_correlations = expected
+    assert_allclose(ensemble.fft_padded_filters, np.asarray(filters),
+                    atol=1e-10)
+    assert_allclose(ensemble.auto_correlations, np.asarray(auto_correlations),
+                    atol=1e-10)
+    assert_allclose(ensemble.cross_correlations,
+                    np.asarray(cross_correlations), atol=1e-10)
+
+
+def test_training_matches_per_landmark_extraction():
+    memmap_dir = tempfile.mkdtemp()
+    try:
+        for offsets in [None, sample_offsets]:
+            for n_workers, patches_dir in [(1, None), (2, None),
+                                           (2, memmap_dir)]:
+                ensemble = _ensemble(images[:4], shapes[:4],
+                                     sample_offsets=offsets,
+                                     n_workers=n_workers,
+                                     memmap_dir=patches_dir)
+                _check_matches_per_landmark_train(
+                    ensemble,
+                    _per_landmark_train(ensemble, images[:4], shapes[:4]))
+    finally:
+        shutil.rmtree(memmap_dir)
+
+
+def test_increment_matches_per_landmark_extraction():
+    for n_workers in [1, 2]:
+        ensemble = _ensemble(images[:4], shapes[:4], n_workers=n_workers)
+        expected = _per_landmark_train(ensemble, images[4:], shapes[4:],
+                                       increment=True)
+        ensemble.increment(images[4:], shapes[4:])
+        _check_matches_per_landmark_train(ensemble, expected)
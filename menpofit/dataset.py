@@ -0,0 +1,310 @@
+r"""
+Lazy training datasets that load the images from their files on demand,
+instead of holding them all in memory.
+"""
+from __future__ import division
+from collections import deque
+import copy
+import glob
+import hashlib
+import os
+import tempfile
+from multiprocessing.pool import ThreadPool
+try:
+    from collections.abc import Sequence
+except ImportError:
+    # Python 2
+    from collections import Sequence
+import numpy as np
+
+from menpo.image import Image
+from menpo.io import import_image, import_landmark_file
+from menpo.shape import PointCloud
+
+# The extensions of the landmark files that are associated with an image by
+# same_name_landmarks
+LANDMARK_EXTENSIONS = ('.pts', '.ljson')
+
+# The version of the format of the cached images
+_CACHE_VERSION = 1
+
+
+def same_name_landmarks(path):
+    r"""
+    Landmark resolver that associates with an image the landmark files that
+    have the same name, e.g. ``image.pts`` for ``image.png``. The landmark
+    group of each file is named after its extension, e.g. ``'PTS'``.
+
+    Parameters
+    ----------
+    path : `str` or `pathlib.Path`
+        The path of the image.
+
+    Returns
+    -------
+    landmarks : `dict` of `str` to `str`
+        The path of the landmark file of each group.
+    """
+    stem = os.path.splitext(str(path))[0]
+    landmarks = {}
+    for extension in LANDMARK_EXTENSIONS:
+        if os.path.isfile(stem + extension):
+            landmarks[extension[1:].upper()] = stem + extension
+    return landmarks
+
+
+def _as_pointcloud(landmarks):
+    # The landmarks of a group as a PointCloud, whether they are imported as
+    # a LandmarkGroup or as a PointCloud
+    return getattr(landmarks, 'lms', landmarks)
+
+
+def _file_signature(path):
+    # Identifies the contents of a file by its path, size and modification
+    # time
+    stat = os.stat(path)
+    return '{}:{}:{}'.format(os.path.realpath(path), stat.st_size,
+                             stat.st_mtime)
+
+
+def _save_cached_image(image, path, dtype):
+    pixels = image.pixels
+    if np.dtype(dtype) == np.uint8:
+        pixels = np.round(np.clip(pixels, 0, 1) * 255)
+    arrays = {'pixels': pixels.astype(dtype),
+              'group_labels': np.array(list(image.landmarks.group_labels))}
+    for k, group in enumerate(image.landmarks.group_labels):
+        arrays['points_{}'.format(k)] = image.landmarks[group].lms.points
+    # Write to a temporary file and then rename it, so that concurrent
+    # readers never see a partially written file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _load_cached_image(path):
+    with np.load(path) as f:
+        pixels = f['pixels']
+        if pixels.dtype == np.uint8:
+            pixels = pixels / 255.
+        image = Image(pixels.astype(np.float64), copy=False)
+        for k, group in enumerate(f['group_labels']):
+            image.landmarks[str(group)] = PointCloud(
+                f['points_{}'.format(k)])
+    return image
+
+
+class ImageDataset(Sequence):
+    r"""
+    A sequence of landmarked training images that are imported from their
+    files on demand, so that they never have to be held in memory all at
+    once. It can be passed to the deformable models wherever a `list` of
+    images is accepted, e.g. ``HolisticAAM(ImageDataset(paths), ...)``.
+
+    The images are imported with their landmarks (see `landmark_resolver`)
+    and, optionally, converted to greyscale. When iterated, the next
+    `prefetch` images are imported in background threads. The models rescale
+    the training images with respect to their reference shape through
+    :map:`rescaled_to_reference_shape`, whose images are cached on disk if a
+    `cache_dir` is given. Hence, repeated trainings with the same reference
+    shape (e.g. hyper-parameter sweeps) load the rescaled images from the
+    cache without decoding and rescaling them again.
+
+    Parameters
+    ----------
+    paths : `list` of `str` or `pathlib.Path`
+        The paths of the images.
+    landmark_resolver : `callable`, optional
+        Function that returns the landmark files of an image given its path,
+        as a `dict` that maps each landmark group to the path of its file.
+    greyscale : `bool`, optional
+        If ``True``, then the RGB images are converted to greyscale.
+    cache_dir : `str` or ``None``, optional
+        The directory of the on-disk cache of the rescaled images. If
+        ``None``, then the rescaled images are not cached.
+    cache_dtype : `numpy.dtype`, optional
+        The dtype of the cached pixels. ``np.float32`` halves the size of
+        the cache with a negligible loss of precision, while ``np.uint8``
+        quarters it by quantising the pixels to 256 levels.
+    prefetch : `int`, optional
+        The number of images that are imported ahead in background threads
+        while iterating. If ``0``, then the images are imported when
+        requested.
+    """
+    def __init__(self, paths, landmark_resolver=same_name_landmarks,
+                 greyscale=True, cache_dir=None, cache_dtype=np.float32,
+                 prefetch=0):
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self.paths = list(paths)
+        self.landmark_resolver = landmark_resolver
+        self.greyscale = greyscale
+        self.cache_dir = cache_dir
+        self.cache_dtype = cache_dtype
+        self.prefetch = prefetch
+        # The (reference_shape, group, use_bounding_box) of the rescaled
+        # datasets
+        self._rescale = None
+
+    @classmethod
+    def from_glob(cls, pattern, **kwargs):
+        r"""
+        Creates a dataset of the images that match a glob pattern, sorted by
+        path.
+
+        Parameters
+        ----------
+        pattern : `str`
+            The glob pattern of the image paths, e.g. ``'./lfpw/*.png'``.
+        kwargs : `dict`
+            The options of the dataset (see :map:`ImageDataset`).
+
+        Returns
+        -------
+        dataset : :map:`ImageDataset`
+            The dataset.
+        """
+        return cls(sorted(glob.glob(pattern)), **kwargs)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # A dataset of the selected images, with the same options
+            dataset = copy.copy(self)
+            dataset.paths = self.paths[index]
+            return dataset
+        return self._load(self.paths[index])
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            for path in self.paths:
+                yield self._load(path)
+            return
+        pool = ThreadPool(self.prefetch)
+        pending = deque()
+        try:
+            for path in self.paths:
+                pending.append(pool.apply_async(self._load, (path,)))
+                if len(pending) > self.prefetch:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def shapes(self, group=None):
+        r"""
+        Returns the landmarks of the images, read from the landmark files
+        without importing the images.
+
+        Parameters
+        ----------
+        group : `str` or ``None``, optional
+            The landmark group. If ``None``, then the images must have a
+            single landmark group.
+
+        Returns
+        -------
+        shapes : `list` of `menpo.shape.PointCloud`
+            The shape of each image. For a rescaled dataset, they are rescaled
+            accordingly.
+        """
+        if self._rescale is not None:
+            # The rescale is only known once the image is imported
+            return [i.landmarks[group].lms for i in self]
+        shapes = []
+        for path in self.paths:
+            landmarks = self.landmark_resolver(path)
+            if group is None:
+                if len(landmarks) != 1:
+                    raise ValueError('The image {} has {} landmark groups, '
+                                     'so a group must be specified.'.format(
+                                         path, len(landmarks)))
+                landmark_path = list(landmarks.values())[0]
+            else:
+                landmark_path = landmarks[group]
+            shapes.append(_as_pointcloud(import_landmark_file(landmark_path)))
+        return shapes
+
+    def rescaled_to_reference_shape(self, reference_shape, group=None,
+                                    use_bounding_box=False):
+        r"""
+        Returns a dataset of the images rescaled so that the size of their
+        landmarks matches the size of the reference shape (see
+        :map:`rescale_images_to_reference_shape`). If the dataset has a
+        `cache_dir`, then the rescaled images are cached there.
+
+        Parameters
+        ----------
+        reference_shape : `menpo.shape.PointCloud`
+            The reference shape.
+        group : `str` or ``None``, optional
+            The landmark group that is aligned with the reference shape.
+        use_bounding_box : `bool`, optional
+            If ``True``, then the bounding box of the landmarks is aligned
+            with the reference shape instead.
+
+        Returns
+        -------
+        dataset : :map:`ImageDataset`
+            The dataset of the rescaled images.
+        """
+        dataset = copy.copy(self)
+        dataset._rescale = (reference_shape, group, use_bounding_box)
+        return dataset
+
+    def _import(self, path):
+        image = import_image(path, landmark_resolver=self.landmark_resolver)
+        if self.greyscale and image.n_channels == 3:
+            image = image.as_greyscale(mode='luminosity')
+        return image
+
+    def _cache_path(self, path):
+        reference_shape, group, use_bounding_box = self._rescale
+        signature = [_CACHE_VERSION, _file_signature(path), self.greyscale,
+                     group, use_bounding_box, np.dtype(self.cache_dtype).str]
+        signature.extend(_file_signature(p) for _, p in
+                         sorted(self.landmark_resolver(path).items()))
+        key = hashlib.sha1(repr(signature).encode('utf-8'))
+        key.update(np.ascontiguousarray(reference_shape.points,
+                                        dtype=np.float64).tobytes())
+        return os.path.join(self.cache_dir, key.hexdigest() + '.npz')
+
+    def _load(self, path):
+        if self._rescale is None:
+            return self._import(path)
+
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self._cache_path(path)
+            if os.path.exists(cache_path):
+                return _load_cached_image(cache_path)
+
+        reference_shape, group, use_bounding_box = self._rescale
+        image = self._import(path)
+        if use_bounding_box:
+            image.landmarks['__bounding_box'] = \
+                image.landmarks[group].lms.bounding_box()
+            image = image.rescale_to_pointcloud(reference_shape,
+                                                group='__bounding_box')
+            del image.landmarks['__bounding_box']
+        else:
+            image = image.rescale_to_pointcloud(reference_shape, group=group)
+        if cache_path is not None:
+            _save_cached_image(image, cache_path, self.cache_dtype)
+        return image
+
+    def __str__(self):
+        return '{} images{}{}'.format(
+            len(self), ' (greyscale)' if self.greyscale else '',
+            ', cached in {}'.format(self.cache_dir)
+            if self.cache_dir is not None else '')
@@ -15,7 +15,9 @@ from menpofit.fitter import (noisy_shape_from_bounding_box,
                              MultiScaleNonParametricFitter,
                              generate_perturbations_from_gt)
 from menpofit.builder import (scale_images, rescale_images_to_reference_shape,
-                              compute_reference_shape)
+                              compute_reference_shape, extract_shapes,
+                              parallel_map)
+from menpofit.dataset import ImageDataset
 from menpofit.result import Result
 
 from .algorithm import DlibAlgorithm
@@ -121,6 +123,10 @@ class DlibERT(MultiScaleNonParametricFitter):
         `F` from [1]. If `list`, it must specify a value per scale.
     verbose : `bool`, optional
         If ``True``, then the progress of building ERT will be printed.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling of the training images (see
+        :map:`parallel_map`). If `int`, then it is the number of threads. If
+        ``None``, then the number of CPUs is used.
 
     References
     ----------
@@ -134,7 +140,8 @@ class DlibERT(MultiScaleNonParametricFitter):
                  perturb_from_gt_bounding_box=noisy_shape_from_bounding_box,
                  n_iterations=10, feature_padding=0, n_pixel_pairs=400,
                  distance_prior_weighting=0.1, regularisation_weight=0.1,
-                 n_split_tests=20, n_trees=500, n_tree_levels=5, verbose=False):
+                 n_split_tests=20, n_trees=500, n_tree_levels=5, verbose=False,
+                 n_workers=1):
         checks.check_diagonal(diagonal)
         scales = checks.check_scales(scales)
         n_scales = len(scales)
@@ -151,6 +158,7 @@ class DlibERT(MultiScaleNonParametricFitter):
         self.n_perturbations = n_perturbations
         self.n_iterations = checks.check_max_iters(n_iterations, n_scales)
         self._perturb_from_gt_bounding_box = perturb_from_gt_bounding_box
+        self.n_workers = n_workers
 
         # DLib options
         self._setup_dlib_options(feature_padding, n_pixel_pairs,
@@ -219,16 +227,7 @@ class DlibERT(MultiScaleNonParametricFitter):
 
             self._dlib_options_templates.append(new_opts)
 
-    def _train(self, original_images, group=None, bounding_box_group_glob=None,
-               verbose=False):
-        # Dlib does not support incremental builds, so we must be passed a list
-        if not isinstance(original_images, list):
-            original_images = list(original_images)
-        # We use temporary landmark groups - so we need the group key to not be
-        # None
-        if group is None:
-            group = original_images[0].landmarks.group_labels[0]
-
+    def _rescale_images(self, original_images, group, verbose=False):
         # Temporarily store all the bounding boxes for rescaling
         for i in original_images:
             i.landmarks['__gt_bb'] = i.landmarks[group].lms.bounding_box()
@@ -243,12 +242,48 @@ class DlibERT(MultiScaleNonParametricFitter):
         # reference_shape and their ground truth (group) bboxes
         images = rescale_images_to_reference_shape(
             original_images, '__gt_bb', self.reference_shape,
-            verbose=verbose)
+            verbose=verbose, n_workers=self.n_workers)
 
         # Scaling is done - remove temporary gt bounding boxes
         for i, i2 in zip(original_images, images):
             del i.landmarks['__gt_bb']
             del i2.landmarks['__gt_bb']
+        return images
+
+    def _rescale_dataset(self, dataset, group, verbose=False):
+        # The images of the dataset are imported already rescaled wrt their
+        # ground truth (group) bboxes, whose reference is computed from the
+        # landmark files
+        if self.reference_shape is None:
+            self._reference_shape = compute_reference_shape(
+                [s.bounding_box() for s in extract_shapes(dataset, group)],
+                self.diagonal, verbose=verbose)
+        dataset = dataset.rescaled_to_reference_shape(
+            self.reference_shape, group=group, use_bounding_box=True)
+        wrap = partial(print_progress, prefix='- Normalizing images size',
+                       end_with_newline=False, verbose=verbose)
+        if self.n_workers == 1:
+            # Iterate the dataset so that it prefetches the images
+            return list(wrap(dataset))
+        return parallel_map(dataset.__getitem__, range(len(dataset)),
+                            n_workers=self.n_workers, wrap=wrap)
+
+    def _train(self, original_images, group=None, bounding_box_group_glob=None,
+               verbose=False):
+        # Dlib does not support incremental builds, so we must be passed a list
+        if not isinstance(original_images, (list, ImageDataset)):
+            original_images = list(original_images)
+        # We use temporary landmark groups - so we need the group key to not be
+        # None
+        if group is None:
+            group = original_images[0].landmarks.group_labels[0]
+
+        if isinstance(original_images, ImageDataset):
+            images = self._rescale_dataset(original_images, group,
+                                           verbose=verbose)
+        else:
+            images = self._rescale_images(original_images, group,
+                                          verbose=verbose)
 
         # Create a callable that generates perturbations of the bounding boxes
         # of the provided images.
@@ -273,7 +308,8 @@ class DlibERT(MultiScaleNonParametricFitter):
             # factor equals to 1.
             scaled_images, scale_transforms = scale_images(
                 images, self.scales[j], prefix=scale_prefix,
-                return_transforms=True, verbose=verbose)
+                return_transforms=True, verbose=verbose,
+                n_workers=self.n_workers)
 
             # Get bbox estimations of current scale. If we are at the first
             # scale, this is done by using generated_bb_func. If we are at the
@@ -319,7 +355,8 @@ class DlibERT(MultiScaleNonParametricFitter):
                         images[jj].landmarks[c_key] = \
                             scale_transforms[jj].apply(bbox)
 
-    def fit_from_shape(self, image, initial_shape, gt_shape=None):
+    def fit_from_shape(self, image, initial_shape, gt_shape=None,
+                       crop_proportion=None):
         r"""
         Fits the model to an image. Note that it is not possible to
         initialise the fitting process from a shape. Thus, this method raises a
@@ -336,6 +373,11 @@ class DlibERT(MultiScaleNonParametricFitter):
             bounding box.
         gt_shape : `menpo.shape.PointCloud`, optional
             The ground truth shape associated to the image.
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial
+            bounding box before being rescaled, padded by this proportion of
+            the box's size. The returned result is still expressed in the
+            original image coordinates.
 
         Returns
         -------
@@ -346,9 +388,11 @@ class DlibERT(MultiScaleNonParametricFitter):
                       'Dlib - therefore we are falling back to the tightest '
                       'bounding box from the given initial_shape')
         tightest_bb = initial_shape.bounding_box()
-        return self.fit_from_bb(image, tightest_bb, gt_shape=gt_shape)
+        return self.fit_from_bb(image, tightest_bb, gt_shape=gt_shape,
+                                crop_proportion=crop_proportion)
 
-    def fit_from_bb(self, image, bounding_box, gt_shape=None):
+    def fit_from_bb(self, image, bounding_box, gt_shape=None,
+                    crop_proportion=None):
         r"""
         Fits the model to an image given an initial bounding box.
 
@@ -361,6 +405,11 @@ class DlibERT(MultiScaleNonParametricFitter):
             will start.
         gt_shape : `menpo.shape.PointCloud`, optional
             The ground truth shape associated to the image.
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial
+            bounding box before being rescaled, padded by this proportion of
+            the box's size. The returned result is still expressed in the
+            original image coordinates.
 
         Returns
         -------
@@ -377,8 +426,9 @@ class DlibERT(MultiScaleNonParametricFitter):
         # transforms are the Scale objects that correspond to each level's
         # scale.
         (images, bounding_boxes, gt_shapes, affine_transforms,
-         scale_transforms) = self._prepare_image(image, bounding_box,
-                                                 gt_shape=gt_shape)
+         scale_transforms) = self._prepare_image(
+            image, bounding_box, gt_shape=gt_shape,
+            crop_proportion=crop_proportion)
 
         # Execute multi-scale fitting
         algorithm_results = self._fit(images=images,
@@ -394,6 +444,74 @@ class DlibERT(MultiScaleNonParametricFitter):
                                    scale_transforms=scale_transforms,
                                    gt_shape=gt_shape)
 
+    def fit_from_shapes(self, images, initial_shapes, gt_shapes=None,
+                        crop_proportion=None):
+        r"""
+        Fits the model to a batch of images. Note that it is not possible to
+        initialise the fitting process from a shape. Thus, this method raises a
+        warning and calls `fit_from_bbs` with the bounding boxes of the
+        provided `initial_shapes`.
+
+        Parameters
+        ----------
+        images : `list` of `menpo.image.Image` or `menpo.image.Image`
+            The images to be fitted, one per initial shape. If a single image
+            is provided, then all the initial shapes are fitted on it.
+        initial_shapes : `list` of `menpo.shape.PointCloud`
+            The initial shape estimates from which the fitting procedure
+            will start. Note that the shapes won't actually be used, only their
+            bounding boxes.
+        gt_shapes : `list` of `menpo.shape.PointCloud` or ``None``, optional
+            The ground truth shapes associated to the images.
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then each image is cropped around its initial
+            bounding box before being rescaled, padded by this proportion of
+            the box's size. The returned results are still expressed in the
+            original image coordinates.
+
+        Returns
+        -------
+        fitting_results : `list` of :map:`MultiScaleNonParametricIterativeResult`
+            The result of the fitting procedure of each sample.
+        """
+        warnings.warn('Fitting from an initial shape is not supported by '
+                      'Dlib - therefore we are falling back to the tightest '
+                      'bounding box from the given initial_shapes')
+        tightest_bbs = [s.bounding_box() for s in initial_shapes]
+        return self.fit_from_bbs(images, tightest_bbs, gt_shapes=gt_shapes,
+                                 crop_proportion=crop_proportion)
+
+    def fit_from_bbs(self, images, bounding_boxes, gt_shapes=None,
+                     crop_proportion=None):
+        r"""
+        Fits the model to a batch of images given their initial bounding boxes.
+
+        Parameters
+        ----------
+        images : `list` of `menpo.image.Image` or `menpo.image.Image`
+            The images to be fitted, one per bounding box. If a single image
+            is provided, then all the bounding boxes are fitted on it.
+        bounding_boxes : `list` of `menpo.shape.PointDirectedGraph`
+            The initial bounding boxes from which the fitting procedure
+            will start.
+        gt_shapes : `list` of `menpo.shape.PointCloud` or ``None``, optional
+            The ground truth shapes associated to the images.
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then each image is cropped around its initial
+            bounding box before being rescaled, padded by this proportion of
+            the box's size. The returned results are still expressed in the
+            original image coordinates.
+
+        Returns
+        -------
+        fitting_results : `list` of :map:`MultiScaleNonParametricIterativeResult`
+            The result of the fitting procedure of each sample.
+        """
+        # The bounding boxes are directly used as the initial estimates
+        return super(DlibERT, self).fit_from_shapes(
+            images, bounding_boxes, gt_shapes=gt_shapes, return_costs=False,
+            crop_proportion=crop_proportion)
+
     def __str__(self):
         if self.diagonal is not None:
             diagonal = self.diagonal
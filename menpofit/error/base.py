@@ -4,21 +4,37 @@ import numpy as np
 from menpo.shape import PointCloud
 
 
+def _to_points(arg):
+    # A PointCloud is converted to its points and a list of PointClouds to a
+    # stacked (n_shapes, n_points, n_dims) array, so that the error functions
+    # are evaluated on all the shapes at once
+    if isinstance(arg, PointCloud):
+        return arg.points
+    if (isinstance(arg, (list, tuple)) and len(arg) > 0 and
+            all(isinstance(a, PointCloud) for a in arg)):
+        return np.array([a.points for a in arg])
+    return arg
+
+
 def pointcloud_to_points(wrapped):
     @wraps(wrapped)
     def wrapper(*args, **kwargs):
-        args = list(args)
-        for index, arg in enumerate(args):
-            if isinstance(arg, PointCloud):
-                args[index] = arg.points
+        args = [_to_points(arg) for arg in args]
         for key in kwargs:
-            if isinstance(kwargs[key], PointCloud):
-                kwargs[key] = kwargs[key].points
+            kwargs[key] = _to_points(kwargs[key])
         return wrapped(*args, **kwargs)
     return wrapper
 
 
+def _bb_edges(shape):
+    # Height and width of the bounding box of each shape. The points are
+    # along the second to last axis, hence a batch of shapes can be provided.
+    edges = np.max(shape, axis=-2) - np.min(shape, axis=-2)
+    return edges[..., 0], edges[..., 1]
+
+
 # BOUNDING BOX NORMALISERS
+@pointcloud_to_points
 def bb_area(shape):
     r"""
     Computes the area of the bounding box of the provided shape,
@@ -31,19 +47,20 @@ def bb_area(shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud` or `subclass`
+    shape : `menpo.shape.PointCloud` or `subclass` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape.
 
     Returns
     -------
-    bb_area : `float`
+    bb_area : `float` or ``(n_shapes,)`` `ndarray`
         The area of the bounding box.
     """
     # Area = w * h
-    height, width = np.max(shape, axis=0) - np.min(shape, axis=0)
+    height, width = _bb_edges(shape)
     return height * width
 
 
+@pointcloud_to_points
 def bb_perimeter(shape):
     r"""
     Computes the perimeter of the bounding box of the provided shape, i.e.
@@ -55,19 +72,20 @@ def bb_perimeter(shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud` or `subclass`
+    shape : `menpo.shape.PointCloud` or `subclass` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape.
 
     Returns
     -------
-    bb_perimeter : `float`
+    bb_perimeter : `float` or ``(n_shapes,)`` `ndarray`
         The perimeter of the bounding box.
     """
     # Area = 2(w + h)
-    height, width = np.max(shape, axis=0) - np.min(shape, axis=0)
+    height, width = _bb_edges(shape)
     return 2 * (height + width)
 
 
+@pointcloud_to_points
 def bb_avg_edge_length(shape):
     r"""
     Computes the average edge length of the bounding box of the provided shape,
@@ -80,19 +98,20 @@ def bb_avg_edge_length(shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud` or `subclass`
+    shape : `menpo.shape.PointCloud` or `subclass` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape.
 
     Returns
     -------
-    bb_avg_edge_length : `float`
+    bb_avg_edge_length : `float` or ``(n_shapes,)`` `ndarray`
         The average edge length of the bounding box.
     """
     # 0.5(w + h) = (2w + 2h) / 4
-    height, width = np.max(shape, axis=0) - np.min(shape, axis=0)
+    height, width = _bb_edges(shape)
     return 0.5 * (height + width)
 
 
+@pointcloud_to_points
 def bb_diagonal(shape):
     r"""
     Computes the diagonal of the bounding box of the provided shape, i.e.
@@ -104,16 +123,16 @@ def bb_diagonal(shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud` or `subclass`
+    shape : `menpo.shape.PointCloud` or `subclass` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape.
 
     Returns
     -------
-    bb_diagonal : `float`
+    bb_diagonal : `float` or ``(n_shapes,)`` `ndarray`
         The diagonal of the bounding box.
     """
     # sqrt(w**2 + h**2)
-    height, width = np.max(shape, axis=0) - np.min(shape, axis=0)
+    height, width = _bb_edges(shape)
     return np.sqrt(width ** 2 + height ** 2)
 
 
@@ -140,17 +159,17 @@ def root_mean_square_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
 
     Returns
     -------
-    root_mean_square_error : `float`
+    root_mean_square_error : `float` or ``(n_shapes,)`` `ndarray`
         The root mean square error.
     """
-    return np.sqrt(np.mean((shape.ravel() - gt_shape.ravel()) ** 2))
+    return np.sqrt(np.mean((shape - gt_shape) ** 2, axis=(-2, -1)))
 
 
 @pointcloud_to_points
@@ -168,20 +187,25 @@ def euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
 
     Returns
     -------
-    root_mean_square_error : `float`
+    root_mean_square_error : `float` or ``(n_shapes,)`` `ndarray`
         The Euclidean error.
     """
-    return np.mean(np.sqrt(np.sum((shape - gt_shape) ** 2, axis=-1)))
+    distances = np.sqrt(np.sum((shape - gt_shape) ** 2, axis=-1))
+    if distances.ndim == 0:
+        # single points rather than shapes were provided
+        return distances
+    return np.mean(distances, axis=-1)
 
 
 # DISTANCE NORMALISER
+@pointcloud_to_points
 def distance_two_indices(index1, index2, shape):
     r"""
     Computes the Euclidean distance between two points of a shape, i.e.
@@ -199,15 +223,16 @@ def distance_two_indices(index1, index2, shape):
         The index of the first point.
     index2 : `int`
         The index of the second point.
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape.
 
     Returns
     -------
-    distance_two_indices : `float`
+    distance_two_indices : `float` or ``(n_shapes,)`` `ndarray`
         The Euclidean distance between the points.
     """
-    return euclidean_error(shape[index1], shape[index2])
+    return np.sqrt(np.sum((shape[..., index1, :] - shape[..., index2, :]) ** 2,
+                          axis=-1))
 
 
 # GENERIC NORMALISED ERROR FUNCTIONS
@@ -230,11 +255,11 @@ def bb_normalised_error(shape_error_f, shape, gt_shape,
     ----------
     shape_error_f : `callable`
         The function to be used for computing the error.
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
-    norm_shape : `menpo.shape.PointCloud` or ``None``, optional
+    norm_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray` or ``None``, optional
         The shape to be used to compute the normaliser. If ``None``, then the
         ground truth shape is used.
     norm_type : ``{'area', 'perimeter', 'avg_edge_length', 'diagonal'}``, optional
@@ -251,7 +276,7 @@ def bb_normalised_error(shape_error_f, shape, gt_shape,
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised error.
     """
     if norm_type not in bb_norm_types:
@@ -282,14 +307,18 @@ def distance_normalised_error(shape_error_f, distance_norm_f, shape, gt_shape):
         The function to be used for computing the error.
     distance_norm_f : `callable`
         The function to be used for computing the normalisation distance metric.
-    shape : `menpo.shape.PointCloud`
+        Note that if a batch of shapes is provided, then it is called with
+        the ``(n_shapes, n_points, n_dims)`` arrays of points and it must
+        return the ``(n_shapes,)`` distances (e.g. using
+        :map:`distance_two_indices`).
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised error.
     """
     return shape_error_f(shape, gt_shape) / distance_norm_f(shape, gt_shape)
@@ -318,14 +347,14 @@ def distance_indexed_normalised_error(shape_error_f, index1, index2, shape,
         The index of the first point.
     index2 : `int`
         The index of the second point.
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised error.
     """
     return shape_error_f(shape, gt_shape) / distance_two_indices(index1, index2,
@@ -356,11 +385,11 @@ def root_mean_square_bb_normalised_error(shape, gt_shape, norm_shape=None,
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
-    norm_shape : `menpo.shape.PointCloud` or ``None``, optional
+    norm_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray` or ``None``, optional
         The shape to be used to compute the normaliser. If ``None``, then the
         ground truth shape is used.
     norm_type : ``{'area', 'perimeter', 'avg_edge_length', 'diagonal'}``, optional
@@ -377,7 +406,7 @@ def root_mean_square_bb_normalised_error(shape, gt_shape, norm_shape=None,
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed root mean square normalised error.
     """
     return bb_normalised_error(shape_error_f=root_mean_square_error,
@@ -407,16 +436,18 @@ def root_mean_square_distance_normalised_error(shape, gt_shape,
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
     distance_norm_f : `callable`
         The function to be used for computing the normalisation distance metric.
+        If a batch of shapes is provided, then it must support batches, as
+        explained in :map:`distance_normalised_error`.
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed root mean square normalised error.
     """
     return distance_normalised_error(shape_error_f=root_mean_square_error,
@@ -447,9 +478,9 @@ def root_mean_square_distance_indexed_normalised_error(shape, gt_shape,
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
     index1 : `int`
         The index of the first point.
@@ -458,7 +489,7 @@ def root_mean_square_distance_indexed_normalised_error(shape, gt_shape,
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed root mean square normalised error.
     """
     return distance_indexed_normalised_error(
@@ -490,11 +521,11 @@ def euclidean_bb_normalised_error(shape, gt_shape, norm_shape=None,
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
-    norm_shape : `menpo.shape.PointCloud` or ``None``, optional
+    norm_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray` or ``None``, optional
         The shape to be used to compute the normaliser. If ``None``, then the
         ground truth shape is used.
     norm_type : ``{'area', 'perimeter', 'avg_edge_length', 'diagonal'}``, optional
@@ -511,7 +542,7 @@ def euclidean_bb_normalised_error(shape, gt_shape, norm_shape=None,
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed Euclidean normalised error.
     """
     return bb_normalised_error(shape_error_f=euclidean_error,
@@ -542,16 +573,18 @@ def euclidean_distance_normalised_error(shape, gt_shape, distance_norm_f):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
     distance_norm_f : `callable`
         The function to be used for computing the normalisation distance metric.
+        If a batch of shapes is provided, then it must support batches, as
+        explained in :map:`distance_normalised_error`.
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed Euclidean normalised error.
     """
     return distance_normalised_error(shape_error_f=euclidean_error,
@@ -583,9 +616,9 @@ def euclidean_distance_indexed_normalised_error(shape, gt_shape, index1,
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure).
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape.
     index1 : `int`
         The index of the first point.
@@ -594,7 +627,7 @@ def euclidean_distance_indexed_normalised_error(shape, gt_shape, index1,
 
     Returns
     -------
-    error : `float`
+    error : `float` or ``(n_shapes,)`` `ndarray`
         The computed Euclidean normalised error.
     """
     return distance_indexed_normalised_error(
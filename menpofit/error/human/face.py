@@ -1,6 +1,5 @@
 import numpy as np
 
-from menpo.shape import PointCloud
 from menpo.landmark import (face_ibug_68_to_face_ibug_49,
                             face_ibug_68_to_face_ibug_68,
                             face_ibug_49_to_face_ibug_49)
@@ -8,32 +7,42 @@ from menpo.landmark import (face_ibug_68_to_face_ibug_49,
 from menpofit.error import euclidean_error
 from menpofit.error.base import (distance_normalised_error,
                                  distance_indexed_normalised_error,
-                                 bb_normalised_error)
+                                 bb_normalised_error, pointcloud_to_points)
 
 
-def _convert_68_to_51(shape):
-    return PointCloud(shape.points[17:])
+# The conversions operate on the points of a shape or on a stacked
+# (n_shapes, n_points, n_dims) array of points
+def _convert_68_to_51(points):
+    return points[..., 17:, :]
 
 
-def _convert_68_to_49(shape):
-    sp = shape.points.copy()
-    sp = np.delete(sp, 64, 0)
-    sp = np.delete(sp, 60, 0)
-    sp = sp[17:]
-    return PointCloud(sp)
+def _convert_68_to_49(points):
+    return np.delete(points, [60, 64], axis=-2)[..., 17:, :]
 
 
-def _convert_66_to_49(shape):
-    return PointCloud(shape.points[17:])
+def _convert_66_to_49(points):
+    return points[..., 17:, :]
 
 
-def _convert_51_to_49(shape):
-    sp = shape.points.copy()
-    sp = np.delete(sp, 47, 0)
-    sp = np.delete(sp, 43, 0)
-    return PointCloud(sp)
+def _convert_51_to_49(points):
+    return np.delete(points, [43, 47], axis=-2)
 
 
+def _n_points(points):
+    return points.shape[-2]
+
+
+def _pupils_distance(points, labeller):
+    # The mapping of the labeller does not depend on the points' values, hence
+    # it is retrieved from a single shape in case of a batch
+    single_points = points.reshape((-1,) + points.shape[-2:])[0]
+    _, mapping = labeller(single_points, include_mapping=True)
+    left_pupil = np.mean(points[..., mapping['left_eye'], :], axis=-2)
+    right_pupil = np.mean(points[..., mapping['right_eye'], :], axis=-2)
+    return np.sqrt(np.sum((left_pupil - right_pupil) ** 2, axis=-1))
+
+
+@pointcloud_to_points
 def mean_pupil_68_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 68 points normalised with the
@@ -56,15 +65,15 @@ def mean_pupil_68_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must have 68 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised Euclidean error.
 
     Raises
@@ -74,19 +83,18 @@ def mean_pupil_68_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 points
     """
-    if shape.n_points != 68:
+    if _n_points(shape) != 68:
         raise ValueError('Final shape must have 68 points')
-    if gt_shape.n_points != 68:
+    if _n_points(gt_shape) != 68:
         raise ValueError('Ground truth shape must have 68 points')
 
     def pupil_dist(_, s):
-        _, mapping = face_ibug_68_to_face_ibug_68(s, include_mapping=True)
-        return euclidean_error(np.mean(s[mapping['left_eye']], axis=0),
-                               np.mean(s[mapping['right_eye']], axis=0))
+        return _pupils_distance(s, face_ibug_68_to_face_ibug_68)
     return distance_normalised_error(euclidean_error, pupil_dist, shape,
                                      gt_shape)
 
 
+@pointcloud_to_points
 def mean_pupil_49_error(shape, gt_shape):
     r"""
     Computes the euclidean error based on 49 points normalised with the
@@ -109,15 +117,15 @@ def mean_pupil_49_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must have either 68 or 66 or 51 or 49 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have either 68 or 66 or 51 or 49 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised Euclidean error.
 
     Raises
@@ -127,32 +135,31 @@ def mean_pupil_49_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 or 66 or 51 or 49 points
     """
-    if shape.n_points not in [68, 66, 51, 49]:
+    if _n_points(shape) not in [68, 66, 51, 49]:
         raise ValueError('Final shape must have 68 or 66 or 51 or 49 points')
-    if gt_shape.n_points not in [68, 66, 51, 49]:
+    if _n_points(gt_shape) not in [68, 66, 51, 49]:
         raise ValueError('Ground truth shape must have 68 or 66 or 51 or 49 '
                          'points')
 
     def pupil_dist(_, s):
-        _, mapping = face_ibug_49_to_face_ibug_49(s, include_mapping=True)
-        return euclidean_error(np.mean(s[mapping['left_eye']], axis=0),
-                               np.mean(s[mapping['right_eye']], axis=0))
-    if shape.n_points == 68:
+        return _pupils_distance(s, face_ibug_49_to_face_ibug_49)
+    if _n_points(shape) == 68:
         shape = _convert_68_to_49(shape)
-    elif shape.n_points == 66:
+    elif _n_points(shape) == 66:
         shape = _convert_66_to_49(shape)
-    elif shape.n_points == 51:
+    elif _n_points(shape) == 51:
         shape = _convert_51_to_49(shape)
-    if gt_shape.n_points == 68:
+    if _n_points(gt_shape) == 68:
         gt_shape = _convert_68_to_49(gt_shape)
-    elif gt_shape.n_points == 66:
+    elif _n_points(gt_shape) == 66:
         gt_shape = _convert_66_to_49(gt_shape)
-    elif gt_shape.n_points == 51:
+    elif _n_points(gt_shape) == 51:
         gt_shape = _convert_51_to_49(gt_shape)
     return distance_normalised_error(euclidean_error, pupil_dist, shape,
                                      gt_shape)
 
 
+@pointcloud_to_points
 def outer_eye_corner_68_euclidean_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 68 points normalised with the
@@ -175,15 +182,15 @@ def outer_eye_corner_68_euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must have 68 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised Euclidean error.
 
     Raises
@@ -193,14 +200,15 @@ def outer_eye_corner_68_euclidean_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 points
     """
-    if shape.n_points != 68:
+    if _n_points(shape) != 68:
         raise ValueError('Final shape must have 68 points')
-    if gt_shape.n_points != 68:
+    if _n_points(gt_shape) != 68:
         raise ValueError('Ground truth shape must have 68 points')
     return distance_indexed_normalised_error(euclidean_error, 36, 45, shape,
                                              gt_shape)
 
 
+@pointcloud_to_points
 def outer_eye_corner_51_euclidean_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 51 points normalised with the
@@ -223,15 +231,15 @@ def outer_eye_corner_51_euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must 68 or 51 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 or 51 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised Euclidean error.
 
     Raises
@@ -241,18 +249,19 @@ def outer_eye_corner_51_euclidean_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 or 51 points
     """
-    if shape.n_points not in [68, 51]:
+    if _n_points(shape) not in [68, 51]:
         raise ValueError('Final shape must have 68 or 51 points')
-    if gt_shape.n_points not in [68, 51]:
+    if _n_points(gt_shape) not in [68, 51]:
         raise ValueError('Ground truth shape must have 68 or 51 points')
-    if shape.n_points == 68:
+    if _n_points(shape) == 68:
         shape = _convert_68_to_51(shape)
-    if gt_shape.n_points == 68:
+    if _n_points(gt_shape) == 68:
         gt_shape = _convert_68_to_51(gt_shape)
     return distance_indexed_normalised_error(euclidean_error, 19, 28, shape,
                                              gt_shape)
 
 
+@pointcloud_to_points
 def outer_eye_corner_49_euclidean_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 49 points normalised with the
@@ -275,15 +284,15 @@ def outer_eye_corner_49_euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must 68 or 66 or 51 or 49 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 or 66 or 51 or 49 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed normalised Euclidean error.
 
     Raises
@@ -293,27 +302,28 @@ def outer_eye_corner_49_euclidean_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 or 66 or 51 or 49 points
     """
-    if shape.n_points not in [68, 66, 51, 49]:
+    if _n_points(shape) not in [68, 66, 51, 49]:
         raise ValueError('Final shape must have 68 or 66 or 51 or 49 points')
-    if gt_shape.n_points not in [68, 66, 51, 49]:
+    if _n_points(gt_shape) not in [68, 66, 51, 49]:
         raise ValueError('Ground truth shape must have 68 or 66 or 51 or 49 '
                          'points')
-    if shape.n_points == 68:
+    if _n_points(shape) == 68:
         shape = _convert_68_to_49(shape)
-    elif shape.n_points == 66:
+    elif _n_points(shape) == 66:
         shape = _convert_66_to_49(shape)
-    elif shape.n_points == 51:
+    elif _n_points(shape) == 51:
         shape = _convert_51_to_49(shape)
-    if gt_shape.n_points == 68:
+    if _n_points(gt_shape) == 68:
         gt_shape = _convert_68_to_49(gt_shape)
-    elif gt_shape.n_points == 66:
+    elif _n_points(gt_shape) == 66:
         gt_shape = _convert_66_to_49(gt_shape)
-    elif gt_shape.n_points == 51:
+    elif _n_points(gt_shape) == 51:
         gt_shape = _convert_51_to_49(gt_shape)
     return distance_indexed_normalised_error(euclidean_error, 19, 28, shape,
                                              gt_shape)
 
 
+@pointcloud_to_points
 def bb_avg_edge_length_68_euclidean_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 68 points normalised by the average
@@ -337,15 +347,15 @@ def bb_avg_edge_length_68_euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must have 68 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed Euclidean normalised error.
 
     Raises
@@ -355,14 +365,15 @@ def bb_avg_edge_length_68_euclidean_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 points
     """
-    if shape.n_points != 68:
+    if _n_points(shape) != 68:
         raise ValueError('Final shape must have 68 points')
-    if gt_shape.n_points != 68:
+    if _n_points(gt_shape) != 68:
         raise ValueError('Ground truth shape must have 68 points')
     return bb_normalised_error(euclidean_error, shape, gt_shape,
                                norm_type='avg_edge_length', norm_shape=gt_shape)
 
 
+@pointcloud_to_points
 def bb_avg_edge_length_49_euclidean_error(shape, gt_shape):
     r"""
     Computes the Euclidean error based on 49 points normalised by the average
@@ -386,15 +397,15 @@ def bb_avg_edge_length_49_euclidean_error(shape, gt_shape):
 
     Parameters
     ----------
-    shape : `menpo.shape.PointCloud`
+    shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The input shape (e.g. the final shape of a fitting procedure). It
         must have 68 or 66 or 51 or 49 points.
-    gt_shape : `menpo.shape.PointCloud`
+    gt_shape : `menpo.shape.PointCloud` or `list` or ``(n_shapes, n_points, n_dims)`` `ndarray`
         The ground truth shape. It must have 68 points.
 
     Returns
     -------
-    normalised_error : `float`
+    normalised_error : `float` or ``(n_shapes,)`` `ndarray`
         The computed Euclidean normalised error.
 
     Raises
@@ -404,15 +415,15 @@ def bb_avg_edge_length_49_euclidean_error(shape, gt_shape):
     ValueError
         Ground truth shape must have 68 points
     """
-    if shape.n_points not in [68, 66, 51, 49]:
+    if _n_points(shape) not in [68, 66, 51, 49]:
         raise ValueError('Final shape must have 68 or 66 or 51 or 49 points')
-    if gt_shape.n_points != 68:
+    if _n_points(gt_shape) != 68:
         raise ValueError('Ground truth shape must have 68 points')
-    if shape.n_points == 68:
+    if _n_points(shape) == 68:
         shape = _convert_68_to_49(shape)
-    elif shape.n_points == 66:
+    elif _n_points(shape) == 66:
         shape = _convert_66_to_49(shape)
-    elif shape.n_points == 51:
+    elif _n_points(shape) == 51:
         shape = _convert_51_to_49(shape)
     gt_shape_68 = gt_shape.copy()
     gt_shape = _convert_68_to_49(gt_shape)
@@ -4,13 +4,31 @@ from scipy.integrate import simps
 from collections import Iterable
 
 
+def _sort_errors(errors):
+    return np.sort(np.asarray(errors, dtype=np.float64).ravel())
+
+
+def _cumulative_error(sorted_errors, bins):
+    # The number of errors that are <= to each bin is its right insertion
+    # index in the sorted errors, hence the CED costs O(n_bins log(n_errors))
+    return (np.searchsorted(sorted_errors, bins, side='right') /
+            sorted_errors.size)
+
+
+def _area_under_curve_and_failure_rate(sorted_errors, step_error, max_error,
+                                       min_error):
+    x_axis = np.arange(min_error, max_error + step_error, step_error)
+    ced = _cumulative_error(sorted_errors, x_axis)
+    return simps(ced, x=x_axis) / max_error, 1. - ced[-1]
+
+
 def compute_cumulative_error(errors, bins):
     r"""
     Computes the values of the Cumulative Error Distribution (CED).
 
     Parameters
     ----------
-    errors : `list` of `float`
+    errors : `list` of `float` or `ndarray`
         The `list` of errors per image.
     bins : `list` of `float`
         The values of the error bins centers at which the CED is evaluated.
@@ -20,8 +38,7 @@ def compute_cumulative_error(errors, bins):
     ced : `list` of `float`
         The computed CED.
     """
-    n_errors = len(errors)
-    return [np.count_nonzero([errors <= x]) / n_errors for x in bins]
+    return list(_cumulative_error(_sort_errors(errors), bins))
 
 
 def mad(errors):
@@ -38,6 +55,7 @@ def mad(errors):
     mad : `float`
         The median absolute deviation value.
     """
+    errors = np.asarray(errors)
     med = np.median(errors)
     return np.median(np.abs(errors - med))
 
@@ -50,7 +68,7 @@ def area_under_curve_and_failure_rate(errors, step_error, max_error,
 
     Parameters
     ----------
-    errors : `list` of `float`
+    errors : `list` of `float` or `ndarray`
         The `list` of errors per image.
     step_error : `float`
         The sampling step of the error bins of the CED.
@@ -66,9 +84,9 @@ def area_under_curve_and_failure_rate(errors, step_error, max_error,
     fr : `float`
         The Failure Rate value.
     """
-    x_axis = list(np.arange(min_error, max_error + step_error, step_error))
-    ced = np.array(compute_cumulative_error(errors, x_axis))
-    return simps(ced, x=x_axis) / max_error, 1. - ced[-1]
+    return _area_under_curve_and_failure_rate(
+        _sort_errors(errors), step_error=step_error, max_error=max_error,
+        min_error=min_error)
 
 
 def compute_statistical_measures(errors, step_error, max_error, min_error=0.):
@@ -79,9 +97,10 @@ def compute_statistical_measures(errors, step_error, max_error, min_error=0.):
 
     Parameters
     ----------
-    errors : `list` of `float` or `list` of `list` of `float`
+    errors : `list` of `float` or `list` of `list` of `float` or `ndarray`
         The `list` of errors per image. You can provide a `list` of `lists`
-        for the errors of multiple methods.
+        (or a ``(n_methods, n_images)`` `ndarray`) for the errors of multiple
+        methods.
     step_error : `float`
         The sampling step of the error bins of the CED for computing the Area
         Under the Curve and the Failure Rate.
@@ -118,23 +137,39 @@ def compute_statistical_measures(errors, step_error, max_error, min_error=0.):
         auc_val = []
         fail_val = []
         for e in errors:
-            mean_val.append(np.mean(e))
-            std_val.append(np.std(e))
-            median_val.append(np.median(e))
-            mad_val.append(mad(e))
-            max_val.append(np.max(e))
-            auc_v, fail_v = area_under_curve_and_failure_rate(
-                    e, step_error=step_error, max_error=max_error,
-                    min_error=min_error)
-            auc_val.append(auc_v)
-            fail_val.append(fail_v)
+            measures = _statistical_measures(e, step_error, max_error,
+                                             min_error)
+            mean_val.append(measures[0])
+            std_val.append(measures[1])
+            median_val.append(measures[2])
+            mad_val.append(measures[3])
+            max_val.append(measures[4])
+            auc_val.append(measures[5])
+            fail_val.append(measures[6])
     else:
-        mean_val = np.mean(errors)
-        std_val = np.std(errors)
-        median_val = np.median(errors)
-        mad_val = mad(errors)
-        max_val = np.max(errors)
-        auc_val, fail_val = area_under_curve_and_failure_rate(
-                errors, step_error=step_error, max_error=max_error,
-                min_error=min_error)
+        (mean_val, std_val, median_val, mad_val, max_val, auc_val,
+         fail_val) = _statistical_measures(errors, step_error, max_error,
+                                           min_error)
     return mean_val, std_val, median_val, mad_val, max_val, auc_val, fail_val
+
+
+def _statistical_measures(errors, step_error, max_error, min_error):
+    # The errors are sorted once, so that the order statistics (median, mad,
+    # max) and the CED are read off the sorted array
+    sorted_errors = _sort_errors(errors)
+    n_errors = sorted_errors.size
+    median_val = _sorted_median(sorted_errors)
+    mad_val = np.median(np.abs(sorted_errors - median_val))
+    auc_val, fail_val = _area_under_curve_and_failure_rate(
+        sorted_errors, step_error=step_error, max_error=max_error,
+        min_error=min_error)
+    return (np.mean(sorted_errors), np.std(sorted_errors), median_val, mad_val,
+            sorted_errors[n_errors - 1], auc_val, fail_val)
+
+
+def _sorted_median(sorted_errors):
+    n_errors = sorted_errors.size
+    middle = n_errors // 2
+    if n_errors % 2:
+        return sorted_errors[middle]
+    return 0.5 * (sorted_errors[middle - 1] + sorted_errors[middle])
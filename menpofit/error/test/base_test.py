@@ -0,0 +1,106 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.shape import PointCloud
+
+from menpofit.error import (bb_area, bb_perimeter, bb_avg_edge_length,
+                            bb_diagonal, distance_two_indices,
+                            root_mean_square_error,
+                            euclidean_error,
+                            root_mean_square_bb_normalised_error,
+                            root_mean_square_distance_normalised_error,
+                            root_mean_square_distance_indexed_normalised_error,
+                            euclidean_bb_normalised_error,
+                            euclidean_distance_normalised_error,
+                            euclidean_distance_indexed_normalised_error)
+
+
+rng = np.random.RandomState(0)
+gt_points = rng.rand(6, 10, 2) * 50
+points = gt_points + rng.randn(6, 10, 2)
+gt_shapes = [PointCloud(p) for p in gt_points]
+shapes = [PointCloud(p) for p in points]
+
+
+# The single shape formulations that the batched metrics replaced
+def _edges(s):
+    return np.max(s, axis=0) - np.min(s, axis=0)
+
+
+_bb_norms = {
+    'area': lambda s: np.prod(_edges(s)),
+    'perimeter': lambda s: 2 * np.sum(_edges(s)),
+    'avg_edge_length': lambda s: 0.5 * np.sum(_edges(s)),
+    'diagonal': lambda s: np.sqrt(np.sum(_edges(s) ** 2))}
+
+
+def _rmse(s, gt):
+    return np.sqrt(np.mean((s.ravel() - gt.ravel()) ** 2))
+
+
+def _euclidean(s, gt):
+    return np.mean(np.sqrt(np.sum((s - gt) ** 2, axis=-1)))
+
+
+def _pupils(_, gt):
+    # distance of the two first points of the ground truth shape
+    return _euclidean(gt[0], gt[1])
+
+
+def _check_batches(error_f, expected_f):
+    expected = np.array([expected_f(s, gt)
+                         for s, gt in zip(points, gt_points)])
+    assert_allclose([error_f(s, gt) for s, gt in zip(shapes, gt_shapes)],
+                    expected)
+    assert_allclose(error_f(points, gt_points), expected)
+    assert_allclose(error_f(shapes, gt_shapes), expected)
+
+
+def test_bb_normalisers_of_batches():
+    for norm_f, name in [(bb_area, 'area'), (bb_perimeter, 'perimeter'),
+                         (bb_avg_edge_length, 'avg_edge_length'),
+                         (bb_diagonal, 'diagonal')]:
+        expected = [_bb_norms[name](p) for p in gt_points]
+        assert_allclose([norm_f(s) for s in gt_shapes], expected)
+        assert_allclose(norm_f(gt_points), expected)
+        assert_allclose(norm_f(gt_shapes), expected)
+
+
+def test_errors_of_batches():
+    _check_batches(root_mean_square_error, _rmse)
+    _check_batches(euclidean_error, _euclidean)
+
+
+def test_bb_normalised_errors_of_batches():
+    for norm_type, norm_f in _bb_norms.items():
+        _check_batches(
+            lambda s, gt: root_mean_square_bb_normalised_error(
+                s, gt, norm_type=norm_type),
+            lambda s, gt: _rmse(s, gt) / norm_f(gt))
+        _check_batches(
+            lambda s, gt: euclidean_bb_normalised_error(
+                s, gt, norm_type=norm_type),
+            lambda s, gt: _euclidean(s, gt) / norm_f(gt))
+
+
+def test_distance_normalised_errors_of_batches():
+    def pupils(_, gt):
+        return distance_two_indices(0, 1, gt)
+    _check_batches(
+        lambda s, gt: root_mean_square_distance_normalised_error(s, gt,
+                                                                 pupils),
+        lambda s, gt: _rmse(s, gt) / _pupils(s, gt))
+    _check_batches(
+        lambda s, gt: euclidean_distance_normalised_error(s, gt, pupils),
+        lambda s, gt: _euclidean(s, gt) / _pupils(s, gt))
+
+
+def test_distance_indexed_normalised_errors_of_batches():
+    _check_batches(
+        lambda s, gt: root_mean_square_distance_indexed_normalised_error(
+            s, gt, 2, 7),
+        lambda s, gt: _rmse(s, gt) / _euclidean(gt[2], gt[7]))
+    _check_batches(
+        lambda s, gt: euclidean_distance_indexed_normalised_error(s, gt, 2,
+                                                                  7),
+        lambda s, gt: _euclidean(s, gt) / _euclidean(gt[2], gt[7]))
@@ -0,0 +1,122 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.shape import PointCloud
+
+from menpofit.error import (mean_pupil_68_error, mean_pupil_49_error,
+                            outer_eye_corner_68_euclidean_error,
+                            outer_eye_corner_51_euclidean_error,
+                            outer_eye_corner_49_euclidean_error,
+                            bb_avg_edge_length_68_euclidean_error,
+                            bb_avg_edge_length_49_euclidean_error)
+from menpofit.error.human.face import (_convert_68_to_51, _convert_68_to_49,
+                                       _convert_51_to_49)
+
+
+rng = np.random.RandomState(0)
+gt_points = rng.rand(5, 68, 2) * 100
+points = gt_points + rng.randn(5, 68, 2)
+
+
+# The single shape formulations that the batched metrics replaced
+def _old_68_to_49(p):
+    p = np.delete(p, 64, 0)
+    p = np.delete(p, 60, 0)
+    return p[17:]
+
+
+def _old_51_to_49(p):
+    p = np.delete(p, 47, 0)
+    p = np.delete(p, 43, 0)
+    return p
+
+
+def _euclidean(s, gt):
+    return np.mean(np.sqrt(np.sum((s - gt) ** 2, axis=-1)))
+
+
+def _pupils_distance(p, left_eye, right_eye):
+    return _euclidean(np.mean(p[left_eye], axis=0),
+                      np.mean(p[right_eye], axis=0))
+
+
+def _avg_edge_length(p):
+    return 0.5 * np.sum(np.max(p, axis=0) - np.min(p, axis=0))
+
+
+def _check_batches(error_f, expected_f, points, gt_points):
+    expected = np.array([expected_f(s, gt)
+                         for s, gt in zip(points, gt_points)])
+    shapes = [PointCloud(p) for p in points]
+    gt_shapes = [PointCloud(p) for p in gt_points]
+    assert_allclose([error_f(s, gt) for s, gt in zip(shapes, gt_shapes)],
+                    expected)
+    assert_allclose(error_f(points, gt_points), expected)
+    assert_allclose(error_f(shapes, gt_shapes), expected)
+
+
+def test_conversions_of_batches():
+    assert_allclose(_convert_68_to_49(points),
+                    [_old_68_to_49(p) for p in points])
+    assert_allclose(_convert_68_to_49(points[0]), _old_68_to_49(points[0]))
+    points_51 = _convert_68_to_51(points)
+    assert_allclose(points_51, points[:, 17:])
+    assert_allclose(_convert_51_to_49(points_51),
+                    [_old_51_to_49(p) for p in points_51])
+    # the 68 to 49 conversion is the same as converting through 51 points
+    assert_allclose(_convert_51_to_49(points_51), _convert_68_to_49(points))
+
+
+def test_mean_pupil_68_error_of_batches():
+    _check_batches(
+        mean_pupil_68_error,
+        lambda s, gt: _euclidean(s, gt) / _pupils_distance(
+            gt, slice(36, 42), slice(42, 48)),
+        points, gt_points)
+
+
+def test_mean_pupil_49_error_of_batches():
+    def expected(s, gt):
+        return _euclidean(s, gt) / _pupils_distance(
+            gt, slice(19, 25), slice(25, 31))
+    points_49 = [_old_68_to_49(p) for p in points]
+    gt_points_49 = [_old_68_to_49(p) for p in gt_points]
+    _check_batches(mean_pupil_49_error,
+                   lambda s, gt: expected(_old_68_to_49(s),
+                                          _old_68_to_49(gt)),
+                   points, gt_points)
+    # batches of 51 and 49 points
+    for convert in [_convert_68_to_51, _convert_68_to_49]:
+        assert_allclose(
+            mean_pupil_49_error(convert(points), convert(gt_points)),
+            [expected(s, gt) for s, gt in zip(points_49, gt_points_49)])
+
+
+def test_outer_eye_corner_errors_of_batches():
+    _check_batches(
+        outer_eye_corner_68_euclidean_error,
+        lambda s, gt: _euclidean(s, gt) / _euclidean(gt[36], gt[45]),
+        points, gt_points)
+    _check_batches(
+        outer_eye_corner_51_euclidean_error,
+        lambda s, gt: (_euclidean(s[17:], gt[17:]) /
+                       _euclidean(gt[17 + 19], gt[17 + 28])),
+        points, gt_points)
+    _check_batches(
+        outer_eye_corner_49_euclidean_error,
+        lambda s, gt: (_euclidean(_old_68_to_49(s), _old_68_to_49(gt)) /
+                       _euclidean(_old_68_to_49(gt)[19],
+                                  _old_68_to_49(gt)[28])),
+        points, gt_points)
+
+
+def test_bb_avg_edge_length_errors_of_batches():
+    _check_batches(
+        bb_avg_edge_length_68_euclidean_error,
+        lambda s, gt: _euclidean(s, gt) / _avg_edge_length(gt),
+        points, gt_points)
+    _check_batches(
+        bb_avg_edge_length_49_euclidean_error,
+        lambda s, gt: (_euclidean(_old_68_to_49(s), _old_68_to_49(gt)) /
+                       _avg_edge_length(gt)),
+        points, gt_points)
@@ -0,0 +1,73 @@
+from __future__ import division
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy.integrate import simps
+
+from menpofit.error import (compute_cumulative_error, mad,
+                            area_under_curve_and_failure_rate,
+                            compute_statistical_measures)
+from menpofit.error.stats import _sorted_median
+
+
+rng = np.random.RandomState(0)
+# rounded, so that there are ties and errors equal to the bins
+errors = np.round(rng.rand(41) * 0.1, 3)
+bins = np.arange(0., 0.1 + 0.005, 0.005)
+
+
+# The formulations that the sorted errors replaced
+def _old_cumulative_error(errors, bins):
+    n_errors = len(errors)
+    return [np.count_nonzero([errors <= x]) / n_errors for x in bins]
+
+
+def _old_auc_and_failure_rate(errors, step_error, max_error, min_error=0.):
+    x_axis = list(np.arange(min_error, max_error + step_error, step_error))
+    ced = np.array(_old_cumulative_error(errors, x_axis))
+    return simps(ced, x=x_axis) / max_error, 1. - ced[-1]
+
+
+def _old_statistical_measures(errors, step_error, max_error):
+    errors = np.asarray(errors)
+    median = np.median(errors)
+    return ((np.mean(errors), np.std(errors), median,
+             np.median(np.abs(errors - median)), np.max(errors)) +
+            _old_auc_and_failure_rate(errors, step_error, max_error))
+
+
+def test_cumulative_error():
+    expected = _old_cumulative_error(errors, bins)
+    assert_allclose(compute_cumulative_error(errors, bins), expected)
+    assert_allclose(compute_cumulative_error(list(errors), list(bins)),
+                    expected)
+    assert_allclose(compute_cumulative_error(errors[::-1], bins), expected)
+
+
+def test_area_under_curve_and_failure_rate():
+    for max_error in [0.05, 0.1]:
+        assert_allclose(
+            area_under_curve_and_failure_rate(errors, 0.005, max_error),
+            _old_auc_and_failure_rate(errors, 0.005, max_error))
+
+
+def test_sorted_median():
+    # odd and even number of errors
+    for n_errors in [1, 2, 7, 8, 41]:
+        e = errors[:n_errors]
+        assert_allclose(_sorted_median(np.sort(e)), np.median(e))
+
+
+def test_statistical_measures():
+    # odd and even number of errors
+    for e in [errors, errors[:-1], list(errors[:10])]:
+        assert_allclose(compute_statistical_measures(e, 0.005, 0.08),
+                        _old_statistical_measures(e, 0.005, 0.08))
+        assert_allclose(mad(e), _old_statistical_measures(e, 0.005, 0.08)[3])
+
+
+def test_statistical_measures_of_multiple_methods():
+    methods_errors = [errors, errors[:-1] * 0.5, list(errors[:10])]
+    measures = compute_statistical_measures(methods_errors, 0.005, 0.08)
+    expected = [_old_statistical_measures(e, 0.005, 0.08)
+                for e in methods_errors]
+    assert_allclose(np.array(measures).T, expected)
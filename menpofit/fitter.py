@@ -4,6 +4,7 @@ import numpy as np
 import warnings
 
 from menpo.base import name_of_callable
+from menpo.image import Image
 from menpo.shape import PointCloud
 from menpo.transform import (scale_about_centre, rotate_ccw_about_centre,
                              Translation, Scale, AlignmentAffine,
@@ -11,6 +12,7 @@ from menpo.transform import (scale_about_centre, rotate_ccw_about_centre,
 
 from menpofit.base import MenpoFitCostsWarning
 import menpofit.checks as checks
+from menpofit.profiling import StageProfiler, stage, set_scale
 from menpofit.visualize import print_progress
 from menpofit.result import (MultiScaleNonParametricIterativeResult,
                              MultiScaleParametricIterativeResult)
@@ -295,11 +297,51 @@ class MultiScaleNonParametricFitter(object):
         """
         return self._holistic_features
 
-    def _prepare_image(self, image, initial_shape, gt_shape=None):
+    def profile(self, trace_memory=False, per_iteration=True, callbacks=None):
+        r"""
+        Returns a profiler that, while active, records the wall time, the
+        number of calls and the allocated bytes of each stage of the fitting
+        procedure (feature extraction, warping, gradients, linear solves,
+        etc.) per scale and per iteration. When no profiler is active, the
+        stages are not measured at all.
+
+        Parameters
+        ----------
+        trace_memory : `bool`, optional
+            If ``True``, then the net allocated bytes of each stage are
+            measured with `tracemalloc`, which slows down the fitting.
+        per_iteration : `bool`, optional
+            If ``True``, then the stages are aggregated per iteration.
+            Otherwise, they are aggregated per scale.
+        callbacks : `list` of `callable` or ``None``, optional
+            Functions that are called after each execution of a stage as
+            ``callback(scale, iteration, stage, seconds, nbytes)``, e.g. in
+            order to forward the measurements to a metrics system.
+
+        Returns
+        -------
+        profiler : :map:`StageProfiler`
+            The profiler, to be used as a context manager.
+
+        Examples
+        --------
+        ::
+
+            with fitter.profile() as profiler:
+                fitter.fit_from_bb(image, bounding_box)
+            print(profiler)
+        """
+        return StageProfiler(trace_memory=trace_memory,
+                             per_iteration=per_iteration, callbacks=callbacks)
+
+    def _prepare_image(self, image, initial_shape, gt_shape=None,
+                       crop_proportion=None, first_scale=0):
         r"""
         Function the performs pre-processing on the image to be fitted. This
         involves the following steps:
 
+            0. Optionally, crop the image around the initial (and ground truth)
+               shape.
             1. Rescale image wrt the scale factor between the reference_shape
                and the initial_shape.
             2. For each scale:
@@ -318,6 +360,14 @@ class MultiScaleNonParametricFitter(object):
             will start.
         gt_shape : `menpo.shape.PointCloud`, optional
             The ground truth shape associated to the image.
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped to the bounding box of
+            the initial (and ground truth) shape, padded by this proportion of
+            the box's size, before any rescaling and feature extraction.
+        first_scale : `int`, optional
+            The index of the first scale to be prepared. The coarser scales are
+            skipped, i.e. their features are not computed and all the returned
+            lists only refer to the scales ``first_scale`` to ``n_scales - 1``.
 
         Returns
         -------
@@ -339,10 +389,24 @@ class MultiScaleNonParametricFitter(object):
         if gt_shape:
             image.landmarks['__gt_shape'] = gt_shape
 
+        # Crop image around the shapes, so that the features are not computed
+        # on the whole frame. Note that the cropping is captured by the affine
+        # transforms below, since they are estimated wrt the initial_shape in
+        # the original image space.
+        if crop_proportion is not None:
+            crop_shape = initial_shape
+            if gt_shape:
+                crop_shape = PointCloud(np.vstack((initial_shape.points,
+                                                   gt_shape.points)))
+            tmp_image = image.crop_to_pointcloud_proportion(crop_shape,
+                                                            crop_proportion)
+        else:
+            tmp_image = image
+
         # Rescale image wrt the scale factor between reference_shape and
         # initial_shape
-        tmp_image = image.rescale_to_pointcloud(self.reference_shape,
-                                                group='__initial_shape')
+        tmp_image = tmp_image.rescale_to_pointcloud(self.reference_shape,
+                                                    group='__initial_shape')
 
         # For each scale:
         #     1. Compute features
@@ -353,14 +417,16 @@ class MultiScaleNonParametricFitter(object):
         images = []
         affine_transforms = []
         scale_transforms = []
-        for i in range(self.n_scales):
+        for i in range(first_scale, self.n_scales):
+            set_scale(i)
             # Extract features
-            if (i == 0 or
+            if (i == first_scale or
                     self.holistic_features[i] != self.holistic_features[i - 1]):
                 # Compute features only if this is the first pass through
                 # the loop or the features at this scale are different from
                 # the features at the previous scale
-                feature_image = self.holistic_features[i](tmp_image)
+                with stage('features'):
+                    feature_image = self.holistic_features[i](tmp_image)
 
                 # Until now, we have introduced an affine transform that
                 # consists of the image rescale to the reference shape,
@@ -379,8 +445,9 @@ class MultiScaleNonParametricFitter(object):
             # Rescale images according to scales
             if self.scales[i] != 1:
                 # Scale feature images only if scale is different than 1
-                scaled_image, scale_transform = feature_image.rescale(
-                    self.scales[i], return_transform=True)
+                with stage('rescale'):
+                    scaled_image, scale_transform = feature_image.rescale(
+                        self.scales[i], return_transform=True)
             else:
                 # Otherwise the image remains the same and the transform is the
                 # identity matrix.
@@ -410,8 +477,68 @@ class MultiScaleNonParametricFitter(object):
         return (images, initial_shapes, gt_shapes, affine_transforms,
                 scale_transforms)
 
+    def _shape_to_next_scale(self, i, shape, affine_transforms,
+                             scale_transforms):
+        r"""
+        Function that maps a shape estimated at scale `i` to the image space of
+        scale `i + 1`.
+
+        Parameters
+        ----------
+        i : `int`
+            The index of the current scale.
+        shape : `menpo.shape.PointCloud`
+            The shape estimate at the current scale.
+        affine_transforms : `list` of `menpo.transform.Affine`
+            The list of affine transforms per scale that are the inverses of the
+            transformations introduced by the rescale wrt the reference shape as
+            well as the feature extraction.
+        scale_transforms : `list` of `menpo.shape.Scale`
+            The list of inverse scaling transforms per scale.
+
+        Returns
+        -------
+        shape : `menpo.shape.PointCloud`
+            The shape estimate in the image space of the next scale.
+        """
+        if self.holistic_features[i + 1] != self.holistic_features[i]:
+            # If the features function of the current scale is different
+            # than the one of the next scale, this means that the affine
+            # transform is different as well. Thus we need to do the
+            # following composition:
+            #
+            #    S_{i+1} \circ A_{i+1} \circ inv(A_i) \circ inv(S_i)
+            #
+            # where:
+            #    S_i : scaling transform of current scale
+            #    S_{i+1} : scaling transform of next scale
+            #    A_i : affine transform of current scale
+            #    A_{i+1} : affine transform of next scale
+            t1 = scale_transforms[i].compose_after(affine_transforms[i])
+            t2 = affine_transforms[i + 1].pseudoinverse().compose_after(t1)
+            transform = scale_transforms[i + 1].pseudoinverse().compose_after(t2)
+            shape = transform.apply(shape)
+        elif (self.holistic_features[i + 1] == self.holistic_features[i] and
+              self.scales[i] != self.scales[i + 1]):
+            # If the features function of the current scale is the same
+            # as the one of the next scale, this means that the affine
+            # transform is the same as well, and thus can be omitted.
+            # Given that the scale factors are different, we need to do
+            # the # following composition:
+            #
+            #    S_{i+1} \circ inv(S_i)
+            #
+            # where:
+            #    S_i : scaling transform of current scale
+            #    S_{i+1} : scaling transform of next scale
+            transform = scale_transforms[i + 1].pseudoinverse().compose_after(scale_transforms[i])
+            shape = transform.apply(shape)
+
+        return shape
+
     def _fit(self, images, initial_shape, affine_transforms, scale_transforms,
-             gt_shapes=None, max_iters=20, return_costs=False, **kwargs):
+             gt_shapes=None, max_iters=20, return_costs=False, first_scale=0,
+             **kwargs):
         r"""
         Function the applies the multi-scale fitting procedure on an image, given
         the initial shape.
@@ -442,6 +569,11 @@ class MultiScaleNonParametricFitter(object):
             computation increases the computational cost of the fitting. The
             additional computation cost depends on the fitting method. Only
             use this option for research purposes.*
+        first_scale : `int`, optional
+            The index of the scale from which the fitting starts. The provided
+            lists of images, transforms and ground truth shapes must only refer
+            to the scales ``first_scale`` to ``n_scales - 1``, as returned by
+            :meth:`_prepare_image` with the same `first_scale`.
         kwargs : `dict`, optional
             Additional keyword arguments that can be passed to specific
             implementations.
@@ -449,7 +581,7 @@ class MultiScaleNonParametricFitter(object):
         Returns
         -------
         algorithm_results : `list` of :map:`NonParametricIterativeResult` or subclass
-            The list of fitting result per scale.
+            The list of fitting result per fitted scale.
         """
         # Check max iters
         max_iters = checks.check_max_iters(max_iters, self.n_scales)
@@ -458,62 +590,140 @@ class MultiScaleNonParametricFitter(object):
         shape = initial_shape
         gt_shape = None
 
+        # The per scale lists skip the first_scale coarsest scales, so they are
+        # padded in order to be indexed by the scale index
+        padding = [None] * first_scale
+        images = padding + list(images)
+        affine_transforms = padding + list(affine_transforms)
+        scale_transforms = padding + list(scale_transforms)
+        if gt_shapes is not None:
+            gt_shapes = padding + list(gt_shapes)
+
         # Initialize list of algorithm results
         algorithm_results = []
-        for i in range(self.n_scales):
+        for i in range(first_scale, self.n_scales):
             # Handle ground truth shape
             if gt_shapes is not None:
                 gt_shape = gt_shapes[i]
 
             # Run algorithm
-            algorithm_result = self.algorithms[i].run(images[i], shape,
-                                                      gt_shape=gt_shape,
-                                                      max_iters=max_iters[i],
-                                                      return_costs=return_costs,
-                                                      **kwargs)
+            set_scale(i)
+            with stage('run'):
+                algorithm_result = self.algorithms[i].run(
+                    images[i], shape, gt_shape=gt_shape,
+                    max_iters=max_iters[i], return_costs=return_costs,
+                    **kwargs)
             # Add algorithm result to the list
             algorithm_results.append(algorithm_result)
 
             # Prepare this scale's final shape for the next scale
             if i < self.n_scales - 1:
                 # This should not be done for the last scale.
-                shape = algorithm_result.final_shape
-                if self.holistic_features[i + 1] != self.holistic_features[i]:
-                    # If the features function of the current scale is different
-                    # than the one of the next scale, this means that the affine
-                    # transform is different as well. Thus we need to do the
-                    # following composition:
-                    #
-                    #    S_{i+1} \circ A_{i+1} \circ inv(A_i) \circ inv(S_i)
-                    #
-                    # where:
-                    #    S_i : scaling transform of current scale
-                    #    S_{i+1} : scaling transform of next scale
-                    #    A_i : affine transform of current scale
-                    #    A_{i+1} : affine transform of next scale
-                    t1 = scale_transforms[i].compose_after(affine_transforms[i])
-                    t2 = affine_transforms[i + 1].pseudoinverse().compose_after(t1)
-                    transform = scale_transforms[i + 1].pseudoinverse().compose_after(t2)
-                    shape = transform.apply(shape)
-                elif (self.holistic_features[i + 1] == self.holistic_features[i] and
-                      self.scales[i] != self.scales[i + 1]):
-                    # If the features function of the current scale is the same
-                    # as the one of the next scale, this means that the affine
-                    # transform is the same as well, and thus can be omitted.
-                    # Given that the scale factors are different, we need to do
-                    # the # following composition:
-                    #
-                    #    S_{i+1} \circ inv(S_i)
-                    #
-                    # where:
-                    #    S_i : scaling transform of current scale
-                    #    S_{i+1} : scaling transform of next scale
-                    transform = scale_transforms[i + 1].pseudoinverse().compose_after(scale_transforms[i])
-                    shape = transform.apply(shape)
+                shape = self._shape_to_next_scale(
+                    i, algorithm_result.final_shape, affine_transforms,
+                    scale_transforms)
 
         # Return list of algorithm results
         return algorithm_results
 
+    def _fit_batch(self, images, initial_shapes, affine_transforms,
+                   scale_transforms, gt_shapes=None, max_iters=20,
+                   return_costs=False, **kwargs):
+        r"""
+        Function the applies the multi-scale fitting procedure on a batch of
+        images, given their initial shapes. At each scale, the whole batch is
+        passed to the algorithm's ``run_batch`` method, if it exists, so that
+        the per-iteration linear algebra can be performed on stacked arrays.
+        Otherwise, the algorithm's ``run`` method is called on each sample.
+
+        Parameters
+        ----------
+        images : `list` of `list` of `menpo.image.Image`
+            The list of images per scale for each sample.
+        initial_shapes : `list` of `menpo.shape.PointCloud`
+            The initial shape estimate of each sample.
+        affine_transforms : `list` of `list` of `menpo.transform.Affine`
+            The list of affine transforms per scale for each sample.
+        scale_transforms : `list` of `list` of `menpo.shape.Scale`
+            The list of inverse scaling transforms per scale for each sample.
+        gt_shapes : `list` of (`list` of `menpo.shape.PointCloud` or ``None``)
+            The list of ground truth shapes per scale for each sample.
+        max_iters : `int` or `list` of `int`, optional
+            The maximum number of iterations. If `int`, then it specifies the
+            maximum number of iterations over all scales. If `list` of `int`,
+            then specifies the maximum number of iterations per scale.
+        return_costs : `bool`, optional
+            If ``True``, then the cost function values will be computed
+            during the fitting procedure.
+        kwargs : `dict`, optional
+            Additional keyword arguments that can be passed to specific
+            implementations.
+
+        Returns
+        -------
+        algorithm_results : `list` of `list` of :map:`NonParametricIterativeResult` or subclass
+            The list of fitting result per scale for each sample.
+        """
+        # Check max iters
+        max_iters = checks.check_max_iters(max_iters, self.n_scales)
+        n_samples = len(images)
+        if gt_shapes is None:
+            gt_shapes = [None] * n_samples
+
+        shapes = list(initial_shapes)
+        algorithm_results = [[] for _ in range(n_samples)]
+        for i in range(self.n_scales):
+            scale_images = [ims[i] for ims in images]
+            scale_gt_shapes = [None if g is None else g[i] for g in gt_shapes]
+
+            # Run algorithm
+            algorithm = self.algorithms[i]
+            set_scale(i)
+            with stage('run'):
+                if hasattr(algorithm, 'run_batch'):
+                    results = algorithm.run_batch(scale_images, shapes,
+                                                  gt_shapes=scale_gt_shapes,
+                                                  max_iters=max_iters[i],
+                                                  return_costs=return_costs,
+                                                  **kwargs)
+                else:
+                    results = [algorithm.run(im, s, gt_shape=g,
+                                             max_iters=max_iters[i],
+                                             return_costs=return_costs,
+                                             **kwargs)
+                               for im, s, g in zip(scale_images, shapes,
+                                                   scale_gt_shapes)]
+
+            for j, r in enumerate(results):
+                # Add algorithm result to the list
+                algorithm_results[j].append(r)
+                # Prepare this scale's final shape for the next scale
+                if i < self.n_scales - 1:
+                    shapes[j] = self._shape_to_next_scale(
+                        i, r.final_shape, affine_transforms[j],
+                        scale_transforms[j])
+
+        return algorithm_results
+
+    def _result_scales(self, algorithm_results):
+        r"""
+        Returns the scales that correspond to a list of algorithm results.
+        Those are all the scales, unless the fitting started from a finer scale
+        (see the `first_scale` argument of :meth:`_fit`), in which case the
+        results refer to the finest scales only.
+
+        Parameters
+        ----------
+        algorithm_results : `list` of :map:`NonParametricIterativeResult` or subclass
+            The list of fitting result per fitted scale.
+
+        Returns
+        -------
+        scales : `list` of `int` or `float`
+            The scales of the results.
+        """
+        return self.scales[self.n_scales - len(algorithm_results):]
+
     def _fitter_result(self, image, algorithm_results, affine_transforms,
                        scale_transforms, gt_shape=None):
         r"""
@@ -541,12 +751,14 @@ class MultiScaleNonParametricFitter(object):
             procedure.
         """
         return MultiScaleNonParametricIterativeResult(
-            results=algorithm_results, scales=self.scales,
+            results=algorithm_results,
+            scales=self._result_scales(algorithm_results),
             affine_transforms=affine_transforms,
             scale_transforms=scale_transforms, image=image, gt_shape=gt_shape)
 
     def fit_from_shape(self, image, initial_shape, max_iters=20, gt_shape=None,
-                       return_costs=False, **kwargs):
+                       return_costs=False, crop_proportion=None,
+                       result_mode='full', **kwargs):
         r"""
         Fits the multi-scale fitter to an image given an initial shape.
 
@@ -570,6 +782,21 @@ class MultiScaleNonParametricFitter(object):
             computation increases the computational cost of the fitting. The
             additional computation cost depends on the fitting method. Only
             use this option for research purposes.*
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial (and
+            ground truth) shape before being rescaled and having its features
+            extracted, which can save a lot of computation for large images.
+            The value defines the padding around the shape as a proportion of
+            its size. The returned result is still expressed in the original
+            image coordinates.
+        result_mode : ``{'full', 'trajectory', 'final'}``, optional
+            If ``'full'``, then the returned result stores a copy of the image
+            and all the shapes and parameters of the fitting iterations. If
+            ``'trajectory'``, then the image is not stored and the shapes (and
+            parameters) of the iterations are stored as compact ``float32``
+            arrays. If ``'final'``, then only the initial and final shapes and
+            parameters are kept in that form. The compact modes reduce the
+            memory and pickling costs of keeping large numbers of results.
         kwargs : `dict`, optional
             Additional keyword arguments that can be passed to specific
             implementations.
@@ -580,6 +807,8 @@ class MultiScaleNonParametricFitter(object):
             The multi-scale fitting result containing the result of the fitting
             procedure.
         """
+        result_mode = checks.check_result_mode(result_mode)
+
         # Generate the list of images to be fitted, as well as the correctly
         # scaled initial and ground truth shapes per level. The function also
         # returns the lists of affine and scale transforms per level that are
@@ -590,8 +819,9 @@ class MultiScaleNonParametricFitter(object):
         # transforms are the Scale objects that correspond to each level's
         # scale.
         (images, initial_shapes, gt_shapes, affine_transforms,
-         scale_transforms) = self._prepare_image(image, initial_shape,
-                                                 gt_shape=gt_shape)
+         scale_transforms) = self._prepare_image(
+            image, initial_shape, gt_shape=gt_shape,
+            crop_proportion=crop_proportion)
 
         # Execute multi-scale fitting
         algorithm_results = self._fit(images=images,
@@ -601,15 +831,21 @@ class MultiScaleNonParametricFitter(object):
                                       max_iters=max_iters, gt_shapes=gt_shapes,
                                       return_costs=return_costs, **kwargs)
 
-        # Return multi-scale fitting result
-        return self._fitter_result(image=image,
-                                   algorithm_results=algorithm_results,
-                                   affine_transforms=affine_transforms,
-                                   scale_transforms=scale_transforms,
-                                   gt_shape=gt_shape)
+        # Return multi-scale fitting result. The image is not passed to the
+        # result at all unless it is kept, in order to avoid copying it.
+        set_scale(None)
+        with stage('result'):
+            result = self._fitter_result(
+                image=image if result_mode == 'full' else None,
+                algorithm_results=algorithm_results,
+                affine_transforms=affine_transforms,
+                scale_transforms=scale_transforms, gt_shape=gt_shape)
+            result._compact(result_mode)
+        return result
 
     def fit_from_bb(self, image, bounding_box, max_iters=20, gt_shape=None,
-                    return_costs=False, **kwargs):
+                    return_costs=False, crop_proportion=None,
+                    result_mode='full', **kwargs):
         r"""
         Fits the multi-scale fitter to an image given an initial bounding box.
 
@@ -634,6 +870,21 @@ class MultiScaleNonParametricFitter(object):
             computation increases the computational cost of the fitting. The
             additional computation cost depends on the fitting method. Only
             use this option for research purposes.*
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial (and
+            ground truth) shape before being rescaled and having its features
+            extracted, which can save a lot of computation for large images.
+            The value defines the padding around the shape as a proportion of
+            its size. The returned result is still expressed in the original
+            image coordinates.
+        result_mode : ``{'full', 'trajectory', 'final'}``, optional
+            If ``'full'``, then the returned result stores a copy of the image
+            and all the shapes and parameters of the fitting iterations. If
+            ``'trajectory'``, then the image is not stored and the shapes (and
+            parameters) of the iterations are stored as compact ``float32``
+            arrays. If ``'final'``, then only the initial and final shapes and
+            parameters are kept in that form. The compact modes reduce the
+            memory and pickling costs of keeping large numbers of results.
         kwargs : `dict`, optional
             Additional keyword arguments that can be passed to specific
             implementations.
@@ -648,7 +899,179 @@ class MultiScaleNonParametricFitter(object):
                                                       bounding_box)
         return self.fit_from_shape(image=image, initial_shape=initial_shape,
                                    max_iters=max_iters, gt_shape=gt_shape,
-                                   return_costs=return_costs, **kwargs)
+                                   return_costs=return_costs,
+                                   crop_proportion=crop_proportion,
+                                   result_mode=result_mode, **kwargs)
+
+    def fit_from_shapes(self, images, initial_shapes, max_iters=20,
+                        gt_shapes=None, return_costs=False,
+                        crop_proportion=None, result_mode='full', **kwargs):
+        r"""
+        Fits the multi-scale fitter to a batch of images given their initial
+        shapes. The samples are fitted together, scale by scale, which allows
+        algorithms that support it to solve the per-iteration linear systems
+        of all the active samples at once. Samples that converge drop out of
+        the active batch.
+
+        Note that currently only the AAM
+        :map:`ProjectOutInverseCompositional` algorithm fits the batch
+        jointly (through its ``run_batch`` method). All the other algorithms
+        fit the samples one after the other with their ``run`` method, hence
+        they return the same results as :meth:`fit_from_shape` without any
+        speed-up.
+
+        Parameters
+        ----------
+        images : `list` of `menpo.image.Image` or `menpo.image.Image`
+            The images to be fitted, one per initial shape. If a single image
+            is provided, then all the initial shapes are fitted on it.
+        initial_shapes : `list` of `menpo.shape.PointCloud`
+            The initial shape estimates from which the fitting procedure
+            will start.
+        max_iters : `int` or `list` of `int`, optional
+            The maximum number of iterations. If `int`, then it specifies the
+            maximum number of iterations over all scales. If `list` of `int`,
+            then specifies the maximum number of iterations per scale.
+        gt_shapes : `list` of `menpo.shape.PointCloud` or ``None``, optional
+            The ground truth shapes associated to the images.
+        return_costs : `bool`, optional
+            If ``True``, then the cost function values will be computed
+            during the fitting procedure. Then these cost values will be
+            assigned to the returned fitting results. *Note that the costs
+            computation increases the computational cost of the fitting. The
+            additional computation cost depends on the fitting method. Only
+            use this option for research purposes.*
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial (and
+            ground truth) shapes before being rescaled and having its features
+            extracted, which can save a lot of computation for large images.
+            The value defines the padding around the shapes as a proportion of
+            their size. The returned results are still expressed in the original
+            image coordinates.
+        result_mode : ``{'full', 'trajectory', 'final'}``, optional
+            If ``'full'``, then the returned results store a copy of the image
+            and all the shapes and parameters of the fitting iterations. If
+            ``'trajectory'``, then the image is not stored and the shapes (and
+            parameters) of the iterations are stored as compact ``float32``
+            arrays. If ``'final'``, then only the initial and final shapes and
+            parameters are kept in that form. The compact modes reduce the
+            memory and pickling costs of keeping large numbers of results.
+        kwargs : `dict`, optional
+            Additional keyword arguments that can be passed to specific
+            implementations.
+
+        Returns
+        -------
+        fitting_results : `list` of :map:`MultiScaleNonParametricIterativeResult` or subclass
+            The multi-scale fitting result of each sample, in the order of the
+            provided initial shapes.
+        """
+        result_mode = checks.check_result_mode(result_mode)
+        n_samples = len(initial_shapes)
+        if isinstance(images, Image):
+            images = [images] * n_samples
+        if gt_shapes is None:
+            gt_shapes = [None] * n_samples
+        if len(images) != n_samples or len(gt_shapes) != n_samples:
+            raise ValueError('The number of images ({}) and ground truth '
+                             'shapes ({}) must match the number of initial '
+                             'shapes ({})'.format(len(images), len(gt_shapes),
+                                                  n_samples))
+
+        # Prepare the images of each sample (see fit_from_shape)
+        prepared = [self._prepare_image(im, s, gt_shape=g,
+                                        crop_proportion=crop_proportion)
+                    for im, s, g in zip(images, initial_shapes, gt_shapes)]
+        (scale_images, scale_initial_shapes, scale_gt_shapes,
+         affine_transforms, scale_transforms) = zip(*prepared)
+
+        # Execute multi-scale fitting on the whole batch
+        algorithm_results = self._fit_batch(
+            images=scale_images,
+            initial_shapes=[s[0] for s in scale_initial_shapes],
+            affine_transforms=affine_transforms,
+            scale_transforms=scale_transforms, gt_shapes=scale_gt_shapes,
+            max_iters=max_iters, return_costs=return_costs, **kwargs)
+
+        # Return multi-scale fitting results
+        results = []
+        set_scale(None)
+        for im, r, a, t, g in zip(images, algorithm_results, affine_transforms,
+                                  scale_transforms, gt_shapes):
+            with stage('result'):
+                result = self._fitter_result(
+                    image=im if result_mode == 'full' else None,
+                    algorithm_results=r, affine_transforms=a,
+                    scale_transforms=t, gt_shape=g)
+                result._compact(result_mode)
+            results.append(result)
+        return results
+
+    def fit_from_bbs(self, images, bounding_boxes, max_iters=20,
+                     gt_shapes=None, return_costs=False, crop_proportion=None,
+                     result_mode='full', **kwargs):
+        r"""
+        Fits the multi-scale fitter to a batch of images given their initial
+        bounding boxes. See :meth:`fit_from_shapes` for details on the batched
+        fitting procedure and on the algorithms that fit the batch jointly
+        (currently only the AAM :map:`ProjectOutInverseCompositional`).
+
+        Parameters
+        ----------
+        images : `list` of `menpo.image.Image` or `menpo.image.Image`
+            The images to be fitted, one per bounding box. If a single image
+            is provided, then all the bounding boxes are fitted on it.
+        bounding_boxes : `list` of `menpo.shape.PointDirectedGraph`
+            The initial bounding boxes from which the fitting procedure will
+            start. Note that the bounding boxes are used in order to align the
+            model's reference shape.
+        max_iters : `int` or `list` of `int`, optional
+            The maximum number of iterations. If `int`, then it specifies the
+            maximum number of iterations over all scales. If `list` of `int`,
+            then specifies the maximum number of iterations per scale.
+        gt_shapes : `list` of `menpo.shape.PointCloud` or ``None``, optional
+            The ground truth shapes associated to the images.
+        return_costs : `bool`, optional
+            If ``True``, then the cost function values will be computed
+            during the fitting procedure. Then these cost values will be
+            assigned to the returned fitting results. *Note that the costs
+            computation increases the computational cost of the fitting. The
+            additional computation cost depends on the fitting method. Only
+            use this option for research purposes.*
+        crop_proportion : `float` or ``None``, optional
+            If not ``None``, then the image is cropped around the initial (and
+            ground truth) shapes before being rescaled and having its features
+            extracted, which can save a lot of computation for large images.
+            The value defines the padding around the shapes as a proportion of
+            their size. The returned results are still expressed in the original
+            image coordinates.
+        result_mode : ``{'full', 'trajectory', 'final'}``, optional
+            If ``'full'``, then the returned results store a copy of the image
+            and all the shapes and parameters of the fitting iterations. If
+            ``'trajectory'``, then the image is not stored and the shapes (and
+            parameters) of the iterations are stored as compact ``float32``
+            arrays. If ``'final'``, then only the initial and final shapes and
+            parameters are kept in that form. The compact modes reduce the
+            memory and pickling costs of keeping large numbers of results.
+        kwargs : `dict`, optional
+            Additional keyword arguments that can be passed to specific
+            implementations.
+
+        Returns
+        -------
+        fitting_results : `list` of :map:`MultiScaleNonParametricIterativeResult` or subclass
+            The multi-scale fitting result of each sample, in the order of the
+            provided bounding boxes.
+        """
+        initial_shapes = [align_shape_with_bounding_box(self.reference_shape,
+                                                        bb)
+                          for bb in bounding_boxes]
+        return self.fit_from_shapes(images=images,
+                                    initial_shapes=initial_shapes,
+                                    max_iters=max_iters, gt_shapes=gt_shapes,
+                                    return_costs=return_costs,
+                                    crop_proportion=crop_proportion,
+                                    result_mode=result_mode, **kwargs)
 
 
 class MultiScaleParametricFitter(MultiScaleNonParametricFitter):
@@ -710,7 +1133,8 @@ class MultiScaleParametricFitter(MultiScaleNonParametricFitter):
             procedure.
         """
         return MultiScaleParametricIterativeResult(
-            results=algorithm_results, scales=self.scales,
+            results=algorithm_results,
+            scales=self._result_scales(algorithm_results),
             affine_transforms=affine_transforms,
             scale_transforms=scale_transforms, image=image, gt_shape=gt_shape)
 
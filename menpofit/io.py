@@ -1,6 +1,8 @@
 from __future__ import absolute_import  # or menpofit.math causes trouble!
 from math import ceil
+import multiprocessing
 import sys
+import threading
 
 try:
     from urllib2 import urlopen  # Py2
@@ -9,7 +11,7 @@ except ImportError:
 
 from menpo.io import import_pickle
 
-from menpofit.base import menpofit_src_dir_path
+from menpofit.base import can_fork, menpofit_src_dir_path, process_pool
 
 # The remote URL that should be queried to download pre-trained models
 MENPO_URL = 'http://static.menpo.org'
@@ -174,6 +176,11 @@ class PickleWrappedFitter(object):
                  fit_from_bb_kwargs, fit_from_shape_kwargs,
                  image_preprocess=image_greyscale_crop_preprocess):
         self.wrapped_fitter = fitter_cls(*fitter_args, **fitter_kwargs)
+        # Keep the (compact) construction arguments, so that worker processes
+        # that cannot inherit this object can rebuild it (see fit_many)
+        self._fitter_spec = (fitter_cls, fitter_args, fitter_kwargs,
+                             fit_from_bb_kwargs, fit_from_shape_kwargs,
+                             image_preprocess)
         self._fit_from_bb_kwargs = fit_from_bb_kwargs
         self._fit_from_shape_kwargs = fit_from_shape_kwargs
         self._image_preprocess = image_preprocess
@@ -218,12 +225,17 @@ class PickleWrappedFitter(object):
             result = self.wrapped_fitter.fit_from_bb(
                 proc_image, trans.pseudoinverse().apply(bounding_box),
                 **final_kwargs)
-            # update result attributes
-            result._image = image
+            # update result attributes (the image and the compact storage
+            # of the shapes of results with a result_mode are preserved)
+            if result.image is not None:
+                result._image = image
             result._final_shape = trans.apply(result.final_shape)
             result._initial_shape = trans.apply(result.initial_shape)
             if result.is_iterative:
+                compact = not isinstance(result._shapes, list)
                 result._shapes = [trans.apply(s) for s in result.shapes]
+                if compact:
+                    result._compact('trajectory')
         return result
 
     def fit_from_shape(self, image, initial_shape, **kwargs):
@@ -265,14 +277,135 @@ class PickleWrappedFitter(object):
             result = self.wrapped_fitter.fit_from_shape(
                 proc_image, trans.pseudoinverse().apply(initial_shape),
                 **final_kwargs)
-            # update result attributes
-            result._image = image
+            # update result attributes (the image and the compact storage
+            # of the shapes of results with a result_mode are preserved)
+            if result.image is not None:
+                result._image = image
             result._final_shape = trans.apply(result.final_shape)
             result._initial_shape = trans.apply(result.initial_shape)
             if result.is_iterative:
+                compact = not isinstance(result._shapes, list)
                 result._shapes = [trans.apply(s) for s in result.shapes]
+                if compact:
+                    result._compact('trajectory')
         return result
 
+    def fit_many(self, images, initialisations, from_shape=False,
+                 n_workers=None, ordered=True, max_pending=None, **kwargs):
+        r"""
+        Fits the fitter to a stream of images using a pool of worker
+        processes. The fitter is sent to each worker only once: on platforms
+        that support ``fork`` the workers inherit the already constructed
+        fitter, otherwise each worker rebuilds it once from the compact
+        construction arguments of this object. The images are then streamed
+        to the workers and the results are streamed back.
+
+        Parameters
+        ----------
+        images : `iterable` of `menpo.image.Image` or subclass
+            The images to be fitted. It can be a lazy iterable (e.g. a
+            generator), as only up to `max_pending` images are consumed ahead
+            of the returned results.
+        initialisations : `iterable` of `menpo.shape.PointCloud`
+            The initial bounding box (or initial shape if `from_shape` is
+            ``True``) of each image.
+        from_shape : `bool`, optional
+            If ``True``, then `fit_from_shape` is used. Otherwise, the fitting
+            is performed with `fit_from_bb`.
+        n_workers : `int` or ``None``, optional
+            The number of worker processes. If ``None``, then the number of
+            CPUs is used.
+        ordered : `bool`, optional
+            If ``True``, then the results are returned in the order of the
+            provided images. Otherwise, they are returned as soon as they are
+            computed, together with the index of the corresponding image.
+        max_pending : `int` or ``None``, optional
+            The maximum number of images that are submitted to the workers but
+            whose results have not been returned yet. It bounds the memory
+            used by the pipeline. If ``None``, then it is set to twice the
+            number of workers.
+        kwargs : `dict`, optional
+            Other kwargs to override the optimal defaults of the fit method.
+
+        Yields
+        ------
+        fitting_result : ``FittingResult`` or subclass or (`int`, ``FittingResult``)
+            The fitting result of each image. If `ordered` is ``False``, then
+            the index of the image is returned along with its result.
+
+        Examples
+        --------
+
+        .. code-block:: python
+
+            from menpofit.io import load_fitter
+
+            fitter = load_fitter('balanced_frontal_face_aam')
+            for result in fitter.fit_many(images, bounding_boxes, n_workers=8):
+                print(result.final_shape)
+        """
+        global _worker_fitter
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        if max_pending is None:
+            max_pending = 2 * n_workers
+        method = 'fit_from_shape' if from_shape else 'fit_from_bb'
+
+        fork = can_fork()
+        if fork:
+            # The workers inherit the constructed fitter
+            _worker_fitter = self
+            fitter_spec = None
+        else:
+            # The workers construct the fitter once at start up
+            fitter_spec = self._fitter_spec
+        pool = process_pool(n_workers, fork=fork,
+                            initializer=_initialise_fit_worker,
+                            initargs=(fitter_spec,))
+
+        # The images are consumed by the thread of the pool that submits the
+        # tasks, which blocks while max_pending results have not been
+        # returned yet (backpressure)
+        slots = threading.Semaphore(max_pending)
+        closed = []
+
+        def tasks():
+            for i, (image, init) in enumerate(zip(images, initialisations)):
+                slots.acquire()
+                if closed:
+                    return
+                yield i, (method, image, init, kwargs)
+
+        imap = pool.imap if ordered else pool.imap_unordered
+        try:
+            for i, result in imap(_fit_in_worker, tasks()):
+                slots.release()
+                yield result if ordered else (i, result)
+        finally:
+            # Unblock the thread that submits the tasks, so that the pool can
+            # be terminated
+            closed.append(True)
+            for _ in range(max_pending):
+                slots.release()
+            pool.terminate()
+            pool.join()
+            _worker_fitter = None
+
+
+# The fitter of a worker process spawned by PickleWrappedFitter.fit_many
+_worker_fitter = None
+
+
+def _initialise_fit_worker(fitter_spec):
+    global _worker_fitter
+    if fitter_spec is not None:
+        _worker_fitter = PickleWrappedFitter(*fitter_spec)
+
+
+def _fit_in_worker(indexed_task):
+    i, (method, image, init, kwargs) = indexed_task
+    return i, getattr(_worker_fitter, method)(image, init, **kwargs)
+
 
 def menpofit_data_dir_path():
     r"""
@@ -1,6 +1,8 @@
 from scipy.linalg import norm
 import numpy as np
 
+from menpofit.profiling import stage, set_iteration
+
 from .result import LucasKanadeAlgorithmResult
 
 
@@ -115,9 +117,11 @@ class ForwardAdditive(LucasKanade):
 
         # Forward Compositional Algorithm
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # warp image
-            IWxp = image.warp_to_mask(self.template.mask, self.transform,
-                                      warp_landmarks=False)
+            with stage('warp'):
+                IWxp = image.warp_to_mask(self.template.mask, self.transform,
+                                          warp_landmarks=False)
 
             # compute warp jacobian
             dW_dp = np.rollaxis(
@@ -137,7 +141,8 @@ class ForwardAdditive(LucasKanade):
                 filtered_J, IWxp, self.template)
 
             # compute gradient descent parameter updates
-            dp = -np.real(np.linalg.solve(H, sd_dp))
+            with stage('solve'):
+                dp = -np.real(np.linalg.solve(H, sd_dp))
 
             # Update warp weights
             self.transform.from_vector_inplace(self.transform.as_vector() + dp)
@@ -248,9 +253,11 @@ class ForwardCompositional(LucasKanade):
 
         # Forward Compositional Algorithm
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # warp image
-            IWxp = image.warp_to_mask(self.template.mask, self.transform,
-                                      warp_landmarks=False)
+            with stage('warp'):
+                IWxp = image.warp_to_mask(self.template.mask, self.transform,
+                                          warp_landmarks=False)
 
             # compute steepest descent images
             filtered_J, J = self.residual.steepest_descent_images(
@@ -264,7 +271,8 @@ class ForwardCompositional(LucasKanade):
                 filtered_J, IWxp, self.template)
 
             # compute gradient descent parameter updates
-            dp = -np.real(np.linalg.solve(H, sd_dp))
+            with stage('solve'):
+                dp = -np.real(np.linalg.solve(H, sd_dp))
 
             # Update warp weights
             self.transform.compose_after_from_vector_inplace(dp)
@@ -379,16 +387,19 @@ class InverseCompositional(LucasKanade):
 
         # Baker-Matthews, Inverse Compositional Algorithm
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # warp image
-            IWxp = image.warp_to_mask(self.template.mask, self.transform,
-                                      warp_landmarks=False)
+            with stage('warp'):
+                IWxp = image.warp_to_mask(self.template.mask, self.transform,
+                                          warp_landmarks=False)
 
             # compute steepest descent parameter updates.
             sd_dp = self.residual.steepest_descent_update(
                 self.filtered_J, IWxp, self.template)
 
             # compute gradient descent parameter updates
-            dp = np.real(np.linalg.solve(self.H, sd_dp))
+            with stage('solve'):
+                dp = np.real(np.linalg.solve(self.H, sd_dp))
 
             # update warp
             inv_dp = self.transform.pseudoinverse_vector(dp)
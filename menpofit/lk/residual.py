@@ -6,6 +6,20 @@ import scipy.linalg
 
 from menpo.feature import gradient
 
+from menpofit.math.sdi import steepest_descent_images
+
+
+def _steepest_descent_images(nabla, dW_dp):
+    # Contracts the gradient (dims x ... x h x w) with the warp Jacobian
+    # (dims x h x w x params) over the dims, i.e. returns the steepest descent
+    # images (... x h x w x params)
+    n_dims, n_params = dW_dp.shape[0], dW_dp.shape[-1]
+    n_pixels = dW_dp[0, ..., 0].size
+    sdi = steepest_descent_images(
+        nabla.reshape((n_dims, 1, -1, n_pixels)),
+        dW_dp.reshape((n_dims, 1, n_pixels, n_params)))
+    return sdi.reshape(nabla.shape[1:] + (n_params,))
+
 
 # TODO: Do we want residuals to support masked templates?
 class Residual(object):
@@ -198,10 +212,7 @@ class SSD(Residual):
         # gradient: dims x ch x h x w
         # dw_dp:    dims x    x h x w x params
         # sdi:             ch x h x w x params
-        sdi = 0
-        a = nabla[..., None] * dW_dp[:, None, ...]
-        for d in a:
-            sdi += d
+        sdi = _steepest_descent_images(nabla, dW_dp)
 
         if self._kernel is None:
             # reshape steepest descent images
@@ -360,10 +371,7 @@ class FourierSSD(Residual):
         # gradient: dims x ch x h x w
         # dw_dp:    dims x    x h x w x params
         # sdi:             ch x h x w x params
-        sdi = 0
-        a = nabla[..., None] * dW_dp[:, None, ...]
-        for d in a:
-            sdi += d
+        sdi = _steepest_descent_images(nabla, dW_dp)
 
         # compute steepest descent images fft
         # fft_sdi:  ch x h x w x params
@@ -535,10 +543,7 @@ class ECC(Residual):
         # gradient: dims x ch x pixels
         # dw_dp:    dims x    x pixels x params
         # sdi:             ch x pixels x params
-        sdi = 0
-        a = grad[..., None] * dW_dp[:, None, ...]
-        for d in a:
-            sdi += d
+        sdi = _steepest_descent_images(grad, dW_dp)
 
         # reshape steepest descent images
         # sdi: (ch x pixels) x params
@@ -721,10 +726,7 @@ class GradientImages(Residual):
         # gradient: dims x dims x ch x (h x w)
         # dw_dp:    dims x           x (h x w) x params
         # sdi:             dims x ch x (h x w) x params
-        sdi = 0
-        a = second_grad[..., None] * dW_dp[:, None, None, ...]
-        for d in a:
-            sdi += d
+        sdi = _steepest_descent_images(second_grad, dW_dp)
 
         # reshape steepest descent images
         # sdi: (ch x pixels) x params
@@ -906,10 +908,9 @@ class GradientCorrelation(Residual):
         # gradient: dims x dims x ch x pixels
         # dw_dp:    dims x           x pixels x params
         # sdi:                    ch x pixels x params
-        sdi = 0
-        aux = second_grad[..., None] * dW_dp[None, :, None, ...]
-        for a in aux.reshape(((-1,) + aux.shape[2:])):
-                sdi += a
+        # (the first dims axis is summed before contracting the second one
+        # with the Jacobian)
+        sdi = _steepest_descent_images(second_grad.sum(axis=0), dW_dp)
 
         # compute constant N
         # N:  1
@@ -1,5 +1,5 @@
 from menpofit.result import (ParametricIterativeResult,
-                             MultiScaleParametricIterativeResult)
+                             MultiScaleParametricIterativeResult, _as_list)
 
 
 class LucasKanadeAlgorithmResult(ParametricIterativeResult):
@@ -48,7 +48,7 @@ class LucasKanadeAlgorithmResult(ParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._shape_parameters
+        return _as_list(self._shape_parameters)
 
 
 class LucasKanadeResult(MultiScaleParametricIterativeResult):
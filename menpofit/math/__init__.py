@@ -1,3 +1,6 @@
 from .regression import (IRLRegression, IIRLRegression, PCRRegression,
                          OptimalLinearRegression, OPPRegression)
 from .correlationfilter import mccf, imccf, mosse, imosse
+from .sdi import steepest_descent_images
+from .pca import (blocked_pca, randomized_pca, n_components_to_keep,
+                  use_randomized_pca, residual_eigenvalues)
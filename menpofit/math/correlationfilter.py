@@ -1,7 +1,6 @@
 import numpy as np
 from numpy.fft import fft2, ifft2, ifftshift
-from scipy.sparse import spdiags, eye as speye
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import issparse
 
 from menpofit.math.fft_utils import pad, crop
 
@@ -224,12 +223,13 @@ def mccf(X, y, l=0.01, boundary='constant', crop_filter=True):
     f : ``(1, response_h, response_w)`` `ndarray`
         Multi-Channel Correlation Filter (MCCF) filter associated to the
         training images.
-    sXY : ``(N,)`` `ndarray`
+    sXY : ``(D, n_channels)`` `ndarray`
         The auto-correlation array, where
-        ``N = (image_h+response_h-1) * (image_w+response_w-1) * n_channels``.
-    sXX : ``(N, N)`` `ndarray`
-        The cross-correlation array, where
-        ``N = (image_h+response_h-1) * (image_w+response_w-1) * n_channels``.
+        ``D = (image_h+response_h-1) * (image_w+response_w-1)``.
+    sXX : ``(D, n_channels, n_channels)`` `ndarray`
+        The cross-correlation array, i.e. one ``(n_channels, n_channels)``
+        matrix per frequency, where
+        ``D = (image_h+response_h-1) * (image_w+response_w-1)``.
 
     References
     ----------
@@ -248,8 +248,6 @@ def mccf(X, y, l=0.01, boundary='constant', crop_filter=True):
     ext_h = hx + hy - 1
     ext_w = wx + wy - 1
     ext_shape = (ext_h, ext_w)
-    # extended dimensionality
-    ext_d = ext_h * ext_w
 
     # extend desired response
     ext_y = pad(y, ext_shape)
@@ -260,28 +258,13 @@ def mccf(X, y, l=0.01, boundary='constant', crop_filter=True):
     ext_X = pad(X, ext_shape, boundary=boundary)
 
     # auto and cross spectral energy matrices
-    sXX = 0
-    sXY = 0
-    # for each training image and desired response
-    for ext_x in ext_X:
-        # fft of extended image
-        fft_ext_x = fft2(ext_x)
-
-        # store extended image fft as sparse diagonal matrix
-        diag_fft_x = spdiags(fft_ext_x.reshape((k, -1)),
-                             -np.arange(0, k) * ext_d, ext_d * k, ext_d).T
-        # vectorize extended desired response fft
-        diag_fft_y = fft_ext_y.ravel()
-
-        # update auto and cross spectral energy matrices
-        sXX += diag_fft_x.conj().T.dot(diag_fft_x)
-        sXY += diag_fft_x.conj().T.dot(diag_fft_y)
+    sXX, sXY = _mccf_spectral_energies(ext_X, fft_ext_y)
 
     # solve ext_d independent k x k linear systems (with regularization)
     # to obtain desired extended multi-channel correlation filter
-    fft_ext_f = spsolve(sXX + l * speye(sXX.shape[-1]), sXY)
+    fft_ext_f = _mccf_solve(sXX, sXY, l)
     # reshape extended filter to extended image shape
-    fft_ext_f = fft_ext_f.reshape((k, ext_h, ext_w))
+    fft_ext_f = fft_ext_f.T.reshape((k, ext_h, ext_w))
 
     # compute filter inverse fft
     f = np.real(ifftshift(ifft2(fft_ext_f), axes=(-2, -1)))
@@ -300,12 +283,16 @@ def imccf(A, B, n_ab, X, y, l=0.01, boundary='constant', crop_filter=True,
 
     Parameters
     ----------
-    A : ``(N,)`` `ndarray`
+    A : ``(D, n_channels)`` `ndarray`
         The current auto-correlation array, where
-        ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``.
-    B : ``(N, N)`` `ndarray`
+        ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``. The
+        ``(N,)`` layout returned by earlier versions, where ``N = D *
+        n_channels``, is also accepted.
+    B : ``(D, n_channels, n_channels)`` `ndarray`
         The current cross-correlation array, where
-        ``N = (patch_h+response_h-1) * (patch_w+response_w-1) * n_channels``.
+        ``D = (patch_h+response_h-1) * (patch_w+response_w-1)``. The sparse
+        ``(N, N)`` block-diagonal layout returned by earlier versions, where
+        ``N = D * n_channels``, is also accepted.
     n_ab : `int`
         The current number of images.
     X : ``(n_images, n_channels, image_h, image_w)`` `ndarray`
@@ -330,12 +317,13 @@ def imccf(A, B, n_ab, X, y, l=0.01, boundary='constant', crop_filter=True,
     f : ``(1, response_h, response_w)`` `ndarray`
         Multi-Channel Correlation Filter (MCCF) filter associated to the
         training images.
-    sXY : ``(N,)`` `ndarray`
+    sXY : ``(D, n_channels)`` `ndarray`
         The auto-correlation array, where
-        ``N = (image_h+response_h-1) * (image_w+response_w-1) * n_channels``.
-    sXX : ``(N, N)`` `ndarray`
-        The cross-correlation array, where
-        ``N = (image_h+response_h-1) * (image_w+response_w-1) * n_channels``.
+        ``D = (image_h+response_h-1) * (image_w+response_w-1)``.
+    sXX : ``(D, n_channels, n_channels)`` `ndarray`
+        The cross-correlation array, i.e. one ``(n_channels, n_channels)``
+        matrix per frequency, where
+        ``D = (image_h+response_h-1) * (image_w+response_w-1)``.
 
     References
     ----------
@@ -379,31 +367,19 @@ def imccf(A, B, n_ab, X, y, l=0.01, boundary='constant', crop_filter=True,
     ext_X = pad(X, ext_shape, boundary=boundary)
 
     # auto and cross spectral energy matrices
-    sXX = 0
-    sXY = 0
-    # for each training image and desired response
-    for ext_x in ext_X:
-        # fft of extended image
-        fft_ext_x = fft2(ext_x)
-
-        # store extended image fft as sparse diagonal matrix
-        diag_fft_x = spdiags(fft_ext_x.reshape((k, -1)),
-                             -np.arange(0, k) * ext_d, ext_d * k, ext_d).T
-        # vectorize extended desired response fft
-        diag_fft_y = fft_ext_y.ravel()
-
-        # update auto and cross spectral energy matrices
-        sXX += diag_fft_x.conj().T.dot(diag_fft_x)
-        sXY += diag_fft_x.conj().T.dot(diag_fft_y)
+    sXX, sXY = _mccf_spectral_energies(ext_X, fft_ext_y)
 
+    # bring auto and cross spectral energy matrices stored in the sparse
+    # block-diagonal layout to the per-frequency one
+    A, B = _to_per_frequency(A, B, k, ext_d)
     # combine old and new auto and cross spectral energy matrices
     sXY = nu_ab * A + nu_x * sXY
     sXX = nu_ab * B + nu_x * sXX
     # solve ext_d independent k x k linear systems (with regularization)
     # to obtain desired extended multi-channel correlation filter
-    fft_ext_f = spsolve(sXX + l * speye(sXX.shape[-1]), sXY)
+    fft_ext_f = _mccf_solve(sXX, sXY, l)
     # reshape extended filter to extended image shape
-    fft_ext_f = fft_ext_f.reshape((k, ext_h, ext_w))
+    fft_ext_f = fft_ext_f.T.reshape((k, ext_h, ext_w))
 
     # compute filter inverse fft
     f = np.real(ifftshift(ifft2(fft_ext_f), axes=(-2, -1)))
@@ -412,3 +388,77 @@ def imccf(A, B, n_ab, X, y, l=0.01, boundary='constant', crop_filter=True,
         f = crop(f, y_shape)
 
     return f, sXY, sXX
+
+
+def _mccf_spectral_energies(ext_X, fft_ext_y):
+    r"""
+    Computes the per-frequency auto and cross spectral energy matrices of a set
+    of extended images, i.e. the ``(n_channels, n_channels)`` diagonal blocks
+    of the otherwise block-diagonal MCCF system.
+
+    Parameters
+    ----------
+    ext_X : ``(n_images, n_channels, ext_h, ext_w)`` `ndarray`
+        The extended training images.
+    fft_ext_y : ``(1, ext_h, ext_w)`` `ndarray`
+        The fft of the extended desired response.
+
+    Returns
+    -------
+    sXX : ``(ext_h * ext_w, n_channels, n_channels)`` `ndarray`
+        The auto spectral energy matrices.
+    sXY : ``(ext_h * ext_w, n_channels)`` `ndarray`
+        The cross spectral energy matrices.
+    """
+    n, k = ext_X.shape[:2]
+    # fft of extended images, vectorized per channel
+    fft_ext_X = fft2(ext_X).reshape((n, k, -1))
+    fft_ext_X_conj = fft_ext_X.conj()
+    # accumulate over all images at once
+    sXX = np.einsum('nkd, nld -> dkl', fft_ext_X_conj, fft_ext_X)
+    sXY = np.einsum('nkd, d -> dk', fft_ext_X_conj, fft_ext_y.ravel())
+    return sXX, sXY
+
+
+def _mccf_solve(sXX, sXY, l):
+    r"""
+    Solves the ``D`` independent (regularized) ``(n_channels, n_channels)``
+    linear systems of the MCCF, one per frequency.
+
+    Parameters
+    ----------
+    sXX : ``(D, n_channels, n_channels)`` `ndarray`
+        The auto spectral energy matrices.
+    sXY : ``(D, n_channels)`` `ndarray`
+        The cross spectral energy matrices.
+    l : `float`
+        Regularization parameter.
+
+    Returns
+    -------
+    fft_ext_f : ``(D, n_channels)`` `ndarray`
+        The fft of the extended filter.
+    """
+    k = sXX.shape[-1]
+    return np.linalg.solve(sXX + l * np.eye(k), sXY[..., None])[..., 0]
+
+
+def _to_per_frequency(A, B, k, ext_d):
+    r"""
+    Converts auto and cross spectral energy matrices stored in the
+    ``(N,)``/``(N, N)`` block-diagonal layout, where ``N = ext_d * k``, to the
+    ``(ext_d, k)``/``(ext_d, k, k)`` per-frequency layout. Matrices that are
+    already in the per-frequency layout are returned unchanged.
+    """
+    if np.ndim(A) == 1:
+        A = np.asarray(A).reshape((k, ext_d)).T
+    if issparse(B) or np.ndim(B) == 2:
+        # entry [(i, d), (j, d)] lives on diagonal (j - i) * ext_d
+        B_pf = np.empty((ext_d, k, k), dtype=B.dtype)
+        for i in range(k):
+            for j in range(k):
+                diagonal = B.diagonal((j - i) * ext_d)
+                start = min(i, j) * ext_d
+                B_pf[:, i, j] = diagonal[start:start + ext_d]
+        B = B_pf
+    return A, B
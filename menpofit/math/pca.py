@@ -0,0 +1,305 @@
+from __future__ import division
+import numpy as np
+
+
+def n_components_to_keep(eigenvalues, max_n_components):
+    r"""
+    Returns the number of principal components to keep given the eigenvalues
+    (sorted in descending order) and the requested number of components,
+    following the conventions of `menpo.model.PCAModel.trim_components`.
+
+    Parameters
+    ----------
+    eigenvalues : ``(n_components,)`` `ndarray`
+        The eigenvalues in descending order.
+    max_n_components : `int` or `float` or ``None``
+        If `int`, then it is the exact number of components. If `float`, then
+        it is the percentage of variance to be kept. If ``None``, then all the
+        components are kept.
+
+    Returns
+    -------
+    n_components : `int`
+        The number of components to keep.
+    """
+    n_available = eigenvalues.shape[0]
+    if max_n_components is None:
+        return n_available
+    if isinstance(max_n_components, float):
+        if not 0. < max_n_components <= 1.:
+            raise ValueError('max_n_components must be in (0, 1] when it '
+                             'is a float')
+        ratio = np.cumsum(eigenvalues) / np.sum(eigenvalues)
+        return min(int(np.sum(ratio < max_n_components)) + 1, n_available)
+    return min(int(max_n_components), n_available)
+
+
+def _eigenvalue_decomposition(C, eps):
+    # Eigendecomposition of a symmetric positive semi-definite matrix, sorted
+    # in descending order and restricted to the eigenvalues that are larger
+    # than eps times the largest one
+    eigenvalues, eigenvectors = np.linalg.eigh(C)
+    index = np.argsort(eigenvalues)[::-1]
+    eigenvalues = eigenvalues[index]
+    eigenvectors = eigenvectors[:, index]
+    keep = eigenvalues > np.max(np.abs(eigenvalues)) * eps
+    return eigenvalues[keep], eigenvectors[:, keep]
+
+
+def blocked_pca(X, mean=None, max_n_components=None, block_size=256,
+                eps=1e-10):
+    r"""
+    Principal Component Analysis of a data matrix that is processed in
+    blocks, e.g. a `numpy.memmap` that does not fit in memory. Depending on
+    which is smaller, either the ``(n_features, n_features)`` covariance
+    matrix or the ``(n_samples, n_samples)`` Gram matrix is accumulated over
+    blocks of the data, hence apart from this matrix the memory usage is
+    bounded by the size of a block of ``block_size`` samples. The data matrix
+    is read at most twice.
+
+    Parameters
+    ----------
+    X : ``(n_samples, n_features)`` `ndarray`
+        The data matrix. It is never modified nor loaded as a whole.
+    mean : ``(n_features,)`` `ndarray` or ``None``, optional
+        The mean of the samples, if known (e.g. accumulated while writing
+        ``X``). If ``None``, then it is computed with an extra pass over the
+        data.
+    max_n_components : `int` or `float` or ``None``, optional
+        The number of principal components to return. If `int`, then it is
+        the exact number of components. If `float`, then it is the percentage
+        of variance to be kept. If ``None``, then all the components are
+        returned.
+    block_size : `int`, optional
+        The number of samples (or the equivalent amount of features) that are
+        loaded at once.
+    eps : `float`, optional
+        Tolerance value for positive eigenvalue, relative to the largest one.
+
+    Returns
+    -------
+    components : ``(n_components, n_features)`` `ndarray`
+        The kept principal components.
+    eigenvalues : ``(n_positive,)`` `ndarray`
+        All the positive eigenvalues of the covariance matrix, in descending
+        order, i.e. including the ones of the discarded components.
+    mean : ``(n_features,)`` `ndarray`
+        The mean of the samples.
+    """
+    n_samples, n_features = X.shape
+    if mean is None:
+        mean = np.zeros(n_features)
+        for start in range(0, n_samples, block_size):
+            mean += np.sum(X[start:start + block_size], axis=0,
+                           dtype=np.float64)
+        mean /= n_samples
+
+    if n_features < n_samples:
+        # Accumulate the covariance matrix over blocks of samples
+        C = np.zeros((n_features, n_features))
+        for start in range(0, n_samples, block_size):
+            N = X[start:start + block_size].astype(np.float64) - mean
+            C += N.T.dot(N)
+        eigenvalues, eigenvectors = _eigenvalue_decomposition(C, eps)
+        del C
+        n_components = n_components_to_keep(eigenvalues, max_n_components)
+        components = eigenvectors[:, :n_components].T.copy()
+    else:
+        # Accumulate the Gram matrix over blocks of features, whose width is
+        # chosen so that a block has the size of block_size samples
+        width = max(1, (block_size * n_features) // n_samples)
+        G = np.zeros((n_samples, n_samples))
+        for start in range(0, n_features, width):
+            N = (X[:, start:start + width].astype(np.float64) -
+                 mean[start:start + width])
+            G += N.dot(N.T)
+        eigenvalues, eigenvectors = _eigenvalue_decomposition(G, eps)
+        del G
+        n_components = n_components_to_keep(eigenvalues, max_n_components)
+        # The principal components are the normalised projections of the
+        # centred data on the eigenvectors of the Gram matrix
+        V = eigenvectors[:, :n_components] / np.sqrt(
+            eigenvalues[:n_components])
+        components = np.empty((n_components, n_features))
+        for start in range(0, n_features, width):
+            N = (X[:, start:start + width].astype(np.float64) -
+                 mean[start:start + width])
+            components[:, start:start + width] = V.T.dot(N)
+
+    # eigenvalues of the (unbiased) covariance matrix, as in menpo's PCAModel
+    eigenvalues = eigenvalues / (n_samples - 1)
+    return components, eigenvalues, mean
+
+
+def use_randomized_pca(max_n_components, n_samples, n_features,
+                       n_oversamples=10, max_ratio=0.25):
+    r"""
+    Returns whether a randomized truncated decomposition should be preferred
+    to the exact one, i.e. whether an exact number of components is requested
+    and it is much smaller than the data.
+
+    Parameters
+    ----------
+    max_n_components : `int` or `float` or ``None``
+        The requested number of components (see :map:`n_components_to_keep`).
+        The randomized decomposition is only possible for an `int`, since the
+        rank of a variance percentage is not known in advance.
+    n_samples : `int`
+        The number of samples.
+    n_features : `int`
+        The number of features.
+    n_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    max_ratio : `float`, optional
+        The maximum ratio between the rank of the randomized decomposition
+        (i.e. ``max_n_components + n_oversamples``) and the rank of the data.
+
+    Returns
+    -------
+    use_randomized : `bool`
+        Whether to use :map:`randomized_pca`.
+    """
+    if (max_n_components is None or isinstance(max_n_components, float) or
+            isinstance(max_n_components, bool)):
+        return False
+    rank = min(n_samples, n_features)
+    return max_n_components + n_oversamples <= max_ratio * rank
+
+
+def _orthonormalise(Y):
+    return np.linalg.qr(Y)[0]
+
+
+def randomized_pca(X, n_components, mean=None, n_oversamples=10,
+                   n_power_iterations=2, block_size=256, random_state=None):
+    r"""
+    Randomized truncated Principal Component Analysis [1]. The range of the
+    centred data matrix is approximated by its product with
+    ``n_components + n_oversamples`` random vectors, refined by
+    `n_power_iterations` power iterations, and the principal components are
+    computed from the projection of the data onto it. Hence, its cost is
+    linear in both the number of samples and the number of features, instead
+    of cubic in the smallest of them. The data matrix is only accessed in
+    blocks of `block_size` samples, ``2 * (n_power_iterations + 1)`` times, so
+    it may be a `numpy.memmap` that does not fit in memory.
+
+    Parameters
+    ----------
+    X : ``(n_samples, n_features)`` `ndarray`
+        The data matrix. It is never modified.
+    n_components : `int`
+        The number of principal components.
+    mean : ``(n_features,)`` `ndarray` or ``None``, optional
+        The mean of the samples, if known. If ``None``, then it is computed
+        with an extra pass over the data.
+    n_oversamples : `int`, optional
+        The number of random vectors in excess of `n_components`. Larger
+        values increase the accuracy.
+    n_power_iterations : `int`, optional
+        The number of power iterations. They increase the accuracy when the
+        spectrum of the data decays slowly, at the cost of two passes over the
+        data each.
+    block_size : `int`, optional
+        The number of samples that are loaded at once.
+    random_state : `int` or `numpy.random.RandomState` or ``None``, optional
+        The seed or the generator of the random vectors.
+
+    Returns
+    -------
+    components : ``(n_components, n_features)`` `ndarray`
+        The principal components.
+    eigenvalues : ``(n_components,)`` `ndarray`
+        The eigenvalues of the covariance matrix that correspond to the
+        principal components.
+    mean : ``(n_features,)`` `ndarray`
+        The mean of the samples.
+    total_variance : `float`
+        The total variance of the data, i.e. the sum of all the eigenvalues of
+        the covariance matrix, which allows to measure the variance that is
+        captured by the components.
+
+    References
+    ----------
+    .. [1] N. Halko, P. G. Martinsson, and J. A. Tropp. "Finding structure
+        with randomness: Probabilistic algorithms for constructing approximate
+        matrix decompositions", SIAM Review, 53(2): 217-288, 2011.
+    """
+    n_samples, n_features = X.shape
+    if not isinstance(random_state, np.random.RandomState):
+        random_state = np.random.RandomState(random_state)
+    if mean is None:
+        mean = np.zeros(n_features)
+        for start in range(0, n_samples, block_size):
+            mean += np.sum(X[start:start + block_size], axis=0,
+                           dtype=np.float64)
+        mean /= n_samples
+    n_random = min(n_components + n_oversamples, n_samples, n_features)
+
+    def blocks():
+        for start in range(0, n_samples, block_size):
+            yield (slice(start, start + block_size),
+                   X[start:start + block_size].astype(np.float64) - mean)
+
+    def dot(M):
+        # centred data times M
+        return np.vstack([N.dot(M) for _, N in blocks()])
+
+    def t_dot(Q):
+        # centred data transposed times Q
+        R = np.zeros((n_features, Q.shape[1]))
+        for rows, N in blocks():
+            R += N.T.dot(Q[rows])
+        return R
+
+    # Sample the range of the centred data, measuring its total variance in
+    # the same pass
+    omega = random_state.randn(n_features, n_random)
+    Y = np.empty((n_samples, n_random))
+    total_variance = 0.
+    for rows, N in blocks():
+        Y[rows] = N.dot(omega)
+        total_variance += np.sum(N ** 2)
+    total_variance /= n_samples - 1
+    del omega
+    Q = _orthonormalise(Y)
+    for _ in range(n_power_iterations):
+        Q = _orthonormalise(dot(_orthonormalise(t_dot(Q))))
+
+    # The principal components are the right singular vectors of the
+    # projection of the centred data onto the approximate range
+    U, s, _ = np.linalg.svd(t_dot(Q), full_matrices=False)
+    components = U[:, :n_components].T.copy()
+    # eigenvalues of the (unbiased) covariance matrix, as in menpo's PCAModel
+    eigenvalues = s[:n_components] ** 2 / (n_samples - 1)
+    return components, eigenvalues, mean, total_variance
+
+
+def residual_eigenvalues(eigenvalues, total_variance, n_samples, n_features):
+    r"""
+    Returns surrogate eigenvalues for the components that are not computed by
+    a truncated decomposition (see :map:`randomized_pca`). The residual
+    variance is spread evenly over the remaining rank of the data, which
+    preserves both the total variance and the noise variance (i.e. the mean
+    of the discarded eigenvalues) of the model.
+
+    Parameters
+    ----------
+    eigenvalues : ``(n_components,)`` `ndarray`
+        The computed eigenvalues.
+    total_variance : `float`
+        The total variance of the data.
+    n_samples : `int`
+        The number of samples.
+    n_features : `int`
+        The number of features.
+
+    Returns
+    -------
+    residual_eigenvalues : ``(n_residual,)`` `ndarray`
+        The surrogate eigenvalues of the remaining components.
+    """
+    n_residual = min(n_samples - 1, n_features) - eigenvalues.shape[0]
+    residual = total_variance - np.sum(eigenvalues)
+    if n_residual <= 0 or residual <= 0:
+        return np.array([])
+    return np.full(n_residual, residual / n_residual)
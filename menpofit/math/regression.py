@@ -1,4 +1,6 @@
 import numpy as np
+from numpy.linalg import LinAlgError
+from scipy.linalg import cho_factor, cho_solve
 
 from menpo.math import pca
 
@@ -23,6 +25,8 @@ class IRLRegression(object):
         self.incrementable = incrementable
         self.V = None
         self.W = None
+        self._XX = None
+        self._XY = None
 
     def train(self, X, Y):
         r"""
@@ -35,19 +39,82 @@ class IRLRegression(object):
         Y : ``(n_dims, n_samples)`` `ndarray`
             The array of target vectors.
         """
-        if self.bias:
-            # add bias
-            X = np.hstack((X, np.ones((X.shape[0], 1))))
+        self._XX = None
+        self._XY = None
+        self._accumulate(X, Y)
+        self._solve()
+
+    def partial_fit(self, X, Y):
+        r"""
+        Accumulate the sufficient statistics ``X^T X`` and ``X^T Y`` of a
+        chunk of training data, so that the model can be trained on data that
+        do not fit in memory. The model is solved by :meth:`finalize`.
+
+        Parameters
+        ----------
+        X : ``(n_samples, n_features)`` `ndarray`
+            The chunk of feature vectors.
+        Y : ``(n_samples, n_dims)`` `ndarray`
+            The chunk of target vectors.
+        """
+        self._accumulate(X, Y)
+
+    def finalize(self):
+        r"""
+        Solve the regression model given the sufficient statistics that were
+        accumulated by :meth:`partial_fit`. The accumulated statistics are
+        released.
 
-        # regularized linear regression
-        XX = X.T.dot(X)
-        # ensure covariance is perfectly symmetric for inversion
+        Raises
+        ------
+        ValueError
+            No data have been accumulated
+        """
+        if self._XX is None:
+            raise ValueError('partial_fit must be called before finalize')
+        self._solve()
+
+    def _accumulate(self, X, Y):
+        # accumulate in double precision, whatever the precision of the chunk
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.asarray(Y, dtype=np.float64)
+        n_features = X.shape[1]
+        if self._XX is None:
+            n = n_features + 1 if self.bias else n_features
+            self._XX = np.zeros((n, n))
+            self._XY = np.zeros((n, Y.shape[1]))
+        # the bias is handled implicitly, i.e. as the sums of X and Y, rather
+        # than by copying X with an extra column of ones
+        self._XX[:n_features, :n_features] += X.T.dot(X)
+        self._XY[:n_features] += X.T.dot(Y)
+        if self.bias:
+            x_sum = X.sum(axis=0)
+            self._XX[:n_features, -1] += x_sum
+            self._XX[-1, :n_features] += x_sum
+            self._XX[-1, -1] += X.shape[0]
+            self._XY[-1] += Y.sum(axis=0)
+
+    def _solve(self):
+        XX, XY = self._XX, self._XY
+        self._XX = None
+        self._XY = None
+        # ensure covariance is perfectly symmetric for the factorization
         XX = (XX + XX.T) / 2.0
         if self.alpha:
             np.fill_diagonal(XX, self.alpha + np.diag(XX))
+        # regularized linear regression. Note that XX is not overwritten by
+        # the factorization, as it is needed if the factorization fails.
+        try:
+            c = cho_factor(XX)
+        except LinAlgError:
+            # not positive definite (e.g. rank deficient and alpha is 0)
+            if self.incrementable:
+                self.V = np.linalg.inv(XX)
+            self.W = np.linalg.solve(XX, XY)
+            return
         if self.incrementable:
-            self.V = np.linalg.inv(XX)
-        self.W = np.linalg.solve(XX, X.T.dot(Y))
+            self.V = cho_solve(c, np.eye(XX.shape[0]))
+        self.W = cho_solve(c, XY)
 
     def increment(self, X, Y):
         r"""
@@ -72,14 +139,14 @@ class IRLRegression(object):
             # add bias
             X = np.hstack((X, np.ones((X.shape[0], 1))))
 
-        # incremental regularized linear regression
-        U = X.dot(self.V).dot(X.T)
-        if self.alpha:
-            np.fill_diagonal(U, self.alpha + np.diag(U))
-        U = np.linalg.inv(U)
-        Q = self.V.dot(X.T).dot(U).dot(X)
-        self.V = self.V - Q.dot(self.V)
-        self.W = self.W - Q.dot(self.W) + self.V.dot(X.T.dot(Y))
+        # incremental regularized linear regression (Woodbury identity). Note
+        # that the regularization is already part of V.
+        VX = self.V.dot(X.T)
+        U = X.dot(VX)
+        np.fill_diagonal(U, 1 + np.diag(U))
+        K = VX.dot(np.linalg.inv(U))
+        self.V = self.V - K.dot(VX.T)
+        self.W = self.W - K.dot(X.dot(self.W)) + self.V.dot(X.T.dot(Y))
 
     def predict(self, x):
         r"""
@@ -96,10 +163,7 @@ class IRLRegression(object):
             The prediction vector.
         """
         if self.bias:
-            if len(x.shape) == 1:
-                x = np.hstack((x, np.ones(1)))
-            else:
-                x = np.hstack((x, np.ones((x.shape[0], 1))))
+            return np.dot(x, self.W[:-1]) + self.W[-1]
         return np.dot(x, self.W)
 
 
@@ -116,11 +180,16 @@ class IIRLRegression(IRLRegression):
         If ``True``, a bias term is used.
     alpha2 : `float`, optional
         The regularization parameter of the Hessian.
+    incrementable : `bool`, optional
+        If ``True``, then the regression model will have the ability to get
+        incremented.
     """
-    def __init__(self, alpha=0, bias=False, alpha2=0):
+    def __init__(self, alpha=0, bias=False, alpha2=0, incrementable=False):
         # TODO: Can we model the bias? May need to slice off of prediction?
-        super(IIRLRegression, self).__init__(alpha=alpha, bias=False)
+        super(IIRLRegression, self).__init__(alpha=alpha, bias=False,
+                                             incrementable=incrementable)
         self.alpha2 = alpha2
+        self.J = None
 
     def train(self, X, Y):
         r"""
@@ -135,7 +204,40 @@ class IIRLRegression(IRLRegression):
         """
         # regularized linear regression exchanging the roles of X and Y
         super(IIRLRegression, self).train(Y, X)
-        J = self.W
+        self._solve_pseudo_inverse()
+
+    def partial_fit(self, X, Y):
+        r"""
+        Accumulate the sufficient statistics of a chunk of training data, so
+        that the model can be trained on data that do not fit in memory. The
+        model is solved by :meth:`finalize`.
+
+        Parameters
+        ----------
+        X : ``(n_samples, n_features)`` `ndarray`
+            The chunk of feature vectors.
+        Y : ``(n_samples, n_dims)`` `ndarray`
+            The chunk of target vectors.
+        """
+        # exchange the roles of X and Y
+        self._accumulate(Y, X)
+
+    def finalize(self):
+        r"""
+        Solve the regression model given the sufficient statistics that were
+        accumulated by :meth:`partial_fit`. The accumulated statistics are
+        released.
+
+        Raises
+        ------
+        ValueError
+            No data have been accumulated
+        """
+        super(IIRLRegression, self).finalize()
+        self._solve_pseudo_inverse()
+
+    def _solve_pseudo_inverse(self):
+        J = self.J = self.W
         # solve the original problem by computing the pseudo-inverse of the
         # previous solution
         # Note that everything is transposed from the above exchanging of roles
@@ -160,16 +262,11 @@ class IIRLRegression(IRLRegression):
         ValueError
             Model is not incrementable
         """
-        # incremental least squares exchanging the roles of X and Y
+        # incremental least squares exchanging the roles of X and Y. The
+        # increment is applied on the solution of the exchanged problem.
+        self.W = self.J
         super(IIRLRegression, self).increment(Y, X)
-        J = self.W
-        # solve the original problem by computing the pseudo-inverse of the
-        # previous solution
-        # Note that everything is transposed from the above exchanging of roles
-        H = J.dot(J.T)
-        if self.alpha2:
-            np.fill_diagonal(H, self.alpha2 + np.diag(H))
-        self.W = np.linalg.solve(H, J)
+        self._solve_pseudo_inverse()
 
     def predict(self, x):
         r"""
@@ -0,0 +1,77 @@
+import numpy as np
+
+from menpofit.profiling import stage
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _einsum_sdi(nabla, dW_dp, out):
+    # Single pass sum of products, no temporaries
+    return np.einsum('dbcn,dbnp->bcnp', nabla, dW_dp, out=out)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _numba_sdi(nabla, dW_dp, out):
+        n_dims, n_blocks, n_channels, n_pixels = nabla.shape
+        n_params = dW_dp.shape[-1]
+        for b in range(n_blocks):
+            # parallelise over the (channel, pixel) pairs of the block
+            for k in numba.prange(n_channels * n_pixels):
+                c = k // n_pixels
+                i = k % n_pixels
+                for p in range(n_params):
+                    acc = nabla[0, b, c, i] * dW_dp[0, b, i, p]
+                    for d in range(1, n_dims):
+                        acc += nabla[d, b, c, i] * dW_dp[d, b, i, p]
+                    out[b, c, i, p] = acc
+        return out
+
+
+def steepest_descent_images(nabla, dW_dp, out=None):
+    r"""
+    Computes the steepest descent images, i.e. the contraction of the image
+    gradient with the warp Jacobian over the spatial dimensions
+
+    .. math::
+       \mathbf{S}_{bcnp} = \sum_d \nabla_{dbcn} \frac{\partial W}{\partial p}_{dbnp}
+
+    without forming their ``(n_dims, n_blocks, n_channels, n_pixels,
+    n_params)`` product. The steepest descent images are written directly into
+    the output array, using a compiled kernel if ``numba`` is installed and
+    `numpy.einsum` otherwise.
+
+    Parameters
+    ----------
+    nabla : ``(n_dims, n_blocks, n_channels, n_pixels)`` `ndarray`
+        The image gradient. The blocks are independent groups of pixels with
+        their own warp Jacobian (e.g. the patches of a patch-based model),
+        hence ``n_blocks`` is ``1`` for holistic images.
+    dW_dp : ``(n_dims, n_blocks, n_pixels, n_params)`` `ndarray`
+        The warp Jacobian. Its pixels axis may also have length ``1``, if the
+        Jacobian is constant within each block.
+    out : ``(n_blocks, n_channels, n_pixels, n_params)`` `ndarray` or ``None``, optional
+        Preallocated array in which the steepest descent images are written.
+        If ``None``, then a new array is allocated.
+
+    Returns
+    -------
+    sdi : ``(n_blocks, n_channels, n_pixels, n_params)`` `ndarray`
+        The steepest descent images.
+    """
+    n_dims, n_blocks, n_channels, n_pixels = nabla.shape
+    n_params = dW_dp.shape[-1]
+    if dW_dp.shape[2] != n_pixels:
+        # Jacobian constant within each block
+        dW_dp = np.broadcast_to(dW_dp, (n_dims, n_blocks, n_pixels, n_params))
+    if out is None:
+        out = np.empty((n_blocks, n_channels, n_pixels, n_params),
+                       dtype=np.result_type(nabla, dW_dp))
+    with stage('steepest_descent_images'):
+        if (numba is not None and nabla.dtype.kind == 'f' and
+                dW_dp.dtype.kind == 'f' and out.dtype.kind == 'f'):
+            return _numba_sdi(nabla, dW_dp, out)
+        return _einsum_sdi(nabla, dW_dp, out)
@@ -0,0 +1,112 @@
+import numpy as np
+from numpy.fft import fft2, ifft2, ifftshift
+from numpy.testing import assert_allclose
+from scipy.sparse import spdiags, eye as speye
+from scipy.sparse.linalg import spsolve
+
+from menpofit.math.correlationfilter import mccf, imccf
+from menpofit.math.fft_utils import pad, crop
+
+
+rng = np.random.RandomState(0)
+X = rng.randn(6, 3, 8, 8)
+X_new = rng.randn(4, 3, 8, 8)
+y = rng.randn(1, 5, 5)
+# extended dimensionality and number of channels
+ext_d = (8 + 5 - 1) * (8 + 5 - 1)
+k = 3
+
+
+def _sparse_energies(X, y, boundary):
+    # block-diagonal sparse spectral energies, as originally computed by mccf
+    n, k, hx, wx = X.shape
+    _, hy, wy = y.shape
+    ext_shape = (hx + hy - 1, wx + wy - 1)
+    ext_d = ext_shape[0] * ext_shape[1]
+    fft_ext_y = fft2(pad(y, ext_shape))
+    sXX = 0
+    sXY = 0
+    for ext_x in pad(X, ext_shape, boundary=boundary):
+        fft_ext_x = fft2(ext_x)
+        diag_fft_x = spdiags(fft_ext_x.reshape((k, -1)),
+                             -np.arange(0, k) * ext_d, ext_d * k, ext_d).T
+        sXX += diag_fft_x.conj().T.dot(diag_fft_x)
+        sXY += diag_fft_x.conj().T.dot(fft_ext_y.ravel())
+    return sXY, sXX
+
+
+def _sparse_filter(sXY, sXX, l, ext_shape, y_shape, crop_filter):
+    # solution of the whole block-diagonal sparse system
+    fft_ext_f = spsolve(sXX + l * speye(sXX.shape[-1]), sXY)
+    fft_ext_f = fft_ext_f.reshape((-1,) + ext_shape)
+    f = np.real(ifftshift(ifft2(fft_ext_f), axes=(-2, -1)))
+    if crop_filter:
+        f = crop(f, y_shape)
+    return f
+
+
+def _sparse_mccf(X, y, l, boundary, crop_filter):
+    sXY, sXX = _sparse_energies(X, y, boundary)
+    f = _sparse_filter(sXY, sXX, l, (12, 12), y.shape[1:], crop_filter)
+    return f, sXY, sXX
+
+
+def _sparse_imccf(A, B, n_ab, X, y, l, boundary, crop_filter):
+    n = n_ab + X.shape[0]
+    sXY, sXX = _sparse_energies(X, y, boundary)
+    sXY = (n_ab / n) * A + (X.shape[0] / n) * sXY
+    sXX = (n_ab / n) * B + (X.shape[0] / n) * sXX
+    f = _sparse_filter(sXY, sXX, l, (12, 12), y.shape[1:], crop_filter)
+    return f, sXY, sXX
+
+
+def _block_diagonal(sXY, sXX):
+    # per-frequency energies in the block-diagonal layout of the sparse solve
+    A = sXY.T.ravel()
+    B = np.zeros((k * ext_d, k * ext_d), dtype=sXX.dtype)
+    d = np.arange(ext_d)
+    for i in range(k):
+        for j in range(k):
+            B[i * ext_d + d, j * ext_d + d] = sXX[:, i, j]
+    return A, B
+
+
+def test_mccf_matches_sparse_solve():
+    for boundary, crop_filter in [('constant', True), ('symmetric', False)]:
+        _check_mccf_matches_sparse_solve(boundary, crop_filter)
+
+
+def _check_mccf_matches_sparse_solve(boundary, crop_filter):
+    f, sXY, sXX = mccf(X, y, l=0.1, boundary=boundary,
+                       crop_filter=crop_filter)
+    f_sp, sXY_sp, sXX_sp = _sparse_mccf(X, y, 0.1, boundary, crop_filter)
+    assert sXY.shape == (ext_d, k)
+    assert sXX.shape == (ext_d, k, k)
+    assert_allclose(f, f_sp, atol=1e-10)
+    A, B = _block_diagonal(sXY, sXX)
+    assert_allclose(A, sXY_sp)
+    assert_allclose(B, sXX_sp.toarray(), atol=1e-10)
+
+
+def test_imccf_matches_sparse_solve():
+    _, sXY, sXX = mccf(X, y, l=0.1)
+    _, sXY_sp, sXX_sp = _sparse_mccf(X, y, 0.1, 'constant', True)
+    f, sXY, sXX = imccf(sXY, sXX, X.shape[0], X_new, y, l=0.1)
+    f_sp, sXY_sp, sXX_sp = _sparse_imccf(sXY_sp, sXX_sp, X.shape[0], X_new,
+                                         y, 0.1, 'constant', True)
+    assert sXY.shape == (ext_d, k)
+    assert sXX.shape == (ext_d, k, k)
+    assert_allclose(f, f_sp, atol=1e-10)
+    A, B = _block_diagonal(sXY, sXX)
+    assert_allclose(A, sXY_sp)
+    assert_allclose(B, sXX_sp.toarray(), atol=1e-10)
+
+
+def test_imccf_accepts_sparse_layout():
+    _, sXY, sXX = mccf(X, y, l=0.1)
+    _, sXY_sp, sXX_sp = _sparse_mccf(X, y, 0.1, 'constant', True)
+    f, sXY, sXX = imccf(sXY, sXX, X.shape[0], X_new, y, l=0.1)
+    f_sp, sXY_sp, sXX_sp = imccf(sXY_sp, sXX_sp, X.shape[0], X_new, y, l=0.1)
+    assert_allclose(f_sp, f)
+    assert_allclose(sXY_sp, sXY)
+    assert_allclose(sXX_sp, sXX, atol=1e-10)
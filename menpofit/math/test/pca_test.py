@@ -0,0 +1,42 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.model import PCAVectorModel
+
+from menpofit.math import blocked_pca, randomized_pca, residual_eigenvalues
+
+
+def test_blocked_pca_matches_pca_model():
+    # (40, 12) accumulates the covariance and (12, 40) the Gram matrix
+    for n_samples, n_features in [(40, 12), (12, 40)]:
+        _check_blocked_pca_matches_pca_model(n_samples, n_features)
+
+
+def _check_blocked_pca_matches_pca_model(n_samples, n_features):
+    rng = np.random.RandomState(0)
+    X = rng.randn(n_samples, n_features)
+    model = PCAVectorModel(X.copy())
+    components, eigenvalues, mean = blocked_pca(X, block_size=5)
+    n_components = model.n_components
+    assert_allclose(mean, model.mean())
+    assert_allclose(eigenvalues[:n_components], model.eigenvalues)
+    assert_allclose(np.abs(components[:n_components]),
+                    np.abs(model.components), atol=1e-8)
+
+
+def test_randomized_pca_matches_exact_pca_on_low_rank_data():
+    rng = np.random.RandomState(0)
+    n_samples, n_features, rank = 60, 50, 4
+    X = rng.randn(n_samples, rank).dot(rng.randn(rank, n_features))
+    model = PCAVectorModel(X.copy())
+    components, eigenvalues, mean, total_variance = randomized_pca(
+        X, rank, n_oversamples=5, block_size=16, random_state=0)
+    assert_allclose(mean, model.mean(), atol=1e-10)
+    assert_allclose(eigenvalues, model.eigenvalues[:rank])
+    assert_allclose(np.abs(components), np.abs(model.components[:rank]),
+                    atol=1e-8)
+    # The data are of rank 4, so the components capture all the variance
+    assert_allclose(total_variance, np.sum(model.eigenvalues))
+    assert_allclose(residual_eigenvalues(eigenvalues, total_variance,
+                                         n_samples, n_features).sum(), 0,
+                    atol=1e-8)
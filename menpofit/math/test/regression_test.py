@@ -0,0 +1,53 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpofit.math import IRLRegression, IIRLRegression
+
+
+rng = np.random.RandomState(0)
+X = rng.randn(50, 6)
+Y = X.dot(rng.randn(6, 3)) + 0.1 * rng.randn(50, 3) + 2.
+
+
+def _partial_fit(regression, n_batches=3):
+    for X_batch, Y_batch in zip(np.array_split(X, n_batches),
+                                np.array_split(Y, n_batches)):
+        regression.partial_fit(X_batch, Y_batch)
+    regression.finalize()
+    return regression
+
+
+def test_partial_fit_matches_train():
+    for regression_cls, kwargs in [
+            (IRLRegression, dict(alpha=0.5, bias=True)),
+            (IRLRegression, dict(alpha=0, bias=False)),
+            (IIRLRegression, dict(alpha=0.5, alpha2=0.1))]:
+        trained = regression_cls(**kwargs)
+        trained.train(X, Y)
+        partially_fitted = _partial_fit(regression_cls(**kwargs))
+        assert_allclose(partially_fitted.W, trained.W)
+        assert_allclose(partially_fitted.predict(X[0]),
+                        trained.predict(X[0]))
+
+
+def test_irl_implicit_bias():
+    alpha = 0.5
+    regression = _partial_fit(IRLRegression(alpha=alpha, bias=True))
+    # Regression with an explicit column of ones for the bias
+    X_bias = np.hstack((X, np.ones((X.shape[0], 1))))
+    XX = X_bias.T.dot(X_bias) + alpha * np.eye(X_bias.shape[1])
+    assert_allclose(regression.W, np.linalg.solve(XX, X_bias.T.dot(Y)))
+
+
+def test_irl_solve_without_cholesky_factorization():
+    # A negative regularisation makes the system indefinite, hence the
+    # Cholesky factorization fails and the system is solved directly
+    X_bias = np.hstack((X, np.ones((X.shape[0], 1))))
+    XX = X_bias.T.dot(X_bias)
+    alpha = - np.mean(np.linalg.eigvalsh(XX))
+    regression = IRLRegression(alpha=alpha, bias=True, incrementable=True)
+    regression.train(X, Y)
+    XX_alpha = XX + alpha * np.eye(XX.shape[0])
+    assert_allclose(regression.W,
+                    np.linalg.solve(XX_alpha, X_bias.T.dot(Y)))
+    assert_allclose(regression.V, np.linalg.inv(XX_alpha))
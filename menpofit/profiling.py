@@ -0,0 +1,277 @@
+r"""
+Per-stage timing and memory profiling of the fitting procedure.
+
+The fitters and algorithms wrap the expensive steps of their ``run`` loops
+(feature extraction, warping, gradients, linear solves, ...) with
+:map:`stage`. When no :map:`StageProfiler` is active, :map:`stage` returns a
+shared no-op context manager, hence the hooks cost a single attribute lookup.
+"""
+from __future__ import division
+from collections import OrderedDict
+import threading
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+# High resolution clock (Python 3) or wall clock (Python 2)
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+# The active profiler and the current scale and iteration, per thread
+_state = threading.local()
+
+
+def _active_profiler():
+    return getattr(_state, 'profiler', None)
+
+
+class _NullStage(object):
+    r"""
+    No-op context manager returned by :map:`stage` when profiling is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage(object):
+    r"""
+    Context manager that measures a single execution of a stage.
+    """
+    __slots__ = ('profiler', 'name', 'scale', 'iteration', 't0', 'm0')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.scale = getattr(_state, 'scale', None)
+        self.iteration = getattr(_state, 'iteration', None)
+
+    def __enter__(self):
+        self.m0 = self.profiler._traced_memory()
+        self.t0 = _clock()
+        return self
+
+    def __exit__(self, *args):
+        seconds = _clock() - self.t0
+        nbytes = self.profiler._traced_memory() - self.m0
+        self.profiler._record(self.scale, self.iteration, self.name, seconds,
+                              nbytes)
+        return False
+
+
+def stage(name):
+    r"""
+    Context manager that marks a stage of the fitting procedure. If a
+    :map:`StageProfiler` is active in the current thread, then the wall time
+    and the allocated bytes of the stage are recorded under the current scale
+    and iteration (see :map:`set_scale` and :map:`set_iteration`). Otherwise,
+    it does nothing.
+
+    Parameters
+    ----------
+    name : `str`
+        The name of the stage, e.g. ``'warp'`` or ``'solve'``.
+
+    Returns
+    -------
+    context : `object`
+        The context manager of the stage.
+
+    Examples
+    --------
+    ::
+
+        with stage('warp'):
+            i = self.interface.warp(image)
+    """
+    profiler = getattr(_state, 'profiler', None)
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name)
+
+
+def set_scale(scale):
+    r"""
+    Sets the scale to which the stages that follow are attributed. It is
+    called by the multi-scale fitters before each scale is processed.
+
+    Parameters
+    ----------
+    scale : `int` or ``None``
+        The index of the scale.
+    """
+    _state.scale = scale
+    _state.iteration = None
+
+
+def set_iteration(iteration):
+    r"""
+    Sets the iteration to which the stages that follow are attributed. It is
+    called by the algorithms at the beginning of each iteration of their
+    ``run`` loop.
+
+    Parameters
+    ----------
+    iteration : `int` or ``None``
+        The index of the iteration.
+    """
+    _state.iteration = iteration
+
+
+class StageProfiler(object):
+    r"""
+    Profiler that aggregates the wall time, the number of calls and the
+    allocated bytes of the stages of the fitting procedure, per scale and per
+    iteration. It is activated in the current thread as a context manager and
+    profilers can be nested, in which case the innermost one is the active
+    one.
+
+    Parameters
+    ----------
+    trace_memory : `bool`, optional
+        If ``True``, then the net allocated bytes of each stage are measured
+        with `tracemalloc`, which slows down the fitting considerably.
+        Otherwise, they are reported as ``0``. It is ignored on Python 2.
+    per_iteration : `bool`, optional
+        If ``True``, then the stages are aggregated per iteration. Otherwise,
+        the iterations of each scale are aggregated together.
+    callbacks : `list` of `callable` or ``None``, optional
+        Functions that are called after each execution of a stage as
+        ``callback(scale, iteration, stage, seconds, nbytes)``. They can be
+        used to forward the measurements to an external metrics system.
+
+    Examples
+    --------
+    ::
+
+        with fitter.profile() as profiler:
+            result = fitter.fit_from_bb(image, bounding_box)
+        print(profiler)
+        records = profiler.records()
+    """
+    def __init__(self, trace_memory=False, per_iteration=True,
+                 callbacks=None):
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.per_iteration = per_iteration
+        self.callbacks = list(callbacks) if callbacks is not None else []
+        self._stats = OrderedDict()
+        self._previous = []
+        self._started_tracing = []
+
+    def __enter__(self):
+        self._previous.append((_active_profiler(),
+                               getattr(_state, 'scale', None),
+                               getattr(_state, 'iteration', None)))
+        started = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started = True
+        self._started_tracing.append(started)
+        _state.profiler = self
+        set_scale(None)
+        return self
+
+    def __exit__(self, *args):
+        if self._started_tracing.pop():
+            tracemalloc.stop()
+        _state.profiler, _state.scale, _state.iteration = self._previous.pop()
+        return False
+
+    def _traced_memory(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    def _record(self, scale, iteration, name, seconds, nbytes):
+        key = (scale, iteration if self.per_iteration else None, name)
+        stats = self._stats.get(key)
+        if stats is None:
+            self._stats[key] = [1, seconds, nbytes]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += nbytes
+        for callback in self.callbacks:
+            callback(scale, iteration, name, seconds, nbytes)
+
+    def add_callback(self, callback):
+        r"""
+        Adds a function that is called after each execution of a stage.
+
+        Parameters
+        ----------
+        callback : `callable`
+            The function, called as
+            ``callback(scale, iteration, stage, seconds, nbytes)``.
+        """
+        self.callbacks.append(callback)
+
+    def reset(self):
+        r"""
+        Discards all the recorded measurements.
+        """
+        self._stats = OrderedDict()
+
+    def records(self):
+        r"""
+        Returns the aggregated measurements as a flat list that can be
+        exported to a metrics system or converted to a table (e.g.
+        ``pandas.DataFrame(profiler.records())``).
+
+        Returns
+        -------
+        records : `list` of `dict`
+            One `dict` per (scale, iteration, stage) with keys ``'scale'``,
+            ``'iteration'``, ``'stage'``, ``'n_calls'``, ``'seconds'`` and
+            ``'nbytes'``. The scale and the iteration are ``None`` for stages
+            executed outside a scale or an iteration.
+        """
+        return [{'scale': scale, 'iteration': iteration, 'stage': name,
+                 'n_calls': n_calls, 'seconds': seconds, 'nbytes': nbytes}
+                for (scale, iteration, name), (n_calls, seconds, nbytes)
+                in self._stats.items()]
+
+    def totals(self, by_scale=False):
+        r"""
+        Returns the measurements aggregated over the iterations and,
+        optionally, the scales.
+
+        Parameters
+        ----------
+        by_scale : `bool`, optional
+            If ``True``, then the measurements are aggregated per
+            (scale, stage). Otherwise, they are aggregated per stage.
+
+        Returns
+        -------
+        totals : `OrderedDict`
+            The ``(n_calls, seconds, nbytes)`` per stage or per
+            ``(scale, stage)``.
+        """
+        totals = OrderedDict()
+        for (scale, _, name), stats in self._stats.items():
+            key = (scale, name) if by_scale else name
+            total = totals.get(key, (0, 0., 0))
+            totals[key] = tuple(t + s for t, s in zip(total, stats))
+        return totals
+
+    def __str__(self):
+        totals = self.totals(by_scale=True)
+        lines = ['{:>6} {:<26} {:>8} {:>11} {:>12}'.format(
+            'scale', 'stage', 'calls', 'time (ms)', 'alloc (kB)')]
+        for (scale, name), (n_calls, seconds, nbytes) in totals.items():
+            lines.append('{:>6} {:<26} {:>8} {:>11.2f} {:>12.1f}'.format(
+                '-' if scale is None else scale, name, n_calls,
+                1000 * seconds, nbytes / 1024))
+        return '\n'.join(lines)
@@ -2,6 +2,7 @@ import numpy as np
 from collections import Iterable
 
 from menpo.image import Image
+from menpo.shape import PointCloud
 
 from menpofit.visualize import view_image_multiple_landmarks
 from menpofit.error import euclidean_bb_normalised_error
@@ -15,6 +16,21 @@ def _rescale_shapes_to_reference(shapes, affine_transform, scale_transform):
     return rescaled_shapes
 
 
+def _as_shapes_list(shapes):
+    # Compact results store the shapes of all the iterations as a single
+    # (n_shapes, n_points, n_dims) float32 array
+    if isinstance(shapes, np.ndarray):
+        return [PointCloud(s.astype(np.float64), copy=False) for s in shapes]
+    return shapes
+
+
+def _as_list(values):
+    # Compact results store the per iteration vectors as a single 2D array
+    if isinstance(values, np.ndarray):
+        return list(values)
+    return values
+
+
 def _parse_iters(iters, n_shapes):
     if not (iters is None or isinstance(iters, int) or
                 isinstance(iters, list)):
@@ -643,6 +659,32 @@ class NonParametricIterativeResult(Result):
         # Add costs as property
         self._costs = costs
 
+    # The indices of the reconstructed initial shapes within the shapes of a
+    # result that was compacted in 'final' mode (see _compact)
+    _compacted_reconstruction_indices = None
+    # The compact shapes array and the list of shapes built from it, so that
+    # the list is only built once (see _shapes_list)
+    _shapes_cache = None
+
+    def __getstate__(self):
+        # The cached list of shapes is not pickled, since it would defeat the
+        # purpose of the compact storage
+        state = self.__dict__.copy()
+        state.pop('_shapes_cache', None)
+        return state
+
+    def _shapes_list(self):
+        # Builds the list of shapes of a compact result on first access. The
+        # cache is tied to the compact array, so that it is invalidated
+        # whenever the shapes are replaced.
+        if not isinstance(self._shapes, np.ndarray):
+            return self._shapes
+        cache = self._shapes_cache
+        if cache is None or cache[0] is not self._shapes:
+            cache = (self._shapes, _as_shapes_list(self._shapes))
+            self._shapes_cache = cache
+        return cache[1]
+
     @property
     def is_iterative(self):
         r"""
@@ -661,7 +703,7 @@ class NonParametricIterativeResult(Result):
 
         :type: `list` of `menpo.shape.PointCloud`
         """
-        return self._shapes
+        return self._shapes_list()
 
     @property
     def n_iters(self):
@@ -672,6 +714,68 @@ class NonParametricIterativeResult(Result):
         """
         return self._n_iters
 
+    def _compact(self, result_mode):
+        r"""
+        Reduces the memory footprint of the result in place, so that large
+        numbers of results can be kept in memory and pickled fast. The image is
+        dropped and the shapes (as well as any per iteration parameters) are
+        stored as single ``float32`` arrays, from which the `shapes` (and
+        parameters) properties are lazily created.
+
+        Parameters
+        ----------
+        result_mode : ``{'full', 'trajectory', 'final'}``
+            If ``'full'``, then the result is left untouched. If
+            ``'trajectory'``, then the shapes of all the iterations are kept.
+            If ``'final'``, then only the initial (if it exists),
+            reconstructed initial (for parametric results) and final shapes,
+            as well as the final parameters, are kept, hence `shapes` and
+            `errors` only refer to those. Note that `n_iters` is always
+            preserved.
+        """
+        if result_mode == 'full':
+            return
+        self._image = None
+        shapes = self._shapes
+        if not isinstance(shapes, np.ndarray):
+            shapes = np.array([s.points for s in shapes])
+        if result_mode == 'final':
+            reconstruction_ids = []
+            if hasattr(self, '_reconstruction_indices'):
+                reconstruction_ids = self._reconstruction_indices
+            ids = [len(shapes) - 1] + reconstruction_ids
+            if self.initial_shape is not None:
+                ids.append(0)
+            ids = sorted(set(ids))
+            shapes = shapes[ids]
+            if reconstruction_ids:
+                # The reconstructions are no longer at the positions implied
+                # by n_iters_per_scale
+                self._compacted_reconstruction_indices = [
+                    ids.index(i) for i in reconstruction_ids]
+        self._shapes = shapes.astype(np.float32)
+        # The per iteration parameters are stored in attributes such as
+        # _shape_parameters and _appearance_parameters. The same list may be
+        # referenced by more than one attribute.
+        compacted = {}
+        for name, values in list(vars(self).items()):
+            if not (name.endswith('_parameters') and
+                    isinstance(values, list) and len(values) > 0):
+                continue
+            key = id(values)
+            if key not in compacted:
+                if result_mode == 'final':
+                    values = values[-1:]
+                try:
+                    compacted[key] = np.array(values, dtype=np.float32)
+                except ValueError:
+                    # The number of parameters varies across scales
+                    compacted[key] = [np.asarray(v, dtype=np.float32)
+                                      for v in values]
+            setattr(self, name, compacted[key])
+        if hasattr(self, '_reconstructed_initial_shape'):
+            self._reconstructed_initial_shape = None
+
     def to_result(self, pass_image=True, pass_initial_shape=True,
                   pass_gt_shape=True):
         r"""
@@ -1653,7 +1757,7 @@ class ParametricIterativeResult(NonParametricIterativeResult):
 
         :type: `list` of `menpo.shape.PointCloud`
         """
-        return self._shapes
+        return self._shapes_list()
 
     @property
     def shape_parameters(self):
@@ -1664,7 +1768,7 @@ class ParametricIterativeResult(NonParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._shape_parameters
+        return _as_list(self._shape_parameters)
 
     @property
     def reconstructed_initial_shape(self):
@@ -1674,10 +1778,7 @@ class ParametricIterativeResult(NonParametricIterativeResult):
 
         :type: `menpo.shape.PointCloud`
         """
-        if self.initial_shape is not None:
-            return self.shapes[1]
-        else:
-            return self.shapes[0]
+        return self.shapes[self._reconstruction_indices[0]]
 
     @property
     def _reconstruction_indices(self):
@@ -1687,6 +1788,8 @@ class ParametricIterativeResult(NonParametricIterativeResult):
 
         :type: `list` of `int`
         """
+        if self._compacted_reconstruction_indices is not None:
+            return self._compacted_reconstruction_indices
         if self.initial_shape is not None:
             return [1]
         else:
@@ -2239,7 +2342,7 @@ class MultiScaleParametricIterativeResult(MultiScaleNonParametricIterativeResult
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._shape_parameters
+        return _as_list(self._shape_parameters)
 
     @property
     def reconstructed_initial_shapes(self):
@@ -2260,6 +2363,8 @@ class MultiScaleParametricIterativeResult(MultiScaleNonParametricIterativeResult
 
         :type: `list` of `int`
         """
+        if self._compacted_reconstruction_indices is not None:
+            return self._compacted_reconstruction_indices
         initial_val = 0
         if self.initial_shape is not None:
             initial_val = 1
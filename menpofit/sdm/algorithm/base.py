@@ -1,10 +1,17 @@
 from __future__ import division
 from functools import partial
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import numpy as np
 
+from menpo.feature import no_op
+from menpo.model import PCAVectorModel
 from menpo.visualize import print_dynamic
 
 from menpofit.fitter import raise_costs_warning
+from menpofit.math.pca import (randomized_pca, residual_eigenvalues,
+                               use_randomized_pca)
+from menpofit.profiling import stage, set_iteration
 from menpofit.visualize import print_progress
 from menpofit.result import (NonParametricIterativeResult,
                              ParametricIterativeResult)
@@ -14,10 +21,27 @@ class BaseSupervisedDescentAlgorithm(object):
     r"""
     Abstract class for defining a Supervised Descent algorithm.
     """
+    # The number of threads that extract the training features (set by the
+    # fitter)
+    n_workers = 1
+
     @property
     def _multi_scale_fitter_result(self):
         raise NotImplementedError()
 
+    @property
+    def can_train_batches(self):
+        r"""
+        Whether the algorithm can be trained on a stream of batches with
+        :meth:`train_batches`, i.e. whether its regressor supports
+        ``partial_fit``. This is not the case for the regressors that are
+        solved from the whole data matrix (:map:`PCRRegression`,
+        :map:`OptimalLinearRegression` and :map:`OPPRegression`).
+
+        :type: `bool`
+        """
+        return hasattr(self._regressor_cls(), 'partial_fit')
+
     def train(self, images, gt_shapes, current_shapes, prefix='',
               verbose=False):
         r"""
@@ -119,6 +143,76 @@ class BaseSupervisedDescentAlgorithm(object):
 
         return current_shapes
 
+    def train_batches(self, batches, prefix='', verbose=False):
+        r"""
+        Method to train the model on a stream of batches, so that only a single
+        batch needs to be in memory at any time. The cascade is trained stage
+        by stage: the features of each batch are fed to the regressor's
+        ``partial_fit`` as they are computed and the regressor is solved once
+        all the batches have been seen, before the shapes are updated and the
+        next regressor is trained. Hence the learned regressors are the same
+        as the ones of :meth:`train`. Note that any shape or appearance models
+        are built from the first batch.
+
+        Parameters
+        ----------
+        batches : `callable`
+            A callable that returns a new iterator over the batches every
+            time it is called. Each batch is an ``(images, gt_shapes,
+            current_shapes)`` `tuple` with the `list` of training images,
+            the `list` of their ground truth shapes and the `list` of `list`
+            of current shapes per image. The current shapes get updated
+            inplace.
+        prefix : `str`, optional
+            The prefix to use when printing information.
+        verbose : `bool`, optional
+            If ``True``, then information is printed during training.
+
+        Raises
+        ------
+        ValueError
+            The regressor of the algorithm cannot be trained in batches
+        """
+        self.regressors = []
+
+        # Cascaded Regression loop. Every pass over the batches updates the
+        # shapes with the previous regressor and feeds the current one.
+        for k in range(self.n_iterations + 1):
+            r = None
+            if k < self.n_iterations:
+                if not self.can_train_batches:
+                    raise ValueError('{} cannot be trained in batches.'.format(
+                        type(self).__name__))
+                r = self._regressor_cls()
+            for b, (images, gt_shapes, current_shapes) in enumerate(
+                    batches()):
+                if verbose:
+                    print_dynamic('{}(Iteration {}) - Batch {}'.format(
+                        prefix, k, b))
+                if k > 0:
+                    # Update the shapes with the previous regressor
+                    features = self._compute_training_features(
+                        images, gt_shapes, current_shapes)
+                    delta_x, gt_x = self._compute_delta_x(gt_shapes,
+                                                          current_shapes)
+                    estimated_delta_x = self.regressors[k - 1].predict(
+                        features)
+                    self._update_estimates(estimated_delta_x, delta_x, gt_x,
+                                           current_shapes)
+                if r is None:
+                    continue
+                # Generate regression data and accumulate it
+                features = self._compute_training_features(
+                    images, gt_shapes, current_shapes)
+                delta_x, _ = self._compute_delta_x(gt_shapes, current_shapes)
+                r.partial_fit(features, delta_x)
+            if r is not None:
+                if verbose:
+                    print_dynamic('{}(Iteration {}) - Performing '
+                                  'regression'.format(prefix, k))
+                r.finalize()
+                self.regressors.append(r)
+
     def _compute_delta_x(self, gt_shapes, current_shapes):
         raise NotImplementedError()
 
@@ -162,9 +256,35 @@ class BaseSupervisedDescentAlgorithm(object):
         raise NotImplementedError()
 
 
-def features_per_patch(image, shape, patch_shape, features_callable):
+def supports_batches(features_callable):
+    r"""
+    Whether the provided patch features callable can be applied on a stack
+    of patches, i.e. on a ``(n_patches, n_channels, height, width)``
+    `ndarray`, and return the stack of the features of each patch. This is
+    the case for `menpo.feature.no_op` and for any callable that opts in by
+    setting its ``supports_batches`` attribute to ``True``.
+
+    Parameters
+    ----------
+    features_callable : `callable`
+        The patch features callable.
+
+    Returns
+    -------
+    supports_batches : `bool`
+        Whether the callable supports stacks of patches.
+    """
+    return (features_callable is no_op or
+            getattr(features_callable, 'supports_batches', False) is True)
+
+
+def features_per_patch(image, shape, patch_shape, features_callable,
+                       out=None):
     r"""
     Method that first extracts patches and then features from these patches.
+    If `features_callable` supports stacks of patches (see
+    :map:`supports_batches`), then the features of all the patches are
+    computed with a single call. Otherwise, it is called once per patch.
 
     Parameters
     ----------
@@ -176,6 +296,9 @@ def features_per_patch(image, shape, patch_shape, features_callable):
         The shape of the patch to be extracted.
     features_callable : `callable`
         The function to be used for extracting features.
+    out : ``(n_features,)`` `ndarray` or ``None``, optional
+        Preallocated array in which the features are written. If ``None``,
+        then a new array is allocated.
 
     Returns
     -------
@@ -184,11 +307,27 @@ def features_per_patch(image, shape, patch_shape, features_callable):
     """
     patches = image.extract_patches(shape, patch_shape=patch_shape,
                                     as_single_array=True)
-    patch_features = [features_callable(p[0]).ravel() for p in patches]
-    return np.hstack(patch_features)
-
-
-def features_per_shapes(image, shapes, patch_shape, features_callable):
+    # patches: n_patches x n_channels x height x width
+    patches = patches[:, 0]
+    if supports_batches(features_callable):
+        features = np.asarray(features_callable(patches)).ravel()
+    elif out is None:
+        features = np.hstack([features_callable(p).ravel() for p in patches])
+    else:
+        start = 0
+        for p in patches:
+            f = features_callable(p).ravel()
+            out[start:start + f.size] = f
+            start += f.size
+        return out
+    if out is None:
+        return features
+    out[:] = features
+    return out
+
+
+def features_per_shapes(image, shapes, patch_shape, features_callable,
+                        out=None):
     r"""
     Method that given multiple shapes for an image, it first extracts patches
     that correspond to the shapes and then features from these patches.
@@ -203,24 +342,37 @@ def features_per_shapes(image, shapes, patch_shape, features_callable):
         The shape of the patch to be extracted.
     features_callable : `callable`
         The function to be used for extracting features.
+    out : ``(n_shapes, n_features)`` `ndarray` or ``None``, optional
+        Preallocated array in which the features are written. If ``None``,
+        then a new array is allocated.
 
     Returns
     -------
     features_per_shapes : ``(n_shapes, n_features)`` `ndarray`
         The concatenated feature vector per shape.
     """
-    patch_features = [features_per_patch(image, s, patch_shape,
-                                         features_callable)
-                      for s in shapes]
-    return np.vstack(patch_features)
+    if out is None:
+        features = features_per_patch(image, shapes[0], patch_shape,
+                                      features_callable)
+        out = np.empty((len(shapes), features.size), dtype=features.dtype)
+        out[0] = features
+        shapes = shapes[1:]
+        offset = 1
+    else:
+        offset = 0
+    for k, s in enumerate(shapes):
+        features_per_patch(image, s, patch_shape, features_callable,
+                           out=out[offset + k])
+    return out
 
 
 def features_per_image(images, shapes, patch_shape, features_callable,
-                       prefix='', verbose=False):
+                       prefix='', verbose=False, n_workers=1):
     r"""
     Method that given multiple images with multiple shapes per image, it first
     extracts patches that correspond to the shapes and then features from
-    these patches.
+    these patches. The features are written directly into a single
+    preallocated feature matrix.
 
     Parameters
     ----------
@@ -236,6 +388,9 @@ def features_per_image(images, shapes, patch_shape, features_callable,
         The prefix of the printed information.
     verbose : `bool`, optional
         If ``True``, then progress information is printed.
+    n_workers : `int` or ``None``, optional
+        The number of threads that extract the features of the images in
+        parallel. If ``None``, then the number of CPUs is used.
 
     Returns
     -------
@@ -245,10 +400,36 @@ def features_per_image(images, shapes, patch_shape, features_callable,
     wrap = partial(print_progress,
                    prefix='{}Extracting patches'.format(prefix),
                    end_with_newline=not prefix, verbose=verbose)
-    patch_features = [features_per_shapes(i, shapes[j], patch_shape,
-                                          features_callable)
-                      for j, i in enumerate(wrap(images))]
-    return np.vstack(patch_features)
+    n_images = len(images)
+    # Allocate the feature matrix given the features of the first image
+    offsets = np.cumsum([0] + [len(s) for s in shapes])
+    features = features_per_shapes(images[0], shapes[0], patch_shape,
+                                   features_callable)
+    out = np.empty((offsets[-1], features.shape[1]), dtype=features.dtype)
+    out[:offsets[1]] = features
+
+    def extract(j):
+        features_per_shapes(images[j], shapes[j], patch_shape,
+                            features_callable,
+                            out=out[offsets[j]:offsets[j + 1]])
+
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    # the features of the first image have already been extracted
+    remaining = range(1, n_images)
+    if n_workers > 1 and n_images > 2:
+        pool = ThreadPool(min(n_workers, n_images - 1))
+        try:
+            for _ in wrap(pool.imap_unordered(extract, remaining),
+                          n_items=n_images - 1):
+                pass
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for j in wrap(remaining):
+            extract(j)
+    return out
 
 
 def compute_non_parametric_delta_x(gt_shapes, current_shapes):
@@ -499,7 +680,8 @@ def update_parametric_estimates(estimated_delta_x, delta_x, gt_x,
 
 
 def build_appearance_model(images, gt_shapes, patch_shape, patch_features,
-                           appearance_model_cls, verbose=False, prefix=''):
+                           appearance_model_cls, max_n_components=None,
+                           verbose=False, prefix=''):
     r"""
     Method that builds a parametric patch-based appearance model.
 
@@ -517,6 +699,14 @@ def build_appearance_model(images, gt_shapes, patch_shape, patch_features,
     appearance_model_cls : `menpo.model.PCAModel`
         The class that will be used to train the model, e.g.
         `menpo.model.PCAModel`.
+    max_n_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept. If `appearance_model_cls` is `menpo.model.PCAVectorModel` and
+        `max_n_components` is an `int` much smaller than the data, then a
+        randomized truncated decomposition is performed (see
+        :map:`randomized_pca`).
     verbose : `bool`, optional
         If ``True``, then information about the training progress will be
         printed.
@@ -535,7 +725,20 @@ def build_appearance_model(images, gt_shapes, patch_shape, patch_features,
     gt_patches = np.array(gt_patches).reshape([n_images, -1])
     if verbose:
         print_dynamic('{}Building Appearance Model'.format(prefix))
-    return appearance_model_cls(gt_patches)
+    if (appearance_model_cls is PCAVectorModel and
+            use_randomized_pca(max_n_components, *gt_patches.shape)):
+        components, eigenvalues, mean, total_variance = randomized_pca(
+            gt_patches, max_n_components)
+        appearance_model = PCAVectorModel.init_from_components(
+            components, eigenvalues, mean, n_images, True)
+        # Keep the variance of the discarded components
+        appearance_model._trimmed_eigenvalues = residual_eigenvalues(
+            eigenvalues, total_variance, *gt_patches.shape)
+        return appearance_model
+    appearance_model = appearance_model_cls(gt_patches)
+    if max_n_components is not None:
+        appearance_model.trim_components(max_n_components)
+    return appearance_model
 
 
 def fit_parametric_shape(image, initial_shape, parametric_algorithm,
@@ -578,13 +781,16 @@ def fit_parametric_shape(image, initial_shape, parametric_algorithm,
     shape_parameters = [parametric_algorithm.shape_model.as_vector()]
 
     # Cascaded Regression loop
-    for r in parametric_algorithm.regressors:
+    for k, r in enumerate(parametric_algorithm.regressors):
+        set_iteration(k)
         # compute regression features
-        features = parametric_algorithm._compute_test_features(image,
-                                                               current_shape)
+        with stage('features'):
+            features = parametric_algorithm._compute_test_features(
+                image, current_shape)
 
         # solve for increments on the shape vector
-        dx = r.predict(features).ravel()
+        with stage('regression'):
+            dx = r.predict(features).ravel()
 
         # update current shape
         p = parametric_algorithm.shape_model.as_vector() + dx
@@ -637,13 +843,16 @@ def fit_non_parametric_shape(image, initial_shape, non_parametric_algorithm,
     shapes = []
 
     # Cascaded Regression loop
-    for r in non_parametric_algorithm.regressors:
+    for k, r in enumerate(non_parametric_algorithm.regressors):
+        set_iteration(k)
         # compute regression features
-        features = non_parametric_algorithm._compute_test_features(image,
-                                                                   current_shape)
+        with stage('features'):
+            features = non_parametric_algorithm._compute_test_features(
+                image, current_shape)
 
         # solve for increments on the shape vector
-        dx = r.predict(features)
+        with stage('regression'):
+            dx = r.predict(features)
 
         # update current shape
         current_shape = current_shape.from_vector(
@@ -28,13 +28,20 @@ class FullyParametricSDAlgorithm(BaseSupervisedDescentAlgorithm):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     """
     def __init__(self, shape_model_cls=OrthoPDM,
-                 appearance_model_cls=PCAVectorModel):
+                 appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None):
         super(FullyParametricSDAlgorithm, self).__init__()
         self.regressors = []
         self.shape_model_cls = shape_model_cls
         self.appearance_model_cls = appearance_model_cls
+        self.max_appearance_components = max_appearance_components
         self.appearance_model = None
         self.shape_model = None
 
@@ -61,7 +68,9 @@ class FullyParametricSDAlgorithm(BaseSupervisedDescentAlgorithm):
         if self.appearance_model is None:
             self.appearance_model = build_appearance_model(
                 images, gt_shapes, self.patch_shape, self.patch_features,
-                self.appearance_model_cls, verbose=verbose, prefix=prefix)
+                self.appearance_model_cls,
+                max_n_components=self.max_appearance_components,
+                verbose=verbose, prefix=prefix)
 
         wrap = partial(print_progress,
                        prefix='{}Extracting patches'.format(prefix),
@@ -172,6 +181,11 @@ class FullyParametricWeightsNewton(ParametricAppearanceWeights):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -183,11 +197,13 @@ class FullyParametricWeightsNewton(ParametricAppearanceWeights):
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, shape_model_cls=OrthoPDM,
                  appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True):
         super(FullyParametricWeightsNewton, self).__init__(
             shape_model_cls=shape_model_cls,
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IRLRegression, alpha=alpha, bias=bias)
         self.patch_shape = patch_shape
@@ -216,6 +232,11 @@ class FullyParametricMeanTemplateNewton(ParametricAppearanceMeanTemplate):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -227,11 +248,13 @@ class FullyParametricMeanTemplateNewton(ParametricAppearanceMeanTemplate):
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, shape_model_cls=OrthoPDM,
                  appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True):
         super(FullyParametricMeanTemplateNewton, self).__init__(
             shape_model_cls=shape_model_cls,
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IRLRegression, alpha=alpha, bias=bias)
         self.patch_shape = patch_shape
@@ -260,6 +283,11 @@ class FullyParametricProjectOutNewton(ParametricAppearanceProjectOut):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -271,11 +299,13 @@ class FullyParametricProjectOutNewton(ParametricAppearanceProjectOut):
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, shape_model_cls=OrthoPDM,
                  appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True):
         super(FullyParametricProjectOutNewton, self).__init__(
             shape_model_cls=shape_model_cls,
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IRLRegression, alpha=alpha, bias=bias)
         self.patch_shape = patch_shape
@@ -304,6 +334,11 @@ class FullyParametricProjectOutGaussNewton(ParametricAppearanceProjectOut):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -317,11 +352,13 @@ class FullyParametricProjectOutGaussNewton(ParametricAppearanceProjectOut):
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, shape_model_cls=OrthoPDM,
                  appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True, alpha2=0):
         super(FullyParametricProjectOutGaussNewton, self).__init__(
             shape_model_cls=shape_model_cls,
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IIRLRegression, alpha=alpha, bias=bias,
                                       alpha2=alpha2)
@@ -350,6 +387,11 @@ class FullyParametricProjectOutOPP(ParametricAppearanceProjectOut):
         choice is :map:`OrthoPDM`.
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -359,11 +401,13 @@ class FullyParametricProjectOutOPP(ParametricAppearanceProjectOut):
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, shape_model_cls=OrthoPDM,
                  appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  bias=True):
         super(FullyParametricProjectOutOPP, self).__init__(
             shape_model_cls=shape_model_cls,
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(OPPRegression, bias=bias)
         self.patch_shape = patch_shape
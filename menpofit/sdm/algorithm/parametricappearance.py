@@ -24,11 +24,18 @@ class ParametricAppearanceSDAlgorithm(BaseSupervisedDescentAlgorithm):
     ----------
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     """
-    def __init__(self, appearance_model_cls=PCAVectorModel):
+    def __init__(self, appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None):
         super(ParametricAppearanceSDAlgorithm, self).__init__()
         self.regressors = []
         self.appearance_model_cls = appearance_model_cls
+        self.max_appearance_components = max_appearance_components
         self.appearance_model = None
 
     @property
@@ -50,7 +57,9 @@ class ParametricAppearanceSDAlgorithm(BaseSupervisedDescentAlgorithm):
         if self.appearance_model is None:
             self.appearance_model = build_appearance_model(
                 images, gt_shapes, self.patch_shape, self.patch_features,
-                self.appearance_model_cls, verbose=verbose, prefix=prefix)
+                self.appearance_model_cls,
+                max_n_components=self.max_appearance_components,
+                verbose=verbose, prefix=prefix)
 
         wrap = partial(print_progress,
                        prefix='{}Extracting patches'.format(prefix),
@@ -126,6 +135,11 @@ class ParametricAppearanceNewton(ParametricAppearanceSDAlgorithm):
         The number of iterations (cascades).
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -136,10 +150,12 @@ class ParametricAppearanceNewton(ParametricAppearanceSDAlgorithm):
     """
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True):
         super(ParametricAppearanceNewton, self).__init__(
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IRLRegression, alpha=alpha, bias=bias)
         self.patch_shape = patch_shape
@@ -164,6 +180,11 @@ class ParametricAppearanceGaussNewton(ParametricAppearanceSDAlgorithm):
         The number of iterations (cascades).
     appearance_model_cls : `menpo.model.PCAVectorModel` or `subclass`
         The class to be used for building the appearance model.
+    max_appearance_components : `int`, `float` or ``None``, optional
+        The number of appearance components to keep. If `int`, then it sets the
+        exact number of components. If `float`, then it defines the variance
+        percentage that will be kept. If ``None``, then all the components are
+        kept.
     compute_error : `callable`, optional
         The function to be used for computing the fitting error when training
         each cascade.
@@ -176,10 +197,12 @@ class ParametricAppearanceGaussNewton(ParametricAppearanceSDAlgorithm):
     """
     def __init__(self, patch_features=no_op, patch_shape=(17, 17),
                  n_iterations=3, appearance_model_cls=PCAVectorModel,
+                 max_appearance_components=None,
                  compute_error=euclidean_bb_normalised_error,
                  alpha=0, bias=True, alpha2=0):
         super(ParametricAppearanceGaussNewton, self).__init__(
-            appearance_model_cls=appearance_model_cls)
+            appearance_model_cls=appearance_model_cls,
+            max_appearance_components=max_appearance_components)
 
         self._regressor_cls = partial(IIRLRegression, alpha=alpha, bias=bias,
                                       alpha2=alpha2)
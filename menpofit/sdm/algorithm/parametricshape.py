@@ -54,7 +54,7 @@ class ParametricShapeSDAlgorithm(BaseSupervisedDescentAlgorithm):
         # initialize sample counter
         return features_per_image(images, current_shapes, self.patch_shape,
                                   self.patch_features, prefix=prefix,
-                                  verbose=verbose)
+                                  verbose=verbose, n_workers=self.n_workers)
 
     def _compute_test_features(self, image, current_shape):
         return features_per_patch(image, current_shape,
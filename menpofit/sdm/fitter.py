@@ -5,12 +5,14 @@ import warnings
 
 from menpo.feature import no_op
 from menpo.base import name_of_callable
+from menpo.shape import PointCloud
+from menpo.transform import Affine
 
 from menpofit.visualize import print_progress
-from menpofit.base import batch
+from menpofit.base import batch, as_sequence
 from menpofit.builder import (scale_images, rescale_images_to_reference_shape,
                               compute_reference_shape, MenpoFitBuilderWarning,
-                              compute_features)
+                              compute_features, extract_shapes)
 from menpofit.fitter import (MultiScaleNonParametricFitter,
                              noisy_shape_from_bounding_box,
                              align_shape_with_bounding_box,
@@ -20,6 +22,25 @@ import menpofit.checks as checks
 from .algorithm import NonParametricNewton
 
 
+# Landmark group that is attached on the training images when streaming them
+# in batches, in order to recover the affine transform that the holistic
+# features and the rescaling apply on their coordinates
+_FRAME_GROUP = '__sdm_frame'
+_FRAME_POINTS = np.array([[0., 0.], [1., 0.], [0., 1.]])
+
+
+def _frame_transform(image):
+    # Returns the affine transform that maps the coordinates of the image to
+    # the ones of the image on which the frame landmarks were attached
+    points = image.landmarks[_FRAME_GROUP].lms.points
+    h_matrix = np.eye(3)
+    h_matrix[:2, 0] = points[1] - points[0]
+    h_matrix[:2, 1] = points[2] - points[0]
+    h_matrix[:2, 2] = points[0]
+    del image.landmarks[_FRAME_GROUP]
+    return Affine(h_matrix).pseudoinverse()
+
+
 class SupervisedDescentFitter(MultiScaleNonParametricFitter):
     r"""
     Class for training a multi-scale Supervised Descent model.
@@ -110,7 +131,11 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
         images. Note that, as opposed to `holistic_features`, these features
         are extracted after extracting the patches. If `list`, then it must
         define a feature function per scale. Please refer to `menpo.feature`
-        and `menpofit.feature` for a list of potential features.
+        and `menpofit.feature` for a list of potential features. A feature
+        that can be applied on a ``(n_patches, n_channels, height, width)``
+        stack of patches can set its ``supports_batches`` attribute to
+        ``True``, so that the features of all the patches of a shape are
+        computed with a single call.
     patch_shape : (`int`, `int`) or `list` of (`int`, `int`), optional
         The shape of the patches to be extracted. If a `list` is provided,
         then it defines a patch shape per scale.
@@ -131,8 +156,21 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
     batch_size : `int` or ``None``, optional
         If an `int` is provided, then the training is performed in an
         incremental fashion on image batches of size equal to the provided
-        value. If ``None``, then the training is performed directly on the
-        all the images.
+        value, so that only a single batch of images and features is in memory
+        at any time. The cascade is trained stage by stage over all the
+        batches, hence `images` must be a sequence that can be traversed
+        multiple times (e.g. a `list` or a `menpo.base.LazyList`) and the
+        algorithm's regressor must support ``partial_fit`` (e.g.
+        :map:`IRLRegression` and :map:`IIRLRegression`). The PCR, Optimal
+        and OPP regression algorithms (e.g. :map:`NonParametricPCRRegression`
+        or :map:`ParametricShapeOPPRegression`) are solved from the whole data
+        matrix, hence they cannot be trained in batches and a `ValueError` is
+        raised before any training. If ``None``, then the training is
+        performed directly on the all the images.
+    n_workers : `int` or ``None``, optional
+        The number of threads used to rescale the training images and to
+        extract their holistic and patch features in parallel (see
+        :map:`parallel_map`). If ``None``, then the number of CPUs is used.
     verbose : `bool`, optional
         If ``True``, then the progress of the training will be printed.
 
@@ -152,10 +190,7 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
                  patch_shape=(17, 17), scales=(0.5, 1.0), n_iterations=3,
                  n_perturbations=30,
                  perturb_from_gt_bounding_box=noisy_shape_from_bounding_box,
-                 batch_size=None, verbose=False):
-        if batch_size is not None:
-            raise NotImplementedError('Training an SDM with a batch size '
-                                      '(incrementally) is not implemented yet.')
+                 batch_size=None, n_workers=1, verbose=False):
         # Check parameters
         checks.check_diagonal(diagonal)
         scales = checks.check_scales(scales)
@@ -178,6 +213,7 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
         self.n_perturbations = n_perturbations
         self.n_iterations = checks.check_max_iters(n_iterations, n_scales)
         self._perturb_from_gt_bounding_box = perturb_from_gt_bounding_box
+        self.n_workers = n_workers
 
         # Set up algorithms
         self._setup_algorithms()
@@ -192,51 +228,142 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
             patch_features=self.patch_features[j],
             patch_shape=self.patch_shape[j], n_iterations=self.n_iterations[j])
                            for j in range(self.n_scales)]
+        for algorithm in self.algorithms:
+            algorithm.n_workers = self.n_workers
 
     def _train(self, images, increment=False, group=None,
                bounding_box_group_glob=None, verbose=False, batch_size=None):
-        # If batch_size is not None, then we may have a generator, else we
-        # assume we have a list.
         if batch_size is not None:
-            # Create a generator of fixed sized batches. Will still work even
-            # on an infinite list.
-            image_batches = batch(images, batch_size)
-        else:
-            image_batches = [list(images)]
-
-        for k, image_batch in enumerate(image_batches):
+            # Train the cascades stage by stage over streamed batches
+            return self._train_batches(
+                images, batch_size, group=group,
+                bounding_box_group_glob=bounding_box_group_glob,
+                verbose=verbose)
+        image_batch = as_sequence(images)
+        group = self._set_up_reference_shape(image_batch, group,
+                                             verbose=verbose)
+        if verbose:
+            print('Computing batch 0')
+        self._train_batch(image_batch, increment=increment, group=group,
+                          bounding_box_group_glob=bounding_box_group_glob,
+                          verbose=verbose)
+
+    def _set_up_reference_shape(self, image_batch, group=None,
+                                batch_size=None, verbose=False):
+        if self.reference_shape is None:
+            # If no reference shape was given, use the mean of the first
+            # batch
+            if batch_size is not None:
+                warnings.warn('No reference shape was provided. The '
+                              'mean of the first batch will be the '
+                              'reference shape. If the batch mean is '
+                              'not representative of the true mean, '
+                              'this may cause issues.',
+                              MenpoFitBuilderWarning)
+            self._reference_shape = compute_reference_shape(
+                extract_shapes(image_batch, group),
+                self.diagonal, verbose=verbose)
+        # We set landmarks on the images to archive the perturbations, so
+        # when the default 'None' is used, we need to grab the actual
+        # label to sort out the ambiguity
+        if group is None:
+            group = image_batch[0].landmarks.group_labels[0]
+        return group
+
+    def _train_batches(self, images, batch_size, group=None,
+                       bounding_box_group_glob=None, verbose=False):
+        for j, algorithm in enumerate(self.algorithms):
+            if not algorithm.can_train_batches:
+                raise ValueError('The algorithm of scale {} ({}) cannot be '
+                                 'trained in batches, as its regressor does '
+                                 'not support partial_fit. Use '
+                                 'batch_size=None instead.'.format(
+                                    j, type(algorithm).__name__))
+        if iter(images) is images:
+            raise ValueError('Training with a batch_size requires images that '
+                             'can be traversed multiple times, e.g. a list or '
+                             'a LazyList, not an iterator.')
+
+        # Set up the reference shape from the first batch and generate the
+        # initial shapes of all the images. Only the shapes are kept in
+        # memory, in the frame of the images rescaled to the reference shape.
+        current_shapes = []
+        for k, image_batch in enumerate(batch(images, batch_size)):
             if k == 0:
-                if self.reference_shape is None:
-                    # If no reference shape was given, use the mean of the first
-                    # batch
-                    if batch_size is not None:
-                        warnings.warn('No reference shape was provided. The '
-                                      'mean of the first batch will be the '
-                                      'reference shape. If the batch mean is '
-                                      'not representative of the true mean, '
-                                      'this may cause issues.',
-                                      MenpoFitBuilderWarning)
-                    self._reference_shape = compute_reference_shape(
-                        [i.landmarks[group].lms for i in image_batch],
-                        self.diagonal, verbose=verbose)
-            # We set landmarks on the images to archive the perturbations, so
-            # when the default 'None' is used, we need to grab the actual
-            # label to sort out the ambiguity
-            if group is None:
-                group = image_batch[0].landmarks.group_labels[0]
-
-            # After the first batch, we are incrementing the model
-            if k > 0:
-                increment = True
+                group = self._set_up_reference_shape(image_batch, group,
+                                                     batch_size=batch_size,
+                                                     verbose=verbose)
+            if verbose:
+                print('Generating perturbations of batch {}'.format(k))
+            image_batch = rescale_images_to_reference_shape(
+                image_batch, group, self.reference_shape, verbose=verbose,
+                n_workers=self.n_workers)
+            generated_bb_func = generate_perturbations_from_gt(
+                image_batch, self.n_perturbations,
+                self._perturb_from_gt_bounding_box, gt_group=group,
+                bb_group_glob=bounding_box_group_glob, verbose=verbose)
+            for image in image_batch:
+                current_shapes.append(
+                    [align_shape_with_bounding_box(self.reference_shape, bbox)
+                     for bbox in generated_bb_func(image)])
 
+        # For each scale (low --> high)
+        for j in range(self.n_scales):
             if verbose:
-                print('Computing batch {}'.format(k))
+                if len(self.scales) > 1:
+                    scale_prefix = '  - Scale {}: '.format(j)
+                else:
+                    scale_prefix = '  - '
+            else:
+                scale_prefix = None
 
-            # Train each batch
-            self._train_batch(
-                image_batch, increment=increment, group=group,
-                bounding_box_group_glob=bounding_box_group_glob,
-                verbose=verbose)
+            def scale_batches(j=j):
+                # Every call re-loads and re-scales the images batch by
+                # batch. The current shapes are mapped to the frame of the
+                # scaled features of the batch and, once the batch is
+                # consumed, mapped back.
+                offset = 0
+                for image_batch in batch(images, batch_size):
+                    scaled_images, frame_transforms = self._scale_batch(
+                        image_batch, group, j)
+                    scaled_shapes = [i.landmarks[group].lms
+                                     for i in scaled_images]
+                    n_images = len(scaled_images)
+                    scaled_current_shapes = [
+                        [t.pseudoinverse().apply(s) for s in shapes]
+                        for t, shapes in zip(
+                            frame_transforms,
+                            current_shapes[offset:offset + n_images])]
+                    yield scaled_images, scaled_shapes, scaled_current_shapes
+                    for jj, (t, shapes) in enumerate(
+                            zip(frame_transforms, scaled_current_shapes)):
+                        current_shapes[offset + jj] = [t.apply(s)
+                                                       for s in shapes]
+                    offset += n_images
+
+            # Train supervised descent algorithm. This updates the shape
+            # estimations for the next scale.
+            self.algorithms[j].train_batches(scale_batches,
+                                             prefix=scale_prefix,
+                                             verbose=verbose)
+
+    def _scale_batch(self, image_batch, group, j):
+        # Rescale images wrt the reference shape, extract the features of
+        # scale j and rescale them according to scale j. The returned
+        # transforms map the scaled images back to the reference frame, which
+        # includes any change of coordinates due to the features.
+        image_batch = rescale_images_to_reference_shape(
+            image_batch, group, self.reference_shape,
+            n_workers=self.n_workers)
+        for image in image_batch:
+            image.landmarks[_FRAME_GROUP] = PointCloud(_FRAME_POINTS)
+        if self.holistic_features[j] != no_op:
+            image_batch = compute_features(image_batch,
+                                           self.holistic_features[j],
+                                           n_workers=self.n_workers)
+        scaled_images = scale_images(image_batch, self.scales[j],
+                                     n_workers=self.n_workers)
+        return scaled_images, [_frame_transform(i) for i in scaled_images]
 
     def _train_batch(self, image_batch, increment=False, group=None,
                      bounding_box_group_glob=None, verbose=False):
@@ -244,7 +371,7 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
         # reference_shape and their ground truth (group) shapes
         image_batch = rescale_images_to_reference_shape(
             image_batch, group, self.reference_shape,
-            verbose=verbose)
+            verbose=verbose, n_workers=self.n_workers)
 
         # Create a callable that generates perturbations of the bounding boxes
         # of the provided images.
@@ -278,14 +405,16 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
                 feature_images = compute_features(image_batch,
                                                   self.holistic_features[j],
                                                   prefix=scale_prefix,
-                                                  verbose=verbose)
+                                                  verbose=verbose,
+                                                  n_workers=self.n_workers)
 
             # Rescale images according to scales. Note that scale_images is smart
             # enough in order not to rescale the images if the current scale
             # factor equals to 1.
             scaled_images, scale_transforms = scale_images(
                 feature_images, self.scales[j], prefix=scale_prefix,
-                return_transforms=True, verbose=verbose)
+                return_transforms=True, verbose=verbose,
+                n_workers=self.n_workers)
 
             # Extract scaled ground truth shapes for current scale
             scaled_shapes = [i.landmarks[group].lms for i in scaled_images]
@@ -425,7 +554,8 @@ class SupervisedDescentFitter(MultiScaleNonParametricFitter):
             procedure.
         """
         return self.algorithms[0]._multi_scale_fitter_result(
-            results=algorithm_results, scales=self.scales,
+            results=algorithm_results,
+            scales=self._result_scales(algorithm_results),
             affine_transforms=affine_transforms,
             scale_transforms=scale_transforms, image=image, gt_shape=gt_shape)
 
@@ -518,7 +648,11 @@ class SDM(SupervisedDescentFitter):
         images. Note that, as opposed to `holistic_features`, these features
         are extracted after extracting the patches. If `list`, then it must
         define a feature function per scale. Please refer to `menpo.feature`
-        and `menpofit.feature` for a list of potential features.
+        and `menpofit.feature` for a list of potential features. A feature
+        that can be applied on a ``(n_patches, n_channels, height, width)``
+        stack of patches can set its ``supports_batches`` attribute to
+        ``True``, so that the features of all the patches of a shape are
+        computed with a single call.
     patch_shape : (`int`, `int`) or `list` of (`int`, `int`), optional
         The shape of the patches to be extracted. If a `list` is provided,
         then it defines a patch shape per scale.
@@ -539,8 +673,21 @@ class SDM(SupervisedDescentFitter):
     batch_size : `int` or ``None``, optional
         If an `int` is provided, then the training is performed in an
         incremental fashion on image batches of size equal to the provided
-        value. If ``None``, then the training is performed directly on the
-        all the images.
+        value, so that only a single batch of images and features is in memory
+        at any time. The cascade is trained stage by stage over all the
+        batches, hence `images` must be a sequence that can be traversed
+        multiple times (e.g. a `list` or a `menpo.base.LazyList`) and the
+        algorithm's regressor must support ``partial_fit`` (e.g.
+        :map:`IRLRegression` and :map:`IIRLRegression`). The PCR, Optimal
+        and OPP regression algorithms (e.g. :map:`NonParametricPCRRegression`
+        or :map:`ParametricShapeOPPRegression`) are solved from the whole data
+        matrix, hence they cannot be trained in batches and a `ValueError` is
+        raised before any training. If ``None``, then the training is
+        performed directly on the all the images.
+    n_workers : `int` or ``None``, optional
+        The number of threads used to rescale the training images and to
+        extract their holistic and patch features in parallel (see
+        :map:`parallel_map`). If ``None``, then the number of CPUs is used.
     verbose : `bool`, optional
         If ``True``, then the progress of the training will be printed.
 
@@ -555,7 +702,7 @@ class SDM(SupervisedDescentFitter):
                  patch_features=no_op, patch_shape=(17, 17), scales=(0.5, 1.0),
                  n_iterations=3, n_perturbations=30,
                  perturb_from_gt_bounding_box=noisy_shape_from_bounding_box,
-                 batch_size=None, verbose=False):
+                 batch_size=None, n_workers=1, verbose=False):
         super(SDM, self).__init__(
                 images, group=group,
                 bounding_box_group_glob=bounding_box_group_glob,
@@ -566,7 +713,7 @@ class SDM(SupervisedDescentFitter):
                 diagonal=diagonal, scales=scales, n_iterations=n_iterations,
                 n_perturbations=n_perturbations,
                 perturb_from_gt_bounding_box=perturb_from_gt_bounding_box,
-                batch_size=batch_size, verbose=verbose)
+                batch_size=batch_size, n_workers=n_workers, verbose=verbose)
 
 
 class RegularizedSDM(SupervisedDescentFitter):
@@ -610,7 +757,11 @@ class RegularizedSDM(SupervisedDescentFitter):
         images. Note that, as opposed to `holistic_features`, these features
         are extracted after extracting the patches. If `list`, then it must
         define a feature function per scale. Please refer to `menpo.feature`
-        and `menpofit.feature` for a list of potential features.
+        and `menpofit.feature` for a list of potential features. A feature
+        that can be applied on a ``(n_patches, n_channels, height, width)``
+        stack of patches can set its ``supports_batches`` attribute to
+        ``True``, so that the features of all the patches of a shape are
+        computed with a single call.
     patch_shape : (`int`, `int`) or `list` of (`int`, `int`), optional
         The shape of the patches to be extracted. If a `list` is provided,
         then it defines a patch shape per scale.
@@ -631,8 +782,21 @@ class RegularizedSDM(SupervisedDescentFitter):
     batch_size : `int` or ``None``, optional
         If an `int` is provided, then the training is performed in an
         incremental fashion on image batches of size equal to the provided
-        value. If ``None``, then the training is performed directly on the
-        all the images.
+        value, so that only a single batch of images and features is in memory
+        at any time. The cascade is trained stage by stage over all the
+        batches, hence `images` must be a sequence that can be traversed
+        multiple times (e.g. a `list` or a `menpo.base.LazyList`) and the
+        algorithm's regressor must support ``partial_fit`` (e.g.
+        :map:`IRLRegression` and :map:`IIRLRegression`). The PCR, Optimal
+        and OPP regression algorithms (e.g. :map:`NonParametricPCRRegression`
+        or :map:`ParametricShapeOPPRegression`) are solved from the whole data
+        matrix, hence they cannot be trained in batches and a `ValueError` is
+        raised before any training. If ``None``, then the training is
+        performed directly on the all the images.
+    n_workers : `int` or ``None``, optional
+        The number of threads used to rescale the training images and to
+        extract their holistic and patch features in parallel (see
+        :map:`parallel_map`). If ``None``, then the number of CPUs is used.
     verbose : `bool`, optional
         If ``True``, then the progress of the training will be printed.
 
@@ -648,7 +812,7 @@ class RegularizedSDM(SupervisedDescentFitter):
                  patch_shape=(17, 17), scales=(0.5, 1.0), n_iterations=6,
                  n_perturbations=30,
                  perturb_from_gt_bounding_box=noisy_shape_from_bounding_box,
-                 batch_size=None, verbose=False):
+                 batch_size=None, n_workers=1, verbose=False):
         super(RegularizedSDM, self).__init__(
             images, group=group,
             bounding_box_group_glob=bounding_box_group_glob,
@@ -658,4 +822,4 @@ class RegularizedSDM(SupervisedDescentFitter):
             patch_shape=patch_shape, diagonal=diagonal, scales=scales,
             n_iterations=n_iterations, n_perturbations=n_perturbations,
             perturb_from_gt_bounding_box=perturb_from_gt_bounding_box,
-            batch_size=batch_size, verbose=verbose)
+            batch_size=batch_size, n_workers=n_workers, verbose=verbose)
@@ -0,0 +1,69 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.feature import no_op
+from menpo.image import Image
+from menpo.shape import PointCloud
+
+from menpofit.sdm.algorithm.base import (features_per_patch,
+                                         features_per_image,
+                                         supports_batches)
+
+
+rng = np.random.RandomState(0)
+image = Image(rng.rand(2, 40, 40))
+shapes = [PointCloud(10 + 20 * rng.rand(4, 2)) for _ in range(3)]
+patch_shape = (6, 6)
+
+
+def _per_patch_features(shape, features_callable):
+    patches = image.extract_patches(shape, patch_shape=patch_shape,
+                                    as_single_array=True)[:, 0]
+    return np.hstack([features_callable(p).ravel() for p in patches])
+
+
+def test_features_reducing_over_the_input_are_not_batched():
+    for features_callable in [lambda x: x - x.min(),
+                              lambda x: x - x.flat[0]]:
+        assert not supports_batches(features_callable)
+        assert_allclose(
+            features_per_patch(image, shapes[0], patch_shape,
+                               features_callable),
+            _per_patch_features(shapes[0], features_callable))
+
+
+def test_features_opting_in_are_batched():
+    calls = []
+
+    def square(x):
+        calls.append(x.shape)
+        return x ** 2
+    square.supports_batches = True
+
+    assert supports_batches(no_op)
+    assert supports_batches(square)
+    features = features_per_patch(image, shapes[0], patch_shape, square)
+    assert calls == [(4, 2) + patch_shape]
+    assert_allclose(features, _per_patch_features(shapes[0], square))
+    assert_allclose(features_per_patch(image, shapes[0], patch_shape, no_op),
+                    _per_patch_features(shapes[0], no_op))
+
+
+def test_features_per_image_extracts_each_shape_once():
+    calls = []
+
+    def features(x):
+        calls.append(x)
+        return 2 * x
+
+    images = [image, Image(rng.rand(2, 40, 40))]
+    shapes_per_image = [shapes, shapes[:2]]
+    for n_workers in [1, 2]:
+        del calls[:]
+        out = features_per_image(images, shapes_per_image, patch_shape,
+                                 features, n_workers=n_workers)
+        assert len(calls) == 4 * 5
+        expected = [features_per_patch(i, s, patch_shape, features)
+                    for i, image_shapes in zip(images, shapes_per_image)
+                    for s in image_shapes]
+        assert_allclose(out, np.array(expected))
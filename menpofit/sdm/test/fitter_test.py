@@ -0,0 +1,74 @@
+from functools import partial
+
+import numpy as np
+from nose.tools import raises
+from numpy.testing import assert_allclose
+
+from menpo.feature import ndfeature
+from menpo.image import Image
+from menpo.shape import PointCloud
+
+from menpofit.sdm import (SupervisedDescentFitter, NonParametricNewton,
+                          NonParametricPCRRegression,
+                          ParametricShapeOPPRegression)
+
+
+@ndfeature
+def half_resolution(pixels):
+    # Feature that halves the resolution of the image, hence changes the
+    # coordinates of its landmarks
+    return pixels[:, ::2, ::2]
+
+
+def _training_images(n_images=6):
+    rng = np.random.RandomState(1)
+    y, x = np.mgrid[:80, :80].astype(np.float64)
+    images = []
+    for _ in range(n_images):
+        cy, cx = 40 + rng.randn(2) * 3
+        pixels = (np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / 200.) +
+                  0.1 * rng.rand(80, 80))
+        image = Image(pixels[None])
+        size = 20 + rng.randn()
+        image.landmarks['PTS'] = PointCloud(
+            np.array([[cy - size, cx - size], [cy - size, cx + size],
+                      [cy + size, cx + size], [cy + size, cx - size],
+                      [cy, cx]]))
+        images.append(image)
+    return images
+
+
+def _train_sdm(images, batch_size,
+               sd_algorithm_cls=partial(NonParametricNewton, alpha=1.)):
+    np.random.seed(0)
+    reference_shape = PointCloud(np.mean(
+        [i.landmarks['PTS'].points for i in images], axis=0))
+    return SupervisedDescentFitter(
+        images, group='PTS', sd_algorithm_cls=sd_algorithm_cls,
+        reference_shape=reference_shape,
+        holistic_features=half_resolution, patch_shape=(8, 8),
+        scales=(0.5, 1.0), n_iterations=2, n_perturbations=3,
+        batch_size=batch_size)
+
+
+def test_sdm_batches_match_in_memory_training_with_features():
+    images = _training_images()
+    in_memory = _train_sdm(images, None)
+    streamed = _train_sdm(images, 4)
+    for a, b in zip(in_memory.algorithms, streamed.algorithms):
+        assert len(a.regressors) == len(b.regressors)
+        for r_a, r_b in zip(a.regressors, b.regressors):
+            assert_allclose(r_a.W, r_b.W, rtol=1e-5, atol=1e-8)
+
+
+@raises(ValueError)
+def test_sdm_batches_reject_pcr_regression():
+    _train_sdm(_training_images(), 4,
+               sd_algorithm_cls=NonParametricPCRRegression)
+
+
+@raises(ValueError)
+def test_sdm_batches_reject_opp_regression_of_any_scale():
+    _train_sdm(_training_images(), 4,
+               sd_algorithm_cls=[NonParametricNewton,
+                                 ParametricShapeOPPRegression])
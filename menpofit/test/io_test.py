@@ -0,0 +1,47 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.image import Image
+from menpo.shape import PointCloud
+
+from menpofit.io import PickleWrappedFitter
+from menpofit.lk import LucasKanadeFitter
+
+
+def _blob_image(offset=(0, 0)):
+    y, x = np.mgrid[:100, :100].astype(np.float64)
+    cy, cx = 50 + offset[0], 50 + offset[1]
+    pixels = (np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / 300.) +
+              0.5 * np.exp(-((y - cy - 10) ** 2 + (x - cx + 8) ** 2) / 80.))
+    image = Image(pixels[None])
+    image.landmarks['PTS'] = PointCloud(
+        np.array([[cy - 20., cx - 20.], [cy - 20., cx + 20.],
+                  [cy + 20., cx + 20.], [cy + 20., cx - 20.]]))
+    return image
+
+
+def test_fit_many_matches_sequential_fitting():
+    template = _blob_image()
+    fitter = PickleWrappedFitter(
+        LucasKanadeFitter, (template,),
+        dict(group='PTS', scales=(1.0,), diagonal=None),
+        dict(max_iters=10), dict(max_iters=10), image_preprocess=None)
+    images = [_blob_image(offset=(i % 3, -(i % 2))) for i in range(7)]
+    bbs = [template.landmarks['PTS'].bounding_box() for _ in images]
+    expected = [fitter.fit_from_bb(i, bb).final_shape.points
+                for i, bb in zip(images, bbs)]
+    for ordered in [True, False]:
+        _check_fit_many(fitter, images, bbs, expected, ordered)
+
+
+def _check_fit_many(fitter, images, bbs, expected, ordered):
+    results = list(fitter.fit_many(iter(images), iter(bbs), n_workers=2,
+                                   ordered=ordered, max_pending=3))
+    assert len(results) == len(images)
+    if ordered:
+        indices = range(len(images))
+    else:
+        indices, results = zip(*results)
+        assert sorted(indices) == list(range(len(images)))
+    for i, result in zip(indices, results):
+        assert_allclose(result.final_shape.points, expected[i])
@@ -0,0 +1,112 @@
+import copy
+import pickle
+from itertools import product
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.shape import PointCloud
+from menpo.transform import Affine, Scale
+
+from menpofit.result import (ParametricIterativeResult,
+                             MultiScaleParametricIterativeResult)
+
+
+rng = np.random.RandomState(0)
+gt_shape = PointCloud(rng.rand(5, 2) * 10)
+
+
+def _parametric_result(n_iters, initial_shape=None):
+    # The first shape is the reconstruction of the initial shape
+    shapes = [PointCloud(gt_shape.points + rng.randn(5, 2))
+              for _ in range(n_iters + 1)]
+    shape_parameters = [rng.randn(3) for _ in range(n_iters + 1)]
+    return ParametricIterativeResult(shapes, shape_parameters,
+                                     initial_shape=initial_shape,
+                                     gt_shape=gt_shape)
+
+
+def _multiscale_result(initial_shape=None):
+    results = [_parametric_result(3, initial_shape=initial_shape),
+               _parametric_result(2)]
+    identity = [Affine.init_identity(2), Affine.init_identity(2)]
+    scale_transforms = [Scale(1., n_dims=2), Scale(1., n_dims=2)]
+    return MultiScaleParametricIterativeResult(
+        results=results, scales=[0.5, 1.], affine_transforms=identity,
+        scale_transforms=scale_transforms, gt_shape=gt_shape)
+
+
+def _compacted(result, result_mode):
+    compacted = copy.deepcopy(result)
+    compacted._compact(result_mode)
+    return compacted
+
+
+result_modes = ['full', 'trajectory', 'final']
+
+
+def test_compact_parametric_result():
+    for result_mode, with_initial_shape in product(result_modes,
+                                                   [True, False]):
+        _check_compact_parametric_result(result_mode, with_initial_shape)
+
+
+def test_compact_multiscale_parametric_result():
+    for result_mode, with_initial_shape in product(result_modes,
+                                                   [True, False]):
+        _check_compact_multiscale_parametric_result(result_mode,
+                                                    with_initial_shape)
+
+
+def _check_compact_parametric_result(result_mode, with_initial_shape):
+    initial_shape = gt_shape.copy() if with_initial_shape else None
+    result = _parametric_result(4, initial_shape=initial_shape)
+    compacted = _compacted(result, result_mode)
+    assert compacted.n_iters == result.n_iters
+    assert_allclose(compacted.reconstructed_initial_shape.points,
+                    result.reconstructed_initial_shape.points, rtol=1e-6)
+    assert_allclose(compacted.reconstructed_initial_error(),
+                    result.reconstructed_initial_error(), rtol=1e-5)
+    assert_allclose(compacted.final_error(), result.final_error(), rtol=1e-5)
+    assert_allclose(compacted.shapes[-1].points, result.final_shape.points,
+                    rtol=1e-6)
+    if with_initial_shape:
+        assert_allclose(compacted.shapes[0].points, initial_shape.points,
+                        rtol=1e-6)
+
+
+def _check_compact_multiscale_parametric_result(result_mode,
+                                                with_initial_shape):
+    initial_shape = gt_shape.copy() if with_initial_shape else None
+    result = _multiscale_result(initial_shape=initial_shape)
+    compacted = _compacted(result, result_mode)
+    assert compacted.n_iters == result.n_iters
+    assert compacted.n_iters_per_scale == result.n_iters_per_scale
+    expected = result.reconstructed_initial_shapes
+    reconstructions = compacted.reconstructed_initial_shapes
+    assert len(reconstructions) == len(expected)
+    for s, e in zip(reconstructions, expected):
+        assert_allclose(s.points, e.points, rtol=1e-6)
+    assert_allclose(compacted.reconstructed_initial_error(),
+                    result.reconstructed_initial_error(), rtol=1e-5)
+    assert_allclose(compacted.shapes[-1].points, result.final_shape.points,
+                    rtol=1e-6)
+    if result_mode == 'final':
+        n_initial = 1 if with_initial_shape else 0
+        assert len(compacted.shapes) == n_initial + result.n_scales + 1
+    else:
+        assert len(compacted.shapes) == len(result.shapes)
+
+
+def test_compact_shapes_are_built_once():
+    compacted = _compacted(_parametric_result(4), 'trajectory')
+    shapes = compacted.shapes
+    assert compacted.shapes is shapes
+    # the cached shapes are not pickled
+    unpickled = pickle.loads(pickle.dumps(compacted))
+    assert '_shapes_cache' not in vars(unpickled)
+    # replacing the compact shapes invalidates the cached ones
+    compacted._shapes = compacted._shapes + 1
+    assert compacted.shapes is not shapes
+    assert_allclose(compacted.shapes[-1].points, shapes[-1].points + 1,
+                    rtol=1e-6)
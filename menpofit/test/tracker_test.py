@@ -0,0 +1,91 @@
+import mock
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.image import Image
+from menpo.shape import PointCloud
+from menpo.transform import Translation
+
+from menpofit.lk import LucasKanadeFitter
+from menpofit.tracker import Tracker
+
+
+def _blob_image(offset=(0, 0)):
+    # Smooth synthetic image with a Gaussian blob and a landmarked square
+    y, x = np.mgrid[:120, :120].astype(np.float64)
+    cy, cx = 60 + offset[0], 60 + offset[1]
+    pixels = (np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / 300.) +
+              0.5 * np.exp(-((y - cy - 10) ** 2 + (x - cx + 8) ** 2) / 80.))
+    image = Image(pixels[None])
+    image.landmarks['PTS'] = PointCloud(
+        np.array([[cy - 25., cx - 25.], [cy - 25., cx + 25.],
+                  [cy + 25., cx + 25.], [cy + 25., cx - 25.]]))
+    return image
+
+
+def test_tracker_warm_start_on_finest_scale_of_lk_fitter():
+    template = _blob_image()
+    fitter = LucasKanadeFitter(template, group='PTS', scales=(0.5, 1.0),
+                               diagonal=None)
+    tracker = Tracker(fitter, n_tracking_scales=1, crop_proportion=0.3,
+                      max_displacement=None)
+    frames = [_blob_image(offset=(i, i)) for i in range(3)]
+    results = list(tracker.track_video(
+        frames, bounding_box=template.landmarks['PTS'].bounding_box()))
+    assert tracker.mode == 'tracking'
+    for i, result in enumerate(results[1:], 1):
+        # Only the finest scale is fitted when tracking
+        assert result.n_scales == 1
+        assert_allclose(result.final_shape.points,
+                        Translation([i, i]).apply(
+                            template.landmarks['PTS'].points), atol=1.)
+
+
+def _lk_tracker(**kwargs):
+    template = _blob_image()
+    fitter = LucasKanadeFitter(template, group='PTS', scales=(0.5, 1.0),
+                               diagonal=None)
+    return template, Tracker(fitter, n_tracking_scales=1,
+                             crop_proportion=0.3, **kwargs)
+
+
+def test_tracker_falls_back_to_full_fitting():
+    template, tracker = _lk_tracker()
+    tracker.track(template,
+                  bounding_box=template.landmarks['PTS'].bounding_box())
+    frame = _blob_image(offset=(2, 2))
+    # the warm started fitting of the finest scale is lost, but the fitting
+    # of all the scales is not
+    with mock.patch.object(Tracker, '_is_lost', side_effect=[True, False]):
+        result = tracker.track(frame)
+    assert tracker.mode == 'full'
+    assert result.n_scales == 2
+    assert result.image is None
+    assert_allclose(result.final_shape.points,
+                    frame.landmarks['PTS'].points, atol=1.)
+
+
+def test_tracker_redetects_lost_object():
+    frame = _blob_image(offset=(6, 6))
+    detector = mock.Mock(
+        return_value=[frame.landmarks['PTS'].bounding_box()])
+    # any displacement of the shape is considered a failure
+    template, tracker = _lk_tracker(detector=detector, max_displacement=0.)
+    tracker.track(template,
+                  bounding_box=template.landmarks['PTS'].bounding_box())
+    result = tracker.track(frame)
+    assert tracker.mode == 'detection'
+    assert detector.call_count == 1
+    assert result.n_scales == 2
+    assert result.image is None
+    assert_allclose(result.final_shape.points,
+                    frame.landmarks['PTS'].points, atol=1.)
+
+
+def test_tracker_returns_none_without_detector():
+    template, tracker = _lk_tracker(max_displacement=0.)
+    tracker.track(template,
+                  bounding_box=template.landmarks['PTS'].bounding_box())
+    assert tracker.track(_blob_image(offset=(6, 6))) is None
+    assert tracker.mode is None
+    assert not tracker.is_tracking
@@ -0,0 +1,230 @@
+from __future__ import division
+import numpy as np
+
+from menpofit.fitter import align_shape_with_bounding_box
+
+
+class Tracker(object):
+    r"""
+    Class for tracking a deformable object across the frames of a video with
+    a multi-scale fitter (e.g. a :map:`MultiScaleParametricFitter` or a
+    :map:`SupervisedDescentFitter`).
+
+    The fitting of each frame is initialised from the final shape of the
+    previous frame (temporal warm start). Given that the inter-frame motion of
+    a video is usually small, only the finest `n_tracking_scales` scales are
+    fitted, hence the features of the coarser scales are never computed.
+    Additionally, each frame is cropped around the previous shape, so that the
+    features are not computed on the whole frame. If the warm started fitting
+    indicates that the tracking was lost (i.e. the shape moved more than
+    `max_displacement` or the final cost is larger than `max_cost`), then the
+    frame is fitted again using all the scales and, if this fails too, the
+    object is re-detected using the `detector`.
+
+    Parameters
+    ----------
+    fitter : :map:`MultiScaleNonParametricFitter` or `subclass`
+        The trained multi-scale fitter.
+    detector : `callable` or ``None``, optional
+        Function that detects the object within an image. It must return the
+        `list` of detected bounding boxes (as `menpo.shape.PointDirectedGraph`),
+        as the detectors of ``menpodetect`` do, and the first one is used. If
+        ``None``, then the object cannot be re-detected once the tracking is
+        lost and the tracker has to be provided with a bounding box or an
+        initial shape.
+    n_tracking_scales : `int`, optional
+        The number of finest scales that are fitted when tracking.
+    crop_proportion : `float` or ``None``, optional
+        The padding of the crop around the previous shape as a proportion of
+        its size. If ``None``, then the features are computed on the whole
+        frame.
+    max_displacement : `float` or ``None``, optional
+        The maximum displacement of the shape during the warm started fitting,
+        normalised by the diagonal of the bounding box of the previous shape.
+        If the mean displacement of the points is larger, then the tracking is
+        considered lost. If ``None``, then the displacement is not checked.
+    max_cost : `float` or ``None``, optional
+        The maximum final cost of the fitting. If the final cost is larger,
+        then the tracking is considered lost. If ``None``, then the cost is not
+        checked. *Note that checking the cost requires the cost values to be
+        computed during the fitting, which increases the computational cost
+        of the fitting.*
+    max_iters : `int` or `list` of `int`, optional
+        The maximum number of iterations, as in
+        :meth:`MultiScaleNonParametricFitter.fit_from_shape`. Note that when
+        tracking, only the iterations of the fitted scales are performed.
+    """
+    def __init__(self, fitter, detector=None, n_tracking_scales=1,
+                 crop_proportion=0.3, max_displacement=0.1, max_cost=None,
+                 max_iters=20):
+        if not 1 <= n_tracking_scales <= fitter.n_scales:
+            raise ValueError('n_tracking_scales must be between 1 and the '
+                             'number of scales of the fitter ({})'.format(
+                                fitter.n_scales))
+        self.fitter = fitter
+        self.detector = detector
+        self.n_tracking_scales = n_tracking_scales
+        self.crop_proportion = crop_proportion
+        self.max_displacement = max_displacement
+        self.max_cost = max_cost
+        self.max_iters = max_iters
+        self.reset()
+
+    def reset(self):
+        r"""
+        Resets the state of the tracker, so that the next frame is fitted from
+        a detection (or the provided bounding box or initial shape).
+        """
+        self.shape = None
+        self.mode = None
+
+    @property
+    def is_tracking(self):
+        r"""
+        Whether the object was successfully fitted in the previous frame, so
+        that the next frame is warm started from its final shape.
+
+        :type: `bool`
+        """
+        return self.shape is not None
+
+    def _fit(self, image, initial_shape, first_scale=0):
+        # Fit the scales from first_scale onwards, given the initial shape in
+        # the original image space
+        fitter = self.fitter
+        (images, initial_shapes, _, affine_transforms,
+         scale_transforms) = fitter._prepare_image(
+            image, initial_shape, crop_proportion=self.crop_proportion,
+            first_scale=first_scale)
+        algorithm_results = fitter._fit(
+            images=images, initial_shape=initial_shapes[0],
+            affine_transforms=affine_transforms,
+            scale_transforms=scale_transforms, max_iters=self.max_iters,
+            return_costs=self.max_cost is not None, first_scale=first_scale)
+        # The frame is not copied into the result, as this would cost a full
+        # frame copy per fitting
+        return fitter._fitter_result(image=None,
+                                     algorithm_results=algorithm_results,
+                                     affine_transforms=affine_transforms,
+                                     scale_transforms=scale_transforms)
+
+    def _is_lost(self, result, initial_shape):
+        # Decide whether the fitting result has lost the object, given the
+        # shape it was initialised from
+        if self.max_displacement is not None:
+            displacement = np.mean(np.linalg.norm(
+                result.final_shape.points - initial_shape.points, axis=1))
+            diagonal = np.linalg.norm(initial_shape.range())
+            if displacement > self.max_displacement * diagonal:
+                return True
+        if self.max_cost is not None and result.costs:
+            if result.costs[-1] > self.max_cost:
+                return True
+        return False
+
+    def _detect(self, image):
+        if self.detector is None:
+            return None
+        bounding_boxes = self.detector(image)
+        if len(bounding_boxes) == 0:
+            return None
+        return align_shape_with_bounding_box(self.fitter.reference_shape,
+                                             bounding_boxes[0])
+
+    def track(self, image, bounding_box=None, initial_shape=None):
+        r"""
+        Fits the next frame of the video.
+
+        If the object was tracked in the previous frame, then only the finest
+        `n_tracking_scales` scales are fitted, starting from the previous final
+        shape. If the tracking is lost, then all the scales are fitted, first
+        from the previous final shape and then from a detection. The way the
+        frame was fitted is stored in :attr:`mode`, which is one of
+        ``{'tracking', 'full', 'detection', 'initialisation'}``, or ``None`` if
+        the object was not found.
+
+        Parameters
+        ----------
+        image : `menpo.image.Image` or subclass
+            The frame to be fitted.
+        bounding_box : `menpo.shape.PointDirectedGraph` or ``None``, optional
+            If provided, then the tracker is re-initialised from this bounding
+            box, i.e. all the scales are fitted starting from the model's
+            reference shape aligned with it.
+        initial_shape : `menpo.shape.PointCloud` or ``None``, optional
+            If provided, then the tracker is re-initialised from this shape,
+            i.e. all the scales are fitted starting from it.
+
+        Returns
+        -------
+        fitting_result : :map:`MultiScaleNonParametricIterativeResult` or subclass or ``None``
+            The fitting result of the frame. Note that if only the finest
+            scales were fitted, then the result only contains their
+            iterations. The frame itself is not stored in the result.
+            ``None`` is returned if the object was not found.
+        """
+        if bounding_box is not None and initial_shape is None:
+            initial_shape = align_shape_with_bounding_box(
+                self.fitter.reference_shape, bounding_box)
+
+        if initial_shape is not None:
+            # Explicit (re-)initialisation
+            result = self._fit(image, initial_shape)
+            self.shape = result.final_shape
+            self.mode = 'initialisation'
+            return result
+
+        if self.is_tracking:
+            # Temporal warm start on the finest scales
+            first_scale = self.fitter.n_scales - self.n_tracking_scales
+            result = self._fit(image, self.shape, first_scale=first_scale)
+            if not self._is_lost(result, self.shape):
+                self.shape = result.final_shape
+                self.mode = 'tracking'
+                return result
+            # Large motion, so fit all the scales from the previous shape
+            if first_scale > 0:
+                result = self._fit(image, self.shape)
+                if not self._is_lost(result, self.shape):
+                    self.shape = result.final_shape
+                    self.mode = 'full'
+                    return result
+
+        # The tracking is lost (or has not started), so re-detect the object
+        self.reset()
+        initial_shape = self._detect(image)
+        if initial_shape is None:
+            return None
+        result = self._fit(image, initial_shape)
+        # The displacement from a detection is not indicative of a failure,
+        # hence only the cost is checked
+        if (self.max_cost is not None and result.costs and
+                result.costs[-1] > self.max_cost):
+            return None
+        self.shape = result.final_shape
+        self.mode = 'detection'
+        return result
+
+    def track_video(self, frames, bounding_box=None):
+        r"""
+        Generator that tracks the object along a sequence of frames.
+
+        Parameters
+        ----------
+        frames : `iterable` of `menpo.image.Image`
+            The frames of the video, e.g. as imported by
+            ``menpo.io.import_video``.
+        bounding_box : `menpo.shape.PointDirectedGraph` or ``None``, optional
+            The bounding box of the object in the first frame. If ``None``,
+            then the object is detected using the `detector`.
+
+        Yields
+        ------
+        fitting_result : :map:`MultiScaleNonParametricIterativeResult` or subclass or ``None``
+            The fitting result of each frame or ``None`` if the object was not
+            found.
+        """
+        self.reset()
+        for i, frame in enumerate(frames):
+            yield self.track(frame,
+                             bounding_box=bounding_box if i == 0 else None)
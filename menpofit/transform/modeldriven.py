@@ -228,24 +228,30 @@ class ModelDrivenTransform(Transform, Targetable, Vectorizable,
         if not np.array_equal(self._cached_points, points):
             # recompute dW/dl, the derivative each point wrt
             # the source landmarks
-            self.dW_dl = self.transform.d_dl(points)
+            if hasattr(self.transform, 'd_dl_barycentric'):
+                # each point only depends on a few source landmarks (e.g.
+                # the vertices of its triangle for a piecewise affine), so
+                # keep the sparse (indices, weights) representation
+                self.dW_dl = self.transform.d_dl_barycentric(points)
+            else:
+                self.dW_dl = self.transform.d_dl(points)
             # cache points
             self._cached_points = points
 
         # dX/dp is simply the Jacobian of the PDM
         dX_dp = self.pdm.d_dp(points)
 
-        # PREVIOUS
-        # dW_dX:  n_points x n_centres x n_dims
         # dX_dp:  n_centres x n_params x n_dims
-
-        # dW_dl:  n_points x (n_dims) x n_centres x n_dims
-        # dX_dp:  (n_points x n_dims) x n_params
-
-        # The following is equivalent to
-        # np.einsum('ild, lpd -> ipd', self.dW_dl, dX_dp)
-        dW_dp = np.tensordot(self.dW_dl, dX_dp, (1, 0))
-        dW_dp = dW_dp.diagonal(axis1=3, axis2=1)
+        if isinstance(self.dW_dl, tuple):
+            # ijk:    n_points x n_vertices
+            # gamma:  n_points x n_vertices
+            ijk, gamma = self.dW_dl
+            dW_dp = gamma[:, 0, None, None] * dX_dp[ijk[:, 0]]
+            for v in range(1, ijk.shape[1]):
+                dW_dp += gamma[:, v, None, None] * dX_dp[ijk[:, v]]
+        else:
+            # dW_dl:  n_points x n_centres x n_dims
+            dW_dp = np.einsum('ild, lpd -> ipd', self.dW_dl, dX_dp)
 
         # dW_dp:  n_points x n_params x n_dims
 
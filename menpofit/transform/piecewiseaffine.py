@@ -40,6 +40,50 @@ class DifferentiablePiecewiseAffine(PiecewiseAffine, DL, DX):
             Note that at present this assumes that the change in every
             dimension is equal.
         """
+        # the jacobian wrt source is of shape
+        # (n_sample_points, n_source_points, 2)
+        jac = np.zeros((points.shape[0], self.n_points, 2))
+        # per sample point, only the source points for the ijk vertices of
+        # the containing triangle get a non 0 jacobian value
+        ijk_per_point, gamma_ijk = self.d_dl_barycentric(points)
+        # to index into the jacobian, we just need a linear iterator for the
+        # first axis - literally [0, 1, ... , n_sample_points]. The
+        # reshape is needed to make it broadcastable with the other indexing
+        # term, ijk_per_point.
+        linear_iterator = np.arange(points.shape[0]).reshape((-1, 1))
+        # in one line, we are done.
+        jac[linear_iterator, ijk_per_point] = gamma_ijk[..., None]
+        return jac
+
+    def d_dl_barycentric(self, points):
+        r"""
+        The derivative of the warp with respect to spatial changes in anchor
+        landmark points, evaluated at points, in a sparse form.
+
+        Each point is only affected by the three vertices of the triangle
+        that contains it. Thus, instead of the dense ``(n_points, n_centres,
+        n_dims)`` Jacobian returned by :meth:`d_dl`, this method returns the
+        indices of these three vertices along with their barycentric weights.
+
+        Parameters
+        ----------
+        points : ``(n_points, n_dims)`` `ndarray`
+            The spatial points at which the derivative should be evaluated.
+
+        Returns
+        -------
+        ijk_per_point : ``(n_points, 3)`` `ndarray`
+            The indices of the vertices of the triangle that contains each
+            point.
+        gamma_ijk : ``(n_points, 3)`` `ndarray`
+            The non-zero values of the Jacobian, i.e. ``d_dl[i, k, m] =
+            gamma_ijk[i, v]`` for ``k = ijk_per_point[i, v]`` and every ``m``.
+
+        Raises
+        ------
+        TriangleContainmentError:
+            If any point is outside any triangle of this PWA.
+        """
         tri_index, alpha_i, beta_i = self.index_alpha_beta(points)
         # for the jacobian we only need
         # gamma = 1 - alpha - beta
@@ -61,21 +105,10 @@ class DifferentiablePiecewiseAffine(PiecewiseAffine, DL, DX):
         gamma_ijk = np.hstack(((1 - alpha_i - beta_i)[:, None],
                                alpha_i[:, None],
                                beta_i[:, None]))
-        # the jacobian wrt source is of shape
-        # (n_sample_points, n_source_points, 2)
-        jac = np.zeros((points.shape[0], self.n_points, 2))
         # per sample point, find the source points for the ijk vertices of
-        # the containing triangle - only these points will get a non 0
-        # jacobian value
+        # the containing triangle
         ijk_per_point = self.trilist[tri_index]
-        # to index into the jacobian, we just need a linear iterator for the
-        # first axis - literally [0, 1, ... , n_sample_points]. The
-        # reshape is needed to make it broadcastable with the other indexing
-        # term, ijk_per_point.
-        linear_iterator = np.arange(points.shape[0]).reshape((-1, 1))
-        # in one line, we are done.
-        jac[linear_iterator, ijk_per_point] = gamma_ijk[..., None]
-        return jac
+        return ijk_per_point, gamma_ijk
 
     def d_dx(self, points):
         r"""
@@ -0,0 +1,52 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from menpo.shape import PointCloud
+from menpofit.modelinstance import OrthoPDM
+from menpofit.transform import (DifferentiablePiecewiseAffine,
+                                OrthoMDTransform)
+
+
+src = PointCloud(np.array([[0.0, 0.0], [0, 10], [10, 0], [10, 10]]))
+tgt = PointCloud(np.array([[1.0, 1.0], [0, 12], [11, 0], [12, 13]]))
+pts = np.array([[1.0, 1.0], [2.5, 7.0], [8.0, 3.0], [6.0, 6.0]])
+
+
+def test_pwa_d_dl_barycentric_matches_d_dl():
+    pwa = DifferentiablePiecewiseAffine(src, tgt)
+    ijk, gamma = pwa.d_dl_barycentric(pts)
+    dense = np.zeros((pts.shape[0], src.n_points))
+    dense[np.arange(pts.shape[0])[:, None], ijk] = gamma
+    assert_allclose(pwa.d_dl(pts), np.repeat(dense[..., None], 2, axis=-1))
+
+
+def test_pwa_d_dl_barycentric_weights_sum_to_one():
+    pwa = DifferentiablePiecewiseAffine(src, tgt)
+    _, gamma = pwa.d_dl_barycentric(pts)
+    assert_allclose(gamma.sum(axis=1), np.ones(pts.shape[0]))
+
+
+def test_md_transform_d_dp_matches_dense_jacobian():
+    rng = np.random.RandomState(0)
+    shapes = [PointCloud(src.points + rng.randn(4, 2)) for _ in range(6)]
+    pdm = OrthoPDM(shapes)
+    md = OrthoMDTransform(pdm, DifferentiablePiecewiseAffine,
+                          source=pdm.model.mean())
+    # Points within each triangle of the source
+    trilist = md.transform.trilist
+    weights = np.array([[0.2, 0.3, 0.5], [0.6, 0.1, 0.3]])
+    sample = np.vstack([weights.dot(md.transform.source.points[t]) for t in trilist])
+    # The dense derivative of the points wrt the source landmarks and its
+    # chaining with the Jacobian of the PDM, as computed before
+    # d_dl_barycentric was used
+    pwa = md.transform
+    tri_index, alpha, beta = pwa.index_alpha_beta(sample)
+    gamma = np.hstack(((1 - alpha - beta)[:, None], alpha[:, None],
+                       beta[:, None]))
+    dW_dl = np.zeros((sample.shape[0], pwa.n_points, 2))
+    dW_dl[np.arange(sample.shape[0])[:, None],
+          pwa.trilist[tri_index]] = gamma[..., None]
+    dX_dp = md.pdm.d_dp(sample)
+    expected = np.tensordot(dW_dl, dX_dp, (1, 0))
+    expected = expected.diagonal(axis1=3, axis2=1)
+    assert_allclose(md.d_dp(sample), expected)
@@ -3,6 +3,7 @@ import numpy as np
 from menpofit.base import build_grid
 from menpofit.checks import check_model
 from menpofit.modelinstance import OrthoPDM
+from menpofit.profiling import stage, set_iteration
 
 from .result import UnifiedAAMCLMAlgorithmResult
 
@@ -95,8 +96,9 @@ class UnifiedAlgorithm(object):
         yxs = target.points[:, None, None, ...] + self._sampling_grid
 
         # compute parts response
-        parts_response = self.expert_ensemble.predict_probability(
-            image, target).squeeze()
+        with stage('responses'):
+            parts_response = self.expert_ensemble.predict_probability(
+                image, target).squeeze()
         parts_response[np.logical_not(np.isfinite(parts_response))] = .5
 
         # compute parts kernel
@@ -217,7 +219,8 @@ class ProjectOutRegularisedLandmarkMeanShift(UnifiedAlgorithm):
 
         # AAM part --------------------------------------------------------
         # warp image
-        i = self.interface.warp(image)
+        with stage('warp'):
+            i = self.interface.warp(image)
         # vectorize it and mask it
         masked_i = i.as_vector()[self.interface.i_mask]
 
@@ -233,6 +236,7 @@ class ProjectOutRegularisedLandmarkMeanShift(UnifiedAlgorithm):
             costs = [cost_closure(e_aam, e_clm, a)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute gauss-newton parameter updates
             if prior:
                 b = (self._j_prior * self.transform.as_vector() -
@@ -250,7 +254,8 @@ class ProjectOutRegularisedLandmarkMeanShift(UnifiedAlgorithm):
 
             # AAM part --------------------------------------------------------
             # warp image
-            i = self.interface.warp(image)
+            with stage('warp'):
+                i = self.interface.warp(image)
             # vectorize it and mask it
             masked_i = i.as_vector()[self.interface.i_mask]
 
@@ -363,7 +368,8 @@ class AlternatingRegularisedLandmarkMeanShift(UnifiedAlgorithm):
         # AAM part --------------------------------------------------------
 
         # warp image
-        i = self.interface.warp(image)
+        with stage('warp'):
+            i = self.interface.warp(image)
         # mask warped image
         masked_i = i.as_vector()[self.interface.i_mask]
 
@@ -385,8 +391,10 @@ class AlternatingRegularisedLandmarkMeanShift(UnifiedAlgorithm):
             costs = [cost_closure(e_aam, e_clm, a)]
 
         while k < max_iters and eps > self.eps:
+            set_iteration(k)
             # compute model gradient
-            nabla_t = self.interface.gradient(self.template)
+            with stage('gradient'):
+                nabla_t = self.interface.gradient(self.template)
 
             # compute AAM jacobian
             j = self.interface.steepest_descent_images(nabla_t, self._dw_dp)
@@ -401,11 +409,13 @@ class AlternatingRegularisedLandmarkMeanShift(UnifiedAlgorithm):
                 b = (self._j_prior * self.transform.as_vector() -
                      a * j_aam.T.dot(e_aam) -
                      (1 - a) * self._j_clm.T.dot(e_clm))
-                dp = -np.linalg.solve(h, b)
+                with stage('solve'):
+                    dp = -np.linalg.solve(h, b)
             else:
-                dp = np.linalg.solve(a * h_aam + (1 - a) * self._h_clm,
-                                     a * j_aam.T.dot(e_aam) +
-                                     (1 - a) * self._j_clm.T.dot(e_clm))
+                with stage('solve'):
+                    dp = np.linalg.solve(a * h_aam + (1 - a) * self._h_clm,
+                                         a * j_aam.T.dot(e_aam) +
+                                         (1 - a) * self._j_clm.T.dot(e_clm))
 
             # update warp
             target = self.transform.target
@@ -414,7 +424,8 @@ class AlternatingRegularisedLandmarkMeanShift(UnifiedAlgorithm):
             shapes.append(self.transform.target)
 
             # warp image
-            i = self.interface.warp(image)
+            with stage('warp'):
+                i = self.interface.warp(image)
             # mask warped image
             masked_i = i.as_vector()[self.interface.i_mask]
 
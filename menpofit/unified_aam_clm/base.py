@@ -1,8 +1,8 @@
+from functools import partial
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
 from menpo.base import name_of_callable
-from menpo.model import PCAModel
 from menpo.feature import no_op, ndfeature
 from menpo.transform import Scale
 from menpo.visualize import print_dynamic
@@ -10,7 +10,9 @@ from menpo.visualize import print_dynamic
 from menpofit import checks
 from menpofit.builder import (build_reference_frame, compute_reference_shape,
                               rescale_images_to_reference_shape,
-                              compute_features, scale_images, warp_images)
+                              compute_features, scale_images, warp_images,
+                              build_appearance_model_out_of_core,
+                              build_pca_model, extract_shapes)
 from menpofit.aam.algorithm.lk import LucasKanadeStandardInterface
 from menpofit.clm import CorrelationFilterExpertEnsemble
 from menpofit.clm.expert.ensemble import ConvolutionBasedExpertEnsemble
@@ -63,7 +65,10 @@ class UnifiedAAMCLM(object):
         assumed.
     expert_ensemble_cls : `subclass` of :map:`ExpertEnsemble`, optional
         The class to be used for training the ensemble of experts. The most
-        common choice is :map:`CorrelationFilterExpertEnsemble`.
+        common choice is :map:`CorrelationFilterExpertEnsemble`. Any
+        additional arguments of the ensemble, e.g. the ``n_workers`` and
+        ``memmap_dir`` of :map:`CorrelationFilterExpertEnsemble`, can be set
+        by passing a `functools.partial` of the class.
     patch_shape : (`int`, `int`) or `list` of (`int`, `int`), optional
         The shape of the patches to be extracted. If a `list` is provided,
         then it defines a patch shape per scale.
@@ -112,6 +117,29 @@ class UnifiedAAMCLM(object):
         the extracted patches.    
     verbose : `bool`, optional
         If ``True``, then the progress of building the model will be printed.
+    appearance_block_size : `int` or ``None``, optional
+        If an `int` is provided, then the appearance models are built
+        out-of-core: the warped images are streamed, `appearance_block_size`
+        at a time, to a memory-mapped temporary file from which the principal
+        components are computed in blocks (see
+        :map:`build_appearance_model_out_of_core`). If ``None``, then the
+        appearance models are built in memory.
+    pca_solver : ``{'auto', 'exact', 'randomized'}``, optional
+        The decomposition of the appearance models. If ``'auto'``, then a
+        randomized truncated decomposition is performed whenever
+        `max_appearance_components` is an `int` much smaller than the number
+        of training images (see :map:`build_pca_model`). Otherwise, the full
+        eigendecomposition is performed and then trimmed.
+    pca_oversamples : `int`, optional
+        The oversampling of the randomized decomposition.
+    pca_power_iterations : `int`, optional
+        The number of power iterations of the randomized decomposition.
+    n_workers : `int` or ``None`` or `multiprocessing.pool.Pool`, optional
+        The parallelism of the rescaling, feature extraction and warping of
+        the training images (see :map:`parallel_map`). If `int`, then it is
+        the number of threads. If ``None``, then the number of CPUs is used.
+        It can also be an existing pool of workers, e.g. a process pool, in
+        which case the images and the features must be picklable.
 
     References
     ----------
@@ -119,6 +147,9 @@ class UnifiedAAMCLM(object):
         parts-based deformable model fitting", Proceedings of the IEEE
         Conference on Computer Vision and Pattern Recognition (CVPR), 2015.
     """
+    # Models that were pickled before n_workers existed build sequentially
+    n_workers = 1
+
     def __init__(self, images, group=None, holistic_features=no_op,
                  reference_shape=None, diagonal=None, scales=(0.5, 1.0),
                  expert_ensemble_cls=CorrelationFilterExpertEnsemble,
@@ -127,7 +158,9 @@ class UnifiedAAMCLM(object):
                  shape_model_cls=OrthoPDM, max_shape_components=None,
                  max_appearance_components=None, sigma=None, boundary=3,
                  response_covariance=2, patch_normalisation=no_op,
-                 cosine_mask=True, verbose=False):
+                 cosine_mask=True, verbose=False, appearance_block_size=None,
+                 pca_solver='auto', pca_oversamples=10,
+                 pca_power_iterations=2, n_workers=1):
         # Check parameters
         checks.check_diagonal(diagonal)
         scales = checks.check_scales(scales)
@@ -158,6 +191,11 @@ class UnifiedAAMCLM(object):
         self.response_covariance = response_covariance
         self.patch_normalisation = patch_normalisation
         self.cosine_mask = cosine_mask
+        self.appearance_block_size = appearance_block_size
+        self.pca_solver = pca_solver
+        self.pca_oversamples = pca_oversamples
+        self.pca_power_iterations = pca_power_iterations
+        self.n_workers = n_workers
         self.shape_models = []
         self.appearance_models = []
         self.expert_ensembles = []
@@ -171,17 +209,44 @@ class UnifiedAAMCLM(object):
                      prefix, verbose):
         reference_frame = build_reference_frame(reference_shape)
         return warp_images(images, shapes, reference_frame, self.transform,
-                           prefix=prefix, verbose=verbose)
+                           prefix=prefix, verbose=verbose,
+                           n_workers=self.n_workers)
+
+    def _build_appearance_model(self, images, shapes, reference_shape,
+                                scale_index, prefix, verbose):
+        block_size = getattr(self, 'appearance_block_size', None)
+        max_n_components = self.max_appearance_components[scale_index]
+        pca_kwargs = {
+            'solver': getattr(self, 'pca_solver', 'auto'),
+            'n_oversamples': getattr(self, 'pca_oversamples', 10),
+            'n_power_iterations': getattr(self, 'pca_power_iterations', 2)}
+        if block_size is not None:
+            # Stream the warped images to disk, block by block
+            warp = partial(self._warp_images, reference_shape=reference_shape,
+                           scale_index=scale_index, prefix=prefix,
+                           verbose=False)
+            return build_appearance_model_out_of_core(
+                images, shapes, warp, block_size,
+                max_n_components=max_n_components, prefix=prefix,
+                verbose=verbose, **pca_kwargs)
+
+        warped_images = self._warp_images(images, shapes, reference_shape,
+                                          scale_index, prefix, verbose)
+        if verbose:
+            print_dynamic('{}Building appearance model'.format(prefix))
+        return build_pca_model(warped_images,
+                               max_n_components=max_n_components,
+                               prefix=prefix, verbose=verbose, **pca_kwargs)
   
     def _train(self, images, group=None, verbose=False):
         checks.check_landmark_trilist(images[0], self.transform, group=group)
         self.reference_shape = compute_reference_shape(
-            [i.landmarks[group].lms for i in images],
-            self.diagonal, verbose=verbose)
+            extract_shapes(images, group), self.diagonal, verbose=verbose)
         
         # normalize images
         images = rescale_images_to_reference_shape(
-            images, group, self.reference_shape, verbose=verbose)
+            images, group, self.reference_shape, verbose=verbose,
+            n_workers=self.n_workers)
         if self.sigma:
             images = [fsmooth(i, self.sigma) for i in images]
 
@@ -211,13 +276,15 @@ class UnifiedAAMCLM(object):
                 feature_images = compute_features(images,
                                                   self.holistic_features[j],
                                                   prefix=scale_prefix,
-                                                  verbose=verbose)
+                                                  verbose=verbose,
+                                                  n_workers=self.n_workers)
             # handle scales
             if self.scales[j] != 1:
                 # Scale feature images only if scale is different than 1
                 scaled_images = scale_images(feature_images, self.scales[j],
                                              prefix=scale_prefix,
-                                             verbose=verbose)
+                                             verbose=verbose,
+                                             n_workers=self.n_workers)
             else:
                 scaled_images = feature_images
 
@@ -237,20 +304,10 @@ class UnifiedAAMCLM(object):
             # reference frame.
             scaled_reference_shape = Scale(self.scales[j], n_dims=2).apply(
                 self.reference_shape)
-            warped_images = self._warp_images(scaled_images, scale_shapes,
-                                              scaled_reference_shape,
-                                              j, scale_prefix, verbose)
-
             # obtain appearance model
-            if verbose:
-                print_dynamic('{}Building appearance model'.format(
-                    scale_prefix))
-
-            appearance_model = PCAModel(warped_images)
-            # trim appearance model if required
-            if self.max_appearance_components[j] is not None:
-                appearance_model.trim_components(
-                    self.max_appearance_components[j])
+            appearance_model = self._build_appearance_model(
+                scaled_images, scale_shapes, scaled_reference_shape, j,
+                scale_prefix, verbose)
             # add appearance model to the list
             self.appearance_models.append(appearance_model)
 
@@ -1,5 +1,5 @@
 from menpofit.result import (ParametricIterativeResult,
-                             MultiScaleParametricIterativeResult)
+                             MultiScaleParametricIterativeResult, _as_list)
 
 
 class UnifiedAAMCLMAlgorithmResult(ParametricIterativeResult):
@@ -55,7 +55,7 @@ class UnifiedAAMCLMAlgorithmResult(ParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._appearance_parameters
+        return _as_list(self._appearance_parameters)
 
 
 class UnifiedAAMCLMResult(MultiScaleParametricIterativeResult):
@@ -110,4 +110,4 @@ class UnifiedAAMCLMResult(MultiScaleParametricIterativeResult):
 
         :type: `list` of ``(n_params,)`` `ndarray`
         """
-        return self._appearance_parameters
+        return _as_list(self._appearance_parameters)